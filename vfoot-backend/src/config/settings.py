@@ -89,6 +89,9 @@ MIDDLEWARE = [
     # Announces the server's clock when it has been shifted, so the client's
     # countdowns do not measure across two different clocks. Inert otherwise.
     'vfoot.middleware.SimClockHeaderMiddleware',
+    # One read of each season's calendar per request, however many lock and
+    # deadline questions the view asks of it (see vfoot/services/matchday_state).
+    'vfoot.middleware.CalendarScopeMiddleware',
 ]
 
 
@@ -111,6 +114,12 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    # DRF's two defaults, with the JSON one encoding through orjson and sending
+    # pre-encoded cached bodies as they are (vfoot/api/renderers.py).
+    "DEFAULT_RENDERER_CLASSES": [
+        "vfoot.api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     # One proxy sits in front of us (nginx), and this number is what makes the
     # per-IP throttling below actually per-IP. Without it DRF keys on the WHOLE
     # X-Forwarded-For string, and nginx APPENDS to whatever the client sent
@@ -337,6 +346,10 @@ VFOOT_SIM_SEED = int(os.environ.get("VFOOT_SIM_SEED", "2627"))
 VFOOT_DATA_DIR = Path(os.environ.get("VFOOT_DATA_DIR", str(REPO_ROOT)))
 VFOOT_SOFASCORE_CACHE = str(VFOOT_DATA_DIR / "historical-data" / "serie-a"
                             / "sofascore" / "cache")
+# Season feature tensors written by ``export_season_tensor`` (a cache: the readers
+# fall back to the database when it is missing or out of date).
+VFOOT_SEASON_TENSOR_DIR = Path(os.environ.get("VFOOT_SEASON_TENSOR_DIR",
+                                              str(VFOOT_DATA_DIR / "season-tensors")))
 
 # Percorso del browser per lo scraping. Sul server usiamo il Chromium di SISTEMA
 # (pacchettizzato da Debian) invece di far scaricare a Playwright una copia
@@ -359,6 +372,18 @@ CACHES = {
     }
 }
 
+# Single-flight on the expensive cache entries (vfoot/services/single_flight.py):
+# how long a worker may hold the right to rebuild one before the others assume
+# it died, and how long the others wait for it before building it themselves.
+# The LEASE must outlast the slowest build (the listone on a cold season, some
+# seconds); the WAIT is what a request is willing to add to its own latency.
+VFOOT_SINGLE_FLIGHT_LEASE = int(os.environ.get("VFOOT_SINGLE_FLIGHT_LEASE", "120"))
+VFOOT_SINGLE_FLIGHT_WAIT = float(os.environ.get("VFOOT_SINGLE_FLIGHT_WAIT", "15"))
+
+# The window health_report reads the cache hit/miss counters over
+# (realdata/services/cache_stats.py), in hours.
+VFOOT_CACHE_STATS_HOURS = float(os.environ.get("VFOOT_CACHE_STATS_HOURS", "24"))
+
 # Under `manage.py test` the cache above is the wrong tool twice over: it is the
 # DEVELOPER'S real cache directory, so a test run pollutes it, and it survives
 # between tests — which with throttling turned on means the counter of one test
@@ -61,6 +61,7 @@ class MaintenanceStateView(APIView):
         return Response({
             "verdict": report.verdict,
             "checks": report.as_dict()["checks"],
+            "caches": report.caches,
             "pending": [_brief(p) for p in pending],
             "runs": [{
                 "id": r.id,
@@ -0,0 +1,80 @@
+"""Move a concluded season's zone rows into cold storage, or bring them back.
+
+Each match's ``PlayerZoneFeature`` and ``TeamZoneFeature`` rows become one
+compressed ``MatchZoneArchive`` row; the per-match totals stay where they are and
+keep scoring the season. The readers that still look at an old season's zones
+read the archive transparently (see ``realdata.services.zone_archive``); the
+historical simulators do not, and want ``--restore`` first.
+
+    python manage.py archive_zone_features --season 1 --dry-run
+    python manage.py archive_zone_features --season 1
+    python manage.py archive_zone_features --season 1 --restore
+"""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from realdata.models import (
+    CompetitionSeason, MatchZoneArchive, PlayerZoneFeature, TeamZoneFeature,
+)
+from realdata.services import zone_archive
+
+
+class Command(BaseCommand):
+    help = "Archive (or restore) the zone feature rows of a concluded season."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", type=int, required=True,
+                            help="CompetitionSeason id.")
+        parser.add_argument("--restore", action="store_true",
+                            help="Put the season's archived rows back in the tables.")
+        parser.add_argument("--force", action="store_true",
+                            help="Archive even if some match is still to be played.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Say what would move and write nothing.")
+
+    def handle(self, *args, **o):
+        cs = CompetitionSeason.objects.filter(id=o["season"]).first()
+        if cs is None:
+            raise CommandError(f"No CompetitionSeason id={o['season']}")
+        verbose = o.get("verbosity", 1) > 1
+        log = self.stdout.write if verbose else (lambda _m: None)
+
+        if o["dry_run"]:
+            self._report(cs, o["restore"])
+            return
+
+        try:
+            if o["restore"]:
+                result = zone_archive.restore_season(cs.id, log=log)
+                self.stdout.write(self.style.SUCCESS(
+                    f"'{cs}': {result.matches} partite ripristinate "
+                    f"({result.player_rows} righe giocatore, {result.team_rows} squadra)"))
+                return
+            # The votes of the season, materialized while the zones are still hot:
+            # the ratings cache then answers for the season without reading them.
+            from vfoot.services.player_ratings import season_player_ratings
+            season_player_ratings(cs.id)
+            result = zone_archive.archive_season(cs.id, force=o["force"], log=log)
+        except zone_archive.ArchiveError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(
+            f"'{cs}': {result.matches} partite archiviate "
+            f"({result.player_rows} righe giocatore, {result.team_rows} squadra, "
+            f"{result.stored_bytes:,} byte compressi)"))
+
+    def _report(self, cs, restore: bool):
+        if restore:
+            n = MatchZoneArchive.objects.filter(match__competition_season=cs).count()
+            self.stdout.write(f"'{cs}': {n} partite da ripristinare")
+            return
+        if not zone_archive.season_concluded(cs.id):
+            self.stdout.write(self.style.WARNING(
+                f"'{cs}': stagione non conclusa (serve --force)"))
+        per_match = (PlayerZoneFeature.objects.filter(match__competition_season=cs)
+                     .values("match_id").annotate(n=Count("id")))
+        teams = TeamZoneFeature.objects.filter(match__competition_season=cs).count()
+        self.stdout.write(
+            f"'{cs}': {len(per_match)} partite da archiviare "
+            f"({sum(r['n'] for r in per_match)} righe giocatore, {teams} squadra)")
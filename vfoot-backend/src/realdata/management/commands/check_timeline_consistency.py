@@ -1,10 +1,138 @@
+"""Check the on-pitch timelines: intervals against each other and against the cards.
+
+Every check is local to one match — who is on the pitch for one side, when a player
+sent off leaves it — so the database is read a chunk of matches at a time, season
+by season, and never held whole: memory is the size of a chunk, not of the history.
+
+    manage.py check_timeline_consistency                  # every season
+    manage.py check_timeline_consistency --season 3       # one CompetitionSeason
+    manage.py check_timeline_consistency --changed        # what moved since last run
+
+``--changed`` re-checks only the matches whose intervals or cards were rewritten
+since the last successful run — the importers replace a match's rows rather than
+editing them, so a fresh ``created_at`` is a rewrite — plus those the importer has
+touched since (``data_changed_at``), which covers rows deleted and not replaced.
+Every run is recorded in the job log, which is where the next one reads "since": a
+``--season`` run under a key of its own, since it has checked that season alone. So
+one season's run never moves another's watermark, while a run over every season
+counts as a check of each.
+"""
 from __future__ import annotations
 
 from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 
 from django.core.management.base import BaseCommand
 
 from realdata.models import CARD_RED, CARD_SECOND_YELLOW, Match, MatchDisciplinaryEvent, PlayerOnPitchInterval
+from realdata.services import job_log
+
+JOB = "check_timeline_consistency"
+
+
+def job_name(season_id: int | None) -> str:
+    """The job log key of a run: one per season for the scoped runs."""
+    return JOB if season_id is None else f"{JOB}:{season_id}"
+
+
+def last_check(season_id: int | None):
+    """The last successful run that checked ``season_id`` (every season: None)."""
+    runs = [job_log.last_run(name, ok_only=True)
+            for name in {JOB, job_name(season_id)}]
+    return max((run for run in runs if run is not None),
+               key=lambda run: run.started_at, default=None)
+
+
+@dataclass
+class Findings:
+    teams_checked: int = 0
+    invalid_intervals: list = field(default_factory=list)
+    exact_duplicates: int = 0
+    player_overlaps: list = field(default_factory=list)
+    active_at_zero: Counter = field(default_factory=Counter)
+    max_raw: int = 0
+    max_adjusted: int = 0
+    raw_over_11: list = field(default_factory=list)
+    adjusted_over_11: list = field(default_factory=list)
+    red_events: int = 0
+    red_no_raw_drop: list = field(default_factory=list)
+    low_active_segments: list = field(default_factory=list)
+
+
+def check_match(match_id: int, intervals, reds, out: Findings) -> None:
+    """Add one match's findings to ``out``.
+
+    ``intervals`` are ``(team_side, player_id, start, end)`` rows, ``reds`` are
+    ``(team_side, player_id, elapsed_seconds)`` for the sending-offs.
+    """
+    intervals_by_team: dict[tuple[int, str], list[tuple[int, int, int]]] = defaultdict(list)
+    intervals_by_player: dict[tuple[int, int], list[tuple[int, int]]] = defaultdict(list)
+    duplicates = Counter()
+    for side, player_id, start, end in intervals:
+        key = (match_id, str(side))
+        if end <= start:
+            out.invalid_intervals.append((key, start, end, player_id))
+            continue
+        intervals_by_team[key].append((start, end, player_id))
+        intervals_by_player[(match_id, player_id)].append((start, end, player_id, key[1], ""))
+        duplicates[(side, player_id, start, end)] += 1
+    out.exact_duplicates += sum(1 for count in duplicates.values() if count > 1)
+
+    sent_off_by_team: dict[tuple[int, str], list[tuple[int, int]]] = defaultdict(list)
+    for side, player_id, elapsed in reds:
+        if player_id is None:
+            continue
+        sent_off_by_team[(match_id, str(side))].append((int(elapsed), int(player_id)))
+
+    for key, rows in intervals_by_player.items():
+        rows = sorted(rows)
+        for first, second in zip(rows, rows[1:]):
+            if second[0] < first[1]:
+                out.player_overlaps.append((key, first, second))
+
+    out.teams_checked += len(intervals_by_team)
+    for key, rows in intervals_by_team.items():
+        sent = sent_off_by_team.get(key, [])
+        times = {time for start, end, _ in rows for time in (start, end)}
+        times.update(time for time, _ in sent)
+        out.active_at_zero[len({player_id for start, end, player_id in rows if start <= 0 < end})] += 1
+        sorted_times = sorted(times)
+        for time in sorted_times:
+            raw_active = {player_id for start, end, player_id in rows if start <= time < end}
+            sent_off = {player_id for red_time, player_id in sent if red_time <= time}
+            adjusted_active = raw_active - sent_off
+            out.max_raw = max(out.max_raw, len(raw_active))
+            out.max_adjusted = max(out.max_adjusted, len(adjusted_active))
+            if len(raw_active) > 11:
+                out.raw_over_11.append((key, time, len(raw_active)))
+            if len(adjusted_active) > 11:
+                out.adjusted_over_11.append((key, time, len(adjusted_active)))
+
+        for start, end in zip(sorted_times, sorted_times[1:]):
+            raw_active = {player_id for left, right, player_id in rows if left <= start and end <= right}
+            if len(raw_active) < 10 and end - start >= 60:
+                red_count = sum(1 for red_time, _ in sent if red_time <= start)
+                out.low_active_segments.append((key, start, end, len(raw_active), red_count))
+
+    for key, red_rows in sent_off_by_team.items():
+        out.red_events += len(red_rows)
+        rows = intervals_by_team.get(key, [])
+        for red_time, player_id in red_rows:
+            before_time = max(0, red_time - 1)
+            after_time = red_time + 1
+            before = {player for start, end, player in rows if start <= before_time < end}
+            after = {player for start, end, player in rows if start <= after_time < end}
+            if player_id in before and len(after) >= len(before):
+                out.red_no_raw_drop.append((key, red_time, player_id, len(before), len(after)))
+
+
+def changed_match_ids(since) -> set[int]:
+    """Matches whose timeline rows were (re)written, or whose data moved, at or after ``since``."""
+    return (
+        set(PlayerOnPitchInterval.objects.filter(created_at__gte=since).values_list("match_id", flat=True))
+        | set(MatchDisciplinaryEvent.objects.filter(created_at__gte=since).values_list("match_id", flat=True))
+        | set(Match.objects.filter(data_changed_at__gte=since).values_list("id", flat=True))
+    )
 
 
 class Command(BaseCommand):
@@ -12,100 +140,62 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--max-examples", type=int, default=10)
+        parser.add_argument("--season", type=int, default=None,
+                            help="Only this CompetitionSeason id (default: every season).")
+        parser.add_argument("--changed", action="store_true",
+                            help="Only the matches whose intervals or cards changed since the "
+                                 "last successful run (all of them on the first run).")
+        parser.add_argument("--chunk", type=int, default=200,
+                            help="Matches read per query (default 200).")
 
     def handle(self, *args, **options):
-        max_examples = int(options["max_examples"])
-        intervals_by_team: dict[tuple[int, str], list[tuple[int, int, int]]] = defaultdict(list)
-        for row in PlayerOnPitchInterval.objects.values(
-            "match_id",
-            "team_side",
-            "player_id",
-            "start_elapsed_seconds",
-            "end_elapsed_seconds",
-        ):
-            start = int(row["start_elapsed_seconds"])
-            end = int(row["end_elapsed_seconds"])
-            if end <= start:
-                continue
-            intervals_by_team[(int(row["match_id"]), str(row["team_side"]))].append((start, end, int(row["player_id"])))
-
-        sent_off_by_team: dict[tuple[int, str], list[tuple[int, int]]] = defaultdict(list)
-        for row in MatchDisciplinaryEvent.objects.filter(card_type__in=[CARD_RED, CARD_SECOND_YELLOW]).values(
-            "match_id",
-            "team_side",
-            "player_id",
-            "elapsed_seconds",
-        ):
-            if row["player_id"] is None:
-                continue
-            sent_off_by_team[(int(row["match_id"]), str(row["team_side"]))].append(
-                (int(row["elapsed_seconds"]), int(row["player_id"]))
-            )
+        with job_log.record(job_name(options["season"])) as run:
+            self._check(options, run)
 
+    def _check(self, options, run) -> None:
+        max_examples = int(options["max_examples"])
+        chunk = max(1, int(options["chunk"]))
+        matches = Match.objects.all()
+        if options["season"] is not None:
+            matches = matches.filter(competition_season_id=options["season"])
+        if options["changed"]:
+            last = last_check(options["season"])
+            if last is not None:
+                matches = matches.filter(id__in=changed_match_ids(last.started_at))
+                self.stdout.write(f"changed_since={last.started_at.isoformat()}")
+        match_ids = list(matches.order_by("competition_season_id", "id").values_list("id", flat=True))
+
+        found = Findings()
+        for i in range(0, len(match_ids), chunk):
+            ids = match_ids[i:i + chunk]
+            intervals: dict[int, list] = defaultdict(list)
+            for match_id, *row in (PlayerOnPitchInterval.objects.filter(match_id__in=ids)
+                                   .order_by("match_id", "id")
+                                   .values_list("match_id", "team_side", "player_id",
+                                                "start_elapsed_seconds", "end_elapsed_seconds")):
+                intervals[match_id].append(row)
+            reds: dict[int, list] = defaultdict(list)
+            for match_id, *row in (MatchDisciplinaryEvent.objects
+                                   .filter(match_id__in=ids, card_type__in=[CARD_RED, CARD_SECOND_YELLOW])
+                                   .order_by("match_id", "id")
+                                   .values_list("match_id", "team_side", "player_id", "elapsed_seconds")):
+                reds[match_id].append(row)
+            for match_id in ids:
+                if match_id in intervals or match_id in reds:
+                    check_match(match_id, intervals.get(match_id, ()), reds.get(match_id, ()), found)
+
+        run.did(matches_checked=len(match_ids), player_interval_overlaps=len(found.player_overlaps),
+                raw_over_11=len(found.raw_over_11), red_without_drop=len(found.red_no_raw_drop))
+        self._write(found, len(match_ids), max_examples)
+
+    def _write(self, found: Findings, matches_checked: int, max_examples: int) -> None:
+        shown = {match_id for (match_id, _), _, _ in
+                 found.raw_over_11[:max_examples] + found.adjusted_over_11[:max_examples]}
         match_labels = {
             match.id: f"{match.external_id} {match.home_team} vs {match.away_team}"
-            for match in Match.objects.select_related("home_team", "away_team")
+            for match in Match.objects.filter(id__in=shown).select_related("home_team", "away_team")
         }
 
-        raw_over_11 = []
-        adjusted_over_11 = []
-        red_no_raw_drop = []
-        max_raw = 0
-        max_adjusted = 0
-        invalid_intervals = []
-        player_overlaps = []
-        exact_duplicates = Counter()
-        active_at_zero = Counter()
-        low_active_segments = []
-
-        intervals_by_player: dict[tuple[int, int], list[tuple[int, int, int, str, str]]] = defaultdict(list)
-        for key, rows in intervals_by_team.items():
-            for start, end, player_id in rows:
-                if end <= start:
-                    invalid_intervals.append((key, start, end, player_id))
-                intervals_by_player[(key[0], player_id)].append((start, end, player_id, key[1], ""))
-                exact_duplicates[(key[0], key[1], player_id, start, end)] += 1
-
-        for key, rows in intervals_by_player.items():
-            rows = sorted(rows)
-            for first, second in zip(rows, rows[1:]):
-                if second[0] < first[1]:
-                    player_overlaps.append((key, first, second))
-
-        for key, rows in intervals_by_team.items():
-            times = {time for start, end, _ in rows for time in (start, end)}
-            times.update(time for time, _ in sent_off_by_team.get(key, []))
-            active_at_zero[len({player_id for start, end, player_id in rows if start <= 0 < end})] += 1
-            for time in sorted(times):
-                raw_active = {player_id for start, end, player_id in rows if start <= time < end}
-                sent_off = {player_id for red_time, player_id in sent_off_by_team.get(key, []) if red_time <= time}
-                adjusted_active = raw_active - sent_off
-                max_raw = max(max_raw, len(raw_active))
-                max_adjusted = max(max_adjusted, len(adjusted_active))
-                if len(raw_active) > 11:
-                    raw_over_11.append((key, time, len(raw_active)))
-                if len(adjusted_active) > 11:
-                    adjusted_over_11.append((key, time, len(adjusted_active)))
-
-            sorted_times = sorted(times)
-            for start, end in zip(sorted_times, sorted_times[1:]):
-                if end <= start:
-                    continue
-                raw_active = {player_id for left, right, player_id in rows if left <= start and end <= right}
-                if len(raw_active) < 10 and end - start >= 60:
-                    red_count = sum(1 for red_time, _ in sent_off_by_team.get(key, []) if red_time <= start)
-                    low_active_segments.append((key, start, end, len(raw_active), red_count))
-
-        for key, red_rows in sent_off_by_team.items():
-            rows = intervals_by_team.get(key, [])
-            for red_time, player_id in red_rows:
-                before_time = max(0, red_time - 1)
-                after_time = red_time + 1
-                before = {player for start, end, player in rows if start <= before_time < end}
-                after = {player for start, end, player in rows if start <= after_time < end}
-                if player_id in before and len(after) >= len(before):
-                    red_no_raw_drop.append((key, red_time, player_id, len(before), len(after)))
-
         def describe(items):
             described = []
             for (match_id, side), time, count in items[:max_examples]:
@@ -119,19 +209,20 @@ class Command(BaseCommand):
                 )
             return described
 
-        self.stdout.write(f"teams_checked={len(intervals_by_team)}")
-        self.stdout.write(f"invalid_intervals={len(invalid_intervals)}")
-        self.stdout.write(f"exact_duplicate_intervals={sum(1 for count in exact_duplicates.values() if count > 1)}")
-        self.stdout.write(f"player_interval_overlaps={len(player_overlaps)}")
-        self.stdout.write(f"active_at_0_distribution={dict(sorted(active_at_zero.items()))}")
-        self.stdout.write(f"max_raw_active={max_raw}")
-        self.stdout.write(f"raw_over_11_count={len(raw_over_11)}")
-        self.stdout.write(f"raw_over_11_examples={describe(raw_over_11)}")
-        self.stdout.write(f"max_discipline_adjusted_active={max_adjusted}")
-        self.stdout.write(f"discipline_adjusted_over_11_count={len(adjusted_over_11)}")
-        self.stdout.write(f"discipline_adjusted_over_11_examples={describe(adjusted_over_11)}")
-        self.stdout.write(f"red_events_checked={sum(len(rows) for rows in sent_off_by_team.values())}")
-        self.stdout.write(f"red_events_without_raw_interval_drop={len(red_no_raw_drop)}")
-        self.stdout.write(f"red_no_raw_drop_examples={red_no_raw_drop[:max_examples]}")
-        self.stdout.write(f"low_active_segments_ge60s_under10={len(low_active_segments)}")
-        self.stdout.write(f"low_active_examples={low_active_segments[:max_examples]}")
+        self.stdout.write(f"matches_checked={matches_checked}")
+        self.stdout.write(f"teams_checked={found.teams_checked}")
+        self.stdout.write(f"invalid_intervals={len(found.invalid_intervals)}")
+        self.stdout.write(f"exact_duplicate_intervals={found.exact_duplicates}")
+        self.stdout.write(f"player_interval_overlaps={len(found.player_overlaps)}")
+        self.stdout.write(f"active_at_0_distribution={dict(sorted(found.active_at_zero.items()))}")
+        self.stdout.write(f"max_raw_active={found.max_raw}")
+        self.stdout.write(f"raw_over_11_count={len(found.raw_over_11)}")
+        self.stdout.write(f"raw_over_11_examples={describe(found.raw_over_11)}")
+        self.stdout.write(f"max_discipline_adjusted_active={found.max_adjusted}")
+        self.stdout.write(f"discipline_adjusted_over_11_count={len(found.adjusted_over_11)}")
+        self.stdout.write(f"discipline_adjusted_over_11_examples={describe(found.adjusted_over_11)}")
+        self.stdout.write(f"red_events_checked={found.red_events}")
+        self.stdout.write(f"red_events_without_raw_interval_drop={len(found.red_no_raw_drop)}")
+        self.stdout.write(f"red_no_raw_drop_examples={found.red_no_raw_drop[:max_examples]}")
+        self.stdout.write(f"low_active_segments_ge60s_under10={len(found.low_active_segments)}")
+        self.stdout.write(f"low_active_examples={found.low_active_segments[:max_examples]}")
@@ -29,7 +29,7 @@ from django.conf import settings
 from django.core.mail import send_mail
 from django.core.management.base import BaseCommand
 
-from realdata.models import JobRun
+from realdata.models import CacheStat, JobRun
 from realdata.services import health
 
 LEVEL_STYLE = {"alarm": "ERROR", "warn": "WARNING", "info": "SUCCESS"}
@@ -69,7 +69,7 @@ class Command(BaseCommand):
 
         pruned = None
         if opts["prune"]:
-            pruned = JobRun.prune()
+            pruned = JobRun.prune() + CacheStat.prune()
 
         if opts["json"]:
             payload = report.as_dict()
@@ -48,6 +48,9 @@ class Command(BaseCommand):
         parser.add_argument("--limit-matches", type=int, default=None)
         parser.add_argument("--no-skip-existing", action="store_true",
                             help="Re-ingest matches even if they already have features.")
+        parser.add_argument("--force", action="store_true",
+                            help="Rewrite a match even when its payloads hash as on "
+                                 "its last import (e.g. after a change to the mapping).")
         parser.add_argument("--include-unfinished", action="store_true",
                             help="Also ingest matches not marked 'finished'.")
         parser.add_argument("--zone-cols", type=int, default=5)
@@ -102,6 +105,7 @@ class Command(BaseCommand):
             zone_cols=options["zone_cols"],
             zone_rows=options["zone_rows"],
             flip_away=options["flip_away"],
+            skip_unchanged=not options["force"],
             logger=lambda msg: self.stdout.write(msg),
         )
 
@@ -117,4 +121,5 @@ class Command(BaseCommand):
             f"players_unplaced={result.players_unplaced}",
             f"skipped_not_finished={result.skipped_not_finished}",
             f"skipped_existing={result.skipped_existing}",
+            f"skipped_unchanged={result.skipped_unchanged}",
         ]))
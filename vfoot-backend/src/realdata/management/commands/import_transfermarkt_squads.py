@@ -43,7 +43,7 @@ from realdata.models import (
 )
 from realdata.services import roster_integrity
 from realdata.services.identity import (
-    is_placeholder_dob, name_similarity, norm_name,
+    NameBlockIndex, is_placeholder_dob, name_similarity, norm_name,
 )
 
 PROVIDER_TM = "transfermarkt"
@@ -82,6 +82,8 @@ _TM_ROLE_MAP = {
 # Filler tokens stripped before matching TM club names to SofaScore team names.
 _CLUB_FILLER = {"fc", "ac", "us", "ss", "ssc", "acf", "as", "bc", "cfc", "afc",
                 "calcio", "sporting", "club", "1907", "1909", "1913", "1919"}
+# Bar of the last-resort fuzzy pass, where no DOB or exact name backs the match.
+_FUZZY_MIN_SCORE = 0.85
 
 
 def _club_key(name: str) -> str:
@@ -198,17 +200,18 @@ class Command(BaseCommand):
                     by_name.setdefault(k, []).append(p)
         return by_dob, by_name
 
-    def _match(self, tp_name, tp_dob, by_dob, by_name, all_players, threshold):
+    def _match(self, tp_name, tp_dob, by_dob, by_name, blocks, threshold):
         """Return (player, method) or (None, reason). method in dob|name|fuzzy."""
+        def score(p):
+            return max(name_similarity(tp_name, p.full_name),
+                       name_similarity(tp_name, p.short_name))
+
         # Pass 1 — exact DOB, confirmed by name (catches transliterations).
         if tp_dob:
             cands = by_dob.get(tp_dob, [])
             if cands:
-                best = max(cands, key=lambda c: max(
-                    name_similarity(tp_name, c.full_name),
-                    name_similarity(tp_name, c.short_name)))
-                if max(name_similarity(tp_name, best.full_name),
-                       name_similarity(tp_name, best.short_name)) >= threshold:
+                best_s, best = max(((score(c), c) for c in cands), key=lambda sc: sc[0])
+                if best_s >= threshold:
                     return best, "dob"
                 # else: DOB collided with a different player -> fall through.
         # Pass 2 — exact normalised name (recovers wrong/placeholder DOBs).
@@ -224,16 +227,14 @@ class Command(BaseCommand):
         # candidate with a known, non-placeholder DOB that DIFFERS from the TM
         # player's is a different person (e.g. Di Renzo 2002 vs Di Lorenzo 1993),
         # so it must never be fuzzy-merged — that would corrupt the real player.
+        # The blocking index applies that rule and hands back only the players that
+        # can reach the bar at all, in scan order, so ties still go to the first.
         best, best_s = None, 0.0
-        for p in all_players:
-            if (tp_dob and p.date_of_birth and p.date_of_birth != tp_dob
-                    and not is_placeholder_dob(p.date_of_birth)):
-                continue
-            s = max(name_similarity(tp_name, p.full_name),
-                    name_similarity(tp_name, p.short_name))
+        for p in blocks.candidates(tp_name, tp_dob, min_score=_FUZZY_MIN_SCORE):
+            s = score(p)
             if s > best_s:
                 best, best_s = p, s
-        if best is not None and best_s >= 0.85:
+        if best is not None and best_s >= _FUZZY_MIN_SCORE:
             return best, "fuzzy"
         return None, "unmatched"
 
@@ -293,6 +294,7 @@ class Command(BaseCommand):
 
         ss_players = list(Player.objects.filter(external_source=PROVIDER_SOFASCORE))
         by_dob, by_name = self._build_indices(ss_players)
+        blocks = NameBlockIndex(ss_players)
         # TM-id -> already-linked player (fast idempotent relink)
         tm_alias = {a.alias: a.player for a in
                     PlayerAlias.objects.filter(source=PROVIDER_TM)
@@ -334,7 +336,7 @@ class Command(BaseCommand):
                     method = "relink"
                     if player is None:
                         player, method = self._match(
-                            tp_name, tp_dob, by_dob, by_name, ss_players, threshold)
+                            tp_name, tp_dob, by_dob, by_name, blocks, threshold)
                     if player is None:
                         if not create_missing:
                             stats["unmatched_skipped"] += 1
@@ -616,10 +618,10 @@ class Command(BaseCommand):
         # Si GUARDA e si riferisce, non si corregge: se succede e' un errore di
         # Transfermarkt (in finestra di mercato tiene un giocatore in due rose per
         # qualche ora) e di norma lo corregge da solo. Ma va saputo, perche' nessun
-        # altro se ne accorgerebbe: ``match_resolver.player_team_season_id`` risolve
-        # il club con un ``.first()`` senza ordinamento, quindi un giocatore doppio
-        # non da' errore — viene valutato sulla partita di una delle due squadre, a
-        # caso. Il perche' del non-vincolo sta in roster_integrity.
+        # altro se ne accorgerebbe: ``match_resolver.current_team_seasons`` risolve
+        # il club col tesseramento aperto piu' vecchio, quindi un giocatore doppio
+        # non da' errore — viene valutato sulla partita della squadra registrata per
+        # prima, giusta o no. Il perche' del non-vincolo sta in roster_integrity.
         # ``active_on``: interessa cio' che e' vero ADESSO. Una sovrapposizione di
         # un giorno chiusasi a agosto e' un fatto concluso; ripeterlo a ogni
         # importazione, due volte al giorno per sempre, insegna a saltare la riga.
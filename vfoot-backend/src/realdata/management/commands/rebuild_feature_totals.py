@@ -0,0 +1,51 @@
+"""Rebuild (or check) PlayerMatchFeatureTotal from the zone rows it sums.
+
+The importers keep the totals in step with ``PlayerZoneFeature`` as they write,
+so this is for what they did not write: matches imported before the table existed,
+zone rows edited by hand, a suspicion. Until a match has been rebuilt the scoring
+reads it from the zone rows directly (see ``realdata.services.feature_totals``),
+so running it is a speed-up, never a precondition.
+
+    python manage.py rebuild_feature_totals                  # every match
+    python manage.py rebuild_feature_totals --season 2
+    python manage.py rebuild_feature_totals --season 2 --check   # report only
+"""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from realdata.models import CompetitionSeason, Match, PROVIDER_CHOICES
+from realdata.services import feature_totals
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-match feature totals from the zone rows, or check them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", type=int, default=None,
+                            help="CompetitionSeason id (default: every season).")
+        parser.add_argument("--provider", type=str, default=None,
+                            choices=[p for p, _label in PROVIDER_CHOICES])
+        parser.add_argument("--check", action="store_true",
+                            help="Compare with the zone rows and write nothing; "
+                                 "exits non-zero on a mismatch.")
+
+    def handle(self, *args, **o):
+        match_ids = None
+        if o["season"] is not None:
+            if not CompetitionSeason.objects.filter(id=o["season"]).exists():
+                raise CommandError(f"No CompetitionSeason id={o['season']}")
+            match_ids = list(Match.objects.filter(competition_season_id=o["season"])
+                             .values_list("id", flat=True))
+
+        if o["check"]:
+            problems = feature_totals.check(match_ids, o["provider"])
+            for line in problems[:50]:
+                self.stdout.write(f"  {line}")
+            if problems:
+                raise CommandError(f"{len(problems)} discrepanze fra totali e zone")
+            self.stdout.write(self.style.SUCCESS("totali coerenti con le zone"))
+            return
+
+        written = feature_totals.rebuild(match_ids, o["provider"])
+        self.stdout.write(self.style.SUCCESS(f"righe di totali scritte: {written}"))
@@ -35,11 +35,12 @@ from realdata.models import (
     MatchAppearance,
     MatchDisciplinaryEvent,
     MatchShot,
+    PlayerMatchFeatureTotal,
     PlayerOnPitchInterval,
     PlayerZoneFeature,
     TeamZoneFeature,
 )
-from realdata.services import season_simulator
+from realdata.services import fork_pool, season_simulator
 
 # Full time plus the interval and stoppages: the delay after which a kicked-off
 # match is treated as over, and the stamp ``finished_at`` gets.
@@ -69,6 +70,7 @@ class Command(BaseCommand):
         parser.add_argument("--year", type=str, default=None,
                             help="Provider year string (default derived, e.g. 26/27).")
         parser.add_argument("--cache-dir", type=str, default=None)
+        fork_pool.add_workers_argument(parser, "Processes that play the matches")
         parser.add_argument("--write-only", action="store_true",
                             help="Write the cache and stop, without importing.")
         parser.add_argument("--import-only", action="store_true",
@@ -98,6 +100,7 @@ class Command(BaseCommand):
                 through_matchday=through, now=now,
                 live_minute=int(o["live_minute"]), seed=int(o["seed"]), year=year,
                 headline=str(o["headline"] or ""),
+                workers=fork_pool.resolve_workers(o["workers"]),
                 log=lambda m: self.stdout.write(m))
             plan = report["plan"]
             self.stdout.write(self.style.SUCCESS(
@@ -258,8 +261,9 @@ class Command(BaseCommand):
 
         not_final = [ext_to_id[e] for e, entry in plan.items()
                      if entry["status"] != "finished" and e in ext_to_id]
-        for model in (PlayerZoneFeature, TeamZoneFeature, PlayerOnPitchInterval,
-                      MatchDisciplinaryEvent, MatchShot, MatchAppearance):
+        for model in (PlayerZoneFeature, PlayerMatchFeatureTotal, TeamZoneFeature,
+                      PlayerOnPitchInterval, MatchDisciplinaryEvent, MatchShot,
+                      MatchAppearance):
             wipe(model, not_final)
 
         if counts:
@@ -332,10 +336,13 @@ class Command(BaseCommand):
             # the pipeline. None means "never imported", which after the purge is
             # exactly true.
             match.data_imported_at = now if match.data_ready else None
+            # The content stamp moves too: the rows under every settled match were
+            # just purged or rewritten, whatever the importer made of them.
+            match.data_changed_at = now
             match.save(update_fields=["status", "data_ready", "finished_at",
                                       "home_goals", "away_goals",
                                       "kickoff_provisional", "data_checked_at",
-                                      "data_imported_at"])
+                                      "data_imported_at", "data_changed_at"])
 
         self.stdout.write(self.style.SUCCESS(
             f"matches settled: {counts['finished']} finished, {counts['live']} live, "
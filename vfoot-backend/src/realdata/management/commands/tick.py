@@ -141,16 +141,24 @@ class Command(BaseCommand):
                 self.stdout.write(f"  [{label}] {m} — would warm+import")
                 continue
             before = live_updates.snapshot_events(m)
-            if not live_ingest.live_round(m, heavy=heavy):
+            outcome = live_ingest.live_round(m, heavy=heavy)
+            if not outcome:
                 run.did(egress_blocked=1)
                 self.stdout.write(f"  [{label}] {m} — egress blocked; will retry")
                 continue
+            # Stamped whatever the round found: these are the CADENCE, and a round
+            # that found nothing new is still a round made.
             m.data_checked_at = now
             fields = ["data_checked_at"]
             if heavy:
                 m.data_imported_at = now
                 fields.append("data_imported_at")
             m.save(update_fields=fields)
+            if outcome == live_ingest.UNCHANGED:
+                # Nothing written, so no event to push and no page to re-read.
+                run.did(unchanged=1, heavy=1 if heavy else 0)
+                self.stdout.write(f"  [{label}] {m} — unchanged")
+                continue
             events = live_updates.announce_events(m, before)
             nudge |= live_updates.leagues_to_nudge(m)
             run.did(imported=1, heavy=1 if heavy else 0, pushes=events or 0)
@@ -163,10 +171,15 @@ class Command(BaseCommand):
             if dry:
                 self.stdout.write(f"  [final-check] {m} — would warm+import")
                 continue
-            if live_ingest.finalize(m):
+            outcome = live_ingest.finalize(m)
+            if outcome:
                 m.data_checked_at = now
                 m.data_imported_at = now
                 m.save(update_fields=["data_checked_at", "data_imported_at"])
+                if outcome == live_ingest.UNCHANGED:
+                    run.did(unchanged=1, finalized=1)
+                    self.stdout.write(f"  [final-check] {m} — unchanged")
+                    continue
                 nudge |= live_updates.leagues_to_nudge(m)
                 run.did(imported=1, finalized=1)
                 self.stdout.write(f"  [final-check] {m} — imported (provisional)")
@@ -175,25 +188,35 @@ class Command(BaseCommand):
                 self.stdout.write(f"  [final-check] {m} — egress blocked; will retry")
 
         # 6) Finalization: +1h confirmation -> data_ready (official). The nudge here
-        #    is the one that clears the "provvisorio" mark on every open page.
+        #    is the one that clears the "provvisorio" mark on every open page, so it
+        #    goes out even when the import itself found nothing new.
         for m in plan.final_confirm:
             if dry:
                 self.stdout.write(f"  [final-confirm] {m} — would warm+import -> data_ready")
                 continue
-            if live_ingest.finalize(m):
+            outcome = live_ingest.finalize(m)
+            if outcome:
                 m.data_checked_at = now
                 m.data_imported_at = now
                 m.data_ready = True
                 m.save(update_fields=["data_checked_at", "data_imported_at",
                                       "data_ready"])
                 nudge |= live_updates.leagues_to_nudge(m)
-                run.did(imported=1, promoted=1)
+                unchanged = outcome == live_ingest.UNCHANGED
+                run.did(promoted=1, imported=0 if unchanged else 1,
+                        unchanged=1 if unchanged else 0)
                 self.stdout.write(f"  [final-confirm] {m} — data_ready")
             else:
                 run.did(egress_blocked=1)
                 self.stdout.write(f"  [final-confirm] {m} — egress blocked; will retry")
 
         if nudge:
+            # What every league about to re-read will read — the index of the
+            # round, the standings, the listone — rebuilt BEFORE the nudge:
+            # otherwise the first page to answer it pays the rebuild, and usually
+            # several at once. The row keeps how long each step took.
+            from vfoot.services import league_warmup
+            run.did(**league_warmup.warm(nudge))
             live_updates.broadcast_leagues(nudge)
             run.did(leagues_nudged=len(nudge))
             self.stdout.write(f"  {len(nudge)} leghe avvisate")
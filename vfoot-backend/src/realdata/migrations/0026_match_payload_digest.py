@@ -0,0 +1,44 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_data_changed_at(apps, schema_editor):
+    # Every import so far was followed by the tick's stamp, so the last check is
+    # the best record of the last change — and it keeps every data version that
+    # was computed before this migration exactly as it was.
+    Match = apps.get_model("realdata", "Match")
+    Match.objects.update(data_changed_at=F("data_checked_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realdata', '0025_player_short_name_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='data_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='MatchPayloadDigest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('statsbomb', 'StatsBomb'), ('wyscout', 'Wyscout'), ('sofascore', 'SofaScore')], default='sofascore', max_length=24)),
+                ('endpoint', models.CharField(max_length=24)),
+                ('digest', models.CharField(max_length=64)),
+                ('imported_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payload_digests', to='realdata.match')),
+            ],
+            options={
+                'unique_together': {('match', 'provider', 'endpoint')},
+            },
+        ),
+        migrations.RunPython(backfill_data_changed_at, migrations.RunPython.noop),
+    ]
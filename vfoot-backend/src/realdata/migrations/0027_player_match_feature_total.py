@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realdata', '0026_match_payload_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerMatchFeatureTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_side', models.CharField(choices=[('home', 'Home'), ('away', 'Away'), ('unknown', 'Unknown')], default='unknown', max_length=12)),
+                ('provider', models.CharField(choices=[('statsbomb', 'StatsBomb'), ('wyscout', 'Wyscout'), ('sofascore', 'SofaScore')], default='statsbomb', max_length=24)),
+                ('totals', models.JSONField(default=dict)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_feature_totals', to='realdata.match')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feature_totals', to='realdata.player')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['player', 'match'], name='realdata_pl_player__b47ca5_idx')],
+                'unique_together': {('match', 'player', 'team_side', 'provider')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realdata', '0027_player_match_feature_total'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchZoneArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.PositiveSmallIntegerField(default=1)),
+                ('player_rows', models.PositiveIntegerField(default=0)),
+                ('team_rows', models.PositiveIntegerField(default=0)),
+                ('payload', models.BinaryField()),
+                ('digest', models.CharField(max_length=64)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='zone_archive', to='realdata.match')),
+            ],
+        ),
+    ]
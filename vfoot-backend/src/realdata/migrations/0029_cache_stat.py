@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realdata', '0028_match_zone_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('family', models.CharField(max_length=40)),
+                ('hour', models.DateTimeField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('misses', models.PositiveIntegerField(default=0)),
+                ('evictions', models.PositiveIntegerField(default=0)),
+                ('stale', models.PositiveIntegerField(default=0)),
+                ('builds', models.PositiveIntegerField(default=0)),
+                ('build_seconds', models.FloatField(default=0.0)),
+                ('build_max_seconds', models.FloatField(default=0.0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-hour'], name='realdata_ca_hour_e1fe62_idx')],
+                'unique_together': {('family', 'hour')},
+            },
+        ),
+    ]
@@ -289,6 +289,12 @@ class Match(models.Model):
     # (VFOOT_LIVE_HEAVY_EVERY); the two stamps are not two clocks, since a heavy
     # round never happens outside a round.
     data_imported_at = models.DateTimeField(null=True, blank=True)
+    # Last import that actually CHANGED the match's data. The two stamps above are
+    # the tick's cadence and move on every round, including a round whose payloads
+    # turn out identical to the previous one's; this one is the importer's and moves
+    # only when it wrote (see MatchPayloadDigest), so the data versions derived
+    # from it stand still when nothing did.
+    data_changed_at = models.DateTimeField(null=True, blank=True)
     # When the match was FIRST observed as finished (full time). The scheduler
     # measures the +15min / +1h finalization windows from this, so it must be the
     # real observed FT, not an estimate from kickoff + nominal duration.
@@ -511,6 +517,45 @@ class JobRun(models.Model):
         return gone
 
 
+class CacheStat(models.Model):
+    """What one family of expensive cache entries did over one hour.
+
+    The caches in front of the voto reference, the matchday pagelle, the listone
+    and the player form are keyed on the data they are computed from, and the
+    failure they are prone to does not raise: a key that moves when it should not
+    (every read a miss, every read a rebuild), or an entry the file cache culled
+    at random. Both look exactly like a slow page. Counted here, they are a hit
+    ratio that fell and an eviction count that rose — see ``services/cache_stats``,
+    which writes these rows, and ``health``, which reads them.
+
+    One row per (family, hour), incremented in place. Pruned with ``JobRun``.
+    """
+
+    family = models.CharField(max_length=40)
+    hour = models.DateTimeField()
+    hits = models.PositiveIntegerField(default=0)
+    misses = models.PositiveIntegerField(default=0)
+    # A miss on a key that WAS written and is gone: the cull, or the TTL ceiling.
+    evictions = models.PositiveIntegerField(default=0)
+    # Served the previous version while another worker rebuilt (single_flight).
+    stale = models.PositiveIntegerField(default=0)
+    builds = models.PositiveIntegerField(default=0)
+    build_seconds = models.FloatField(default=0.0)
+    build_max_seconds = models.FloatField(default=0.0)
+
+    class Meta:
+        unique_together = [("family", "hour")]
+        indexes = [models.Index(fields=["-hour"])]
+
+    def __str__(self) -> str:
+        return f"{self.family} @ {self.hour:%Y-%m-%d %H}h: {self.hits}/{self.misses}"
+
+    @classmethod
+    def prune(cls, *, keep_days: int = 14) -> int:
+        return cls.objects.filter(
+            hour__lt=timezone.now() - timedelta(days=keep_days)).delete()[0]
+
+
 class MaintenanceRun(models.Model):
     """One pass of the maintenance agent: what woke it, and what it concluded.
 
@@ -659,6 +704,32 @@ class PlayerZoneFeature(models.Model):
         ]
 
 
+class PlayerMatchFeatureTotal(models.Model):
+    """A player's ``PlayerZoneFeature`` rows for one match, summed over the zones.
+
+    Derived, never a source: the importers write it in the same transaction as the
+    zone rows it sums, and ``rebuild_feature_totals`` recomputes it from them (and,
+    with ``--check``, reports where the two disagree). Most of the scoring never
+    asks WHERE something happened — the classic vote sums each feature over the
+    pitch — and re-grouping the twenty-odd zone rows of every (player, feature) on
+    each read was the largest single cost of a pagella.
+
+    ``totals`` maps feature_key -> sum, with every key that has a zone row, a
+    zero-sum signed feature included. Unplaced rows (``METHOD_UNPLACED``) count:
+    they carry true totals and only lack a position.
+    """
+
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name="player_feature_totals")
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="feature_totals")
+    team_side = models.CharField(max_length=12, choices=SIDE_CHOICES, default=SIDE_UNKNOWN)
+    provider = models.CharField(max_length=24, choices=PROVIDER_CHOICES, default=PROVIDER_STATSBOMB)
+    totals = models.JSONField(default=dict)
+
+    class Meta:
+        unique_together = [("match", "player", "team_side", "provider")]
+        indexes = [models.Index(fields=["player", "match"])]
+
+
 class MatchShot(models.Model):
     """One shot, with WHEN and WHERE it happened.
 
@@ -715,6 +786,33 @@ class MatchShot(models.Model):
         return f"{self.match_id} {self.minute}' {self.team_side} xg={self.xg:.2f}"
 
 
+class MatchPayloadDigest(models.Model):
+    """Content hash of one provider payload of a match, as of the last import.
+
+    One row per endpoint the import reads (event, lineups, shotmap, incidents,
+    heatmaps) plus ``options`` — the import's own settings and format version —
+    and ``rows``, a fingerprint of what that import left in the database. An import
+    whose payloads all hash the same AND whose rows are still there has nothing to
+    do, and stops before writing anything.
+
+    Cleared before an import starts writing and stored again only once it has
+    finished, so an import that fails halfway is never taken for a complete one.
+    """
+    match = models.ForeignKey(Match, on_delete=models.CASCADE,
+                              related_name="payload_digests")
+    provider = models.CharField(max_length=24, choices=PROVIDER_CHOICES,
+                                default=PROVIDER_SOFASCORE)
+    endpoint = models.CharField(max_length=24)
+    digest = models.CharField(max_length=64)
+    imported_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = [("match", "provider", "endpoint")]
+
+    def __str__(self):
+        return f"{self.match_id} {self.provider}/{self.endpoint} {self.digest[:12]}"
+
+
 class TeamZoneFeature(models.Model):
     """
     Aggregated feature values by team side and zone for one match.
@@ -739,6 +837,35 @@ class TeamZoneFeature(models.Model):
         ]
 
 
+class MatchZoneArchive(models.Model):
+    """A concluded match's zone rows, moved out of the hot tables and compressed.
+
+    ``PlayerZoneFeature`` and ``TeamZoneFeature`` are by far the largest tables, and
+    every live import pays for their indexes and every current-season ``GROUP BY``
+    walks past rows of seasons nobody scores any more. ``archive_zone_features``
+    moves a finished season's rows here, one row per match, after checking that its
+    ``PlayerMatchFeatureTotal`` rows agree with them; ``--restore`` puts them back
+    exactly (same ids, same values), which ``digest`` is there to prove.
+
+    The readers that go back to old zone rows (role inference, defensive exposure,
+    the season tensor, the footprints) read through
+    ``realdata.services.zone_archive``, so an archived match is slower to read and
+    otherwise indistinguishable. See that module for the format.
+    """
+    match = models.OneToOneField(Match, on_delete=models.CASCADE,
+                                 related_name="zone_archive")
+    format = models.PositiveSmallIntegerField(default=1)
+    player_rows = models.PositiveIntegerField(default=0)
+    team_rows = models.PositiveIntegerField(default=0)
+    payload = models.BinaryField()
+    # sha256 of the uncompressed payload: what a restore must read back.
+    digest = models.CharField(max_length=64)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.match_id}: {self.player_rows}+{self.team_rows} rows archived"
+
+
 class MatchDisciplinaryEvent(models.Model):
     """
     Provider-normalized disciplinary event for one match.
@@ -0,0 +1,156 @@
+"""Hits, misses, rebuilds and evictions of the expensive caches, per hour.
+
+The callers count (``hit``, ``miss``, ``stale``, ``built``/``timed``) in a
+per-process tally that costs a dictionary increment; every ``FLUSH_SECONDS`` the
+tally goes into the ``CacheStat`` row of the current hour, incremented in place,
+so the gunicorn workers, the tick and the shell all add to the same numbers.
+``summary`` reads them back over a rolling window, for ``health`` and the admin
+page.
+
+Two rules, both borrowed from ``job_log``:
+
+* **it must never break what it measures.** A write that fails is a log line;
+  and nothing is written from inside a caller's transaction (a conclusion, a
+  standings update), where a failed statement would take the caller down with
+  it — the tally waits for the next call outside one;
+* **it is approximate, and says so.** Counts a process had not flushed when it
+  exited are lost; an eviction is only seen where the family keeps a pointer to
+  its last key (the file cache does not say what it culled). A regression moves
+  these numbers by orders of magnitude, not by the few percent they miss.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Max, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from realdata.models import CacheStat
+
+log = logging.getLogger(__name__)
+
+# The families and what a human calls them in the report.
+FAMILIES = {
+    "reference": "riferimento del voto",
+    "role_averages": "medie di ruolo",
+    "matchday_index": "pagelle di giornata",
+    "season_ratings": "voti di stagione",
+    "player_form": "forma dei giocatori",
+    "footprints": "impronte di zona",
+    "listone": "listone",
+}
+FLUSH_SECONDS = 30.0
+_COUNTS = ("hits", "misses", "evictions", "stale", "builds")
+
+_pending: Counter = Counter()
+_slowest: dict[str, float] = {}
+_last_flush = time.monotonic()
+
+
+def _window() -> timedelta:
+    return timedelta(hours=float(getattr(settings, "VFOOT_CACHE_STATS_HOURS", 24)))
+
+
+def hit(family: str) -> None:
+    _pending[family, "hits"] += 1
+    _maybe_flush()
+
+
+def miss(family: str, *, evicted: bool = False) -> None:
+    _pending[family, "misses"] += 1
+    if evicted:
+        _pending[family, "evictions"] += 1
+    _maybe_flush()
+
+
+def stale(family: str) -> None:
+    _pending[family, "stale"] += 1
+    _maybe_flush()
+
+
+def built(family: str, seconds: float) -> None:
+    """Count one rebuild of ``family`` that took ``seconds``."""
+    _pending[family, "builds"] += 1
+    _pending[family, "build_seconds"] += seconds
+    _slowest[family] = max(_slowest.get(family, 0.0), seconds)
+    _maybe_flush()
+
+
+@contextmanager
+def timed(family: str):
+    """``built`` around a block."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        built(family, time.perf_counter() - t0)
+
+
+def _maybe_flush() -> None:
+    if time.monotonic() - _last_flush >= FLUSH_SECONDS:
+        flush()
+
+
+def flush(*, force: bool = False) -> None:
+    """Write the tally into this hour's rows. ``force`` writes from inside a
+    transaction too (in a savepoint): for tests, and for a command about to exit."""
+    global _pending, _slowest, _last_flush
+    if not _pending:
+        return
+    if connection.in_atomic_block and not force:
+        return
+    pending, slowest = _pending, _slowest
+    _pending, _slowest = Counter(), {}
+    _last_flush = time.monotonic()
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    for family in sorted({f for f, _ in pending}):
+        counts = {k: pending[family, k] for k in _COUNTS if pending[family, k]}
+        seconds = pending[family, "build_seconds"]
+        try:
+            with transaction.atomic():
+                _add(family, hour, counts, seconds, slowest.get(family, 0.0))
+        except Exception:  # noqa: BLE001 — see the module docstring
+            log.exception("cache_stats: impossibile scrivere i conteggi di %s", family)
+
+
+def _add(family, hour, counts, seconds, slowest) -> None:
+    updates = {k: F(k) + v for k, v in counts.items()}
+    if seconds:
+        updates["build_seconds"] = F("build_seconds") + seconds
+        updates["build_max_seconds"] = Greatest(F("build_max_seconds"), slowest)
+    if CacheStat.objects.filter(family=family, hour=hour).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            CacheStat.objects.create(family=family, hour=hour, build_seconds=seconds,
+                                     build_max_seconds=slowest, **counts)
+    except IntegrityError:
+        # Another process created the hour's row in between: add to it.
+        CacheStat.objects.filter(family=family, hour=hour).update(**updates)
+
+
+def summary(*, now=None) -> dict[str, dict]:
+    """{family: {hits, misses, evictions, stale, builds, hit_ratio, avg_build_ms,
+    max_build_ms}} over the rolling window, for the families that saw traffic."""
+    now = now or timezone.now()
+    rows = (CacheStat.objects.filter(hour__gte=now - _window())
+            .values("family")
+            .annotate(**{k: Sum(k) for k in _COUNTS},
+                      seconds=Sum("build_seconds"), slowest=Max("build_max_seconds")))
+    out = {}
+    for r in rows:
+        reads = r["hits"] + r["misses"]
+        out[r["family"]] = {
+            **{k: r[k] for k in _COUNTS},
+            "hit_ratio": round(r["hits"] / reads, 3) if reads else None,
+            "avg_build_ms": round(1000 * r["seconds"] / r["builds"], 1) if r["builds"] else None,
+            "max_build_ms": round(1000 * r["slowest"], 1) if r["builds"] else None,
+        }
+    return dict(sorted(out.items()))
@@ -0,0 +1,189 @@
+"""Per-(match, player, side) feature totals, kept next to the zone rows they sum.
+
+``PlayerZoneFeature`` is long and narrow: a player's match is some twenty zones
+times a dozen features, and every consumer that does not care about the zones —
+the classic vote, the form line, the calibration commands — had the database
+re-group those rows on each read. ``PlayerMatchFeatureTotal`` holds the answer
+once per (match, player, side, provider), written by the importers alongside the
+zone rows (``write_match``) and recomputable from them at any time (``rebuild``).
+
+It is DERIVED: when the two disagree the zone rows are right, and ``check`` is how
+to find out that they do. ``match_player_totals`` is the read side, and it falls
+back to grouping the zone rows for any match that has no totals at all — a row
+written by hand in a test, or a database that predates the table — so a missing
+total reads as a slow answer, never as a player who did nothing.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+
+from django.db.models import Sum
+
+from realdata.models import PlayerMatchFeatureTotal, PlayerZoneFeature
+from realdata.services import zone_archive
+
+# Matches per query when rebuilding or checking a whole season: enough to make the
+# grouping worth it, few enough that the IN list stays well inside SQLite's limits.
+BATCH_MATCHES = 200
+
+
+def totals_from_zones(player_zone: Mapping[tuple, float]
+                      ) -> dict[tuple[int, str], dict[str, float]]:
+    """Fold ``{(player_id, side, zone, feature): value}`` — the importers' own
+    accumulator — into ``{(player_id, side): {feature: total}}``."""
+    out: dict[tuple[int, str], dict[str, float]] = defaultdict(dict)
+    for (player_id, side, _zone, feature), value in player_zone.items():
+        row = out[(player_id, side)]
+        row[feature] = row.get(feature, 0.0) + value
+    return dict(out)
+
+
+def write_match(match, provider: str,
+                totals: Mapping[tuple[int, str], Mapping[str, float]]) -> int:
+    """Replace one match's totals for ``provider``. Call it inside the transaction
+    that writes the zone rows, so a reader never sees one without the other.
+
+    Delete-and-reinsert, unlike the zone rows: thirty-odd rows a match, and an
+    upsert would still have to find the ones that stopped arriving."""
+    PlayerMatchFeatureTotal.objects.filter(match=match, provider=provider).delete()
+    PlayerMatchFeatureTotal.objects.bulk_create([
+        PlayerMatchFeatureTotal(match=match, player_id=player_id, team_side=side,
+                                provider=provider, totals=dict(feats))
+        for (player_id, side), feats in totals.items() if feats
+    ], batch_size=500)
+    return len(totals)
+
+
+def _grouped(match_ids, provider: str | None = None, player_ids=None,
+             feature_keys=None) -> dict[tuple[int, int, str, str], dict[str, float]]:
+    """The zone rows of ``match_ids`` grouped by the database:
+    ``{(match_id, player_id, side, provider): {feature: total}}``. Archived
+    matches are grouped from their archive (``zone_archive``)."""
+    match_ids = list(match_ids)
+    out: dict[tuple, dict[str, float]] = defaultdict(dict)
+    for (mid, pid, side, prov, key), v in zone_archive.grouped(
+            zone_archive.player_rows(match_ids, provider=provider, player_ids=player_ids,
+                                     feature_keys=feature_keys),
+            key=lambda r: (r.match_id, r.player_id, r.team_side, r.provider,
+                           r.feature_key)).items():
+        out[(mid, pid, side, prov)][key] = float(v or 0.0)
+    qs = PlayerZoneFeature.objects.filter(match_id__in=match_ids)
+    if provider is not None:
+        qs = qs.filter(provider=provider)
+    if player_ids is not None:
+        qs = qs.filter(player_id__in=list(player_ids))
+    if feature_keys is not None:
+        qs = qs.filter(feature_key__in=sorted(feature_keys))
+    for mid, pid, side, prov, key, v in (
+            qs.values_list("match_id", "player_id", "team_side", "provider",
+                           "feature_key")
+              .annotate(v=Sum("value"))
+              .values_list("match_id", "player_id", "team_side", "provider",
+                           "feature_key", "v")):
+        out[(mid, pid, side, prov)][key] = float(v or 0.0)
+    return out
+
+
+def _batches(ids: list[int]) -> Iterable[list[int]]:
+    for i in range(0, len(ids), BATCH_MATCHES):
+        yield ids[i:i + BATCH_MATCHES]
+
+
+def _match_ids(match_ids, provider: str | None) -> list[int]:
+    if match_ids is not None:
+        return sorted({int(m) for m in match_ids})
+    qs = PlayerZoneFeature.objects.all()
+    if provider is not None:
+        qs = qs.filter(provider=provider)
+    return sorted(set(qs.values_list("match_id", flat=True).distinct())
+                  | zone_archive.archived_match_ids())
+
+
+def rebuild(match_ids=None, provider: str | None = None) -> int:
+    """Recompute the totals of ``match_ids`` (default: every match with zone rows)
+    from the zone rows. Returns the rows written."""
+    written = 0
+    ids = _match_ids(match_ids, provider)
+    for batch in _batches(ids):
+        rows = _grouped(batch, provider)
+        stale = PlayerMatchFeatureTotal.objects.filter(match_id__in=batch)
+        if provider is not None:
+            stale = stale.filter(provider=provider)
+        stale.delete()
+        PlayerMatchFeatureTotal.objects.bulk_create([
+            PlayerMatchFeatureTotal(match_id=mid, player_id=pid, team_side=side,
+                                    provider=prov, totals=feats)
+            for (mid, pid, side, prov), feats in rows.items()
+        ], batch_size=500)
+        written += len(rows)
+    return written
+
+
+def check(match_ids=None, provider: str | None = None,
+          tolerance: float = 1e-6) -> list[str]:
+    """Where the stored totals and the zone rows disagree, one line each; an empty
+    list is a consistent table. ``tolerance`` absorbs the order of the additions:
+    the database and the importer do not sum the same floats in the same order."""
+    problems: list[str] = []
+    ids = _match_ids(match_ids, provider)
+    for batch in _batches(ids):
+        expected = _grouped(batch, provider)
+        stored_qs = PlayerMatchFeatureTotal.objects.filter(match_id__in=batch)
+        if provider is not None:
+            stored_qs = stored_qs.filter(provider=provider)
+        stored = {(mid, pid, side, prov): totals for mid, pid, side, prov, totals in
+                  stored_qs.values_list("match_id", "player_id", "team_side",
+                                        "provider", "totals")}
+        for key in sorted(set(expected) | set(stored), key=repr):
+            mid, pid, side, prov = key
+            want, have = expected.get(key), stored.get(key)
+            where = f"match {mid} player {pid} {side} {prov}"
+            if have is None:
+                problems.append(f"{where}: no totals row")
+                continue
+            if want is None:
+                problems.append(f"{where}: totals row with no zone rows")
+                continue
+            for feat in sorted(set(want) | set(have)):
+                a, b = want.get(feat), have.get(feat)
+                if a is None or b is None or abs(a - b) > tolerance:
+                    problems.append(f"{where}: {feat} zones={a} totals={b}")
+    return problems
+
+
+def match_player_totals(match_ids, *, provider: str | None = None, player_ids=None,
+                        feature_keys=None) -> dict[tuple[int, int], dict[str, float]]:
+    """``{(match_id, player_id): {feature: total_over_zones}}`` for ``match_ids``,
+    summed over sides (and providers, when ``provider`` is None) as the zone rows
+    always were. Only the ``feature_keys`` asked for, when given; a pair with none
+    of them is absent, exactly as a grouped zone query would leave it.
+
+    Read from the totals table; a match with no totals row at all for ``provider``
+    is grouped from its zone rows instead — see the module docstring."""
+    ids = sorted({int(m) for m in match_ids})
+    if not ids:
+        return {}
+    wanted = set(feature_keys) if feature_keys is not None else None
+    qs = PlayerMatchFeatureTotal.objects.filter(match_id__in=ids)
+    if provider is not None:
+        qs = qs.filter(provider=provider)
+    covered = set(qs.values_list("match_id", flat=True).distinct())
+    if player_ids is not None:
+        qs = qs.filter(player_id__in=list(player_ids))
+
+    out: dict[tuple[int, int], dict[str, float]] = defaultdict(dict)
+    for mid, pid, totals in qs.values_list("match_id", "player_id", "totals"):
+        row = out[(mid, pid)]
+        for feat, v in (totals or {}).items():
+            if wanted is None or feat in wanted:
+                row[feat] = row.get(feat, 0.0) + v
+
+    missing = [m for m in ids if m not in covered]
+    if missing:
+        for (mid, pid, _side, _prov), feats in _grouped(
+                missing, provider, player_ids, wanted).items():
+            row = out[(mid, pid)]
+            for feat, v in feats.items():
+                row[feat] = row.get(feat, 0.0) + v
+    return {k: v for k, v in out.items() if v}
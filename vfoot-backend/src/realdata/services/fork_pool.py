@@ -0,0 +1,72 @@
+"""Independent tasks on a FORKED process pool, or here when a pool cannot help.
+
+Every worker in this project lives in a module that imports Django models. A
+spawned child (macOS, Windows, and Linux from Python 3.14 on) re-imports that
+module from scratch without ``django.setup()``, raises ``AppRegistryNotReady``,
+and the pool dies with ``BrokenProcessPool`` — taking down the command with it.
+A forked child inherits the process as it is: apps loaded, and whatever the
+caller left in ``shared``. So the pool always forks; where fork does not exist,
+or the caller is itself a pool's worker (a daemonic process may not have
+children — ``manage.py test --parallel`` runs every test in one), the tasks run
+serially here, with the same results.
+
+    fork_pool.fork_map(_score, todo, workers=workers,
+                       state={"ref": ref, "avgs": avgs})
+
+The workers read ``fork_pool.shared[...]``: set before the fork and cleared
+after, so every worker inherits it copy-on-write instead of unpickling it once
+per task.
+
+A pool changes WHERE the tasks run and nothing else: the results come back in
+the order of the items. So a caller whose tasks are independent — each with its
+own seed, its own output file — gets the serial run's answer, bit for bit,
+whatever ``--workers`` says; the callers' ``--workers`` help says so, and the
+docstrings there need only name ``fork_map``.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connections
+
+WORKERS_NOTE = "(default: one per core). The result does not depend on it."
+
+shared: dict = {}
+
+
+def add_workers_argument(parser, what: str, *, note: str = WORKERS_NOTE) -> None:
+    """The ``--workers`` option of a command that runs a ``fork_map``."""
+    parser.add_argument("--workers", type=int, default=None, help=f"{what} {note}")
+
+
+def resolve_workers(workers: int | None) -> int:
+    """``--workers`` as given, or one per core when it was not."""
+    return max(1, int(workers) if workers is not None else (os.cpu_count() or 1))
+
+
+def fork_map(fn, items, *, workers: int, state: dict | None = None,
+             uses_database: bool = False) -> list:
+    """``[fn(item) for item in items]``, in a forked pool when that can help.
+
+    The results come back in the order of ``items`` whatever the pool does.
+    ``uses_database``: the workers query, each on its OWN connection — the
+    parent's are closed before the fork so none is inherited open (they reopen
+    here at the next query).
+    """
+    items = list(items)
+    shared.update(state or {})
+    try:
+        if (workers <= 1 or len(items) < 2
+                or "fork" not in multiprocessing.get_all_start_methods()
+                or multiprocessing.current_process().daemon):
+            return [fn(item) for item in items]
+        if uses_database:
+            connections.close_all()
+        workers = min(workers, len(items))
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("fork")) as pool:
+            return list(pool.map(fn, items, chunksize=max(1, len(items) // (4 * workers))))
+    finally:
+        shared.clear()
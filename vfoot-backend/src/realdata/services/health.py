@@ -38,7 +38,7 @@ from django.conf import settings
 from django.utils import timezone
 
 from realdata.models import CompetitionSeason, JobRun, Match
-from realdata.services import roster_integrity, shape_canary
+from realdata.services import cache_stats, roster_integrity, shape_canary
 
 # job -> (systemd unit, expected cadence, how late is too late).
 #
@@ -84,6 +84,15 @@ EGRESS_POOLS = {
     "transfermarkt": (Path("/var/lib/vfoot-egress/tm_pool.json"), 1,
                       "il polling del listone resta senza uscita"),
 }
+# The expensive caches (services/cache_stats), over its rolling window. Below
+# CACHE_MIN_READS reads a ratio says nothing; below CACHE_MIN_HIT_RATIO the key
+# is moving when it should not, or the entries are not surviving. An eviction
+# rate past CACHE_EVICTION_SHARE of the builds means the file cache's 500-entry
+# cull is throwing away what was just paid for.
+CACHE_MIN_READS = 50
+CACHE_MIN_HIT_RATIO = 0.5
+CACHE_MIN_EVICTIONS = 5
+CACHE_EVICTION_SHARE = 0.25
 BLIND_STREAK = 5          # consecutive ticks owed work that imported nothing
 SETTLE_AFTER = timedelta(hours=4)   # from kickoff, by when a match should be ready
 
@@ -100,6 +109,7 @@ class Check:
 class Health:
     at: object = None
     checks: list[Check] = field(default_factory=list)
+    caches: dict = field(default_factory=dict)
 
     def add(self, level: str, code: str, message: str, **detail) -> None:
         self.checks.append(Check(level, code, message, detail))
@@ -125,6 +135,7 @@ class Health:
             "checks": [{"level": c.level, "code": c.code, "message": c.message,
                         **({"detail": c.detail} if c.detail else {})}
                        for c in self.checks],
+            "caches": self.caches,
         }
 
 
@@ -391,6 +402,32 @@ def _check_roster_overlap(health: Health, now) -> None:
                    players=[o.player_name for o in overlaps])
 
 
+def _check_caches(health: Health, now) -> None:
+    """Do the expensive caches still hit? A key that moves on every read, or an
+    entry the cull keeps throwing away, raises nothing: the page is only slower.
+    Here it is a ratio that fell, or evictions that rose."""
+    health.caches = cache_stats.summary(now=now)
+    for family, s in health.caches.items():
+        label = cache_stats.FAMILIES.get(family, family)
+        reads = s["hits"] + s["misses"]
+        line = (f"cache {label}: {s['hits']}/{reads} letture servite"
+                + (f", {s['builds']} ricostruzioni (media {s['avg_build_ms']:.0f} ms, "
+                   f"max {s['max_build_ms']:.0f} ms)" if s["builds"] else "")
+                + (f", {s['evictions']} espulse" if s["evictions"] else "")
+                + (f", {s['stale']} servite dalla versione prima" if s["stale"] else ""))
+        if reads >= CACHE_MIN_READS and s["hit_ratio"] < CACHE_MIN_HIT_RATIO:
+            health.add("warn", f"cache:misses:{family}",
+                       f"{line}: meno della meta' — la chiave si muove quando non "
+                       f"dovrebbe, o le voci non sopravvivono.", **s)
+        elif (s["evictions"] >= CACHE_MIN_EVICTIONS
+              and s["evictions"] >= CACHE_EVICTION_SHARE * max(s["builds"], 1)):
+            health.add("warn", f"cache:evicted:{family}",
+                       f"{line}: il culling della cache su file butta via voci "
+                       f"appena pagate (MAX_ENTRIES troppo basso?).", **s)
+        else:
+            health.add("info", f"cache:{family}", f"{line}.", **s)
+
+
 def _check_shape(health: Health, now) -> None:
     report = shape_canary.run(now=now)
     for finding in report.findings:
@@ -418,6 +455,7 @@ def report(*, now=None, skip_shape: bool = False) -> Health:
     _check_calendar_freshness(health, now)
     _check_pending_digests(health, now)
     _check_roster_overlap(health, now)
+    _check_caches(health, now)
     if not skip_shape:
         _check_shape(health, now)
     return health
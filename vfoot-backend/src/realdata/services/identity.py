@@ -12,9 +12,12 @@ back up the other.
 
 from __future__ import annotations
 
+import math
 import unicodedata
+from collections import Counter, defaultdict
 from datetime import date
 from difflib import SequenceMatcher
+from typing import Any, Iterable
 
 
 def norm_name(name: str | None) -> str:
@@ -41,6 +44,124 @@ def name_similarity(a: str | None, b: str | None) -> float:
     return max(direct, token)
 
 
+def name_trigrams(name: str | None) -> Counter[str]:
+    """Character trigrams of the normalised name, counted, with the ends padded so
+    that a two-letter name still has some."""
+    nm = norm_name(name)
+    if not nm:
+        return Counter()
+    padded = f"  {nm} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+# Lowest score the trigram pruning is exact for; see ``_min_shared_trigrams``.
+_MIN_BLOCKED_SCORE = 0.8
+
+
+def _min_shared_trigrams(len_a: int, len_b: int, min_score: float) -> int:
+    """Fewest trigrams two names of these lengths must share for their
+    ``SequenceMatcher`` ratio to reach ``min_score``.
+
+    The ratio is 2M/L over L = len_a + len_b, M the characters in matching blocks.
+    Reaching it leaves at most (1 - min_score)L characters unmatched, and k blocks
+    need k - 1 gaps between them, so k <= (1 - min_score)L + 1. A block of n
+    characters carries n - 2 trigrams of the other name, hence at least M - 2k of
+    them are shared. Never below one: from 0.8 up, blocks of at most two characters
+    cannot reach the ratio unless one end of both names is aligned, and the padding
+    then shares a trigram. Below 0.8 that no longer holds (see ``candidates``).
+    """
+    total = len_a + len_b
+    blocks = math.floor((1.0 - min_score) * total) + 1
+    return max(1, math.ceil(min_score * total / 2.0) - 2 * blocks)
+
+
+class NameBlockIndex:
+    """Blocking index over players' names, for the fuzzy fallback of a roster match.
+
+    Scoring a scraped name against every known player with ``name_similarity`` is a
+    ``SequenceMatcher`` alignment per pair; over a league that is most of an import.
+    The index only hands back the players that CAN reach the score asked for, under
+    three kinds of key:
+
+    * tokens of the normalised name — the token half of ``name_similarity`` needs
+      shared tokens (which one is the surname depends on the provider's order);
+    * character trigrams, counted — the alignment half needs names of comparable
+      length sharing trigrams, and ``_min_shared_trigrams`` says how many;
+    * birth year — a player whose real DOB differs from the scraped one is a
+      different person, so only the same year (then the same day) and the undated
+      or placeholder-dated are eligible.
+
+    Candidates come back in the order the players were given, so a caller keeping
+    the first best score breaks ties exactly as a full scan would.
+    """
+
+    def __init__(self, players: Iterable[Any]) -> None:
+        self.players = list(players)
+        # One entry per distinct name of a player (full and short): each is scored
+        # on its own by the caller, so each must be able to qualify on its own.
+        self._names: list[tuple[int, int, frozenset[str]]] = []
+        self._by_token: dict[str, set[int]] = defaultdict(set)
+        self._by_gram: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._by_year: dict[int, set[int]] = defaultdict(set)
+        self._undated: set[int] = set()
+        for pos, p in enumerate(self.players):
+            dob = p.date_of_birth
+            if dob and not is_placeholder_dob(dob):
+                self._by_year[dob.year].add(pos)
+            else:
+                self._undated.add(pos)
+            for nm in {norm_name(p.full_name), norm_name(p.short_name)} - {""}:
+                entry = len(self._names)
+                tokens = frozenset(nm.split())
+                self._names.append((pos, len(nm), tokens))
+                for tok in tokens:
+                    self._by_token[tok].add(entry)
+                for gram, n in name_trigrams(nm).items():
+                    self._by_gram[gram].append((entry, n))
+
+    def _eligible(self, dob: date | None) -> set[int] | None:
+        """Positions whose DOB does not rule them out; None = everyone."""
+        if not dob:
+            return None
+        same_day = {pos for pos in self._by_year.get(dob.year, ())
+                    if self.players[pos].date_of_birth == dob}
+        return same_day | self._undated
+
+    def candidates(self, name: str | None, dob: date | None = None,
+                   min_score: float = 0.85) -> list[Any]:
+        """Players that may score ``min_score`` or more against ``name``."""
+        nm = norm_name(name)
+        if not nm:
+            return []
+        eligible = self._eligible(dob)
+        if min_score < _MIN_BLOCKED_SCORE:
+            # Too low a bar to prune on trigrams without losing a match.
+            return [p for pos, p in enumerate(self.players)
+                    if eligible is None or pos in eligible]
+        tokens = set(nm.split())
+        shared_grams: Counter[int] = Counter()
+        for gram, n in name_trigrams(nm).items():
+            for entry, m in self._by_gram.get(gram, ()):
+                shared_grams[entry] += min(n, m)
+        shared_tokens: Counter[int] = Counter()
+        for tok in tokens:
+            for entry in self._by_token.get(tok, ()):
+                shared_tokens[entry] += 1
+        hits: set[int] = set()
+        for entry in shared_grams.keys() | shared_tokens.keys():
+            pos, length, their_tokens = self._names[entry]
+            if eligible is not None and pos not in eligible:
+                continue
+            union = len(tokens | their_tokens)
+            # The ratio can never beat 2*shorter/(both): no alignment without length.
+            aligned = (2 * min(len(nm), length) >= min_score * (len(nm) + length)
+                       and shared_grams[entry]
+                       >= _min_shared_trigrams(len(nm), length, min_score))
+            if aligned or shared_tokens[entry] >= min_score * union:
+                hits.add(pos)
+        return [self.players[pos] for pos in sorted(hits)]
+
+
 def is_placeholder_dob(d: date | None) -> bool:
     """SofaScore uses Jan 1 when the real birth date is unknown — treat as missing."""
     return bool(d) and d.month == 1 and d.day == 1
@@ -11,9 +11,11 @@ amount of work: ``live_round`` for a match being played (never promotes it),
 take the same road; ``live_round`` takes the cheap version of it on the rounds that
 are not the k-th.
 
-Each entry point returns True on success and False when the egress was blocked /
-unavailable — the caller then simply does NOT advance the match's state, so the
-next tick retries (the on-disk cache makes a retry cheap).
+Each entry point returns ``IMPORTED`` or ``UNCHANGED`` on success and False when
+the egress was blocked / unavailable — the caller then simply does NOT advance the
+match's state, so the next tick retries (the on-disk cache makes a retry cheap).
+``UNCHANGED`` is a success that wrote nothing: every payload hashed as on the
+previous import (see ``MatchPayloadDigest``), so there is nobody to tell.
 """
 from __future__ import annotations
 
@@ -31,6 +33,11 @@ from realdata.services.sofascore_client import (
     SofaScoreBlocked, SofaScoreClient, SofaScoreError,
 )
 
+# Outcomes of a successful round. Both truthy, so "did it go through" still reads
+# as it did when the answer was a bool.
+IMPORTED = "imported"
+UNCHANGED = "unchanged"
+
 
 def year_for(match) -> str:
     """SofaScore year string for a match, e.g. Season.code '2026-2027' -> '26/27'."""
@@ -99,9 +106,9 @@ def _warm(match, *, heavy: bool) -> bool:
                                       "final" if heavy else "live")
 
 
-def _import_warm(match, *, only_finished: bool, heavy: bool) -> bool:
+def _import_warm(match, *, only_finished: bool, heavy: bool) -> str | bool:
     """Import the warm cache OFFLINE (lineups/shotmap/incidents -> DB, incl. voto
-    puro). True iff the import went through.
+    puro). ``IMPORTED`` or ``UNCHANGED`` iff the import went through, else False.
 
     ``heavy`` is the whole difference in cost. A light round reads four endpoints; a
     heavy one adds a heatmap per player — some twenty-two more — and with them the
@@ -120,7 +127,8 @@ def _import_warm(match, *, only_finished: bool, heavy: bool) -> bool:
 
     ``skip_existing=False`` always: this is called repeatedly on the same match (the
     +15min check, the +1h confirmation, and every live round), and the point of each
-    call is to pick up what has changed since the last one.
+    call is to pick up what has changed since the last one. What has NOT changed
+    is the importer's to notice: it compares the payloads' digests before writing.
     """
     year = year_for(match)
     client = _offline_client()
@@ -136,28 +144,28 @@ def _import_warm(match, *, only_finished: bool, heavy: bool) -> bool:
             # to the network — which from here is a block.
             if not egress_client.warm_schedule(year):
                 return False
-            ingest_sofascore_season(scraper=client, year=year,
-                                    match_ids=[int(match.external_id)],
-                                    only_finished=only_finished,
-                                    skip_existing=False, with_heatmaps=heavy)
+            result = ingest_sofascore_season(
+                scraper=client, year=year, match_ids=[int(match.external_id)],
+                only_finished=only_finished, skip_existing=False,
+                with_heatmaps=heavy)
     except (SofaScoreBlocked, SofaScoreError):
         # Something the import needed was not in the warm cache and it tried the
         # network (blocked from here). Bail; the next tick retries.
         return False
-    return True
+    return UNCHANGED if result.skipped_unchanged and not result.matches else IMPORTED
 
 
-def finalize(match) -> bool:
+def finalize(match) -> str | bool:
     """The post-full-time import: the match is over, so only a finished one counts,
     and it is always heavy — the heatmaps are what full time was waited for."""
     return (_warm(match, heavy=True)
             and _import_warm(match, only_finished=True, heavy=True))
 
 
-def live_round(match, *, heavy: bool) -> bool:
+def live_round(match, *, heavy: bool) -> str | bool:
     """One round of a match being played: its lifecycle and score, then its
-    per-player data. True iff the egress warmed the cache AND the import went
-    through.
+    per-player data. Truthy iff the egress warmed the cache AND the import went
+    through; ``UNCHANGED`` only if neither the match nor its data moved.
 
     The two used to be separate steps on separate clocks. They are one because the
     light half is what sets the cadence: the votes move on every round, and the
@@ -174,6 +182,6 @@ def live_round(match, *, heavy: bool) -> bool:
     if not _warm(match, heavy=heavy):
         return False
     event = _cached_event(match.external_id)
-    if event is not None:
-        _apply_status(match, event)
-    return _import_warm(match, only_finished=False, heavy=heavy)
+    moved = _apply_status(match, event) if event is not None else []
+    outcome = _import_warm(match, only_finished=False, heavy=heavy)
+    return IMPORTED if outcome and moved else outcome
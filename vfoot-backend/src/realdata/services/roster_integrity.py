@@ -17,10 +17,10 @@ della passata, proprio nel periodo dell'anno in cui il mercato si muove. Quindi
 qui si GUARDA e si RIFERISCE, non si corregge.
 
 CHI SE NE ACCORGEREBBE, ALTRIMENTI. Nessuno, ed e' questo il punto.
-``match_resolver.player_team_season_id`` risolve il club corrente con un
-``.first()`` senza ordinamento: con due tesseramenti aperti non solleva niente,
-restituisce uno dei due nell'ordine in cui capita il database. Il giocatore
-verrebbe valutato sulla partita sbagliata, in modo non deterministico e
+``match_resolver.current_team_seasons`` risolve il club corrente prendendo il
+tesseramento aperto con l'id piu' basso: con due tesseramenti aperti non solleva
+niente, restituisce quello registrato per primo, che non e' necessariamente
+quello giusto. Il giocatore verrebbe valutato sulla partita sbagliata, in modo
 silenzioso. La sovrapposizione non e' disordine estetico: e' un punteggio
 attribuito alla partita di un'altra squadra.
 
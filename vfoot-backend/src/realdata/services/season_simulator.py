@@ -74,6 +74,7 @@ from realdata.models import (
     PlayerTeamStint,
     TeamSeason,
 )
+from realdata.services import fork_pool
 
 PROVIDER = "sofascore"
 SERIE_A_TOURNAMENT_ID = 23
@@ -1288,9 +1289,62 @@ def _order_fixtures(fixtures: list, headline: str) -> list:
     return [f for f in fixtures if str(f.external_id) != str(headline)] + pick
 
 
+@dataclass(frozen=True)
+class _Fixture:
+    """One match to play: what a worker needs besides the squads and the pool."""
+    external_id: str
+    matchday: int
+    home_id: int
+    away_id: int
+    clock: int
+
+
+def _play_and_write(fixture: _Fixture) -> tuple[int, int, int]:
+    """Simulate one match and write its payloads. (home goals, away goals, heatmaps)."""
+    shared = fork_pool.shared
+    teams, pool = shared["teams"], shared["pool"]
+    cache_dir, seed = shared["cache_dir"], shared["seed"]
+    # Seeded from the fixture's OWN identity, not from a shared stream. A stream
+    # is consumed only by the matches that get simulated, so moving the
+    # observation instant forward — the whole point of this command — changed
+    # which draws each match received and re-rolled the season behind the front.
+    # Keyed on the provider id instead, a match plays the same way whenever it is
+    # asked, and in whichever process.
+    sim = simulate_match(teams[fixture.home_id], teams[fixture.away_id],
+                         fixture.matchday, pool,
+                         random.Random(f"{seed}:{fixture.external_id}"),
+                         clock=fixture.clock)
+    mid = int(fixture.external_id)
+    _write(cache_dir, f"/api/v1/event/{mid}/lineups", sim.lineups)
+    _write(cache_dir, f"/api/v1/event/{mid}/shotmap", {"shotmap": sim.shotmap})
+    _write(cache_dir, f"/api/v1/event/{mid}/incidents", {"incidents": sim.incidents})
+    for pid, points in sim.heatmaps.items():
+        _write(cache_dir, f"/api/v1/event/{mid}/player/{pid}/heatmap",
+               {"heatmap": points})
+    return sim.home_goals, sim.away_goals, len(sim.heatmaps)
+
+
+def play_fixtures(fixtures: list[_Fixture], *, teams: dict[int, SimTeam],
+                  pool: DonorPool, cache_dir: Path, seed: int,
+                  workers: int = 1) -> list[tuple[int, int, int]]:
+    """Play and write every fixture; one (home goals, away goals, heatmaps) each,
+    in the order given.
+
+    Each match draws from its own stream and writes its own files, so they go
+    through ``fork_pool.fork_map``; the squads and the donor pool are loaded once,
+    by the caller.
+    """
+    # A worker never touches the database: the connection it inherits is left
+    # alone, and a forked worker exits without closing it.
+    return fork_pool.fork_map(_play_and_write, fixtures, workers=workers,
+                              state={"teams": teams, "pool": pool,
+                                     "cache_dir": cache_dir, "seed": seed})
+
+
 def write_season_cache(*, competition_season: CompetitionSeason, cache_dir: Path,
                        through_matchday: int, now: datetime, live_minute: int,
-                       seed: int, year: str, headline: str = "", log=print) -> dict:
+                       seed: int, year: str, headline: str = "", workers: int = 1,
+                       log=print) -> dict:
     """Write every provider payload the importer will read. Returns a small report.
 
     Matchdays after ``through_matchday`` are written as fixtures only — no lineups,
@@ -1299,6 +1353,9 @@ def write_season_cache(*, competition_season: CompetitionSeason, cache_dir: Path
     match's status comes from the CLOCK: kicked off more than 105 minutes ago means
     finished, kicked off means in progress, otherwise not started. That is the whole
     mechanism behind a half-played matchday 22.
+
+    ``workers`` processes play the matches (``play_fixtures``); the files written
+    do not depend on it.
     """
     cache_dir.mkdir(parents=True, exist_ok=True)
     season_id = str(competition_season.external_id)
@@ -1329,6 +1386,7 @@ def write_season_cache(*, competition_season: CompetitionSeason, cache_dir: Path
     report = {"finished": 0, "live": 0, "scheduled": 0, "rounds": 0,
               "heatmaps": 0, "kickoffs_assigned": 0, "plan": {}}
     events_by_round: dict[int, list[dict]] = {}
+    played: list[tuple[_Fixture, dict, dict]] = []
 
     for matchday in sorted(by_round):
         fixtures = _order_fixtures(by_round[matchday], headline)
@@ -1350,40 +1408,17 @@ def write_season_cache(*, competition_season: CompetitionSeason, cache_dir: Path
                 report["plan"][str(fixture.external_id)] = {
                     "status": status, "clock": clock,
                     "kickoff": kickoff.isoformat() if kickoff else None,
-                    # Filled in below for anything that has kicked off. A match in
-                    # progress is NOT imported (see the command's _targets), so this
-                    # is the only place its score can come from.
+                    # Filled in below for anything that has kicked off.
                     "home_goals": None, "away_goals": None,
                 }
             if status == "notstarted":
                 report["scheduled"] += 1
                 continue
 
-            home = teams[fixture.home_team_id]
-            away = teams[fixture.away_team_id]
-            # Seeded from the fixture's OWN identity, not from a shared stream.
-            # A stream is consumed only by the matches that get simulated, so
-            # moving the observation instant forward — the whole point of this
-            # command — changed which draws each match received and re-rolled the
-            # season behind the front. Keyed on the provider id instead, a match
-            # plays the same way whenever it is asked.
-            sim = simulate_match(home, away, matchday, pool,
-                                 random.Random(f"{seed}:{fixture.external_id}"),
-                                 clock=clock)
-            events[-1]["homeScore"] = {"current": sim.home_goals}
-            events[-1]["awayScore"] = {"current": sim.away_goals}
-            entry = report["plan"][str(fixture.external_id)]
-            entry["home_goals"], entry["away_goals"] = sim.home_goals, sim.away_goals
-
-            mid = int(fixture.external_id)
-            _write(cache_dir, f"/api/v1/event/{mid}/lineups", sim.lineups)
-            _write(cache_dir, f"/api/v1/event/{mid}/shotmap", {"shotmap": sim.shotmap})
-            _write(cache_dir, f"/api/v1/event/{mid}/incidents",
-                   {"incidents": sim.incidents})
-            for pid, points in sim.heatmaps.items():
-                _write(cache_dir, f"/api/v1/event/{mid}/player/{pid}/heatmap",
-                       {"heatmap": points})
-            report["heatmaps"] += len(sim.heatmaps)
+            # Played after the calendar walk, all rounds at once: see play_fixtures.
+            played.append((_Fixture(str(fixture.external_id), matchday,
+                                    fixture.home_team_id, fixture.away_team_id, clock),
+                           events[-1], report["plan"][str(fixture.external_id)]))
             report["finished" if status == "finished" else "live"] += 1
 
         events_by_round[matchday] = events
@@ -1395,6 +1430,18 @@ def write_season_cache(*, competition_season: CompetitionSeason, cache_dir: Path
             log(f"  matchday {matchday:2d}: "
                 + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
 
+    results = play_fixtures([f for f, _, _ in played], teams=teams, pool=pool,
+                            cache_dir=cache_dir, seed=seed, workers=workers)
+    for (_, event, entry), (home_goals, away_goals, heatmaps) in zip(played, results):
+        event["homeScore"] = {"current": home_goals}
+        event["awayScore"] = {"current": away_goals}
+        # A match in progress is NOT imported (see the command's _targets), so
+        # the plan is the only place its score can come from.
+        entry["home_goals"], entry["away_goals"] = home_goals, away_goals
+        report["heatmaps"] += heatmaps
+    log(f"played {len(played)} matches on {max(1, min(workers, len(played)))} "
+        f"process(es)")
+
     # The three schedule endpoints the importer walks before any match.
     _write(cache_dir, f"/api/v1/unique-tournament/{SERIE_A_TOURNAMENT_ID}/seasons",
            {"seasons": [{"year": year, "id": int(season_id)}]})
@@ -36,6 +36,8 @@ match shows away-team zones mirrored, pass ``flip_away=True``.
 
 from __future__ import annotations
 
+import hashlib
+import json
 import math
 from collections import defaultdict
 from dataclasses import dataclass
@@ -43,6 +45,7 @@ from datetime import datetime, timezone
 from typing import Any, Callable
 
 from django.db import transaction
+from django.utils import timezone as djtz
 
 from realdata.models import (
     CARD_RED,
@@ -54,9 +57,12 @@ from realdata.models import (
     Match,
     MatchAppearance,
     MatchDisciplinaryEvent,
+    MatchPayloadDigest,
     MatchShot,
+    MatchZoneArchive,
     Player,
     PlayerAlias,
+    PlayerTeamStint,
     PlayerZoneFeature,
     PROVIDER_SOFASCORE,
     SIDE_AWAY,
@@ -73,6 +79,8 @@ from realdata.models import (
 # presence. We test the ATTACKING box only (see the box_count loop).
 from realdata.services.statsbomb_adapter import (
     BOX_X_MIN, BOX_Y_MIN, BOX_Y_MAX, _zone_key)
+from realdata.services import feature_totals as match_totals
+from realdata.services import zone_archive
 from realdata.services.sofascore_client import SofaScoreBlocked
 from realdata.services.identity import (
     is_placeholder_dob, norm_name, spell_out_particles,
@@ -204,6 +212,8 @@ class SofaIngestResult:
     players_unplaced: int = 0
     skipped_not_finished: int = 0
     skipped_existing: int = 0
+    # Matches whose payloads all hashed as on their last import: nothing written.
+    skipped_unchanged: int = 0
     # Matches whose own /event/{id} did not answer with something usable, so the
     # caller must fall back to resolving them from the schedule. See
     # ``ingest_sofascore_matches``.
@@ -356,76 +366,201 @@ def _should_set_dob(existing, new) -> bool:
     return existing is None or is_placeholder_dob(existing)
 
 
-def _adopt_by_identity(name: str, dob) -> Player | None:
-    """Find an EXISTING canonical player (from another provider) for this human.
+class PlayerIdentityIndex:
+    """Every identity an import can resolve a SofaScore player to, read ONCE per run.
 
-    Enforces "one Player across providers": before minting a new SofaScore row,
-    check whether this person already exists — e.g. a Transfermarkt-sourced squad
-    member who just made their debut. Matched on (exact normalised name + DOB);
-    DOB is required (precise, and StatsBomb rows carry none so they're untouched),
-    and the match must be unique. The SofaScore id is then attached as an alias so
-    future imports resolve straight to the same entity.
+    Resolving a player used to cost a query per lookup: this provider's id, then
+    the alias table, then — for a newcomer — the cross-provider candidates and an
+    alias ``exists()`` per candidate. On the first import of a season that is
+    thousands of small queries for a few hundred people. The index holds what those
+    queries asked, so the decisions are dictionary lookups:
+
+    * ``by_ext``      — SofaScore id -> Player, primary rows and adopted aliases;
+    * ``candidates``  — (DOB, normalised name) -> players of OTHER providers, keyed
+      on both the full and the short name, exactly the pair adoption compares;
+    * ``aliased``     — ids that already carry a SofaScore alias, so are taken;
+    * ``memberships`` — the team-seasons each candidate is registered to.
+
+    Writes go back per match, in bulk (see ``resolve_match``): new players and
+    aliases are created together, before the rows of the match that reference them.
     """
-    if not dob:
-        return None
-    nm = norm_name(name)
-    if not nm:
-        return None
-    cands = [
-        c for c in Player.objects.filter(date_of_birth=dob).exclude(external_source=PROVIDER)
-        if (norm_name(c.full_name) == nm or norm_name(c.short_name) == nm)
-        and not PlayerAlias.objects.filter(player=c, source=PROVIDER).exists()
-    ]
-    return cands[0] if len(cands) == 1 else None
-
-
-def _player(player_id: Any, name: str, short_name: str,
-            cache: dict[str, Player], dob_ts: Any = None) -> Player:
-    ext_id = str(player_id)
-    dob = _dob_from_ts(dob_ts)
-    if ext_id in cache:
-        player = cache[ext_id]
-        # backfill DOB on a player we first saw without it (e.g. from a shotmap)
-        if _should_set_dob(player.date_of_birth, dob):
-            player.date_of_birth = dob
-            player.save(update_fields=["date_of_birth"])
-        return player
-    # Resolve an existing identity: this provider's id (primary, or an alias from a
-    # prior adoption) before falling back to cross-provider adoption, then creation.
-    player = (Player.objects.filter(external_source=PROVIDER, external_id=ext_id).first()
-              or _player_by_alias(ext_id))
-    if player is None:
-        adopted = _adopt_by_identity(name, dob)
-        if adopted is not None:
-            PlayerAlias.objects.get_or_create(
-                player=adopted, source=PROVIDER, alias=ext_id)
-            print(f"  [identity] adopted existing player '{adopted.full_name}' "
-                  f"({adopted.external_source}/{adopted.external_id}) for SofaScore "
-                  f"id {ext_id} — no duplicate created")
-            player = adopted
-        else:
-            full = str(name or f"SS-{ext_id}")
-            player = Player.objects.create(
-                external_source=PROVIDER, external_id=ext_id,
-                full_name=full,
-                # Il nome breve arriva gia' abbreviato dal fornitore, che pero'
-                # accorcia anche le particelle del cognome ('G. D. Marzi'). E'
-                # quello che si legge in quasi tutta l'app, quindi si ripara qui,
-                # una volta, invece che a ogni punto di visualizzazione.
-                short_name=spell_out_particles(short_name, full),
-                date_of_birth=dob)
-    # player may have existed without a DOB (or with a placeholder) -> fill it
-    if _should_set_dob(player.date_of_birth, dob):
-        player.date_of_birth = dob
-        player.save(update_fields=["date_of_birth"])
-    cache[ext_id] = player
-    return player
-
-
-def _player_by_alias(ext_id: str) -> Player | None:
-    a = (PlayerAlias.objects.filter(source=PROVIDER, alias=ext_id)
-         .select_related("player").first())
-    return a.player if a else None
+
+    def __init__(self) -> None:
+        self.by_ext: dict[str, Player] = {}
+        self.candidates: dict[tuple, list[Player]] = defaultdict(list)
+        self.aliased: set[int] = set()
+        self.memberships: dict[int, set[int]] = defaultdict(set)
+
+    @classmethod
+    def load(cls) -> "PlayerIdentityIndex":
+        index = cls()
+        for p in Player.objects.filter(external_source=PROVIDER):
+            index.by_ext[str(p.external_id)] = p
+        for a in PlayerAlias.objects.filter(source=PROVIDER).select_related("player"):
+            index.by_ext.setdefault(a.alias, a.player)
+            index.aliased.add(a.player_id)
+        # DOB is required to adopt, so a player without one can never be a candidate.
+        others = (Player.objects.exclude(external_source=PROVIDER)
+                  .filter(date_of_birth__isnull=False))
+        for p in others:
+            index._add_candidate(p)
+        for pid, ts_id in (PlayerTeamStint.objects
+                           .filter(player__in=others)
+                           .values_list("player_id", "team_season_id")):
+            index.memberships[pid].add(ts_id)
+        return index
+
+    def _add_candidate(self, player: Player) -> None:
+        keys = {norm_name(player.full_name), norm_name(player.short_name)} - {""}
+        for nm in keys:
+            self.candidates[(player.date_of_birth, nm)].append(player)
+
+    def get(self, player_id: Any) -> Player:
+        return self.by_ext[str(player_id)]
+
+    def __len__(self) -> int:
+        return len(self.by_ext)
+
+    def adopt(self, name: str, dob, team_season: TeamSeason | None = None) -> Player | None:
+        """Find an EXISTING canonical player (from another provider) for this human.
+
+        Enforces "one Player across providers": before minting a new SofaScore row,
+        check whether this person already exists — e.g. a Transfermarkt-sourced
+        squad member who just made their debut. Matched on (exact normalised name +
+        DOB); DOB is required (precise, and StatsBomb rows carry none so they're
+        untouched), and the match must be unique. Two homonyms born the same day are
+        told apart only by the squad they play for: if exactly one of them is
+        registered to it, that one is the player; otherwise nobody is adopted.
+        """
+        if not dob:
+            return None
+        nm = norm_name(name)
+        if not nm:
+            return None
+        cands = [c for c in self.candidates.get((dob, nm), ())
+                 if c.id not in self.aliased]
+        if len(cands) > 1 and team_season is not None:
+            cands = [c for c in cands if team_season.id in self.memberships[c.id]]
+        return cands[0] if len(cands) == 1 else None
+
+    def resolve_match(self, people: dict[str, tuple[str, str, Any, TeamSeason]],
+                      log: Callable[[str], None] = print) -> None:
+        """Make every id of ``people`` ({ext_id: (name, short_name, dob_ts,
+        team_season)}) resolvable with ``get``, writing what is new in one batch.
+
+        Resolution order per id: this provider's id (primary, or an alias from a
+        prior adoption), then cross-provider adoption, then creation. A DOB is only
+        ever FILLED on a player who has none or a placeholder (``_should_set_dob``).
+
+        If the batch fails, what it would have written is forgotten before the error
+        goes on: the next match resolves those ids afresh, as if met for the first
+        time, instead of getting back a player that was never saved.
+        """
+        new_players: list[Player] = []
+        new_aliases: list[PlayerAlias] = []
+        dob_filled: dict[int, Player] = {}
+        created: list[str] = []
+        adopted: list[str] = []
+        for ext_id, (name, short_name, dob_ts, team_season) in people.items():
+            dob = _dob_from_ts(dob_ts)
+            player = self.by_ext.get(ext_id)
+            if player is None:
+                player = self.adopt(name, dob, team_season)
+                if player is not None:
+                    new_aliases.append(
+                        PlayerAlias(player=player, source=PROVIDER, alias=ext_id))
+                    self.aliased.add(player.id)
+                    adopted.append(ext_id)
+                    log(f"  [identity] adopted existing player '{player.full_name}' "
+                        f"({player.external_source}/{player.external_id}) for "
+                        f"SofaScore id {ext_id} — no duplicate created")
+                else:
+                    full = str(name or f"SS-{ext_id}")
+                    player = Player(
+                        external_source=PROVIDER, external_id=ext_id,
+                        full_name=full,
+                        # Il nome breve arriva gia' abbreviato dal fornitore, che
+                        # pero' accorcia anche le particelle del cognome ('G. D.
+                        # Marzi'). E' quello che si legge in quasi tutta l'app,
+                        # quindi si ripara qui, una volta, invece che a ogni punto
+                        # di visualizzazione.
+                        short_name=spell_out_particles(short_name, full),
+                        date_of_birth=dob)
+                    new_players.append(player)
+                    created.append(ext_id)
+                self.by_ext[ext_id] = player
+            # player may exist without a DOB (or with a placeholder) -> fill it
+            if player.pk is not None and _should_set_dob(player.date_of_birth, dob):
+                player.date_of_birth = dob
+                dob_filled[player.pk] = player
+
+        try:
+            if new_players:
+                Player.objects.bulk_create(new_players, batch_size=500)
+                if any(p.pk is None for p in new_players):
+                    # Backends that cannot return ids from a bulk insert (MySQL): read
+                    # them back on the natural key, which is unique for this provider.
+                    ids = dict(Player.objects.filter(
+                        external_source=PROVIDER,
+                        external_id__in=[p.external_id for p in new_players],
+                    ).values_list("external_id", "id"))
+                    for p in new_players:
+                        p.pk = p.id = ids[p.external_id]
+            created = []
+            if new_aliases:
+                PlayerAlias.objects.bulk_create(new_aliases, ignore_conflicts=True)
+        except Exception:
+            for ext_id in created + adopted:
+                self.by_ext.pop(ext_id, None)
+            self.aliased.difference_update(a.player_id for a in new_aliases)
+            raise
+        if dob_filled:
+            Player.objects.bulk_update(list(dob_filled.values()), ["date_of_birth"])
+
+
+def _match_people(stats_rows, shots_rows, incidents_rows, home_ts: TeamSeason,
+                  away_ts: TeamSeason, flip_away: bool,
+                  ) -> dict[str, tuple[str, str, Any, TeamSeason]]:
+    """Every player a match's payloads will write a row for, in the order the
+    import meets them (lineups, shot map, cards), so the first name seen wins as it
+    always did. A later mention only contributes a DOB the earlier ones lacked."""
+    people: dict[str, tuple[str, str, Any, TeamSeason]] = {}
+
+    def meet(pid: Any, name: str, short_name: str, dob_ts: Any, ts: TeamSeason) -> None:
+        ext_id = str(pid)
+        if ext_id not in people:
+            people[ext_id] = (name, short_name, dob_ts, ts)
+        elif _should_set_dob(_dob_from_ts(people[ext_id][2]), _dob_from_ts(dob_ts)):
+            people[ext_id] = (*people[ext_id][:2], dob_ts, people[ext_id][3])
+
+    for row in stats_rows:
+        pid = _first(row, "id", "playerId", "player_id")
+        if pid is None:
+            continue
+        meet(pid, _first(row, "name", "shortName") or "", _first(row, "shortName") or "",
+             _first(row, "dateOfBirthTimestamp"),
+             home_ts if row.get("side") == "home" else away_ts)
+    for shot in shots_rows:
+        pdata = shot.get("player") or {}
+        if not isinstance(pdata, dict) or "id" not in pdata:
+            continue
+        side = SIDE_HOME if shot.get("isHome") else SIDE_AWAY
+        # Same filter as the shot loop: a shot with no usable position writes nothing.
+        px, py = _shot_point_xy(shot.get("playerCoordinates") or {})
+        if _norm_point(px, py, side, flip_away) is None:
+            continue
+        meet(pdata["id"], pdata.get("name", ""), pdata.get("shortName", ""),
+             pdata.get("dateOfBirthTimestamp"), home_ts if side == SIDE_HOME else away_ts)
+    for inc in incidents_rows:
+        if inc.get("incidentType") != "card":
+            continue
+        pdata = inc.get("player") or {}
+        if pdata.get("id") is None:
+            continue
+        meet(pdata["id"], pdata.get("name", ""), pdata.get("shortName", ""),
+             pdata.get("dateOfBirthTimestamp"),
+             home_ts if inc.get("isHome") else away_ts)
+    return people
 
 
 def _kickoff(event: dict[str, Any]) -> datetime | None:
@@ -466,10 +601,87 @@ def _upsert_match(event: dict[str, Any], competition_season: CompetitionSeason,
     return match
 
 
+# -- payload digests -----------------------------------------------------
+
+# Bump when the import writes something different from the SAME payloads (a new
+# feature, a changed formula): the stored digests would otherwise keep declaring
+# every finished match up to date with the old output.
+IMPORT_FORMAT = 1
+# Not a payload: the fingerprint of what the last import left in the database.
+_ROWS_ENDPOINT = "rows"
+
+
+def _digest(obj: Any) -> str:
+    blob = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _event_fields(event: dict[str, Any]) -> dict[str, Any]:
+    """The part of the event the import reads. The whole dict also carries clocks
+    and change stamps that move while nothing the import writes does."""
+    def team(t):
+        t = t or {}
+        return [t.get("id"), t.get("name"), t.get("shortName")]
+    return {
+        "id": event.get("id"),
+        "status": (event.get("status") or {}).get("type"),
+        "round": (event.get("roundInfo") or {}).get("round"),
+        "start": event.get("startTimestamp"),
+        "score": [(event.get("homeScore") or {}).get("current"),
+                  (event.get("awayScore") or {}).get("current")],
+        "teams": [team(event.get("homeTeam")), team(event.get("awayTeam"))],
+    }
+
+
+def _payload_digests(*, event, stats_rows, shots_rows, incidents_rows,
+                     heatmaps: dict[int, Any], options: tuple) -> dict[str, str]:
+    return {
+        "event": _digest(_event_fields(event)),
+        "lineups": _digest(stats_rows),
+        "shotmap": _digest(shots_rows),
+        "incidents": _digest(incidents_rows),
+        "heatmaps": _digest(sorted(heatmaps.items())),
+        "options": _digest([IMPORT_FORMAT, *options]),
+    }
+
+
+def _rows_digest(match: Match) -> str:
+    """What an import leaves behind, counted. Purging a match's appearances or zone
+    rows (``simulate_sofascore_season`` does, before re-ingesting) must not leave
+    the digests claiming the data is there."""
+    return _digest([
+        MatchAppearance.objects.filter(match=match).count(),
+        PlayerZoneFeature.objects.filter(match=match, provider=PROVIDER).count()
+        + zone_archive.archived_row_count(match.id, PROVIDER),
+    ])
+
+
+def _is_unchanged(match: Match, digests: dict[str, str]) -> bool:
+    stored = dict(MatchPayloadDigest.objects.filter(match=match, provider=PROVIDER)
+                  .values_list("endpoint", "digest"))
+    rows = stored.pop(_ROWS_ENDPOINT, None)
+    return stored == digests and rows == _rows_digest(match)
+
+
+def _record_import(match: Match, digests: dict[str, str]) -> None:
+    """Store the digests of a COMPLETED import and stamp the change on the match."""
+    now = djtz.now()
+    MatchPayloadDigest.objects.bulk_create(
+        [MatchPayloadDigest(match=match, provider=PROVIDER, endpoint=endpoint,
+                            digest=digest, imported_at=now)
+         for endpoint, digest in {**digests,
+                                  _ROWS_ENDPOINT: _rows_digest(match)}.items()],
+        update_conflicts=True, update_fields=["digest", "imported_at"],
+        unique_fields=["match", "provider", "endpoint"])
+    match.data_changed_at = now
+    Match.objects.filter(pk=match.pk).update(data_changed_at=now)
+
+
 # -- per-match ingestion -------------------------------------------------
 
 
-def _ingest_cards(incidents_rows, match, home_ts, away_ts, player_cache) -> int:
+def _ingest_cards(incidents_rows, match, home_ts, away_ts,
+                  identity: PlayerIdentityIndex) -> int:
     """Create MatchDisciplinaryEvent rows from a match's incidents (cards only).
     Idempotent: drops this match's sofascore card events, then bulk-inserts."""
     MatchDisciplinaryEvent.objects.filter(match=match, provider=PROVIDER).delete()
@@ -481,8 +693,7 @@ def _ingest_cards(incidents_rows, match, home_ts, away_ts, player_cache) -> int:
         pid = pdata.get("id")
         if pid is None:
             continue
-        player = _player(pid, pdata.get("name", ""), pdata.get("shortName", ""),
-                         player_cache, dob_ts=pdata.get("dateOfBirthTimestamp"))
+        player = identity.get(pid)
         minute = int(inc.get("time") or 0)
         cls = inc.get("incidentClass")
         side = SIDE_HOME if inc.get("isHome") else SIDE_AWAY
@@ -537,27 +748,64 @@ def _carried_presence(match) -> dict[int, tuple[dict[str, float], dict[str, floa
 
 def _ingest_match(
     *, scraper, event: dict[str, Any], competition_season: CompetitionSeason,
-    team_cache: dict[str, TeamSeason], player_cache: dict[str, Player],
+    team_cache: dict[str, TeamSeason], identity: PlayerIdentityIndex,
     zone_cols: int, zone_rows: int, flip_away: bool,
     feature_totals: dict[str, float], stat_keys_seen: set[str],
     diagnostics: dict[str, bool], log: Callable[[str], None],
-    with_heatmaps: bool = True,
+    with_heatmaps: bool = True, skip_unchanged: bool = True,
 ) -> SofaIngestResult:
     """Import one match. ``with_heatmaps=False`` is the LIGHT round of a live
     match: it skips the request-per-player heatmaps and places each player's totals
     where the last heavy round measured him, or in ``ZONE_UNPLACED`` if it never
     did (a substitute who came on since). The shot map keeps its exact coordinates
-    either way — that one is a single request."""
+    either way — that one is a single request.
+
+    ``skip_unchanged`` stops before the first write when every payload hashes as
+    it did on the last import of this match (see ``MatchPayloadDigest``): the
+    final-confirm pass and a backfill of finished matches then cost the reads."""
     match_id = int(event["id"])
     home_team = event["homeTeam"]
     away_team = event["awayTeam"]
-    # Fetch first so a block raises before we create an empty Match shell.
+    # Fetch first so a block raises before we create an empty Match shell. The
+    # heatmaps too: a request per player, and part of what the digest is taken of.
     stats_rows = scraper.player_stats_records(match_id)
     shots_rows = scraper.shots_records(match_id)
     incidents_rows = scraper.incidents_records(match_id)
+    heatmaps: dict[int, Any] = {}
+    if with_heatmaps:
+        # Skip players with no minutes (unused subs have no heatmap data), and the
+        # whole lot on a light round: that request per player IS the cost the
+        # heavy pass exists to ration.
+        for row in stats_rows:
+            pid_raw = _first(row, "id", "playerId", "player_id")
+            if pid_raw is not None and int(_stat(row, "minutesPlayed")) > 0:
+                heatmaps[int(pid_raw)] = scraper.heatmap(match_id, int(pid_raw))
+
+    digests = _payload_digests(
+        event=event, stats_rows=stats_rows, shots_rows=shots_rows,
+        incidents_rows=incidents_rows, heatmaps=heatmaps,
+        options=(zone_cols, zone_rows, flip_away, with_heatmaps))
+    existing = Match.objects.filter(external_source=PROVIDER,
+                                    external_id=str(match_id)).first()
+    if existing is not None:
+        if skip_unchanged and _is_unchanged(existing, digests):
+            log(f"  match {match_id} {home_team.get('name')} v {away_team.get('name')}: "
+                f"unchanged since the last import")
+            return SofaIngestResult(skipped_unchanged=1)
+        # Forgotten BEFORE writing: an import that dies halfway must not leave
+        # digests behind that vouch for the rows it did not finish.
+        MatchPayloadDigest.objects.filter(match=existing, provider=PROVIDER).delete()
+        # A match of an archived season is written like any other, so its rows
+        # come back first: the upsert has to find them, and the archive would
+        # otherwise go on describing a match that has since changed.
+        zone_archive.restore_match(existing.id)
+
     home_ts = _team_season(home_team, competition_season, team_cache)
     away_ts = _team_season(away_team, competition_season, team_cache)
     match = _upsert_match(event, competition_season, home_ts, away_ts)
+    identity.resolve_match(
+        _match_people(stats_rows, shots_rows, incidents_rows, home_ts, away_ts,
+                      flip_away), log=log)
     # Read before anything is written for this match, and only when it is needed.
     carried = _carried_presence(match) if not with_heatmaps else {}
 
@@ -590,10 +838,7 @@ def _ingest_match(
         if pid_raw is None:
             continue
         side = SIDE_HOME if row.get("side") == "home" else SIDE_AWAY
-        name = _first(row, "name", "shortName") or ""
-        short_name = _first(row, "shortName") or ""
-        player = _player(pid_raw, name, short_name, player_cache,
-                         dob_ts=_first(row, "dateOfBirthTimestamp"))
+        player = identity.get(pid_raw)
 
         minutes = int(_stat(row, "minutesPlayed"))
         substitute = _first(row, "substitute")
@@ -616,12 +861,8 @@ def _ingest_match(
         )
         appearances += 1
 
-        # Heatmap (one request per player) -> per-zone presence distribution.
-        # Skip players with no minutes (unused subs have no heatmap data), and the
-        # whole lot on a light round: that request per player IS the cost the heavy
-        # pass exists to ration.
-        points = (scraper.heatmap(match_id, int(pid_raw))
-                  if with_heatmaps and minutes > 0 else [])
+        # Heatmap (fetched above) -> per-zone presence distribution.
+        points = heatmaps.get(int(pid_raw), [])
         if first_match and not diagnostics.get("hm_sample") and points:
             diagnostics["hm_sample"] = True
             log(f"  [diagnostics] heatmap sample: {str(points[:8])[:160]}")
@@ -709,8 +950,7 @@ def _ingest_match(
         if norm is None:
             continue
         zone = _zone_key(norm[0], norm[1], zone_cols, zone_rows)
-        player = _player(pdata["id"], pdata.get("name", ""), pdata.get("shortName", ""),
-                         player_cache, dob_ts=pdata.get("dateOfBirthTimestamp"))
+        player = identity.get(pdata["id"])
         inc(player.id, side, zone, "shots", 1.0)
         inc(player.id, side, zone, "xg_shots", _num(shot.get("xg")))
         # The event itself: the zone aggregate loses the minute, and anything that
@@ -732,7 +972,7 @@ def _ingest_match(
 
     # Incidents -> disciplinary events (cards). Cards live ONLY here, not in the
     # /lineups statistics, so they must be ingested as part of every import.
-    cards = _ingest_cards(incidents_rows, match, home_ts, away_ts, player_cache)
+    cards = _ingest_cards(incidents_rows, match, home_ts, away_ts, identity)
 
     # MatchShot stays delete-and-reinsert: its unique constraint is CONDITIONAL
     # (~Q(external_id="")), which update_conflicts cannot key on, and it is ~25 rows
@@ -751,16 +991,23 @@ def _ingest_match(
             return "heatmap_points"
         return "heatmap_interpolated"
 
-    player_written, player_total = _upsert_zone_features(
-        PlayerZoneFeature, match,
-        attnames=("player_id", "team_side", "zone_key", "feature_key"),
-        unique_names=("player", "team_side", "zone_key", "feature_key"),
-        rows={k: (v, method_for(k[2], k[3])) for k, v in player_zone.items()})
-    team_written, team_total = _upsert_zone_features(
-        TeamZoneFeature, match,
-        attnames=("team_side", "zone_key", "feature_key"),
-        unique_names=("team_side", "zone_key", "feature_key"),
-        rows={k: (v, method_for(k[1], k[2])) for k, v in team_zone.items()})
+    # One transaction for the zone rows and the totals derived from them: a reader
+    # between the two would otherwise score this match on last round's totals.
+    with transaction.atomic():
+        player_written, player_total = _upsert_zone_features(
+            PlayerZoneFeature, match,
+            attnames=("player_id", "team_side", "zone_key", "feature_key"),
+            unique_names=("player", "team_side", "zone_key", "feature_key"),
+            rows={k: (v, method_for(k[2], k[3])) for k, v in player_zone.items()})
+        match_totals.write_match(
+            match, PROVIDER, match_totals.totals_from_zones(player_zone))
+        team_written, team_total = _upsert_zone_features(
+            TeamZoneFeature, match,
+            attnames=("team_side", "zone_key", "feature_key"),
+            unique_names=("team_side", "zone_key", "feature_key"),
+            rows={k: (v, method_for(k[1], k[2])) for k, v in team_zone.items()})
+
+    _record_import(match, digests)
 
     log(f"  match {match_id} {home_team.get('name')} v {away_team.get('name')}: "
         f"{'heavy' if with_heatmaps else 'light'} "
@@ -854,7 +1101,8 @@ def ingest_sofascore_matches(
     *, scraper, year: str, match_ids: list[int], season_code: str | None = None,
     only_finished: bool = True, skip_existing: bool = True,
     zone_cols: int = 5, zone_rows: int = 4, flip_away: bool = False,
-    with_heatmaps: bool = True, logger: Callable[[str], None] = print,
+    with_heatmaps: bool = True, skip_unchanged: bool = True,
+    logger: Callable[[str], None] = print,
 ) -> SofaIngestResult:
     """Ingest specific matches resolved BY ID, without reading the schedule.
 
@@ -862,7 +1110,9 @@ def ingest_sofascore_matches(
     found differs. ``result.unresolved`` counts the ids whose event did not answer
     usably — the caller decides whether to retry through the calendar.
 
-    ``with_heatmaps=False`` is the light round of a live match: see ``_ingest_match``.
+    ``with_heatmaps=False`` is the light round of a live match, and
+    ``skip_unchanged=False`` rewrites a match whose payloads have not moved: see
+    ``_ingest_match`` for both.
     """
     log = logger
     events: list[dict[str, Any]] = []
@@ -880,7 +1130,8 @@ def ingest_sofascore_matches(
         season_code=season_code or season_code_from_year(year),
         only_finished=only_finished, skip_existing=skip_existing,
         limit_matches=None, zone_cols=zone_cols, zone_rows=zone_rows,
-        flip_away=flip_away, with_heatmaps=with_heatmaps, log=log)
+        flip_away=flip_away, with_heatmaps=with_heatmaps,
+        skip_unchanged=skip_unchanged, log=log)
     return result.add(unresolved=unresolved)
 
 
@@ -889,7 +1140,8 @@ def ingest_sofascore_season(
     only_finished: bool = True, skip_existing: bool = True,
     limit_matches: int | None = None, match_ids: list[int] | None = None,
     zone_cols: int = 5, zone_rows: int = 4, flip_away: bool = False,
-    with_heatmaps: bool = True, logger: Callable[[str], None] = print,
+    with_heatmaps: bool = True, skip_unchanged: bool = True,
+    logger: Callable[[str], None] = print,
 ) -> SofaIngestResult:
     """Ingest a SofaScore Serie A season via a ``SofaScoreClient`` instance.
 
@@ -913,14 +1165,15 @@ def ingest_sofascore_season(
         season_code=season_code or season_code_from_year(year),
         only_finished=only_finished, skip_existing=skip_existing,
         limit_matches=limit_matches, zone_cols=zone_cols, zone_rows=zone_rows,
-        flip_away=flip_away, with_heatmaps=with_heatmaps, log=log)
+        flip_away=flip_away, with_heatmaps=with_heatmaps,
+        skip_unchanged=skip_unchanged, log=log)
 
 
 def _ingest_events(
     *, scraper, events: list[dict[str, Any]], season_code: str,
     only_finished: bool, skip_existing: bool, limit_matches: int | None,
     zone_cols: int, zone_rows: int, flip_away: bool, with_heatmaps: bool,
-    log: Callable[[str], None],
+    skip_unchanged: bool, log: Callable[[str], None],
 ) -> SofaIngestResult:
     """Ingest a list of already-resolved event dicts. Shared by both entry points,
     which differ only in HOW they got the list."""
@@ -928,9 +1181,7 @@ def _ingest_events(
         competition_season = _get_or_create_competition_season(season_code)
 
     team_cache: dict[str, TeamSeason] = {}
-    player_cache: dict[str, Player] = {
-        str(p.external_id): p for p in Player.objects.filter(external_source=PROVIDER)
-    }
+    identity = PlayerIdentityIndex.load()
     feature_totals: dict[str, float] = {}
     stat_keys_seen: set[str] = set()
     diagnostics: dict[str, bool] = {}
@@ -945,20 +1196,23 @@ def _ingest_events(
         if limit_matches is not None and processed >= limit_matches:
             log(f"Reached limit_matches={limit_matches}; stopping.")
             break
-        if skip_existing and PlayerZoneFeature.objects.filter(
+        if skip_existing and (PlayerZoneFeature.objects.filter(
             match__external_source=PROVIDER, match__external_id=str(event.get("id")),
             provider=PROVIDER,
-        ).exists():
+        ).exists() or MatchZoneArchive.objects.filter(
+            match__external_source=PROVIDER, match__external_id=str(event.get("id")),
+        ).exists()):
             result = result.add(skipped_existing=1)
             continue
 
         try:
             result = result.add(**_ingest_match(
                 scraper=scraper, event=event, competition_season=competition_season,
-                team_cache=team_cache, player_cache=player_cache,
+                team_cache=team_cache, identity=identity,
                 zone_cols=zone_cols, zone_rows=zone_rows, flip_away=flip_away,
                 feature_totals=feature_totals, stat_keys_seen=stat_keys_seen,
                 diagnostics=diagnostics, log=log, with_heatmaps=with_heatmaps,
+                skip_unchanged=skip_unchanged,
             ).__dict__)
         except SofaScoreBlocked as exc:
             log(f"  !! SofaScore is blocking ({exc}); stopping cleanly. "
@@ -968,7 +1222,7 @@ def _ingest_events(
             log(f"  !! match {event.get('id')} failed: {type(exc).__name__}: {exc}")
         processed += 1
 
-    result = result.add(teams=len(team_cache), players=len(player_cache))
+    result = result.add(teams=len(team_cache), players=len(identity))
     _log_diagnostics(feature_totals, stat_keys_seen, log)
     return result
 
@@ -30,6 +30,7 @@ from realdata.models import (
     Match,
     MatchAppearance,
     MatchDisciplinaryEvent,
+    MatchZoneArchive,
     Player,
     PlayerOnPitchInterval,
     PlayerZoneFeature,
@@ -42,6 +43,7 @@ from realdata.models import (
     TeamSeason,
     TeamZoneFeature,
 )
+from realdata.services import feature_totals
 
 
 PROVIDER = PROVIDER_STATSBOMB
@@ -912,6 +914,9 @@ def _ingest_events_and_features(
     stats: IngestStats,
 ) -> IngestStats:
     events = _load_json(events_file)
+    # an archived match is being rewritten from scratch: its archive goes with
+    # the rows it stands for
+    MatchZoneArchive.objects.filter(match=match_obj).delete()
     PlayerZoneFeature.objects.filter(
         match=match_obj,
         provider=PROVIDER,
@@ -1095,6 +1100,10 @@ def _ingest_events_and_features(
             except DatabaseError:
                 player_inserted = safe_insert_rows(player_rows)
 
+    # Derived from what actually went in rather than from the accumulator: with
+    # safe_writes some rows may have been refused one by one.
+    feature_totals.rebuild([match_obj.id], PROVIDER)
+
     team_inserted = 0
     if team_rows:
         if not safe_writes:
@@ -0,0 +1,282 @@
+"""Cold storage for the zone rows of concluded seasons.
+
+A match's ``PlayerZoneFeature`` and ``TeamZoneFeature`` rows are written once,
+read heavily while its season is being played, and after that almost never: the
+vote reads ``PlayerMatchFeatureTotal``, and the few readers that still want the
+zones of an old season (the role inference reads the PREVIOUS one, the defensive
+exposure and the footprints read positions) read a season at a time. Keeping
+them in the hot tables means every live import maintains indexes over several
+seasons of rows, and every current-season ``GROUP BY`` walks past them.
+
+``archive_season`` moves a concluded season out, one ``MatchZoneArchive`` row per
+match: the rows as columns of JSON, zlib-compressed. ``restore_season`` puts them
+back with their ids, values and timestamps, and proves it by re-reading them and
+comparing the digest taken when they left. Before anything moves the season's
+totals are checked against the zone rows (and rebuilt if they drift), since from
+then on they are what the vote reads.
+
+READING. ``player_rows`` yields the archived player rows with the filters the
+readers use; each reader adds them to its own query of the hot table — a match
+is in exactly one of the two places. The readers that do so are the ones with a
+reason to look at an old season: ``feature_totals``, the role inference, the
+defensive exposure, the season tensor, the footprints, the ratings probe and the
+zone-duel scoring. Nothing reads an old season's team rows; the historical
+simulators and the StatsBomb calibrations, which read the hot tables only,
+``--restore`` first.
+
+A re-import of an archived match restores it before writing (see
+``sofascore_adapter``), so an archive never goes stale behind the importer's back.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from collections import namedtuple
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db import transaction
+
+from realdata.models import Match, MatchZoneArchive, PlayerZoneFeature, TeamZoneFeature
+
+FORMAT = 1
+# zlib level: the payload is written once a season and read rarely; spend the CPU.
+COMPRESSION = 9
+
+_PLAYER_FIELDS = ("id", "player_id", "team_side", "zone_key", "feature_key", "value",
+                  "provider", "source_method", "created_at")
+_TEAM_FIELDS = ("id", "team_side", "zone_key", "feature_key", "value", "provider",
+                "source_method", "created_at")
+
+ZoneRow = namedtuple("ZoneRow", ("match_id", "player_id", "team_side", "zone_key",
+                                 "feature_key", "value", "provider", "source_method"))
+
+
+class ArchiveError(ValueError):
+    """The season cannot be archived or restored as asked; nothing was moved."""
+
+
+@dataclass(frozen=True)
+class ArchiveResult:
+    matches: int = 0
+    player_rows: int = 0
+    team_rows: int = 0
+    stored_bytes: int = 0
+
+
+# -- format ----------------------------------------------------------------
+
+
+def _columns(qs, fields: tuple[str, ...]) -> dict[str, list]:
+    cols: dict[str, list] = {f: [] for f in fields}
+    for row in qs.order_by("id").values_list(*fields):
+        for f, v in zip(fields, row):
+            cols[f].append(v.isoformat() if isinstance(v, datetime) else v)
+    return cols
+
+
+def _encode(match_id: int) -> tuple[bytes, int, int]:
+    """(canonical JSON, player rows, team rows) of a match's hot zone rows."""
+    player = _columns(PlayerZoneFeature.objects.filter(match_id=match_id), _PLAYER_FIELDS)
+    team = _columns(TeamZoneFeature.objects.filter(match_id=match_id), _TEAM_FIELDS)
+    raw = json.dumps({"format": FORMAT, "player": player, "team": team},
+                     sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return raw, len(player["id"]), len(team["id"])
+
+
+def _decode(archive: MatchZoneArchive) -> dict:
+    raw = zlib.decompress(bytes(archive.payload))
+    if hashlib.sha256(raw).hexdigest() != archive.digest:
+        raise ArchiveError(f"match {archive.match_id}: archive payload is corrupt")
+    data = json.loads(raw)
+    if data.get("format") != FORMAT:
+        raise ArchiveError(f"match {archive.match_id}: archive format "
+                           f"{data.get('format')} is not {FORMAT}")
+    return data
+
+
+def _rows(cols: dict[str, list]) -> Iterator[dict]:
+    names = list(cols)
+    for values in zip(*(cols[n] for n in names)):
+        yield dict(zip(names, values))
+
+
+# -- reading ---------------------------------------------------------------
+
+
+def _archives(match_ids=None, competition_season_id=None, before_matchday=None):
+    qs = MatchZoneArchive.objects.all()
+    if match_ids is not None:
+        qs = qs.filter(match_id__in=list(match_ids))
+    if competition_season_id is not None:
+        qs = qs.filter(match__competition_season_id=competition_season_id)
+    if before_matchday is not None:
+        qs = qs.filter(match__matchday__lt=before_matchday)
+    return qs.order_by("match_id")
+
+
+def archived_match_ids(match_ids=None, *, competition_season_id=None) -> set[int]:
+    return set(_archives(match_ids, competition_season_id)
+               .values_list("match_id", flat=True))
+
+
+def is_archived(match_id: int) -> bool:
+    return MatchZoneArchive.objects.filter(match_id=match_id).exists()
+
+
+def player_rows(match_ids=None, *, competition_season_id=None, before_matchday=None,
+                provider: str | None = None, player_ids=None, feature_keys=None,
+                exclude_method: str | None = None) -> Iterator[ZoneRow]:
+    """The archived ``PlayerZoneFeature`` rows matching the filters, in id order
+    within each match. With no archive in the scope this is one empty query."""
+    players = None if player_ids is None else {int(p) for p in player_ids}
+    features = None if feature_keys is None else set(feature_keys)
+    for archive in _archives(match_ids, competition_season_id, before_matchday):
+        for r in _rows(_decode(archive)["player"]):
+            if ((provider is not None and r["provider"] != provider)
+                    or (players is not None and r["player_id"] not in players)
+                    or (features is not None and r["feature_key"] not in features)
+                    or (exclude_method is not None
+                        and r["source_method"] == exclude_method)):
+                continue
+            yield ZoneRow(archive.match_id, r["player_id"], r["team_side"],
+                          r["zone_key"], r["feature_key"], r["value"], r["provider"],
+                          r["source_method"])
+
+
+def archived_row_count(match_id: int, provider: str | None = None) -> int:
+    """Player rows a match has in the archive (0 if it is not archived). Exact for
+    ``provider=None``; for one provider the payload has to be read."""
+    archive = MatchZoneArchive.objects.filter(match_id=match_id).first()
+    if archive is None:
+        return 0
+    if provider is None:
+        return archive.player_rows
+    return sum(1 for p in _decode(archive)["player"]["provider"] if p == provider)
+
+
+# -- moving ----------------------------------------------------------------
+
+
+def season_concluded(competition_season_id: int) -> bool:
+    """Every match of the season is over: finished with stable data, or cancelled.
+    A postponed match still to be played keeps the whole season hot."""
+    qs = Match.objects.filter(competition_season_id=competition_season_id)
+    if not qs.exists():
+        return False
+    return not qs.exclude(status=Match.STATUS_CANCELLED).exclude(
+        status=Match.STATUS_FINISHED, data_ready=True).exists()
+
+
+@transaction.atomic
+def archive_match(match_id: int) -> MatchZoneArchive | None:
+    """Move one match's zone rows into its archive row. None if it has none, or is
+    archived already (an archive is never merged into: restore first)."""
+    if is_archived(match_id):
+        return None
+    raw, n_player, n_team = _encode(match_id)
+    if not n_player and not n_team:
+        return None
+    archive = MatchZoneArchive.objects.create(
+        match_id=match_id, format=FORMAT, player_rows=n_player, team_rows=n_team,
+        payload=zlib.compress(raw, COMPRESSION),
+        digest=hashlib.sha256(raw).hexdigest())
+    PlayerZoneFeature.objects.filter(match_id=match_id).delete()
+    TeamZoneFeature.objects.filter(match_id=match_id).delete()
+    return archive
+
+
+@transaction.atomic
+def restore_match(match_id: int) -> tuple[int, int]:
+    """Put an archived match's rows back, exactly, and drop the archive. Returns
+    (player rows, team rows); (0, 0) if the match was not archived."""
+    archive = MatchZoneArchive.objects.select_for_update().filter(match_id=match_id).first()
+    if archive is None:
+        return 0, 0
+    if (PlayerZoneFeature.objects.filter(match_id=match_id).exists()
+            or TeamZoneFeature.objects.filter(match_id=match_id).exists()):
+        raise ArchiveError(f"match {match_id} has zone rows both archived and live; "
+                           "refusing to merge them")
+    data = _decode(archive)
+
+    def created(row):
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+        return row
+
+    PlayerZoneFeature.objects.bulk_create(
+        [PlayerZoneFeature(match_id=match_id, **created(r)) for r in _rows(data["player"])],
+        batch_size=2000)
+    TeamZoneFeature.objects.bulk_create(
+        [TeamZoneFeature(match_id=match_id, **created(r)) for r in _rows(data["team"])],
+        batch_size=2000)
+    raw, n_player, n_team = _encode(match_id)
+    if hashlib.sha256(raw).hexdigest() != archive.digest:
+        raise ArchiveError(f"match {match_id}: restored rows differ from the archive")
+    archive.delete()
+    return n_player, n_team
+
+
+def _totals_agree(match_ids: list[int]) -> None:
+    """The season's totals must equal its zone rows before the rows leave: after
+    that they are what the vote reads. Rebuilt once if they drift."""
+    from realdata.services import feature_totals
+
+    if feature_totals.check(match_ids):
+        feature_totals.rebuild(match_ids)
+        problems = feature_totals.check(match_ids)
+        if problems:
+            raise ArchiveError(f"totals disagree with the zone rows: {problems[0]}")
+
+
+def archive_season(competition_season_id: int, *, force: bool = False,
+                   log=lambda _m: None) -> ArchiveResult:
+    """Archive every match of a concluded season that has hot zone rows.
+
+    One transaction per match, so an interrupted run leaves every match whole in
+    one place or the other, and running it again finishes the job."""
+    if not force and not season_concluded(competition_season_id):
+        raise ArchiveError(f"season {competition_season_id} is not concluded")
+    match_ids = sorted(
+        set(PlayerZoneFeature.objects
+            .filter(match__competition_season_id=competition_season_id)
+            .values_list("match_id", flat=True).distinct())
+        | set(TeamZoneFeature.objects
+              .filter(match__competition_season_id=competition_season_id)
+              .values_list("match_id", flat=True).distinct()))
+    _totals_agree(match_ids)
+    matches = players = teams = stored = 0
+    for mid in match_ids:
+        archive = archive_match(mid)
+        if archive is None:
+            continue
+        matches += 1
+        players += archive.player_rows
+        teams += archive.team_rows
+        stored += len(archive.payload)
+        log(f"  match {mid}: {archive.player_rows}+{archive.team_rows} rows, "
+            f"{len(archive.payload):,} bytes")
+    return ArchiveResult(matches=matches, player_rows=players, team_rows=teams,
+                         stored_bytes=stored)
+
+
+def restore_season(competition_season_id: int, *, log=lambda _m: None) -> ArchiveResult:
+    matches = players = teams = 0
+    for mid in sorted(archived_match_ids(competition_season_id=competition_season_id)):
+        n_player, n_team = restore_match(mid)
+        matches += 1
+        players += n_player
+        teams += n_team
+        log(f"  match {mid}: {n_player}+{n_team} rows restored")
+    return ArchiveResult(matches=matches, player_rows=players, team_rows=teams)
+
+
+def grouped(rows: Iterable, key) -> dict:
+    """Sum ``value`` of archived rows under ``key(row)`` — the ``GROUP BY`` the
+    readers run on the hot table, for the rows that are not in it."""
+    out: dict = {}
+    for r in rows:
+        k = key(r)
+        out[k] = out.get(k, 0.0) + r.value
+    return out
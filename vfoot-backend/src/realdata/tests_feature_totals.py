@@ -0,0 +1,103 @@
+"""The per-match feature totals, and their agreement with the zone rows they sum.
+
+``PlayerMatchFeatureTotal`` is what the scoring reads instead of re-grouping
+``PlayerZoneFeature`` on every pagella. A derived table is only as good as its
+agreement with the source, so that is most of what is tested here: the importer
+writes the totals with the zones, ``check`` notices when they drift, ``rebuild``
+puts them back, and a match with no totals at all is still read correctly.
+"""
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from realdata.models import (
+    Competition, CompetitionSeason, Match, Player, PlayerMatchFeatureTotal,
+    PlayerZoneFeature, PROVIDER_SOFASCORE, Season, Team, TeamSeason,
+)
+from realdata.services import feature_totals
+from realdata.services.sofascore_adapter import ingest_sofascore_matches
+from realdata.tests_import_by_id import MATCH_ID, _Recording, _payloads
+
+
+def _grouped_by_hand(match_id: int) -> dict:
+    out: dict = {}
+    for r in PlayerZoneFeature.objects.filter(match_id=match_id):
+        row = out.setdefault((match_id, r.player_id), {})
+        row[r.feature_key] = row.get(r.feature_key, 0.0) + r.value
+    return out
+
+
+class ImportedTotalsTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        ingest_sofascore_matches(
+            scraper=_Recording(Path(tmp.name), _payloads()), year="26/27",
+            match_ids=[MATCH_ID], only_finished=False, skip_existing=False,
+            logger=lambda _m: None)
+        self.match = Match.objects.get(external_id=str(MATCH_ID))
+
+    def test_the_import_writes_one_row_per_player_and_side(self):
+        self.assertEqual(PlayerMatchFeatureTotal.objects.filter(match=self.match).count(),
+                         3)
+        self.assertEqual(feature_totals.check([self.match.id]), [])
+
+    def test_the_read_is_the_zone_rows_summed(self):
+        got = feature_totals.match_player_totals([self.match.id])
+        want = _grouped_by_hand(self.match.id)
+        self.assertEqual(set(got), set(want))
+        for key, feats in want.items():
+            self.assertEqual(set(got[key]), set(feats))
+            for feat, v in feats.items():
+                self.assertAlmostEqual(got[key][feat], v, places=9)
+
+    def test_only_the_features_asked_for(self):
+        got = feature_totals.match_player_totals([self.match.id],
+                                                 feature_keys=["touches"])
+        self.assertTrue(got)
+        self.assertTrue(all(set(f) == {"touches"} for f in got.values()))
+
+    def test_check_notices_a_drifted_total_and_rebuild_repairs_it(self):
+        row = PlayerMatchFeatureTotal.objects.filter(match=self.match).first()
+        row.totals = {**row.totals, "touches": -1.0}
+        row.save(update_fields=["totals"])
+        problems = feature_totals.check([self.match.id])
+        self.assertEqual(len(problems), 1)
+        self.assertIn("touches", problems[0])
+
+        feature_totals.rebuild([self.match.id])
+        self.assertEqual(feature_totals.check([self.match.id]), [])
+
+    def test_the_command_check_fails_loudly(self):
+        PlayerMatchFeatureTotal.objects.filter(match=self.match).delete()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_feature_totals", "--check", stdout=open("/dev/null", "w"))
+        call_command("rebuild_feature_totals", stdout=open("/dev/null", "w"))
+        call_command("rebuild_feature_totals", "--check", stdout=open("/dev/null", "w"))
+
+
+class MissingTotalsTests(TestCase):
+    """Zone rows nobody summed — a database from before the table, or a test that
+    writes them by hand — are grouped on the spot rather than read as empty."""
+
+    def test_a_match_without_totals_is_read_from_its_zones(self):
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        cs = CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2026-2027"))
+        ts = TeamSeason.objects.create(competition_season=cs,
+                                       team=Team.objects.create(name="Napoli"))
+        match = Match.objects.create(competition_season=cs, home_team=ts, away_team=ts)
+        player = Player.objects.create(full_name="Tizio")
+        for zone, v in (("Z_1_1", 10.0), ("Z_2_1", 5.5)):
+            PlayerZoneFeature.objects.create(
+                match=match, player=player, provider=PROVIDER_SOFASCORE,
+                team_side="home", zone_key=zone, feature_key="touches", value=v)
+
+        self.assertEqual(
+            feature_totals.match_player_totals([match.id], provider=PROVIDER_SOFASCORE),
+            {(match.id, player.id): {"touches": 15.5}})
@@ -0,0 +1,42 @@
+"""fork_map: the serial answer, in order, whether or not a pool runs it."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from realdata.services import fork_pool
+
+
+def _scaled(x):
+    return x * fork_pool.shared["factor"]
+
+
+class ForkMapTests(SimpleTestCase):
+    def test_a_pool_returns_what_the_serial_run_returns(self):
+        items = list(range(23))
+        serial = fork_pool.fork_map(_scaled, items, workers=1, state={"factor": 3})
+        self.assertEqual(serial, [x * 3 for x in items])
+        self.assertEqual(fork_pool.fork_map(_scaled, items, workers=4, state={"factor": 3}), serial)
+        self.assertEqual(fork_pool.shared, {}, "cleared after the map")
+
+    def test_without_fork_the_tasks_run_here(self):
+        with patch.object(fork_pool.multiprocessing, "get_all_start_methods",
+                          return_value=["spawn"]), \
+                patch.object(fork_pool, "ProcessPoolExecutor", side_effect=AssertionError):
+            self.assertEqual(fork_pool.fork_map(_scaled, [1, 2], workers=4,
+                                                state={"factor": 2}), [2, 4])
+
+    def test_inside_a_pools_worker_the_tasks_run_there(self):
+        with patch.object(fork_pool.multiprocessing, "current_process",
+                          return_value=SimpleNamespace(daemon=True)), \
+                patch.object(fork_pool, "ProcessPoolExecutor", side_effect=AssertionError):
+            self.assertEqual(fork_pool.fork_map(_scaled, [1, 2], workers=4,
+                                                state={"factor": 2}), [2, 4])
+
+    def test_workers_default_to_one_per_core(self):
+        with patch.object(fork_pool.os, "cpu_count", return_value=6):
+            self.assertEqual(fork_pool.resolve_workers(None), 6)
+        self.assertEqual(fork_pool.resolve_workers(3), 3)
+        self.assertEqual(fork_pool.resolve_workers(0), 1)
@@ -22,13 +22,16 @@ from __future__ import annotations
 import json
 from datetime import datetime, timedelta, timezone
 
+from unittest import mock
+
+from django.db import transaction
 from django.test import TestCase
 from django.utils.timezone import now as django_now
 
 from realdata.models import (
-    Competition, CompetitionSeason, JobRun, Match, Season, Team, TeamSeason,
+    CacheStat, Competition, CompetitionSeason, JobRun, Match, Season, Team, TeamSeason,
 )
-from realdata.services import health, job_log, shape_canary
+from realdata.services import cache_stats, health, job_log, shape_canary
 
 UTC = timezone.utc
 NOW = datetime(2026, 9, 20, 20, 0, tzinfo=UTC)
@@ -352,3 +355,68 @@ class DoppioTesseramento(TestCase):
         self._stint(self.milan, datetime(2026, 8, 10).date())
         rep = health.report(now=NOW, skip_shape=True)
         self.assertEqual(rep.verdict, "ok")
+
+
+class TelemetriaCache(TestCase):
+    """Le cache care si contano: una chiave che si muove quando non deve non
+    solleva niente, rende solo la pagina piu' lenta. Qui diventa un numero."""
+
+    def setUp(self):
+        cache_stats._pending.clear()
+        cache_stats._slowest.clear()
+
+    def _hour(self, family, **counts):
+        CacheStat.objects.create(family=family, hour=NOW - timedelta(hours=1), **counts)
+
+    def test_i_conteggi_finiscono_nella_riga_dell_ora_e_si_sommano(self):
+        with mock.patch.object(cache_stats.timezone, "now", return_value=NOW):
+            for _ in range(3):
+                cache_stats.hit("matchday_index")
+            cache_stats.miss("matchday_index", evicted=True)
+            cache_stats.built("matchday_index", 0.4)
+            cache_stats.flush(force=True)
+            cache_stats.hit("matchday_index")
+            cache_stats.built("matchday_index", 0.2)
+            cache_stats.flush(force=True)
+        row = CacheStat.objects.get()
+        self.assertEqual((row.hits, row.misses, row.evictions, row.builds), (4, 1, 1, 2))
+        self.assertAlmostEqual(row.build_max_seconds, 0.4)
+        s = cache_stats.summary(now=NOW)["matchday_index"]
+        self.assertEqual((s["hit_ratio"], s["avg_build_ms"], s["max_build_ms"]),
+                         (0.8, 300.0, 400.0))
+
+    def test_dentro_una_transazione_non_si_scrive(self):
+        """Un conteggio che fallisse dentro la conclusione di una giornata se la
+        porterebbe dietro: aspetta la prossima chiamata fuori."""
+        cache_stats.hit("listone")
+        with transaction.atomic():
+            cache_stats.flush()
+        self.assertFalse(CacheStat.objects.exists())
+        self.assertEqual(cache_stats._pending["listone", "hits"], 1)
+
+    def test_fuori_dalla_finestra_non_conta(self):
+        CacheStat.objects.create(family="listone", hour=NOW - timedelta(days=3), hits=9)
+        self.assertEqual(cache_stats.summary(now=NOW), {})
+
+    def test_una_cache_che_non_colpisce_e_un_avviso(self):
+        self._hour("reference", hits=10, misses=90, builds=90, build_seconds=45.0,
+                   build_max_seconds=0.9)
+        rep = health.report(now=NOW, skip_shape=True)
+        self.assertIn("cache:misses:reference", {c.code for c in rep.warns})
+        self.assertEqual(rep.as_dict()["caches"]["reference"]["hit_ratio"], 0.1)
+
+    def test_il_culling_che_butta_voci_pagate_e_un_avviso(self):
+        self._hour("matchday_index", hits=500, misses=20, evictions=8, builds=20,
+                   build_seconds=10.0, build_max_seconds=0.8)
+        rep = health.report(now=NOW, skip_shape=True)
+        self.assertIn("cache:evicted:matchday_index", {c.code for c in rep.warns})
+
+    def test_una_cache_sana_e_solo_informazione(self):
+        self._hour("listone", hits=300, misses=4, builds=4, build_seconds=8.0,
+                   build_max_seconds=3.0)
+        self._hour("player_form", hits=3, misses=3, builds=3, build_seconds=0.3,
+                   build_max_seconds=0.1)      # troppo poche letture per giudicare
+        rep = health.report(now=NOW, skip_shape=True)
+        self.assertEqual(rep.verdict, "ok")
+        self.assertEqual({c.code for c in rep.checks if c.code.startswith("cache:")},
+                         {"cache:listone", "cache:player_form"})
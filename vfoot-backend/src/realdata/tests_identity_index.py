@@ -0,0 +1,120 @@
+"""Resolving SofaScore players against an index read once per import run.
+
+Adoption used to ask the database per player: this provider's id, the alias table,
+then the cross-provider candidates and an alias ``exists()`` for each of them. The
+decisions are unchanged — (normalised name, DOB), unique, not already adopted — but
+they are now answered from ``PlayerIdentityIndex``, and what a match adds (players,
+aliases, filled-in DOBs) goes back in one batch.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from realdata.models import (
+    Competition, CompetitionSeason, Player, PlayerAlias, PlayerTeamStint,
+    PROVIDER_SOFASCORE, Season, Team, TeamSeason,
+)
+from realdata.services.sofascore_adapter import PlayerIdentityIndex
+
+DOB = date(1999, 5, 17)
+
+
+def _ts(d: date) -> int:
+    return int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp())
+
+
+class PlayerIdentityIndexTests(TestCase):
+    def setUp(self):
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        cs = CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2026-2027"))
+        self.napoli = TeamSeason.objects.create(
+            competition_season=cs, team=Team.objects.create(name="Napoli"))
+        self.genoa = TeamSeason.objects.create(
+            competition_season=cs, team=Team.objects.create(name="Genoa"))
+
+    def _tm(self, name: str, tm_id: str, dob=DOB) -> Player:
+        return Player.objects.create(full_name=name, date_of_birth=dob,
+                                     external_source="transfermarkt", external_id=tm_id)
+
+    def _resolve(self, people: dict) -> PlayerIdentityIndex:
+        index = PlayerIdentityIndex.load()
+        index.resolve_match(people, log=lambda _m: None)
+        return index
+
+    def test_a_debutant_from_the_squad_is_adopted_not_duplicated(self):
+        tm = self._tm("Dušan Vlahović", "100")
+        index = self._resolve({"55": ("Dusan Vlahovic", "D. Vlahovic", _ts(DOB),
+                                      self.napoli)})
+        self.assertEqual(index.get("55").id, tm.id)
+        self.assertTrue(PlayerAlias.objects.filter(
+            player=tm, source=PROVIDER_SOFASCORE, alias="55").exists())
+        self.assertFalse(Player.objects.filter(external_source=PROVIDER_SOFASCORE).exists())
+
+    def test_the_next_run_resolves_the_alias_without_adopting_again(self):
+        tm = self._tm("Milan Duric", "100")
+        self._resolve({"55": ("Milan Duric", "", _ts(DOB), self.napoli)})
+        index = PlayerIdentityIndex.load()
+        self.assertEqual(index.get("55").id, tm.id)
+        self.assertIn(tm.id, index.aliased)
+
+    def test_a_failed_batch_leaves_nothing_unsaved_behind(self):
+        tm = self._tm("Milan Duric", "100")
+        people = {"55": ("Milan Duric", "", _ts(DOB), self.napoli),
+                  "77": ("Nuovo Arrivo", "N. Arrivo", None, self.genoa)}
+        index = PlayerIdentityIndex.load()
+        with patch.object(Player.objects, "bulk_create", side_effect=RuntimeError("db")):
+            with self.assertRaises(RuntimeError):
+                index.resolve_match(people, log=lambda _m: None)
+        # The import skips that match; the next one meets the same players.
+        index.resolve_match(people, log=lambda _m: None)
+        self.assertEqual(index.get("55").id, tm.id)
+        self.assertEqual(Player.objects.get(pk=index.get("77").pk).external_id, "77")
+        self.assertTrue(PlayerAlias.objects.filter(player=tm, alias="55").exists())
+
+    def test_a_player_already_adopted_by_another_id_is_not_taken_twice(self):
+        tm = self._tm("Milan Duric", "100")
+        index = self._resolve({"55": ("Milan Duric", "", _ts(DOB), self.napoli),
+                               "56": ("Milan Duric", "", _ts(DOB), self.napoli)})
+        self.assertEqual(index.get("55").id, tm.id)
+        self.assertNotEqual(index.get("56").id, tm.id)
+        self.assertEqual(index.get("56").external_source, PROVIDER_SOFASCORE)
+
+    def test_homonyms_are_told_apart_only_by_squad(self):
+        uno = self._tm("Marco Rossi", "1")
+        due = self._tm("Marco Rossi", "2")
+        PlayerTeamStint.objects.create(player=uno, team_season=self.genoa)
+        PlayerTeamStint.objects.create(player=due, team_season=self.napoli)
+        index = self._resolve({"7": ("Marco Rossi", "", _ts(DOB), self.napoli)})
+        self.assertEqual(index.get("7").id, due.id)
+
+    def test_homonyms_in_no_squad_are_left_alone(self):
+        self._tm("Marco Rossi", "1")
+        self._tm("Marco Rossi", "2")
+        index = self._resolve({"7": ("Marco Rossi", "", _ts(DOB), self.napoli)})
+        self.assertEqual(index.get("7").external_source, PROVIDER_SOFASCORE)
+
+    def test_a_match_of_newcomers_is_written_in_one_insert(self):
+        index = PlayerIdentityIndex.load()
+        people = {str(i): (f"Nuovo {i}", f"N. {i}", None, self.napoli) for i in range(22)}
+        with self.assertNumQueries(1):
+            index.resolve_match(people, log=lambda _m: None)
+        self.assertEqual(Player.objects.filter(external_source=PROVIDER_SOFASCORE).count(), 22)
+        self.assertTrue(all(index.get(str(i)).pk for i in range(22)))
+
+    def test_a_placeholder_dob_is_filled_never_a_good_one_clobbered(self):
+        placeholder = Player.objects.create(
+            full_name="Uno", external_source=PROVIDER_SOFASCORE, external_id="1",
+            date_of_birth=date(1999, 1, 1))
+        good = Player.objects.create(
+            full_name="Due", external_source=PROVIDER_SOFASCORE, external_id="2",
+            date_of_birth=DOB)
+        self._resolve({"1": ("Uno", "", _ts(DOB), self.napoli),
+                       "2": ("Due", "", _ts(date(2000, 2, 2)), self.napoli)})
+        placeholder.refresh_from_db()
+        good.refresh_from_db()
+        self.assertEqual(placeholder.date_of_birth, DOB)
+        self.assertEqual(good.date_of_birth, DOB)
@@ -284,6 +284,24 @@ class TickWiringTests(_Base):
         self.assertIsNone(m.data_checked_at)
         self.assertIsNone(m.data_imported_at)
 
+    def test_an_unchanged_round_keeps_the_cadence_and_tells_nobody(self):
+        """The stamps are the clock, so they move; with nothing written there is no
+        event to push and no open page that needs to re-read."""
+        from vfoot.services import live_updates
+
+        now = datetime(2026, 8, 30, 20, 0, tzinfo=timezone.utc)
+        m = self._match(status=Match.STATUS_LIVE,
+                        kickoff=now - timedelta(minutes=30))
+        with mock.patch.object(live_ingest, "live_round",
+                               return_value=live_ingest.UNCHANGED), \
+             mock.patch.object(live_updates, "announce_events") as ann, \
+             mock.patch.object(live_updates, "broadcast_leagues") as nudge:
+            call_command("tick", "--now", _iso(now))
+        ann.assert_not_called()
+        nudge.assert_not_called()
+        m.refresh_from_db()
+        self.assertEqual(m.data_checked_at, now)
+
     def test_full_time_is_announced_at_the_stamp_and_not_again(self):
         """The full-time push belongs to ``stamp_ft``, which by construction happens
         exactly once per match — the later finalization steps must stay silent."""
@@ -299,3 +317,25 @@ class TickWiringTests(_Base):
             with mock.patch.object(live_ingest, "finalize", return_value=True):
                 call_command("tick", "--now", _iso(now + timedelta(hours=2)))
             ann.assert_not_called()
+
+    def test_the_caches_are_warmed_before_the_nudge_and_the_row_keeps_the_timings(self):
+        """The nudge makes every open page re-read in the same second: what they
+        read has to be ready by then, not rebuilt by the first of them."""
+        from realdata.models import JobRun
+        from vfoot.services import league_warmup, live_updates
+
+        now = datetime(2026, 8, 30, 20, 0, tzinfo=timezone.utc)
+        self._match(status=Match.STATUS_LIVE, kickoff=now - timedelta(minutes=30))
+        order = []
+        with mock.patch.object(live_ingest, "live_round", return_value=True), \
+             mock.patch.object(live_updates, "announce_events", return_value=0), \
+             mock.patch.object(live_updates, "leagues_to_nudge", return_value={7}), \
+             mock.patch.object(league_warmup, "warm",
+                               side_effect=lambda ids: order.append(("warm", ids))
+                               or {"warm_index_ms": 12.5, "indexes_warmed": 1}), \
+             mock.patch.object(live_updates, "broadcast_leagues",
+                               side_effect=lambda ids: order.append(("nudge", ids))):
+            call_command("tick", "--now", _iso(now))
+        self.assertEqual(order, [("warm", {7}), ("nudge", {7})])
+        did = JobRun.objects.get(job="tick").did
+        self.assertEqual((did["warm_index_ms"], did["indexes_warmed"]), (12.5, 1))
@@ -415,6 +415,7 @@ class ApiDellaPagina(TestCase):
         self.assertEqual(r.status_code, 200)
         self.assertIn(r.json()["verdict"], ("ok", "warn", "alarm"))
         self.assertEqual([p["id"] for p in r.json()["pending"]], [self.p.id])
+        self.assertIn("caches", r.json())
         # Lo stato del livello automatico è scritto, non lasciato indovinare.
         self.assertFalse(r.json()["auto_enabled"])
 
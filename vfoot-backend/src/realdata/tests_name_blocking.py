@@ -0,0 +1,108 @@
+"""The fuzzy fallback of the Transfermarkt roster match, behind a blocking index.
+
+Pass 3 of ``import_transfermarkt_squads._match`` scored every scraped name against
+every SofaScore player with ``name_similarity`` — a ``SequenceMatcher`` alignment
+per pair. ``NameBlockIndex`` narrows that to the players sharing enough tokens or
+trigrams to reach the bar, on the right birth date. It must only PRUNE: the tests
+compare it with the full scan it replaces, ties included.
+"""
+from __future__ import annotations
+
+import random
+from datetime import date
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from realdata.services.identity import (
+    NameBlockIndex, is_placeholder_dob, name_similarity,
+)
+
+_FIRST = ["Marco", "Matteo", "Luca", "Lorenzo", "Federico", "Nicolo", "Ciro",
+          "Dusan", "Khvicha", "Rafael", "Mattia", "Giovanni", "Davide", "Andrea"]
+_LAST = ["Rossi", "Di Lorenzo", "Di Renzo", "Barella", "Immobile", "Vlahovic",
+         "Kvaratskhelia", "Leao", "Zaccagni", "De Marzi", "Dimarco", "Bastoni",
+         "Frattesi", "Pellegrini", "Pellegrino", "Scamacca", "Lo Celso", "Ng"]
+
+
+def _player(full: str, short: str = "", dob=None):
+    return SimpleNamespace(full_name=full, short_name=short, date_of_birth=dob)
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    op = rng.choice(["drop", "swap", "sub", "keep"])
+    if op == "drop" and len(chars) > 3:
+        del chars[i]
+    elif op == "swap" and i + 1 < len(chars):
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    elif op == "sub":
+        chars[i] = rng.choice("aeioun")
+    return "".join(chars)
+
+
+def _full_scan(players, name, dob, bar):
+    """Pass 3 as it was before the index."""
+    best, best_s = None, 0.0
+    for p in players:
+        if (dob and p.date_of_birth and p.date_of_birth != dob
+                and not is_placeholder_dob(p.date_of_birth)):
+            continue
+        s = max(name_similarity(name, p.full_name), name_similarity(name, p.short_name))
+        if s > best_s:
+            best, best_s = p, s
+    return best if best_s >= bar else None
+
+
+def _blocked(index, name, dob, bar):
+    best, best_s = None, 0.0
+    for p in index.candidates(name, dob, min_score=bar):
+        s = max(name_similarity(name, p.full_name), name_similarity(name, p.short_name))
+        if s > best_s:
+            best, best_s = p, s
+    return best if best_s >= bar else None
+
+
+class NameBlockIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.players = []
+        for first in _FIRST:
+            for last in _LAST:
+                dob = rng.choice([None, date(1990 + rng.randrange(15), 1, 1),
+                                  date(1990 + rng.randrange(15), rng.randrange(1, 13),
+                                       rng.randrange(1, 28))])
+                self.players.append(_player(f"{first} {last}",
+                                            f"{first[0]}. {last}", dob))
+        self.index = NameBlockIndex(self.players)
+
+    def test_the_index_finds_what_the_full_scan_finds(self):
+        rng = random.Random(11)
+        for _ in range(300):
+            target = rng.choice(self.players)
+            name = _typo(rng, rng.choice([target.full_name, target.short_name]))
+            dob = rng.choice([None, target.date_of_birth, date(1999, 9, 9)])
+            for bar in (0.85, 0.9):
+                self.assertIs(_blocked(self.index, name, dob, bar),
+                              _full_scan(self.players, name, dob, bar), (name, dob, bar))
+
+    def test_it_prunes(self):
+        """Every first name meets every surname here, so whoever shares either half
+        stays a candidate — and that is still a tenth of the roster."""
+        cands = self.index.candidates("Khvicha Kvaratskhelia", None)
+        self.assertLessEqual(len(cands), len(_FIRST) + len(_LAST))
+        self.assertIn("Khvicha Kvaratskhelia", [p.full_name for p in cands])
+
+    def test_a_different_real_birth_date_is_a_different_person(self):
+        """Di Renzo 2002 is not Di Lorenzo 1993, however close the names."""
+        players = [_player("Giovanni Di Lorenzo", dob=date(1993, 8, 4)),
+                   _player("Giovanni Di Lorenzo", dob=date(2002, 1, 1))]
+        index = NameBlockIndex(players)
+        found = index.candidates("Giovanni Di Lorenzo", date(2002, 3, 3))
+        # The placeholder-dated one is still eligible; the dated one is not.
+        self.assertEqual(found, [players[1]])
+
+    def test_a_low_bar_falls_back_to_every_eligible_player(self):
+        self.assertEqual(len(self.index.candidates("Zzz", None, min_score=0.5)),
+                         len(self.players))
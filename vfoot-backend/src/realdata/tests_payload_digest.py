@@ -0,0 +1,94 @@
+"""An import that re-reads the same payloads writes nothing.
+
+Every live round, the +15min check and the +1h confirmation re-import the match
+whole: delete its rows, write them back. Most of those passes read exactly the
+bytes the previous one read. The importer now keeps a digest per endpoint
+(``MatchPayloadDigest``) and stops before the first write when none has moved —
+and the tests below pin down the cases where it must NOT stop.
+"""
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase
+
+from realdata.models import (
+    Match, MatchAppearance, MatchPayloadDigest, PlayerZoneFeature, PROVIDER_SOFASCORE,
+)
+from realdata.services.sofascore_adapter import ingest_sofascore_matches
+from realdata.tests_import_by_id import MATCH_ID, _Recording, _event, _payloads
+
+
+class PayloadDigestTests(TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.n = 0
+
+    def _import(self, payloads=None, **kw):
+        self.n += 1
+        client = _Recording(Path(self._tmp.name) / str(self.n), payloads or _payloads())
+        kw.setdefault("with_heatmaps", True)
+        return ingest_sofascore_matches(
+            scraper=client, year="26/27", match_ids=[MATCH_ID], only_finished=False,
+            skip_existing=False, logger=lambda _m: None, **kw)
+
+    def _match(self) -> Match:
+        return Match.objects.get(external_source=PROVIDER_SOFASCORE,
+                                 external_id=str(MATCH_ID))
+
+    def test_the_first_import_records_its_digests_and_the_change(self):
+        self.assertEqual(self._import().matches, 1)
+        match = self._match()
+        self.assertIsNotNone(match.data_changed_at)
+        self.assertEqual(
+            set(MatchPayloadDigest.objects.filter(match=match)
+                .values_list("endpoint", flat=True)),
+            {"event", "lineups", "shotmap", "incidents", "heatmaps", "options", "rows"})
+
+    def test_the_same_payloads_again_write_nothing(self):
+        self._import()
+        stamped = self._match().data_changed_at
+        pzf_ids = set(PlayerZoneFeature.objects.values_list("id", flat=True))
+
+        result = self._import()
+
+        self.assertEqual((result.matches, result.skipped_unchanged), (0, 1))
+        self.assertEqual(self._match().data_changed_at, stamped)
+        # Not rewritten identically: not rewritten at all.
+        self.assertEqual(set(PlayerZoneFeature.objects.values_list("id", flat=True)),
+                         pzf_ids)
+
+    def test_a_goal_is_a_change(self):
+        self._import()
+        payloads = _payloads()
+        payloads[f"/api/v1/event/{MATCH_ID}"] = {
+            "event": _event(homeScore={"current": 2})}
+        self.assertEqual(self._import(payloads).matches, 1)
+        self.assertEqual(self._match().home_goals, 2)
+
+    def test_a_moved_heatmap_is_a_change(self):
+        self._import()
+        payloads = _payloads()
+        payloads[f"/api/v1/event/{MATCH_ID}/player/1/heatmap"] = {
+            "heatmap": [{"x": 10, "y": 10}]}
+        self.assertEqual(self._import(payloads).matches, 1)
+
+    def test_a_light_round_after_a_heavy_one_is_not_the_same_import(self):
+        """Same four endpoints, but the light round places nobody: its output is
+        different, so its digests must be too."""
+        self._import()
+        self.assertEqual(self._import(with_heatmaps=False).matches, 1)
+
+    def test_rows_purged_under_the_digests_force_a_reimport(self):
+        """The season simulator deletes appearances and re-ingests from the same
+        cache. Digests that only looked at the payloads would leave it empty."""
+        self._import()
+        MatchAppearance.objects.filter(match=self._match()).delete()
+        self.assertEqual(self._import().matches, 1)
+        self.assertEqual(self._match().appearances.count(), 3)
+
+    def test_skip_unchanged_false_rewrites_anyway(self):
+        self._import()
+        self.assertEqual(self._import(skip_unchanged=False).matches, 1)
@@ -13,6 +13,8 @@ these run in milliseconds and fail for one reason only.
 from __future__ import annotations
 
 import random
+import tempfile
+from pathlib import Path
 
 from django.test import SimpleTestCase
 
@@ -20,6 +22,8 @@ from realdata.services.season_simulator import (
     DonorPool,
     SimPlayer,
     SimTeam,
+    _Fixture,
+    play_fixtures,
     simulate_match,
 )
 
@@ -130,3 +134,24 @@ class ClockTests(SimpleTestCase):
         for side in ("home", "away"):
             self.assertEqual(len(_play(30).lineups[side]["players"]),
                              len(_play(90).lineups[side]["players"]))
+
+
+class ParallelTests(SimpleTestCase):
+    """A pool of processes plays the same season, byte for byte."""
+
+    def _written(self, workers: int):
+        teams = {i: _team(i, name) for i, name in ((1, "Alfa"), (2, "Beta"), (3, "Gamma"))}
+        fixtures = [_Fixture(str(9000 + n), 1 + n // 3, home, away, 90 if n < 5 else 60)
+                    for n, (home, away) in enumerate([(1, 2), (2, 3), (3, 1)] * 3)]
+        with tempfile.TemporaryDirectory() as tmp:
+            results = play_fixtures(fixtures, teams=teams, pool=_pool(),
+                                    cache_dir=Path(tmp), seed=2627, workers=workers)
+            files = {p.name: p.read_bytes() for p in sorted(Path(tmp).iterdir())}
+        return results, files
+
+    def test_the_pool_writes_what_the_serial_run_writes(self):
+        serial, serial_files = self._written(1)
+        parallel, parallel_files = self._written(3)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel_files, serial_files)
+        self.assertEqual(len([n for n in serial_files if n.endswith("_lineups.json")]), 9)
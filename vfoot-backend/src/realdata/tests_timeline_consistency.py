@@ -0,0 +1,91 @@
+"""The timeline check, a chunk of matches at a time, and only what moved.
+
+Two matches: one clean, one with a player on twice at once and a red card whose
+interval never ends. Read in chunks of one match they give the findings they give
+read together, and ``--changed`` re-checks only the match whose intervals were
+rewritten since the last run that checked its season.
+"""
+from __future__ import annotations
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from realdata.models import (
+    CARD_RED,
+    Competition,
+    CompetitionSeason,
+    Match,
+    MatchDisciplinaryEvent,
+    Player,
+    PlayerOnPitchInterval,
+    Season,
+    Team,
+    TeamSeason,
+)
+
+
+class TimelineConsistencyTests(TestCase):
+    def setUp(self):
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        cs = CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2025-2026"), name="Serie A")
+        self.home = TeamSeason.objects.create(competition_season=cs, team=Team.objects.create(name="Como"))
+        self.away = TeamSeason.objects.create(competition_season=cs, team=Team.objects.create(name="Lazio"))
+        self.players = [Player.objects.create(full_name=f"Player {i}") for i in range(22)]
+        self.clean = self._match(1)
+        self.broken = self._match(2)
+        sent_off = self.players[3]
+        # On the pitch twice at once, and a red card at 60' that leaves the player there.
+        self._interval(self.broken, self.players[2], 30 * 60, 90 * 60, "extra")
+        MatchDisciplinaryEvent.objects.create(
+            match=self.broken, player=sent_off, team_side="home", elapsed_seconds=60 * 60,
+            card_type=CARD_RED, provider_event_id="red")
+
+    def _match(self, matchday):
+        match = Match.objects.create(competition_season=self.home.competition_season, matchday=matchday,
+                                     home_team=self.home, away_team=self.away, external_id=str(matchday))
+        for i, player in enumerate(self.players):
+            self._interval(match, player, 0, 90 * 60, "full")
+        return match
+
+    def _interval(self, match, player, start, end, tag):
+        side, ts = ("home", self.home) if self.players.index(player) < 11 else ("away", self.away)
+        PlayerOnPitchInterval.objects.create(
+            match=match, player=player, team_season=ts, team_side=side,
+            start_elapsed_seconds=start, end_elapsed_seconds=end, provider_interval_id=tag)
+
+    def _check(self, *args) -> dict[str, str]:
+        out = StringIO()
+        call_command("check_timeline_consistency", *args, stdout=out)
+        return dict(line.split("=", 1) for line in out.getvalue().splitlines())
+
+    def test_chunks_find_what_the_whole_history_finds(self):
+        whole = self._check()
+        self.assertEqual(whole["matches_checked"], "2")
+        self.assertEqual(whole["player_interval_overlaps"], "1")
+        self.assertEqual(whole["red_events_without_raw_interval_drop"], "1")
+        self.assertEqual(self._check("--chunk", "1"), whole)
+
+    def test_changed_rechecks_only_the_rewritten_match(self):
+        self.assertEqual(self._check("--changed")["matches_checked"], "2", "first run: everything")
+        self.assertEqual(self._check("--changed")["matches_checked"], "0")
+        # The importers replace a match's intervals; the rewrite is what is noticed.
+        PlayerOnPitchInterval.objects.filter(match=self.broken, provider_interval_id="extra").delete()
+        self._interval(self.broken, self.players[2], 45 * 60, 90 * 60, "extra")
+        again = self._check("--changed")
+        self.assertEqual(again["matches_checked"], "1")
+        self.assertEqual(again["player_interval_overlaps"], "1")
+
+    def test_a_run_on_another_season_leaves_this_ones_watermark(self):
+        cs = self.home.competition_season
+        other = CompetitionSeason.objects.create(
+            competition=cs.competition, season=Season.objects.create(code="2026-2027"), name="Serie A")
+        self._check("--changed")
+        PlayerOnPitchInterval.objects.filter(match=self.broken, provider_interval_id="extra").delete()
+        self._interval(self.broken, self.players[2], 45 * 60, 90 * 60, "extra")
+        self.assertEqual(self._check("--season", str(other.id), "--changed")["matches_checked"], "0")
+        self.assertEqual(self._check("--changed")["matches_checked"], "1")
+        # The run over every season checked this one too.
+        self.assertEqual(self._check("--season", str(cs.id), "--changed")["matches_checked"], "0")
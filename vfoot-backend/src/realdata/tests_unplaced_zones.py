@@ -24,7 +24,7 @@ from realdata.models import (
     Match, MatchAppearance, PlayerZoneFeature, PROVIDER_SOFASCORE, SIDE_HOME,
 )
 from realdata.services.sofascore_adapter import (
-    METHOD_UNPLACED, ZONE_UNPLACED, _ingest_match,
+    METHOD_UNPLACED, ZONE_UNPLACED, PlayerIdentityIndex, _ingest_match,
 )
 from realdata.tests_import_by_id import (
     MATCH_ID, _Recording, _event, _payloads,
@@ -47,7 +47,8 @@ class _Fixture(TestCase):
         return _ingest_match(
             scraper=client, event=_event(),
             competition_season=_get_or_create_competition_season("2026-2027"),
-            team_cache={}, player_cache={}, zone_cols=5, zone_rows=4,
+            team_cache={}, identity=PlayerIdentityIndex.load(),
+            zone_cols=5, zone_rows=4,
             flip_away=False, feature_totals={}, stat_keys_seen=set(),
             diagnostics={}, log=lambda _m: None, with_heatmaps=with_heatmaps)
 
@@ -78,7 +79,8 @@ class LightImportTests(_Fixture):
         _ingest_match(
             scraper=client, event=_event(),
             competition_season=_get_or_create_competition_season("2026-2027"),
-            team_cache={}, player_cache={}, zone_cols=5, zone_rows=4,
+            team_cache={}, identity=PlayerIdentityIndex.load(),
+            zone_cols=5, zone_rows=4,
             flip_away=False, feature_totals={}, stat_keys_seen=set(),
             diagnostics={}, log=lambda _m: None, with_heatmaps=False)
         self.assertEqual([p for p in client.requested if "heatmap" in p], [])
@@ -0,0 +1,118 @@
+"""Cold storage of a concluded season's zone rows.
+
+What is tested is that nothing can tell: the rows come back exactly (ids, values,
+timestamps), the readers answer the same while they are away, a re-import of an
+archived match finds them, and an archive that is not what was stored is refused
+rather than restored.
+"""
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from realdata.models import (
+    Match, MatchZoneArchive, PlayerZoneFeature, PROVIDER_SOFASCORE, TeamZoneFeature,
+)
+from realdata.services import feature_totals, zone_archive
+from realdata.services.sofascore_adapter import ingest_sofascore_matches
+from realdata.tests_import_by_id import MATCH_ID, _Recording, _payloads
+
+
+def _snapshot() -> tuple[list, list]:
+    fields = ("id", "match_id", "player_id", "team_side", "zone_key", "feature_key",
+              "value", "provider", "source_method", "created_at")
+    return (list(PlayerZoneFeature.objects.order_by("id").values_list(*fields)),
+            list(TeamZoneFeature.objects.order_by("id").values_list(*fields[:2] + fields[3:])))
+
+
+class ZoneArchiveTests(TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.n = 0
+        self._import()
+        self.match = Match.objects.get(external_id=str(MATCH_ID))
+        Match.objects.filter(id=self.match.id).update(status=Match.STATUS_FINISHED,
+                                                      data_ready=True)
+        self.cs_id = self.match.competition_season_id
+
+    def _import(self, **kw):
+        self.n += 1
+        client = _Recording(Path(self._tmp.name) / str(self.n), _payloads())
+        return ingest_sofascore_matches(
+            scraper=client, year="26/27", match_ids=[MATCH_ID], only_finished=False,
+            skip_existing=False, with_heatmaps=True, logger=lambda _m: None, **kw)
+
+    def test_archive_then_restore_is_the_identity(self):
+        before = _snapshot()
+        self.assertTrue(before[0])
+
+        result = zone_archive.archive_season(self.cs_id)
+
+        self.assertEqual((result.matches, result.player_rows), (1, len(before[0])))
+        self.assertFalse(PlayerZoneFeature.objects.exists())
+        self.assertFalse(TeamZoneFeature.objects.exists())
+        zone_archive.restore_season(self.cs_id)
+        self.assertEqual(_snapshot(), before)
+        self.assertFalse(MatchZoneArchive.objects.exists())
+
+    def test_the_readers_cannot_tell(self):
+        totals = feature_totals.match_player_totals([self.match.id])
+        grouped = feature_totals._grouped([self.match.id], None)
+        zone_archive.archive_season(self.cs_id)
+        self.assertEqual(feature_totals.match_player_totals([self.match.id]), totals)
+        self.assertEqual(feature_totals._grouped([self.match.id], None), grouped)
+        self.assertEqual(feature_totals.check(), [])
+
+    def test_a_season_still_being_played_stays_hot(self):
+        Match.objects.filter(id=self.match.id).update(data_ready=False)
+        with self.assertRaises(zone_archive.ArchiveError):
+            zone_archive.archive_season(self.cs_id)
+        self.assertFalse(MatchZoneArchive.objects.exists())
+        self.assertEqual(zone_archive.archive_season(self.cs_id, force=True).matches, 1)
+
+    def test_archiving_twice_moves_nothing_more(self):
+        zone_archive.archive_season(self.cs_id)
+        self.assertEqual(zone_archive.archive_season(self.cs_id).matches, 0)
+        self.assertEqual(MatchZoneArchive.objects.count(), 1)
+
+    def test_a_corrupt_archive_is_not_restored(self):
+        zone_archive.archive_season(self.cs_id)
+        archive = MatchZoneArchive.objects.get()
+        archive.digest = "0" * 64
+        archive.save(update_fields=["digest"])
+        with self.assertRaises(zone_archive.ArchiveError):
+            zone_archive.restore_season(self.cs_id)
+        self.assertFalse(PlayerZoneFeature.objects.exists())
+        self.assertTrue(MatchZoneArchive.objects.exists())
+
+    def test_an_unchanged_reimport_leaves_it_archived(self):
+        zone_archive.archive_season(self.cs_id)
+        self.assertEqual(self._import().skipped_unchanged, 1)
+        self.assertTrue(zone_archive.is_archived(self.match.id))
+
+    def test_a_forced_reimport_brings_the_rows_back_first(self):
+        before = len(_snapshot()[0])
+        zone_archive.archive_season(self.cs_id)
+        self.assertEqual(self._import(skip_unchanged=False).matches, 1)
+        self.assertFalse(zone_archive.is_archived(self.match.id))
+        self.assertEqual(
+            PlayerZoneFeature.objects.filter(provider=PROVIDER_SOFASCORE).count(), before)
+
+    def test_the_command(self):
+        out = open("/dev/null", "w")
+        self.addCleanup(out.close)
+        with self.assertRaises(CommandError):
+            call_command("archive_zone_features", "--season", 999, stdout=out)
+        call_command("archive_zone_features", "--season", self.cs_id, "--dry-run",
+                     stdout=out)
+        self.assertFalse(MatchZoneArchive.objects.exists())
+        call_command("archive_zone_features", "--season", self.cs_id, stdout=out)
+        self.assertTrue(zone_archive.is_archived(self.match.id))
+        call_command("archive_zone_features", "--season", self.cs_id, "--restore",
+                     stdout=out)
+        self.assertFalse(MatchZoneArchive.objects.exists())
@@ -10,7 +10,8 @@ from random import Random
 
 from django.contrib.auth.models import User
 from django.db import IntegrityError, transaction
-from django.db.models import Count, Max, Q
+from django.db.models import Count, Max, Q, TextField
+from django.db.models.functions import Cast
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
@@ -28,6 +29,7 @@ from realdata.models import (
     Player,
     PlayerTeamStint,
 )
+from vfoot.api.renderers import PreEncoded, encoded_response, extend_encoded
 from vfoot.api.league_serializers import (
     AddRosterPlayerSerializer,
     AuctionAssignSerializer,
@@ -86,7 +88,7 @@ from vfoot.services.auction_engine import (
 from vfoot.services.auction_realtime import broadcast_auction
 
 
-from vfoot.services.name_search import matches as name_matches
+from vfoot.services.player_search import fuzzy_player_ids
 from vfoot.services.fantasy_simulation import (
     bulk_assign_players_to_teams,
     generate_knockout_fixtures,
@@ -110,22 +112,24 @@ from vfoot.services.formation_rules import CLASSIC_CONSTRAINTS, validate_classic
 from vfoot.services.classic_pagella import (
     elapsed_minutes, get_reference, match_in_progress, pagella_for_match,
 )
-from vfoot.services.classic_rating import current_role_map
 from vfoot.services import league_decisions
 from vfoot.services.league_decisions import (
     accept_all_proposals, attention_count, cast_vote, market_blocked_reason,
     open_role_decisions, resolve as resolve_decision, unavailable_players,
-    undecided_player_ids,
 )
 from vfoot.services.listone import snapshot_league_listone
 from vfoot.services.listone import eligible_player_ids
+from vfoot.services.listone_payload import (
+    ORDERS as LISTONE_ORDERS, championship_players_payload, championship_players_response,
+    club_by_player as _club_by_player,
+)
 from vfoot.services.player_ratings import (
     latest_market_values, player_values,
 )
 from vfoot.services.match_resolver import matchday_fixtures_by_team
 from vfoot.services import (
     currency, honours, knockout, lineup_baseline, lineup_deadline, lineup_repair, lineup_suggest,
-    matchday_state,
+    matchday_state, standings,
 )
 from vfoot.services.live_realtime import broadcast_live
 
@@ -1820,20 +1824,18 @@ class PlayerSearchView(APIView):
 
         # Two passes. The database narrows with what SQL can do cheaply — an
         # icontains on either name — and if that finds nothing we fall back to the
-        # forgiving matcher over the (bounded) candidate set. icontains is neither
-        # accent- nor typo-tolerant, so "Leao" and "Mkitarian" used to come back
-        # empty from the auction room while the listone, which filters in the
-        # browser, found them. Same rules on both sides now.
+        # forgiving matcher, over the process's index of every short and full name
+        # (see services/player_search). icontains is neither accent- nor
+        # typo-tolerant, so "Leao" and "Mkitarian" used to come back empty from
+        # the auction room while the listone, which filters in the browser,
+        # found them. Same rules on both sides now.
         base = Player.objects.exclude(id__in=assigned_in_league)
         players = list(
             base.filter(Q(full_name__icontains=query) | Q(short_name__icontains=query))
             .order_by("short_name", "full_name")[:limit]
         )
         if not players:
-            candidates = base.order_by("short_name", "full_name").values_list(
-                "id", "short_name", "full_name")
-            hit_ids = [pid for pid, short, full in candidates
-                       if name_matches(query, short, full)][:limit]
+            hit_ids = fuzzy_player_ids(query, exclude=assigned_in_league, limit=limit)
             if hit_ids:
                 by_id = Player.objects.in_bulk(hit_ids)
                 players = [by_id[i] for i in hit_ids if i in by_id]
@@ -3407,8 +3409,9 @@ class LeagueMatchdayConcludeView(APIView):
                 )
 
             if fixtures:
-                FantasyFixture.objects.bulk_update(
-                    fixtures, ["home_total", "away_total", "status"], batch_size=500)
+                with standings.tracking(fx.id for fx in fixtures):
+                    FantasyFixture.objects.bulk_update(
+                        fixtures, ["home_total", "away_total", "status"], batch_size=500)
 
         stage_ids_to_resolve: set[int] = set()
         done_stages = 0
@@ -4127,31 +4130,6 @@ def _league_rosters(league) -> dict:
     }
 
 
-def _club_by_player(competition_season_id, player_ids) -> dict[int, str]:
-    """Il club di ciascun giocatore NELL'EDIZIONE di campionato che si sta guardando.
-
-    UNA REGOLA SOLA, e sono due comportamenti diversi che vengono gratis.
-
-    Una lega in corso gioca la stagione corrente, e l'importazione delle rose
-    tiene fresca quella: chiude i cartellini di chi parte e riapre quelli di chi
-    arriva, quindi il trasferimento di gennaio si vede il giorno dopo. Una lega
-    conclusa resta ferma alla sua stagione, ed e' giusto: una lega finita e' un
-    documento, e deve dire le maglie di allora, non quelle di oggi.
-
-    E' la stessa regola del listone — anzi, e' la stessa funzione, chiamata da
-    ``championship_players_payload`` — e questo e' il punto: in asta si compra dal
-    listone, e i due schermi non possono dire due squadre diverse per lo stesso
-    giocatore. Legarli a due fonti che "di solito coincidono" e' esattamente il
-    modo in cui un giorno non coincidono piu'.
-    """
-    if not competition_season_id:
-        return {}
-    return dict(PlayerTeamStint.objects
-                .filter(team_season__competition_season_id=competition_season_id,
-                        end_date__isnull=True, player_id__in=player_ids)
-                .values_list("player_id", "team_season__team__name"))
-
-
 def _serialize_auction_state(session, viewer_membership_id: int | None = None) -> dict:
     league = session.league
     budgets = team_budgets(league)
@@ -4964,84 +4942,6 @@ class AuctionCloseSessionView(APIView):
         return Response({"auction_id": session.id, "status": session.status})
 
 
-def _compute_standings(fixtures, pw: int, pd: int, pl: int,
-                       live_totals: dict | None = None) -> list[dict]:
-    """Ranked standings (fixtures with .detail prefetched).
-
-    LE PARTITE IN CORSO CONTANO, quando ``live_totals`` le porta. Una classifica
-    che si fermava all'ultima giornata conclusa dava, per tutta la domenica, la
-    risposta sbagliata alla sola domanda che le si fa in quel momento — "come sta
-    andando" — e la dava accanto a un calendario che i punteggi provvisori li
-    mostrava già: due risposte alla stessa domanda, e nessuna delle due marcata.
-    Le righe toccate escono con ``provisional`` acceso, perché "sesto a 41" e
-    "sesto a 41 con una partita da finire" non sono la stessa frase.
-
-    Senza ``live_totals`` il conto è quello di prima, sulle sole partite chiuse:
-    è ciò che serve a chi la classifica la vuole definitiva (un premio, un
-    verdetto), e resta il comportamento predefinito.
-    """
-    rows: dict[int, dict] = {}
-    names: dict[int, str] = {}
-    crests: dict[int, str] = {}
-
-    def row(team_id: int) -> dict:
-        return rows.setdefault(
-            team_id, {"pts": 0, "played": 0, "w": 0, "d": 0, "l": 0, "gf": 0.0, "ga": 0.0,
-                      "score_sum": 0.0, "scored": 0, "live": False}
-        )
-
-    for fx in fixtures:
-        played = fx.status == FantasyFixture.STATUS_FINISHED
-        live = None if played else (live_totals or {}).get(fx.id)
-        if not played and live is None:
-            continue
-        hs, as_ = ((fx.home_total, fx.away_total) if played
-                   else (live["home_total"], live["away_total"]))
-        names[fx.home_team_id] = fx.home_team.name
-        names[fx.away_team_id] = fx.away_team.name
-        crests[fx.home_team_id] = fx.home_team.crest
-        crests[fx.away_team_id] = fx.away_team.crest
-        h, a = row(fx.home_team_id), row(fx.away_team_id)
-        h["played"] += 1
-        a["played"] += 1
-        h["gf"] += hs
-        h["ga"] += as_
-        a["gf"] += as_
-        a["ga"] += hs
-        if not played:
-            h["live"] = a["live"] = True
-        if hs > as_:
-            h["pts"] += pw; a["pts"] += pl; h["w"] += 1; a["l"] += 1
-        elif hs < as_:
-            a["pts"] += pw; h["pts"] += pl; a["w"] += 1; h["l"] += 1
-        else:
-            h["pts"] += pd; a["pts"] += pd; h["d"] += 1; a["d"] += 1
-        detail = getattr(fx, "detail", None)
-        if detail is not None:
-            h["score_sum"] += detail.vfoot_home
-            a["score_sum"] += detail.vfoot_away
-            h["scored"] += 1
-            a["scored"] += 1
-
-    ranked = sorted(rows.items(), key=lambda kv: (kv[1]["pts"], kv[1]["gf"] - kv[1]["ga"], kv[1]["gf"]), reverse=True)
-    return [
-        {
-            "rank": i + 1, "team_id": tid, "team": names.get(tid, str(tid)),
-            "crest": crests.get(tid, ""),
-            "played": r["played"], "wins": r["w"], "draws": r["d"], "losses": r["l"],
-            "goals_for": int(r["gf"]), "goals_against": int(r["ga"]),
-            "goal_diff": int(r["gf"] - r["ga"]), "points": r["pts"],
-            # La media sulle partite che un tabellino ce l'hanno: una in corso non
-            # ne ha ancora uno, e dividerla per le giocate abbassava la media di
-            # tutti appena cominciava la giornata.
-            "avg_score_for": round(r["score_sum"] / r["scored"], 3) if r["scored"] else 0.0,
-            # Questa riga contiene una partita ancora da finire.
-            "provisional": r["live"],
-        }
-        for i, (tid, r) in enumerate(ranked)
-    ]
-
-
 _KO_ROUND_LABELS = {1: "Finale", 2: "Semifinali", 4: "Quarti di finale", 8: "Ottavi di finale"}
 
 
@@ -5086,15 +4986,14 @@ def _highlighted_ranks(stage) -> tuple[list[int], list[int]]:
 
 def _section(name, stage_type, order, fixtures, my_team_id, current_md, pw, pd, pl,
              stage=None, awaiting_mds=None, locked_mds=None, live_totals=None,
-             early_detail=None, stage_count: int = 0) -> dict:
+             early_detail=None, stage_count: int = 0, competition=None) -> dict:
     """One results section: a standings table (round-robin) or a bracket (knockout)."""
-    fixtures = list(fixtures)
     prize_ranks, qualify_ranks = _highlighted_ranks(stage)
     base = {"name": name, "type": stage_type, "order": order,
             "prize_ranks": prize_ranks, "qualify_ranks": qualify_ranks}
     if stage_type == CompetitionStage.TYPE_KNOCKOUT:
         by_round: dict[int, list] = {}
-        for f in fixtures:
+        for f in list(fixtures):
             by_round.setdefault(f.round_no, []).append(f)
         rounds = []
         for rno in sorted(by_round):
@@ -5132,21 +5031,23 @@ def _section(name, stage_type, order, fixtures, my_team_id, current_md, pw, pd,
             })
         base["rounds"] = rounds
     else:
-        # Tutte le partite, non solo le finite: quelle in corso entrano in
-        # classifica se ``live_totals`` ha un punteggio per loro (vedi
-        # _compute_standings), e senza cambiano niente.
-        standings = _compute_standings(fixtures, pw, pd, pl, live_totals)
+        # Le finite sono gia' nelle righe salvate (services/standings): qui si
+        # leggono solo le altre, che entrano in classifica se ``live_totals`` ha un
+        # punteggio per loro, e senza cambiano niente.
+        pending = list(fixtures.exclude(status=FantasyFixture.STATUS_FINISHED))
+        table = standings.table(competition, pw, pd, pl, stage=stage, pending=pending,
+                                live_totals=live_totals)
         # Before the first match there are no finished fixtures, so the table came
         # back empty and a group showed its name over nothing — for a group stage
         # that reads as "the draw failed", when in fact nobody has played yet.
         # Every team that HAS a fixture in this section belongs in the table, at
-        # zero.
-        if not standings:
+        # zero. (With nothing finished, every fixture is a pending one.)
+        if not table:
             seen: dict[int, tuple[str, str]] = {}
-            for f in fixtures:
+            for f in pending:
                 seen.setdefault(f.home_team_id, (f.home_team.name, f.home_team.crest))
                 seen.setdefault(f.away_team_id, (f.away_team.name, f.away_team.crest))
-            standings = [
+            table = [
                 {
                     "rank": i + 1, "team_id": tid, "team": name, "crest": crest,
                     "played": 0, "wins": 0, "draws": 0, "losses": 0,
@@ -5158,7 +5059,7 @@ def _section(name, stage_type, order, fixtures, my_team_id, current_md, pw, pd,
                 for i, (tid, (name, crest)) in enumerate(
                     sorted(seen.items(), key=lambda kv: kv[1][0].lower()))
             ]
-        base["standings"] = standings
+        base["standings"] = table
     return base
 
 
@@ -5193,8 +5094,10 @@ class CompetitionStructureView(APIView):
         # I punteggi provvisori della competizione, in un colpo solo: `_live_totals`
         # tiene un solo scorer per giornata, e chiederli fase per fase avrebbe
         # rifatto quel lavoro per ogni girone.
+        # Solo le partite non finite: le altre un punteggio provvisorio non ce l'hanno.
         live_totals = _live_totals(
-            league, list(comp.fixtures.select_related("fantasy_matchday")), locked_mds)
+            league, list(comp.fixtures.exclude(status=FantasyFixture.STATUS_FINISHED)
+                         .select_related("fantasy_matchday")), locked_mds)
         early_detail = _opens_before_kickoff(league)
 
         stages = list(comp.stages.order_by("order_index", "id"))
@@ -5205,7 +5108,7 @@ class CompetitionStructureView(APIView):
                          stage=s, awaiting_mds=awaiting_mds, locked_mds=locked_mds,
                          live_totals=live_totals, early_detail=early_detail,
                          # Gia' in mano: nessuna query in piu' per contarle.
-                         stage_count=len(stages))
+                         stage_count=len(stages), competition=comp)
                 for s in stages
             ]
         else:
@@ -5214,7 +5117,7 @@ class CompetitionStructureView(APIView):
                          comp.fixtures.select_related(*rel).defer(*defer), my_team_id, current_md, pw, pd, pl,
                          awaiting_mds=awaiting_mds, locked_mds=locked_mds,
                          live_totals=live_totals, early_detail=early_detail,
-                         stage_count=0)
+                         stage_count=0, competition=comp)
             ]
         return Response({
             "competition_id": comp.id, "name": comp.name,
@@ -5247,19 +5150,20 @@ class LeagueStandingsView(APIView):
         # chiedeva di cambiarli insieme: la prima colonna aggiunta a uno solo dei
         # due sarebbe stata il bug che quel commento temeva, e i punteggi
         # provvisori sarebbero stati esattamente quella colonna.
-        fixtures = list(
+        # Le partite finite sono gia' nelle righe salvate: si leggono solo le
+        # altre, per i punteggi provvisori.
+        pending = list(
             FantasyFixture.objects
             .filter(competition=comp)
-            .select_related("fantasy_matchday", "home_team", "away_team", "detail")
-            # Stessa ragione della vista struttura: della `detail` servono due
-            # numeri, non il referto intero.
-            .defer("detail__payload")
+            .exclude(status=FantasyFixture.STATUS_FINISHED)
+            .select_related("fantasy_matchday")
         ) if comp else []
         locked_mds = (matchday_state.locked_matchdays(league.reference_season_id)
                       if league.reference_season_id else set())
-        standings = _compute_standings(
-            fixtures, pw, pd, pl, _live_totals(league, fixtures, locked_mds))
-        return Response({"competition_id": comp.id if comp else None, "standings": standings})
+        table = standings.table(
+            comp, pw, pd, pl, pending=pending,
+            live_totals=_live_totals(league, pending, locked_mds)) if comp else []
+        return Response({"competition_id": comp.id if comp else None, "standings": table})
 
 
 def _fixture_managers(fx) -> dict:
@@ -5305,7 +5209,10 @@ class FixtureDetailView(APIView):
             FantasyFixture.objects.select_related(
                 "competition__league", "detail", "fantasy_matchday",
                 "home_team__manager__user__profile",
-                "away_team__manager__user__profile"),
+                "away_team__manager__user__profile")
+            # Il referto congelato si legge come testo e si manda com'e': niente
+            # json.loads di venticinque pagelle per poi ricodificarle identiche.
+            .defer("detail__payload"),
             id=fixture_id,
         )
         league = fx.competition.league
@@ -5313,7 +5220,9 @@ class FixtureDetailView(APIView):
         managers = _fixture_managers(fx)
         detail = getattr(fx, "detail", None)
         if detail is not None:
-            return Response({**detail.payload, **managers})
+            raw = (FantasyFixtureDetail.objects.filter(id=detail.id)
+                   .values_list(Cast("payload", TextField()), flat=True).first())
+            return encoded_response(request, PreEncoded(extend_encoded(raw, managers)))
 
         md = fx.fantasy_matchday
         if md is None or md.status == FantasyMatchday.STATUS_CONCLUDED:
@@ -6320,92 +6229,22 @@ class SeasonRealMatchDetailView(APIView):
         return Response(payload)
 
 
-def championship_players_payload(cs, league=None) -> dict:
-    """The 'listone': one row per currently-eligible player of a championship
-    edition (open real-club stint), with role, real club and a value signal
-    (average voto puro from the latest season with data).
-
-    With a ``league``, two columns are added that only exist inside one: who owns
-    the player, and the role that league froze. Without it the pool, the values
-    and the roles are the season's own — which is what the votes were scored
-    against anyway. The frontend does role / free-agent / search filtering and
-    value sorting over this list."""
-    pool = eligible_player_ids(cs.id)
+def _listone_filters(request) -> dict | None:
+    """The row filters a listone request may carry (see ``filter_rows``), or None
+    for an unknown order — refused rather than ignored: a list silently in the
+    wrong order reads as the right one."""
+    qp = request.query_params
+    order = qp.get("order") or None
+    if order is not None and order not in LISTONE_ORDERS:
+        return None
+    return {"role": qp.get("role") or None, "team": qp.get("team") or None,
+            "q": qp.get("q") or None, "order": order,
+            "free": qp.get("free") in ("1", "true", "True")}
 
-    # Il club di ciascuno in QUESTA edizione. Stessa funzione che usa la sala
-    # d'asta: si compra da questo elenco, e i due schermi devono dire lo stesso.
-    team_by_player = _club_by_player(cs.id, pool)
 
-    # frozen listone role, fallback to the global classic role
-    lpr = (dict(LeaguePlayerRole.objects.filter(league=league)
-                .values_list("player_id", "role")) if league is not None else {})
-    # ownership in this league
-    owner_by_player = (dict(
-        FantasyRosterSlot.objects
-        .filter(team__league=league, released_at__isnull=True)
-        .values_list("player_id", "team__name")) if league is not None else {})
-
-    # Value blends last season's average with current-season form as the
-    # championship progresses (see player_values).
-    market = latest_market_values(pool)
-    values, prev_cs, fit = player_values(cs, market)
-
-    players = (Player.objects.filter(id__in=pool)
-               .values("id", "full_name", "short_name", "classic_role_seed"))
-    # Players whose role is still an open question: shown, but marked, so
-    # nobody plans an auction around someone they cannot actually buy. Outside a
-    # league nobody is buying, and there is no question open: the season role is
-    # simply what it is.
-    undecided = undecided_player_ids(league) if league is not None else set()
-    # The season's measured role, second in line behind the league's frozen one
-    # (AGENTS.md, "Classic Role Resolution"), and never the raw provider seed
-    # alone. It used to be read only OUTSIDE a league, on the grounds that inside
-    # one the frozen role always answers — which is true of everyone except the
-    # players in limbo, who deliberately have no frozen row. For those the row fell
-    # through to ``classic_role_seed``, the provider map where every winger is a
-    # midfielder: the listone showed Chukwueze as a midfielder while the decision
-    # screen, for the same player, proposed attacker. Shown here, the two agree.
-    season_roles = current_role_map()
-    rows = []
-    for p in players:
-        pid = p["id"]
-        v = values.get(pid)
-        rows.append({
-            "market_value": market.get(pid),
-            "player_id": pid,
-            "name": p["short_name"] or p["full_name"] or str(pid),
-            # The list shows the short name ("L. Martinez"); searching for
-            # "Lautaro" found nothing because that string is all the client
-            # had. Sent alongside so the search can match either.
-            "full_name": p["full_name"] or "",
-            "role": (lpr.get(pid) or season_roles.get(pid)
-                     or p["classic_role_seed"] or ""),
-            "team": team_by_player.get(pid),
-            "owned": pid in owner_by_player,
-            "owner": owner_by_player.get(pid),
-            "role_undecided": pid in undecided,
-            "value": v["value"] if v else None,
-            "estimated_value": v["estimated_value"] if v else None,
-            "value_basis": v["basis"] if v else None,
-            "appearances": v["n_cur"] if v else 0,
-            "prev_appearances": v["n_prev"] if v else 0,
-        })
-    # Default order = the HOMOGENEOUS estimated value, so newcomers rank among
-    # the rated players instead of forming an alphabetical tail. The frontend
-    # also offers the measured-voto-then-market order.
-    rows.sort(key=lambda x: (x["estimated_value"] is None,
-                             -(x["estimated_value"] or 0),
-                             -(x["market_value"] or 0), x["name"]))
-    return {
-        "value_season": str(prev_cs) if prev_cs else None,
-        "current_season": str(cs),
-        "count": len(rows),
-        # How the market->voto estimate was calibrated (r = fit quality on the
-        # players having both signals), so the UI can be honest about it.
-        "value_fit": ({"intercept": round(fit[0], 3), "slope": round(fit[1], 3),
-                       "r": round(fit[2], 3), "n": fit[3]} if fit else None),
-        "players": rows,
-    }
+def _bad_listone_order() -> Response:
+    return Response({"detail": f"order non valido: {', '.join(LISTONE_ORDERS)}."},
+                    status=status.HTTP_400_BAD_REQUEST)
 
 
 class LeagueChampionshipPlayersView(APIView):
@@ -6421,7 +6260,11 @@ class LeagueChampionshipPlayersView(APIView):
         cs = league.reference_season
         if cs is None:
             return Response({"value_season": None, "players": []})
-        return Response(championship_players_payload(cs, league=league))
+        filters = _listone_filters(request)
+        if filters is None:
+            return _bad_listone_order()
+        return encoded_response(
+            request, championship_players_response(cs, league=league, **filters))
 
 
 class SeasonChampionshipPlayersView(APIView):
@@ -6435,4 +6278,7 @@ class SeasonChampionshipPlayersView(APIView):
         cs = get_object_or_404(
             CompetitionSeason.objects.select_related("competition", "season"),
             id=season_id)
-        return Response(championship_players_payload(cs))
+        filters = _listone_filters(request)
+        if filters is None:
+            return _bad_listone_order()
+        return encoded_response(request, championship_players_response(cs, **filters))
@@ -0,0 +1,136 @@
+"""JSON out of the API: what DRF's ``JSONRenderer`` writes, through orjson.
+
+The big payloads — the listone, the tabellino, the calendar, the auction state —
+were encoded by the stdlib ``json`` module on every response, and for a cached
+payload that was most of what the response still cost. ``FastJSONRenderer``
+writes the same document with orjson (a C encoder, several times faster on
+these shapes): same keys in the same order, same compact separators, the same
+``\\u2028``/``\\u2029`` escaping, and every type orjson does not know natively
+(dates and datetimes included, so the ``Z`` suffix survives) handed to DRF's own
+encoder. Two deliberate differences, both invisible to a JSON parser: a float
+may be spelled differently (``1e16`` for ``1e+16``), and a NaN becomes ``null``
+instead of a 500.
+
+A payload that is already bytes — ``PreEncoded`` — is sent as it is: a cache hit
+that stores the encoded form does no serialization at all. It can carry a gzip
+version of itself, which ``encoded_response`` sends to a client that accepts it
+(nginx leaves a response that is already compressed alone).
+
+orjson is an optional wheel: without it ``encode`` is DRF's stdlib path.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils import encoders
+
+try:  # pragma: no cover - exercised by whichever of the two is installed
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_DRF = encoders.JSONEncoder()
+_OPTIONS = ((orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+             | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson is not None else 0)
+# Level 1, as nginx does (deploy/nginx/vfoot-gzip.conf): the CPU is the scarce
+# resource here, and the higher levels buy a few percent for three times the cost.
+GZIP_LEVEL = 1
+# Under a kilobyte compressing costs more than it saves (same threshold as nginx).
+GZIP_MIN_LENGTH = 1024
+
+
+def _escape_separators(out: bytes) -> bytes:
+    # Strict JavaScript subset, as DRF guarantees: U+2028/2029 are legal in JSON
+    # strings but end a line in a JS literal.
+    if b"\xe2\x80\xa8" in out or b"\xe2\x80\xa9" in out:
+        out = out.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return out
+
+
+def encode(data) -> bytes:
+    """``data`` as the compact UTF-8 JSON the API sends."""
+    if orjson is not None:
+        try:
+            return _escape_separators(orjson.dumps(data, default=_DRF.default, option=_OPTIONS))
+        except orjson.JSONEncodeError:
+            # An integer past 64 bits, or a type nobody knows: the stdlib path
+            # either manages or raises the error DRF would have raised.
+            pass
+    out = json.dumps(data, cls=encoders.JSONEncoder, ensure_ascii=False,
+                     allow_nan=False, separators=(",", ":"))
+    return _escape_separators(out.encode())
+
+
+class PreEncoded:
+    """A response body already encoded (and, optionally, already gzipped)."""
+
+    __slots__ = ("body", "gzipped")
+
+    def __init__(self, body: bytes, gzipped: bytes | None = None):
+        self.body = body
+        self.gzipped = gzipped
+
+    @classmethod
+    def of(cls, data, *, compress: bool = False) -> "PreEncoded":
+        body = encode(data)
+        return cls(body, compress_body(body) if compress else None)
+
+
+def compress_body(body: bytes) -> bytes | None:
+    """The gzip form of ``body``, or None when it is too small to be worth it."""
+    if len(body) < GZIP_MIN_LENGTH:
+        return None
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def extend_encoded(raw: bytes | str, extra: dict) -> bytes:
+    """The JSON object ``raw`` with ``extra``'s keys added at the end, without
+    decoding it: ``{**json.loads(raw), **extra}`` for a ``raw`` that does not
+    already carry those keys. ``raw`` is trusted to be one JSON object — what a
+    ``JSONField`` column holds."""
+    if isinstance(raw, str):
+        raw = raw.encode()
+    body = _escape_separators(raw).rstrip()
+    if not extra:
+        return body
+    tail = encode(extra)[1:]                   # "k":v,...}
+    head = body[:-1].rstrip()                  # {... without the brace
+    return head + (tail if head.endswith(b"{") else b"," + tail)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` through ``encode``; ``PreEncoded`` bodies pass untouched.
+
+    Indented output (``?format=json; indent=4``, the browsable API) stays on the
+    stdlib path: it is for reading, not for speed."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if isinstance(data, PreEncoded):
+            if indent is None:
+                return data.body
+            data = json.loads(data.body)
+        if indent is not None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        return encode(data)
+
+
+def encoded_response(request, payload: PreEncoded, status: int = 200) -> Response:
+    """A ``Response`` for a pre-encoded body, gzipped if it has a gzip form, the
+    client accepts one and the body is going out as JSON."""
+    response = Response(payload, status=status)
+    if payload.gzipped is None:
+        return response
+    patch_vary_headers(response, ("Accept-Encoding",))
+    accepts = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    if ("gzip" in accepts
+            and isinstance(getattr(request, "accepted_renderer", None), FastJSONRenderer)):
+        response.data = PreEncoded(payload.gzipped)
+        response["Content-Encoding"] = "gzip"
+    return response
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class VfootConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vfoot'
+
+    def ready(self):
+        # Connects the Match signals that drop a request's copy of the calendar
+        # when a match in it is saved (``matchday_state.calendar_scope``).
+        from vfoot.services import matchday_state  # noqa: F401
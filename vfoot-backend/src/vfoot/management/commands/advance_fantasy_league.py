@@ -47,7 +47,7 @@ from vfoot.models import (
     LeaguePlayerRole,
     SavedLineupSnapshot,
 )
-from vfoot.services import honours, matchday_state
+from vfoot.services import honours, matchday_state, standings
 from vfoot.services.classic_matchday_scoring import score_and_persist_matchday
 from vfoot.services.classic_scoring import Ruleset
 from vfoot.services.competition_stages import resolve_pending_stages, resolve_stage
@@ -132,14 +132,16 @@ class Command(BaseCommand):
             self._reopen_competitions(league)
             return
         fixtures = FantasyFixture.objects.filter(fantasy_matchday__in=late)
-        FantasyFixtureDetail.objects.filter(fixture__in=fixtures).delete()
-        # 0.0, not None: the column is NOT NULL with a 0.0 default, so nulling it
-        # raised an IntegrityError — and only ever when the rewind had something to
-        # rewind, which is why it survived. An unplayed fixture is identified by its
-        # STATUS everywhere that matters (see _serialize_fixture_row, which only
-        # exposes a score when it is finished), never by a null total.
-        fixtures.update(status=FantasyFixture.STATUS_SCHEDULED,
-                        home_total=0.0, away_total=0.0)
+        # The standings give the rewound results back in the same transaction.
+        with standings.tracking(fixtures.values_list("id", flat=True)):
+            FantasyFixtureDetail.objects.filter(fixture__in=fixtures).delete()
+            # 0.0, not None: the column is NOT NULL with a 0.0 default, so nulling it
+            # raised an IntegrityError — and only ever when the rewind had something to
+            # rewind, which is why it survived. An unplayed fixture is identified by its
+            # STATUS everywhere that matters (see _serialize_fixture_row, which only
+            # exposes a score when it is finished), never by a null total.
+            fixtures.update(status=FantasyFixture.STATUS_SCHEDULED,
+                            home_total=0.0, away_total=0.0)
         for md in late:
             md.status = FantasyMatchday.STATUS_PLANNED
             md.concluded_at = None
@@ -0,0 +1,100 @@
+"""How long the big payloads take to ENCODE, three ways.
+
+    python manage.py bench_json_render --league 53
+    python manage.py bench_json_render --league 53 --repeat 50
+
+For the league's largest endpoints — the listone in and out of the league, the
+calendar, the auction state, the heaviest frozen tabellino — the payload is
+fetched once through the API and then encoded again and again:
+
+  * ``stdlib``: DRF's ``JSONRenderer``, what every response paid before;
+  * ``orjson``: ``renderers.encode`` on the same dict, what an uncached
+    response pays now;
+  * ``cached``: what a cache hit pays now — the listone assembled from its
+    cached row fragments, the season listone sent as stored, the tabellino
+    extended as raw text. Empty where the endpoint has no encoded cache.
+
+Only the encoding is timed: building the payload is the same in all three.
+"""
+from __future__ import annotations
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import TextField
+from django.db.models.functions import Cast, Length
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from vfoot.api.renderers import encode, extend_encoded
+from vfoot.models import AuctionSession, FantasyFixtureDetail, FantasyLeague
+from vfoot.services import listone_payload
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+class Command(BaseCommand):
+    help = "Benchmark the JSON encoding of the largest endpoints of a league."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--league", type=int, required=True)
+        parser.add_argument("--repeat", type=int, default=20,
+                            help="Encodings per measure; the best one is kept.")
+
+    def handle(self, *args, **o):
+        league = FantasyLeague.objects.filter(id=o["league"]).select_related(
+            "reference_season").first()
+        if league is None:
+            raise CommandError(f"No FantasyLeague id={o['league']}")
+        client = APIClient()
+        client.force_authenticate(user=league.owner)
+        drf = JSONRenderer()
+        repeat = max(1, o["repeat"])
+
+        def fetch(url):
+            res = client.get(url)
+            return json.loads(res.content) if res.status_code == 200 else None
+
+        cases = []
+        cs = league.reference_season
+        if cs is not None:
+            payload = fetch(f"/api/v1/leagues/{league.id}/championship-players")
+            fragments = listone_payload.cached_listone(cs, league).get("rows_json")
+            cases.append(("listone (lega)", payload,
+                          (lambda: listone_payload.assemble(payload, fragments))
+                          if fragments else None))
+            season = fetch(f"/api/v1/real-seasons/{cs.id}/players")
+            cases.append(("listone (stagione)", season, lambda: None))
+        cases.append(("calendario", fetch(f"/api/v1/leagues/{league.id}/fixtures"), None))
+        auction = AuctionSession.objects.filter(league=league).order_by("-id").first()
+        if auction is not None:
+            cases.append(("asta", fetch(f"/api/v1/auctions/{auction.id}"), None))
+        heaviest = (FantasyFixtureDetail.objects
+                    .filter(fixture__competition__league=league)
+                    .annotate(raw=Cast("payload", TextField()))
+                    .annotate(size=Length("raw")).order_by("-size")
+                    .values_list("fixture_id", "raw").first())
+        if heaviest is not None:
+            fixture_id, raw = heaviest
+            detail = fetch(f"/api/v1/fixtures/{fixture_id}")
+            managers = {k: v for k, v in (detail or {}).items() if k.endswith("_manager")}
+            cases.append(("tabellino", detail, lambda: extend_encoded(raw, managers)))
+
+        self.stdout.write(f"{'endpoint':<20}{'KB':>8}{'stdlib':>10}{'orjson':>10}"
+                          f"{'cached':>10}   (ms, migliore di {repeat})")
+        for label, data, cached in cases:
+            if data is None:
+                continue
+            size = len(encode(data)) / 1024
+            std = _best_ms(lambda: drf.render(data), repeat)
+            fast = _best_ms(lambda: encode(data), repeat)
+            hit = f"{_best_ms(cached, repeat):>10.2f}" if cached else f"{'—':>10}"
+            self.stdout.write(f"{label:<20}{size:>8.1f}{std:>10.2f}{fast:>10.2f}{hit}")
@@ -31,6 +31,10 @@ matchday L (the league mirrors the first 36 rounds).
 The report is a self-contained HTML page: each team's league-position trajectory
 (real vs our-votes) over the 36 matchdays, plus the two final tables side by side.
 Re-run after any weight change to regenerate it.
+
+Our votes come from a season table (``season_votes``) scored once and cached
+under the season's data version and the scoring model; the league sheets are
+read in a process pool (``--workers``), since each is a file of its own.
 """
 from __future__ import annotations
 
@@ -43,13 +47,15 @@ from pathlib import Path
 
 import openpyxl
 from django.conf import settings
+from django.core.cache import cache
 from django.core.management.base import BaseCommand, CommandError
 
 from realdata.models import Match, MatchAppearance
+from realdata.services import fork_pool
 from vfoot.management.commands.voto_puro_discrepancies import Command as DiscCmd
-from vfoot.services.classic_pagella import (
-    get_reference, get_role_averages, pagella_for_match,
-)
+from vfoot.services.classic_pagella import data_version, get_reference
+from vfoot.services.classic_rating import roles_digest, voto_puro_for_match
+from vfoot.services.vote_reference import scoring_fingerprint
 
 SCORE_RE = re.compile(r"^\s*\d+\s*-\s*\d+\s*$")
 GD_RE = re.compile(r"_(\d+)_giornata")
@@ -124,6 +130,38 @@ def parse_file(path):
     return matchups
 
 
+def parse_files(files, workers=1):
+    """``parse_file`` of each sheet, in order; in a process pool when ``workers`` > 1.
+    openpyxl is the slow part of a replay and the sheets do not depend on each other."""
+    return fork_pool.fork_map(parse_file, files, workers=workers)
+
+
+def season_votes(cs_id, *, rebuild=False):
+    """{(matchday, player id): voto puro} for every rated appearance of a season —
+    the number the pagella prints, rounded as it rounds it.
+
+    Only the vote: ``pagella_for_match`` would also explain it, charge the cards,
+    the penalties and the goals conceded, none of which a replay reads, for every
+    match. Cached under the season's data version, the scoring fingerprint and the
+    role map, like the fit extract: a replay after a weight change rescores the
+    season once, and every replay after that reads it back.
+    """
+    key = (f"vfoot:season_votes:{cs_id}:{data_version(cs_id)}"
+           f":{scoring_fingerprint()}:{roles_digest()}")
+    if not rebuild:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    ref = get_reference(cs_id)
+    vp = {}
+    for m in Match.objects.filter(competition_season_id=cs_id):
+        for row in voto_puro_for_match(m, ref):
+            if row.get("rated") and row.get("voto_puro") is not None:
+                vp[(m.matchday, row["player_id"])] = round(float(row["voto_puro"]), 1)
+    cache.set(key, vp, None)
+    return vp
+
+
 def goals_from_total(t):
     """League fantapunti -> goals: 66=1, then +6 per goal."""
     return 0 if t < 66 else int((t - 66) // 6) + 1
@@ -138,6 +176,9 @@ class Command(BaseCommand):
                             help="Folder of per-matchday league xlsx files.")
         parser.add_argument("--out", default=str(Path(settings.BASE_DIR).parent.parent
                                                  / "fantaresilienza_report.html"))
+        fork_pool.add_workers_argument(parser, "Processes reading the league sheets")
+        parser.add_argument("--rebuild-votes", action="store_true",
+                            help="rescore the season even if its votes are cached")
 
     # -- player id resolution (club-less: surname + fantacalcio initial) --------
     def _build_name_index(self, cs_id):
@@ -168,18 +209,6 @@ class Command(BaseCommand):
             return None
         return resolve
 
-    def _our_voto_puro(self, cs_id):
-        ref = get_reference(cs_id)
-        avgs = get_role_averages(cs_id)
-        vp = {}
-        for m in Match.objects.filter(competition_season_id=cs_id):
-            pag = pagella_for_match(m, ref, averages=avgs)
-            for side in ("home", "away"):
-                for ln in pag[side]["starters"] + pag[side]["bench"]:
-                    if ln.get("voto_puro") is not None:
-                        vp[(m.matchday, ln["player_id"])] = float(ln["voto_puro"])
-        return vp
-
     @staticmethod
     def _find_subs(bench, gap, k):
         cand = [(bi, b) for bi, b in enumerate(bench) if b["fanta"] is not None]
@@ -199,15 +228,16 @@ class Command(BaseCommand):
             raise CommandError(f"No league xlsx in {opt['dir']}")
 
         self.stdout.write("Computing our voto puro for every match…")
-        our_vp = self._our_voto_puro(cs_id)
+        our_vp = season_votes(cs_id, rebuild=opt["rebuild_votes"])
         resolve = self._build_name_index(cs_id)
+        sheets = parse_files(files, workers=fork_pool.resolve_workers(opt["workers"]))
 
         stats = dict(voted=0, unmatched=0, sub_exact=0, sub_approx=0, goal_ok=0, goal_bad=0)
         # records[gd] = list of (teamA, teamB, gAa, gBa, gAo, gBo)
         records = defaultdict(list)
-        for f in files:
+        for f, matchups in zip(files, sheets):
             L = int(GD_RE.search(f).group(1))
-            for mu in parse_file(f):
+            for mu in matchups:
                 side_goals = {}
                 for side in ("A", "B"):
                     st, bench, tr = mu["starters"][side], mu["bench"][side], mu["trailer"][side]
@@ -37,13 +37,24 @@ Due scelte di metodo
 Il match giocatore-a-giocatore riusa il matcher di ``voto_puro_discrepancies``
 (cognome + iniziale del nome, indicizzato sulle squadre in cui il giocatore ha
 effettivamente giocato), cosi' c'e' una sola implementazione da mantenere.
+
+Rifarlo costa quanto e' cambiato
+--------------------------------
+La pagella di ogni partita finisce su disco (``--cache-dir``) sotto l'impronta
+della partita, del modello di voto e della mappa dei ruoli: dopo un ritocco dei
+pesi si ricalcolano tutte, ma una volta sola, e in un pool di processi
+(``--workers``); dopo un reimport solo le partite reimportate. Allo stesso modo
+una pagina si riscrive solo se sono cambiati i suoi dati o il codice che la
+disegna.
 """
 from __future__ import annotations
 
 import glob
+import hashlib
 import html
 import json
 import math
+import pickle
 import re
 from collections import defaultdict
 from pathlib import Path
@@ -54,11 +65,13 @@ from django.core.management.base import BaseCommand, CommandError
 
 import vfoot.services.classic_rating as cr
 from realdata.models import Match, MatchAppearance
+from realdata.services import fork_pool
 from realdata.services.identity import norm_name
 from vfoot.management.commands.voto_puro_discrepancies import Command as DiscCmd
 from vfoot.services.classic_pagella import (
-    get_reference, get_role_averages, pagella_for_match,
+    get_reference, get_role_averages, match_data_versions, pagella_for_match,
 )
+from vfoot.services.vote_reference import scoring_fingerprint
 
 DEFAULT_DIR = str(Path(settings.VFOOT_DATA_DIR) / "data_fantacalcio" / "2025-2026")
 DEFAULT_OUT = str(Path(settings.REPO_ROOT) / "voto_benchmark")
@@ -81,6 +94,26 @@ HIST_BINS = [x / 2 for x in range(7, 19)]        # 3.5 … 9.0
 MATRIX_BINS = [x / 2 for x in range(8, 18)]      # 4.0 … 8.5
 
 
+# Il codice che disegna le pagine: una pagina i cui dati non sono cambiati si
+# riscrive comunque se e' cambiato questo file (CSS, JS, impaginazione).
+_RENDER_VERSION = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()[:12]
+
+
+def _score(match):
+    """La pagella di una partita, calcolata e messa su disco sotto la sua chiave;
+    le versioni precedenti della stessa partita vanno via. Riferimento, medie e
+    cartella arrivano da ``fork_pool.shared``."""
+    shared = fork_pool.shared
+    pag = pagella_for_match(match, shared["ref"], averages=shared["avgs"],
+                            full_explanation=True)
+    folder = shared["dir"]
+    for old in folder.glob(f"pagella-{match.id}-*.pickle"):
+        old.unlink(missing_ok=True)
+    (folder / f"pagella-{match.id}-{shared['keys'][match.id]}.pickle").write_bytes(
+        pickle.dumps(pag, protocol=pickle.HIGHEST_PROTOCOL))
+    return pag
+
+
 def _clamp_bin(v, bins):
     return min(max(round(v * 2) / 2, bins[0]), bins[-1])
 
@@ -149,6 +182,12 @@ class Command(BaseCommand):
                             help="cartella di destinazione delle pagine HTML")
         parser.add_argument("--matchdays", default=None,
                             help="sottoinsieme di giornate, es. '1-5,12' (default: tutte)")
+        parser.add_argument("--cache-dir", default=None,
+                            help="dove tenere le pagelle gia' calcolate (default: "
+                                 "<out>/.cache)")
+        fork_pool.add_workers_argument(
+            parser, "processi che calcolano le pagelle",
+            note="(default: uno per core). Il risultato non dipende da questo.")
 
     # ------------------------------------------------------------------ input
 
@@ -200,7 +239,7 @@ class Command(BaseCommand):
         wb.close()
         return fanta, stat
 
-    def _our_side(self, cs_id, matchdays):
+    def _our_side(self, cs_id, matchdays, *, cache_dir, workers=1):
         """{(gd, pid): riga nostra} + {(gd, nome_squadra): incontro}.
 
         La riga nostra e' quella della pagella reale: voto puro, spiegazione,
@@ -213,7 +252,7 @@ class Command(BaseCommand):
                   MatchAppearance.objects.filter(match__competition_season_id=cs_id)
                   .values_list('player_id', 'match__matchday', 'raw_stats')
                   if (rs or {}).get('rating')}
-        ours, fixtures = {}, {}
+        ours, fixtures, played = {}, {}, []
         qs = (Match.objects.filter(competition_season_id=cs_id)
               .select_related("home_team__team", "away_team__team").order_by("matchday"))
         for m in qs:
@@ -238,7 +277,10 @@ class Command(BaseCommand):
                     "gf": m.home_goals if side == "home" else m.away_goals,
                     "gs": m.away_goals if side == "home" else m.home_goals,
                 }
-            pag = pagella_for_match(m, ref, averages=avgs, full_explanation=True)
+            played.append((m, names))
+        pagelle = self._pagelle(cs_id, [m for m, _ in played], ref, avgs,
+                                cache_dir=cache_dir, workers=workers)
+        for (m, names), pag in zip(played, pagelle):
             for side in ("home", "away"):
                 for group in ("starters", "bench"):
                     for ln in pag[side][group]:
@@ -248,6 +290,49 @@ class Command(BaseCommand):
                         }
         return ours, fixtures
 
+    def _pagelle(self, cs_id, matches, ref, avgs, *, cache_dir, workers):
+        """La pagella di ciascuna partita, nell'ordine dato: da disco quando la sua
+        chiave non e' cambiata, altrimenti calcolata — in un pool di processi.
+
+        La chiave e' l'impronta della partita (``match_data_versions``) con quella
+        del modello: fingerprint del voto, mappa dei ruoli, e il riferimento e le
+        medie effettivamente usati (che senza calibrazione fissa si muovono con la
+        stagione)."""
+        model = hashlib.sha1(repr((scoring_fingerprint(), cr.roles_digest(), ref, avgs))
+                             .encode()).hexdigest()[:12]
+        versions = match_data_versions(cs_id)
+        keys = {m.id: hashlib.sha1(f"{versions.get(m.id)}:{model}".encode()).hexdigest()[:16]
+                for m in matches}
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        found, todo = {}, []
+        for m in matches:
+            try:
+                found[m.id] = pickle.loads(
+                    (cache_dir / f"pagella-{m.id}-{keys[m.id]}.pickle").read_bytes())
+            except (OSError, pickle.UnpicklingError, EOFError):
+                todo.append(m)
+        self.stdout.write(f"  {len(found)} pagelle dalla cache, {len(todo)} da calcolare")
+        # I processi leggono la banca dati, ognuno con la SUA connessione.
+        scored = fork_pool.fork_map(_score, todo, workers=workers, uses_database=True,
+                                    state={"ref": ref, "avgs": avgs, "dir": cache_dir,
+                                           "keys": keys})
+        found.update(zip((m.id for m in todo), scored))
+        return [found[m.id] for m in matches]
+
+    def _write_page(self, outdir, name, inputs, render, manifest):
+        """Scrive ``name`` solo se i suoi dati o il codice che la disegna sono
+        cambiati dall'ultima volta (o se il file non c'e' piu'). True se l'ha
+        scritta; ``render`` puo' restituire "" per dire che la pagina non serve."""
+        digest = hashlib.sha1(f"{_RENDER_VERSION}:{inputs!r}".encode()).hexdigest()
+        if manifest.get(name) == digest and (outdir / name).exists():
+            return False
+        page = render()
+        if not page:
+            return False
+        (outdir / name).write_text(page, encoding="utf-8")
+        manifest[name] = digest
+        return True
+
     # ------------------------------------------------------------------- join
 
     def _resolve(self, pidx, pid_first, our_team, nome):
@@ -431,7 +516,9 @@ class Command(BaseCommand):
         outdir.mkdir(parents=True, exist_ok=True)
 
         self.stdout.write("Calcolo voto puro + spiegazione per ogni partita…")
-        ours, fixtures = self._our_side(cs_id, wanted)
+        ours, fixtures = self._our_side(
+            cs_id, wanted, cache_dir=Path(o["cache_dir"] or outdir / ".cache"),
+            workers=fork_pool.resolve_workers(o["workers"]))
         team_map = DiscCmd()._our_team_index(cs_id)
         pidx, _pid_team, pid_first = DiscCmd()._our_player_index(cs_id)
 
@@ -452,6 +539,12 @@ class Command(BaseCommand):
         days.sort(key=lambda d: d["gd"])
         gds = [d["gd"] for d in days]
 
+        manifest_path = outdir / ".pagine.json"
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = {}
+        written = 0
         for i, d in enumerate(days):
             rows = [r for b in d["blocks"] for r in b["rows"]]
             d["rows"] = rows
@@ -459,16 +552,17 @@ class Command(BaseCommand):
                           "cov": self._coverage(rows)}
             d["prev"] = gds[i - 1] if i else None
             d["next"] = gds[i + 1] if i + 1 < len(gds) else None
-            (outdir / f"giornata-{d['gd']:02d}.html").write_text(
-                self._render_matchday(d), encoding="utf-8")
-
-        (outdir / "index.html").write_text(self._render_index(days), encoding="utf-8")
-        allrows_ = [r for d in days for r in d["rows"]]
-        page = self._render_divergences(allrows_)
-        if page:
-            (outdir / "divergenze.html").write_text(page, encoding="utf-8")
+            written += self._write_page(outdir, f"giornata-{d['gd']:02d}.html", d,
+                                        lambda d=d: self._render_matchday(d), manifest)
 
         allrows = [r for d in days for r in d["rows"]]
+        written += self._write_page(outdir, "index.html", days,
+                                    lambda: self._render_index(days), manifest)
+        written += self._write_page(outdir, "divergenze.html", allrows,
+                                    lambda: self._render_divergences(allrows), manifest)
+        manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True),
+                                 encoding="utf-8")
+
         sf, ss = self._agg(allrows, "f"), self._agg(allrows, "s")
         cov = self._coverage(allrows)
         self.stdout.write(self.style.SUCCESS(
@@ -480,6 +574,7 @@ class Command(BaseCommand):
         self.stdout.write(
             f"  vs Statistico: n={ss['n']} MAE={f2(ss['mae'])} bias={signed(ss['bias'])} "
             f"corr={f2(ss['corr'])} entro 0.5={f1(ss['w05'])}%")
+        self.stdout.write(f"{written} pagine riscritte, le altre erano gia' aggiornate")
         self.stdout.write(f"report -> {outdir / 'index.html'}")
 
     # ---------------------------------------------------------------- rendering
@@ -7,9 +7,12 @@ from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 from django.core.management.base import BaseCommand
 
 from realdata.models import Match, PlayerZoneFeature, SIDE_AWAY, SIDE_HOME
+from realdata.services import fork_pool
+from vfoot.services import season_tensor
 from vfoot.services.duel_engine import DUEL_BONUS_RATE
 from vfoot.services.realdata_scoring import (
     BASE_ZONE_RATING,
@@ -20,6 +23,7 @@ from vfoot.services.realdata_scoring import (
     statsbomb_zone_to_contract,
     starting_player_ids_for_real_match,
 )
+from vfoot.services.season_tensor import SeasonTensor
 from vfoot.services.zone_engine import make_zone_grid
 
 
@@ -93,32 +97,6 @@ class FeatureParams:
         return FeatureParams(**values)
 
 
-def hard_goals(score: float) -> int:
-    if score < 66.0:
-        return 0
-    return math.floor((score - 66.0) / 6.0) + 1
-
-
-def sign(a: float, b: float) -> int:
-    if a > b:
-        return 1
-    if a < b:
-        return -1
-    return 0
-
-
-def sigmoid(x: float) -> float:
-    if x >= 40:
-        return 1.0
-    if x <= -40:
-        return 0.0
-    return 1.0 / (1.0 + math.exp(-x))
-
-
-def soft_goals(score: float, tau: float) -> float:
-    return sum(sigmoid((score - threshold) / tau) for threshold in GOAL_THRESHOLDS)
-
-
 def _normalise(values: list[float]) -> list[float]:
     total = sum(max(0.0, value) for value in values)
     if total <= 0.0:
@@ -126,17 +104,6 @@ def _normalise(values: list[float]) -> list[float]:
     return [max(0.0, value) / total for value in values]
 
 
-def _overcrowding_renormalize(values: list[float]) -> list[float]:
-    total = sum(values)
-    if total <= 1.0 or total <= 0.0:
-        return values
-    return [value / total for value in values]
-
-
-def _clamp(value: float, lo: float, hi: float) -> float:
-    return max(lo, min(hi, value))
-
-
 def _feature_group(feature_key: str) -> str | None:
     for group, keys in FEATURE_GROUPS.items():
         if feature_key in keys:
@@ -144,62 +111,95 @@ def _feature_group(feature_key: str) -> str | None:
     return None
 
 
-def _team_scores(players: tuple[PlayerSample, ...], params: FeatureParams, zone_count: int) -> tuple[list[float], list[float]]:
-    pure_scores = [0.0] * zone_count
-    player_pure_votes: list[float] = []
-    player_zone_ratings: list[list[float]] = []
-
-    multipliers = params.as_dict()
-    for player in players:
-        ratings: list[float] = []
-        for zi in range(zone_count):
-            quality = 0.0
-            for group in FEATURE_GROUPS:
-                quality += player.grouped_quality[group][zi] * multipliers[group]
-            ratings.append(_clamp(BASE_ZONE_RATING + quality, MIN_ZONE_RATING, MAX_ZONE_RATING))
-        player_zone_ratings.append(ratings)
-        player_pure_votes.append(sum(player.presence[zi] * ratings[zi] for zi in range(zone_count)))
-
-    base_scores = [0.0] * zone_count
-    for zi in range(zone_count):
-        zone_presences = _overcrowding_renormalize([player.presence[zi] for player in players])
-        for pi, presence in enumerate(zone_presences):
-            pure_scores[zi] += presence * player_zone_ratings[pi][zi]
-            base_scores[zi] += presence * player_pure_votes[pi]
-    return pure_scores, base_scores
-
-
-def raw_match_score(sample: MatchSample, params: FeatureParams, zone_count: int) -> tuple[float, float]:
-    home_pure, home_base = _team_scores(sample.home_players, params, zone_count)
-    away_pure, away_base = _team_scores(sample.away_players, params, zone_count)
-
-    home_total = 0.0
-    away_total = 0.0
-    for zi in range(zone_count):
-        if abs(home_pure[zi] - away_pure[zi]) < 1e-9:
-            home_total += home_base[zi]
-            away_total += away_base[zi]
-        elif home_pure[zi] > away_pure[zi]:
-            home_total += home_base[zi] * (1.0 + DUEL_BONUS_RATE)
-            away_total += away_base[zi] * (1.0 - DUEL_BONUS_RATE)
-        else:
-            home_total += home_base[zi] * (1.0 - DUEL_BONUS_RATE)
-            away_total += away_base[zi] * (1.0 + DUEL_BONUS_RATE)
-    return home_total, away_total
-
-
-def adjusted_scores(sample: MatchSample, params: FeatureParams, zone_count: int) -> tuple[float, float]:
-    raw_home, raw_away = raw_match_score(sample, params, zone_count)
-    home = raw_home * params.scale + params.offset + params.home_advantage
-    away = raw_away * params.scale + params.offset - params.home_advantage
-    return home, away
+PARAM_NAMES = tuple(FeatureParams().as_dict())
+_GROUP_COUNT = len(FEATURE_GROUPS)
+_REG_WEIGHTS = np.array([1.0] * _GROUP_COUNT + [1.0, 1.0 / 36.0, 1.0])
+_LOWER = np.array([0.0] * _GROUP_COUNT + [0.75, 0.0, -2.5])
+_UPPER = np.array([4.0] * _GROUP_COUNT + [1.25, 18.0, 2.5])
 
 
-def objective(
-    samples: list[MatchSample],
-    params: FeatureParams,
+@dataclass(frozen=True)
+class PackedSamples:
+    """The samples as dense arrays, built once: the objective is then a handful of
+    array operations per evaluation instead of a walk over every sample, player,
+    zone and feature group.
+
+    ``presence`` is matches × sides × players × zones and ``quality`` the same with
+    the feature groups before the zones. A side with fewer than the widest line-up
+    is padded with players of no presence, who add nothing anywhere.
+    """
+    presence: np.ndarray
+    quality: np.ndarray
+    goals: np.ndarray           # matches × sides
+
+    def __len__(self) -> int:
+        return len(self.goals)
+
+
+def pack_samples(samples: list[MatchSample], zone_count: int) -> PackedSamples:
+    width = max((len(players) for s in samples
+                 for players in (s.home_players, s.away_players)), default=0)
+    presence = np.zeros((len(samples), 2, width, zone_count))
+    quality = np.zeros((len(samples), 2, width, _GROUP_COUNT, zone_count))
+    for m, sample in enumerate(samples):
+        for s, players in enumerate((sample.home_players, sample.away_players)):
+            for p, player in enumerate(players):
+                presence[m, s, p] = player.presence
+                quality[m, s, p] = [player.grouped_quality[g] for g in FEATURE_GROUPS]
+    goals = np.array([[s.real_home_goals, s.real_away_goals] for s in samples],
+                     dtype=float).reshape(len(samples), 2)
+    return PackedSamples(presence=presence, quality=quality, goals=goals)
+
+
+def _theta(params: FeatureParams) -> np.ndarray:
+    return np.array([params.as_dict()[name] for name in PARAM_NAMES])
+
+
+def _clipped(thetas: np.ndarray) -> np.ndarray:
+    """``FeatureParams.clipped`` for a stack of parameter vectors."""
+    return np.clip(thetas, _LOWER, _UPPER)
+
+
+def raw_scores(packed: PackedSamples, thetas: np.ndarray) -> np.ndarray:
+    """The zone-duel totals, parameter sets × matches × sides, for every parameter
+    vector in ``thetas`` at once."""
+    ratings = np.clip(
+        BASE_ZONE_RATING + np.einsum("mspgz,kg->kmspz", packed.quality,
+                                     thetas[:, :_GROUP_COUNT]),
+        MIN_ZONE_RATING, MAX_ZONE_RATING)
+    presence = packed.presence[None]
+    pure_votes = (presence * ratings).sum(axis=-1)                    # k m s p
+    crowd = packed.presence.sum(axis=2, keepdims=True)                # m s 1 z
+    shares = (packed.presence / np.where(crowd > 1.0, crowd, 1.0))[None]
+    pure = (shares * ratings).sum(axis=3)                             # k m s z
+    base = (shares * pure_votes[..., None]).sum(axis=3)
+    gap = pure[:, :, 0] - pure[:, :, 1]
+    edge = np.where(np.abs(gap) < 1e-9, 0.0, np.sign(gap))
+    home = (base[:, :, 0] * (1.0 + edge * DUEL_BONUS_RATE)).sum(axis=-1)
+    away = (base[:, :, 1] * (1.0 - edge * DUEL_BONUS_RATE)).sum(axis=-1)
+    return np.stack([home, away], axis=-1)
+
+
+def adjusted_scores(raw: np.ndarray, thetas: np.ndarray) -> np.ndarray:
+    scale, offset, home_advantage = (thetas[:, i, None, None] for i in
+                                     range(_GROUP_COUNT, _GROUP_COUNT + 3))
+    return raw * scale + offset + home_advantage * np.array([1.0, -1.0])
+
+
+def hard_goals(score: np.ndarray) -> np.ndarray:
+    return np.where(score < 66.0, 0, np.floor((score - 66.0) / 6.0) + 1)
+
+
+def soft_goals(score: np.ndarray, tau: float) -> np.ndarray:
+    x = (score[..., None] - np.array(GOAL_THRESHOLDS)) / tau
+    sig = 1.0 / (1.0 + np.exp(-np.clip(x, -40.0, 40.0)))
+    return np.where(x >= 40, 1.0, np.where(x <= -40, 0.0, sig)).sum(axis=-1)
+
+
+def objective_batch(
+    packed: PackedSamples,
+    thetas: np.ndarray,
     *,
-    zone_count: int,
     tau: float,
     diff_weight: float,
     sign_weight: float,
@@ -207,144 +207,160 @@ def objective(
     sign_tau: float,
     regularization: float,
     prior: FeatureParams,
-) -> float:
-    if not samples:
+) -> np.ndarray:
+    """The training loss of every parameter vector in ``thetas``."""
+    if not len(packed):
+        return np.zeros(len(thetas))
+    reg = regularization * (((thetas - _theta(prior)) ** 2) * _REG_WEIGHTS).sum(axis=1)
+    adjusted = adjusted_scores(raw_scores(packed, thetas), thetas)
+    pred = soft_goals(adjusted, tau)
+    real = packed.goals
+    goal_loss = ((pred - real) ** 2).sum(axis=-1)
+    diff_loss = ((pred[..., 0] - pred[..., 1]) - (real[:, 0] - real[:, 1])) ** 2
+    real_sign = np.sign(real[:, 0] - real[:, 1])
+    score_diff = adjusted[..., 0] - adjusted[..., 1]
+    sign_loss = np.where(real_sign == 0, draw_weight * (score_diff / 6.0) ** 2,
+                         np.log1p(np.exp(-real_sign * score_diff / sign_tau)))
+    total = goal_loss + diff_weight * diff_loss + sign_weight * sign_loss
+    return total.mean(axis=1) + reg
+
+
+def objective(packed: PackedSamples, params: FeatureParams, **kwargs) -> float:
+    if not len(packed):
         return 0.0
-    total = 0.0
-    for sample in samples:
-        adj_home, adj_away = adjusted_scores(sample, params, zone_count)
-        pred_home = soft_goals(adj_home, tau)
-        pred_away = soft_goals(adj_away, tau)
-        goal_loss = (pred_home - sample.real_home_goals) ** 2 + (pred_away - sample.real_away_goals) ** 2
-        diff_loss = ((pred_home - pred_away) - (sample.real_home_goals - sample.real_away_goals)) ** 2
-        real_sign = sign(sample.real_home_goals, sample.real_away_goals)
-        score_diff = adj_home - adj_away
-        if real_sign == 0:
-            sign_loss = draw_weight * (score_diff / 6.0) ** 2
-        else:
-            sign_loss = math.log1p(math.exp(-real_sign * score_diff / sign_tau))
-        total += goal_loss + diff_weight * diff_loss + sign_weight * sign_loss
+    return float(objective_batch(packed, _theta(params)[None], **kwargs)[0])
+
+
+FINITE_DIFFERENCE_STEPS = np.array([0.02] * _GROUP_COUNT + [0.002, 0.02, 0.02])
+SPSA_SCALES = np.array([1.0] * _GROUP_COUNT + [0.08, 2.0, 1.0])
 
-    p = params.as_dict()
-    q = prior.as_dict()
-    reg = 0.0
-    for group in FEATURE_GROUPS:
-        reg += (p[group] - q[group]) ** 2
-    reg += (p["scale"] - q["scale"]) ** 2
-    reg += ((p["offset"] - q["offset"]) / 6.0) ** 2
-    reg += (p["home_advantage"] - q["home_advantage"]) ** 2
-    return total / len(samples) + regularization * reg
-
-
-def finite_difference_gradient(samples: list[MatchSample], params: FeatureParams, **kwargs) -> dict[str, float]:
-    steps = {
-        "passing": 0.02,
-        "progression": 0.02,
-        "chance_creation": 0.02,
-        "shooting": 0.02,
-        "duels": 0.02,
-        "defending": 0.02,
-        "pressure": 0.02,
-        "errors": 0.02,
-        "scale": 0.002,
-        "offset": 0.02,
-        "home_advantage": 0.02,
-    }
-    base = params.as_dict()
-    grads: dict[str, float] = {}
-    for name, step in steps.items():
-        plus = base.copy()
-        minus = base.copy()
-        plus[name] += step
-        minus[name] -= step
-        loss_plus = objective(samples, FeatureParams(**plus).clipped(), **kwargs)
-        loss_minus = objective(samples, FeatureParams(**minus).clipped(), **kwargs)
-        grads[name] = (loss_plus - loss_minus) / (2.0 * step)
-    return grads
+
+def finite_difference_gradient(packed: PackedSamples, params: FeatureParams,
+                               **kwargs) -> dict[str, float]:
+    """Central differences, every parameter's two evaluations in one batch."""
+    step = np.diag(FINITE_DIFFERENCE_STEPS)
+    theta = _theta(params)
+    losses = objective_batch(packed, _clipped(np.vstack([theta + step, theta - step])),
+                             **kwargs)
+    n = len(PARAM_NAMES)
+    grads = (losses[:n] - losses[n:]) / (2.0 * FINITE_DIFFERENCE_STEPS)
+    return dict(zip(PARAM_NAMES, grads.tolist()))
 
 
 def spsa_gradient(
-    samples: list[MatchSample],
+    packed: PackedSamples,
     params: FeatureParams,
     *,
     rng: random.Random,
     perturbation: float,
     **kwargs,
 ) -> dict[str, float]:
-    names = list(params.as_dict())
-    base = params.as_dict()
-    delta = {name: (1.0 if rng.random() >= 0.5 else -1.0) for name in names}
-    scales = {
-        "scale": 0.08,
-        "offset": 2.0,
-        "home_advantage": 1.0,
-    }
-    for group in FEATURE_GROUPS:
-        scales[group] = 1.0
-
-    plus = base.copy()
-    minus = base.copy()
-    for name in names:
-        step = perturbation * scales[name] * delta[name]
-        plus[name] += step
-        minus[name] -= step
+    delta = np.array([1.0 if rng.random() >= 0.5 else -1.0 for _ in PARAM_NAMES])
+    step = perturbation * SPSA_SCALES * delta
+    theta = _theta(params)
+    loss_plus, loss_minus = objective_batch(
+        packed, _clipped(np.vstack([theta + step, theta - step])), **kwargs)
+    return dict(zip(PARAM_NAMES, ((loss_plus - loss_minus) / (2.0 * step)).tolist()))
 
-    loss_plus = objective(samples, FeatureParams(**plus).clipped(), **kwargs)
-    loss_minus = objective(samples, FeatureParams(**minus).clipped(), **kwargs)
 
-    grads: dict[str, float] = {}
-    for name in names:
-        grads[name] = (loss_plus - loss_minus) / (2.0 * perturbation * scales[name] * delta[name])
-    return grads
-
-
-def metrics(samples: list[MatchSample], params: FeatureParams, zone_count: int) -> dict[str, float]:
-    if not samples:
+def metrics(packed: PackedSamples, params: FeatureParams) -> dict[str, float]:
+    n = len(packed)
+    if not n:
         return {"matches": 0}
-    total_abs = 0.0
-    wdl_hits = 0
-    exact_hits = 0
-    pred_goal_sum = 0
-    real_goal_sum = 0
-    raw_sign_hits = 0
-    soft_abs = 0.0
-    soft_wdl_hits = 0
-    soft_diff_abs = 0.0
-    soft_goal_sum = 0.0
-    for sample in samples:
-        raw_home, raw_away = raw_match_score(sample, params, zone_count)
-        adj_home = raw_home * params.scale + params.offset + params.home_advantage
-        adj_away = raw_away * params.scale + params.offset - params.home_advantage
-        soft_home = soft_goals(adj_home, 1.25)
-        soft_away = soft_goals(adj_away, 1.25)
-        pred_home = hard_goals(adj_home)
-        pred_away = hard_goals(adj_away)
-        total_abs += abs(pred_home - sample.real_home_goals) + abs(pred_away - sample.real_away_goals)
-        wdl_hits += int(sign(pred_home, pred_away) == sign(sample.real_home_goals, sample.real_away_goals))
-        soft_wdl_hits += int(sign(soft_home, soft_away) == sign(sample.real_home_goals, sample.real_away_goals))
-        raw_sign_hits += int(sign(raw_home, raw_away) == sign(sample.real_home_goals, sample.real_away_goals))
-        exact_hits += int(pred_home == sample.real_home_goals and pred_away == sample.real_away_goals)
-        pred_goal_sum += pred_home + pred_away
-        real_goal_sum += sample.real_home_goals + sample.real_away_goals
-        soft_goal_sum += soft_home + soft_away
-        soft_abs += abs(soft_home - sample.real_home_goals) + abs(soft_away - sample.real_away_goals)
-        soft_diff_abs += abs((soft_home - soft_away) - (sample.real_home_goals - sample.real_away_goals))
-    n = len(samples)
+    theta = _theta(params)[None]
+    raw = raw_scores(packed, theta)
+    adjusted = adjusted_scores(raw, theta)[0]
+    raw = raw[0]
+    soft = soft_goals(adjusted, 1.25)
+    pred = hard_goals(adjusted)
+    real = packed.goals
+    real_sign = np.sign(real[:, 0] - real[:, 1])
+
+    def same_sign(pair):
+        return float((np.sign(pair[:, 0] - pair[:, 1]) == real_sign).sum())
+
     return {
         "matches": n,
-        "soft_goal_mae_per_team": soft_abs / (2.0 * n),
-        "soft_wdl_accuracy": soft_wdl_hits / n,
-        "soft_goal_diff_mae": soft_diff_abs / n,
-        "soft_avg_pred_goals_per_team": soft_goal_sum / (2.0 * n),
-        "goal_mae_per_team": total_abs / (2.0 * n),
-        "wdl_accuracy": wdl_hits / n,
-        "raw_score_sign_accuracy": raw_sign_hits / n,
-        "exact_scoreline_accuracy": exact_hits / n,
-        "avg_pred_goals_per_team": pred_goal_sum / (2.0 * n),
-        "avg_real_goals_per_team": real_goal_sum / (2.0 * n),
+        "soft_goal_mae_per_team": float(np.abs(soft - real).sum()) / (2.0 * n),
+        "soft_wdl_accuracy": same_sign(soft) / n,
+        "soft_goal_diff_mae": float(np.abs((soft[:, 0] - soft[:, 1])
+                                           - (real[:, 0] - real[:, 1])).sum()) / n,
+        "soft_avg_pred_goals_per_team": float(soft.sum()) / (2.0 * n),
+        "goal_mae_per_team": float(np.abs(pred - real).sum()) / (2.0 * n),
+        "wdl_accuracy": same_sign(pred) / n,
+        "raw_score_sign_accuracy": same_sign(raw) / n,
+        "exact_scoreline_accuracy": float((pred == real).all(axis=1).sum()) / n,
+        "avg_pred_goals_per_team": float(pred.sum()) / (2.0 * n),
+        "avg_real_goals_per_team": float(real.sum()) / (2.0 * n),
     }
 
 
+def descend(train: PackedSamples, validation: PackedSamples, *, start: FeatureParams,
+            seed: int, epochs: int, learning_rate: float, optimizer: str,
+            perturbation: float, loss: dict) -> tuple[dict[str, float], float, list[str]]:
+    """One Adam run from ``start``: (best parameters on validation, their validation
+    loss, the progress lines). Self-contained, so restarts can run in a pool."""
+    params = start
+    best_params = FeatureParams(**params.as_dict())
+    best_validation_loss = float("inf")
+    adam_m = {name: 0.0 for name in PARAM_NAMES}
+    adam_v = {name: 0.0 for name in PARAM_NAMES}
+    beta1 = 0.9
+    beta2 = 0.999
+    eps = 1e-8
+    rng = random.Random(seed)
+    lines: list[str] = []
+
+    for epoch in range(1, epochs + 1):
+        if optimizer == "finite-diff":
+            grads = finite_difference_gradient(train, params, **loss)
+        else:
+            grads = spsa_gradient(train, params, rng=rng,
+                                  perturbation=perturbation / math.sqrt(epoch), **loss)
+        values = params.as_dict()
+        for name, grad in grads.items():
+            adam_m[name] = beta1 * adam_m[name] + (1.0 - beta1) * grad
+            adam_v[name] = beta2 * adam_v[name] + (1.0 - beta2) * grad * grad
+            m_hat = adam_m[name] / (1.0 - beta1**epoch)
+            v_hat = adam_v[name] / (1.0 - beta2**epoch)
+            values[name] -= learning_rate * m_hat / (math.sqrt(v_hat) + eps)
+        params = FeatureParams(**values).clipped()
+
+        validation_loss = objective(validation, params, **loss)
+        if validation_loss < best_validation_loss:
+            best_validation_loss = validation_loss
+            best_params = FeatureParams(**params.as_dict())
+
+        if epoch == 1 or epoch % 20 == 0 or epoch == epochs:
+            train_loss = objective(train, params, **loss)
+            lines.append(
+                f"epoch={epoch} train_loss={train_loss:.4f} validation_loss={validation_loss:.4f} "
+                f"params={params.as_dict()}"
+            )
+    return best_params.as_dict(), best_validation_loss, lines
+
+
+def _restart_start(prior: FeatureParams, seed: int, restart: int) -> FeatureParams:
+    """Restart 0 starts from the prior, as a single run always has; the others from
+    the prior with the group multipliers jittered by their own stream."""
+    if restart == 0:
+        return FeatureParams(**prior.as_dict())
+    rng = random.Random(f"{seed}:restart:{restart}")
+    values = prior.as_dict()
+    for group in FEATURE_GROUPS:
+        values[group] *= rng.uniform(0.5, 1.5)
+    return FeatureParams(**values).clipped()
+
+
+def _descend_restart(restart: int):
+    """One restart, on the samples and settings in ``fork_pool.shared``."""
+    shared = fork_pool.shared
+    seed = shared["seed"]
+    return descend(shared["train"], shared["validation"],
+                   start=_restart_start(shared["prior"], seed, restart),
+                   seed=seed + restart, **shared["settings"])
+
+
 class Command(BaseCommand):
     help = "Calibrate grouped StatsBomb quality-feature weights for real-data Vfoot scoring."
 
@@ -361,6 +377,10 @@ class Command(BaseCommand):
         parser.add_argument("--optimizer", choices=["spsa", "finite-diff"], default="spsa")
         parser.add_argument("--seed", type=int, default=42)
         parser.add_argument("--perturbation", type=float, default=0.08)
+        parser.add_argument("--restarts", type=int, default=1,
+                            help="Independent runs; the first starts from the prior, "
+                                 "the others from a jittered copy of it.")
+        fork_pool.add_workers_argument(parser, "Processes for the restarts")
         parser.add_argument("--output", type=str, default="calibration/realdata_scoring_v1_feature_groups.json")
         parser.add_argument("--no-write", action="store_true")
 
@@ -376,13 +396,13 @@ class Command(BaseCommand):
         train_samples = [sample for sample in samples if sample.match_id % validation_mod != 0]
         validation_samples = [sample for sample in samples if sample.match_id % validation_mod == 0]
 
-        prior = FeatureParams()
-        params = FeatureParams()
-        best_params = FeatureParams(**params.as_dict())
-        best_validation_loss = float("inf")
+        zone_count = len(zone_ids)
+        train = pack_samples(train_samples, zone_count)
+        validation = pack_samples(validation_samples, zone_count)
+        everything = pack_samples(samples, zone_count)
 
+        prior = FeatureParams()
         kwargs = {
-            "zone_count": len(zone_ids),
             "tau": float(options["tau"]),
             "diff_weight": float(options["diff_weight"]),
             "sign_weight": float(options["sign_weight"]),
@@ -391,51 +411,32 @@ class Command(BaseCommand):
             "regularization": float(options["regularization"]),
             "prior": prior,
         }
-        lr = float(options["learning_rate"])
-        epochs = int(options["epochs"])
-        adam_m = {name: 0.0 for name in params.as_dict()}
-        adam_v = {name: 0.0 for name in params.as_dict()}
-        beta1 = 0.9
-        beta2 = 0.999
-        eps = 1e-8
-        rng = random.Random(int(options["seed"]))
         optimizer = str(options["optimizer"])
-        perturbation = float(options["perturbation"])
+        settings = {
+            "epochs": int(options["epochs"]),
+            "learning_rate": float(options["learning_rate"]),
+            "optimizer": optimizer,
+            "perturbation": float(options["perturbation"]),
+            "loss": kwargs,
+        }
+        seed = int(options["seed"])
+        restarts = max(1, int(options["restarts"]))
+        workers = fork_pool.resolve_workers(options["workers"])
 
         self.stdout.write(f"samples={len(samples)} train={len(train_samples)} validation={len(validation_samples)}")
-        self.stdout.write(f"initial_metrics={json.dumps(metrics(samples, params, len(zone_ids)), sort_keys=True)}")
-
-        for epoch in range(1, epochs + 1):
-            if optimizer == "finite-diff":
-                grads = finite_difference_gradient(train_samples, params, **kwargs)
-            else:
-                grads = spsa_gradient(
-                    train_samples,
-                    params,
-                    rng=rng,
-                    perturbation=perturbation / math.sqrt(epoch),
-                    **kwargs,
-                )
-            values = params.as_dict()
-            for name, grad in grads.items():
-                adam_m[name] = beta1 * adam_m[name] + (1.0 - beta1) * grad
-                adam_v[name] = beta2 * adam_v[name] + (1.0 - beta2) * grad * grad
-                m_hat = adam_m[name] / (1.0 - beta1**epoch)
-                v_hat = adam_v[name] / (1.0 - beta2**epoch)
-                values[name] -= lr * m_hat / (math.sqrt(v_hat) + eps)
-            params = FeatureParams(**values).clipped()
-
-            validation_loss = objective(validation_samples, params, **kwargs)
-            if validation_loss < best_validation_loss:
-                best_validation_loss = validation_loss
-                best_params = FeatureParams(**params.as_dict())
-
-            if epoch == 1 or epoch % 20 == 0 or epoch == epochs:
-                train_loss = objective(train_samples, params, **kwargs)
-                self.stdout.write(
-                    f"epoch={epoch} train_loss={train_loss:.4f} validation_loss={validation_loss:.4f} "
-                    f"params={params.as_dict()}"
-                )
+        self.stdout.write(f"initial_metrics={json.dumps(metrics(everything, prior), sort_keys=True)}")
+
+        # Each restart carries its own seed (see fork_pool.fork_map).
+        runs = fork_pool.fork_map(_descend_restart, range(restarts), workers=workers,
+                                  state={"train": train, "validation": validation,
+                                         "prior": prior, "seed": seed, "settings": settings})
+        for restart, (_, _, lines) in enumerate(runs):
+            for line in lines:
+                self.stdout.write(f"restart={restart} {line}" if restarts > 1 else line)
+        # The first restart with the lowest validation loss: ties go to the prior.
+        best_values, _ = min(((values, loss) for values, loss, _ in runs),
+                             key=lambda run: run[1])
+        best_params = FeatureParams(**best_values)
 
         result = {
             "formula_version": "realdata_scoring_v1_feature_groups_gd",
@@ -449,12 +450,13 @@ class Command(BaseCommand):
                 "tau": kwargs["tau"],
                 "validation_mod": validation_mod,
                 "optimizer": optimizer,
+                "restarts": restarts,
             },
             "params": best_params.as_dict(),
             "metrics": {
-                "train": metrics(train_samples, best_params, len(zone_ids)),
-                "validation": metrics(validation_samples, best_params, len(zone_ids)),
-                "all": metrics(samples, best_params, len(zone_ids)),
+                "train": metrics(train, best_params),
+                "validation": metrics(validation, best_params),
+                "all": metrics(everything, best_params),
             },
         }
         self.stdout.write(self.style.SUCCESS(json.dumps(result, indent=2, sort_keys=True)))
@@ -479,12 +481,24 @@ class Command(BaseCommand):
             .distinct()
             .order_by("id")
         )
+        # One season tensor per (season, provider) when export_season_tensor left a
+        # current one: a match found in it is read off the array, not the zone rows.
+        tensors: dict[tuple[int, str], SeasonTensor | None] = {}
         for match in matches:
             home_ids = list(starting_player_ids_for_real_match(match, SIDE_HOME)[:11])
             away_ids = list(starting_player_ids_for_real_match(match, SIDE_AWAY)[:11])
             if len(home_ids) < 8 or len(away_ids) < 8:
                 continue
-            players = self._load_players(match, set(home_ids + away_ids), zone_index, zone_count)
+            key = (match.competition_season_id, match.external_source)
+            if key not in tensors:
+                tensors[key] = season_tensor.load(*key)
+            tensor = tensors[key]
+            if tensor is not None and tensor.has_match(match.id):
+                players = self._tensor_players(tensor, match, set(home_ids + away_ids),
+                                               zone_index, zone_count)
+            else:
+                players = self._load_players(match, set(home_ids + away_ids),
+                                             zone_index, zone_count)
             home_players = tuple(player for player in players if player.player_id in home_ids)
             away_players = tuple(player for player in players if player.player_id in away_ids)
             if len(home_players) < 8 or len(away_players) < 8:
@@ -533,17 +547,60 @@ class Command(BaseCommand):
             if group:
                 grouped_quality[player_id][group][zi] += value * QUALITY_FEATURE_WEIGHTS.get(feature_key, 0.0)
 
-        players: list[PlayerSample] = []
-        for player_id in player_ids:
-            presence = _normalise(presence_volume[player_id])
-            if sum(presence) <= 0.0:
+        return _player_samples(player_ids, presence_volume, grouped_quality, sides)
+
+    def _tensor_players(
+        self,
+        tensor: SeasonTensor,
+        match: Match,
+        player_ids: set[int],
+        zone_index: dict[str, int],
+        zone_count: int,
+    ) -> list[PlayerSample]:
+        """``_load_players`` for a match held in a season tensor: the same weighted
+        sums, taken over the feature axis of the match's slice."""
+        zone_cols = [(zi, zone_index[statsbomb_zone_to_contract(z)])
+                     for zi, z in enumerate(tensor.zones)
+                     if statsbomb_zone_to_contract(z) in zone_index]
+        presence_w = np.array([PRESENCE_FEATURE_WEIGHTS.get(f, 0.0) for f in tensor.features])
+        group_w = {
+            group: np.array([QUALITY_FEATURE_WEIGHTS.get(f, 0.0) if _feature_group(f) == group
+                             else 0.0 for f in tensor.features])
+            for group in FEATURE_GROUPS
+        }
+        presence_volume: dict[int, list[float]] = defaultdict(lambda: [0.0] * zone_count)
+        grouped_quality: dict[int, dict[str, list[float]]] = defaultdict(
+            lambda: {group: [0.0] * zone_count for group in FEATURE_GROUPS}
+        )
+        sides: dict[int, str] = {}
+        rows = tensor.match_rows(match.id)
+        for r in range(rows.start, rows.stop):
+            player_id = int(tensor.player_ids[r])
+            if player_id not in player_ids or not tensor.present[r].any():
                 continue
-            players.append(
-                PlayerSample(
-                    player_id=player_id,
-                    side=sides.get(player_id, ""),
-                    presence=presence,
-                    grouped_quality=grouped_quality[player_id],
-                )
+            sides[player_id] = season_tensor.SIDES[int(tensor.sides[r])]
+            values = np.asarray(tensor.values[r])      # [F, Z]
+            presence = presence_w @ values
+            quality = {group: w @ values for group, w in group_w.items()}
+            for src, dst in zone_cols:
+                presence_volume[player_id][dst] += float(presence[src])
+                for group in FEATURE_GROUPS:
+                    grouped_quality[player_id][group][dst] += float(quality[group][src])
+        return _player_samples(player_ids, presence_volume, grouped_quality, sides)
+
+
+def _player_samples(player_ids, presence_volume, grouped_quality, sides) -> list[PlayerSample]:
+    players: list[PlayerSample] = []
+    for player_id in player_ids:
+        presence = _normalise(presence_volume[player_id])
+        if sum(presence) <= 0.0:
+            continue
+        players.append(
+            PlayerSample(
+                player_id=player_id,
+                side=sides.get(player_id, ""),
+                presence=presence,
+                grouped_quality=grouped_quality[player_id],
             )
-        return players
+        )
+    return players
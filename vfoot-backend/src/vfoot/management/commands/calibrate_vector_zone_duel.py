@@ -3,10 +3,11 @@ from __future__ import annotations
 import json
 import math
 import random
-from collections import Counter, defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
+
 from django.core.management.base import BaseCommand
 
 from realdata.models import Match, SIDE_AWAY, SIDE_HOME, TeamZoneFeature
@@ -42,13 +43,25 @@ GOAL_THRESHOLDS = (66.0, 72.0, 78.0, 84.0, 90.0, 96.0)
 
 
 @dataclass(frozen=True)
-class VectorZoneSample:
-    match_id: int
-    zones_home: tuple[tuple[float, ...], ...]
-    zones_away: tuple[tuple[float, ...], ...]
-    zone_centrality: tuple[float, ...]  # per-zone centrality (1 central, 0 flank)
-    real_home_goals: int
-    real_away_goals: int
+class VectorZoneSamples:
+    """The matches as arrays, built once.
+
+    ``margins`` is matches × zones × features: the home side's features in a zone
+    minus the away side's in the MIRRORED zone (the opponent's frame), already
+    scaled. A candidate's zone margins are then one contraction with its weights,
+    and a batch of candidates is one contraction with a stack of them.
+    """
+    match_ids: np.ndarray
+    margins: np.ndarray
+    zone_centrality: np.ndarray  # per-zone centrality (1 central, 0 flank)
+    goals: np.ndarray            # matches × (home, away)
+
+    def __len__(self) -> int:
+        return len(self.match_ids)
+
+    def subset(self, mask: np.ndarray) -> "VectorZoneSamples":
+        return VectorZoneSamples(match_ids=self.match_ids[mask], margins=self.margins[mask],
+                                 zone_centrality=self.zone_centrality, goals=self.goals[mask])
 
 
 @dataclass
@@ -106,48 +119,53 @@ class VectorParams:
         return VectorParams(**values)
 
 
-def sign(a: float, b: float) -> int:
-    if a > b:
-        return 1
-    if a < b:
-        return -1
-    return 0
+PARAM_NAMES = tuple(VectorParams().as_dict())
+_HEAD = len(PARAM_NAMES) - len(FEATURES)     # base … zone_center_weight
+_LOWER = np.array([56.0, 0.5, -3.0, 0.1, 0.0]
+                  + [-4.0 if f in ERROR_FEATURES else 0.0 for f in FEATURES])
+_UPPER = np.array([76.0, 25.0, 3.0, 5.0, 0.6]
+                  + [0.0 if f in ERROR_FEATURES else 4.0 for f in FEATURES])
+_REG_SCALE = np.array([6.0 if n in {"base", "score_scale"} else 1.0 for n in PARAM_NAMES])
+SPSA_SCALES = np.array([{"base": 4.0, "score_scale": 4.0, "home_advantage": 1.0,
+                         "zone_center_weight": 0.3}.get(n, 1.0) for n in PARAM_NAMES])
 
 
-def sigmoid(x: float) -> float:
-    if x >= 40:
-        return 1.0
-    if x <= -40:
-        return 0.0
-    return 1.0 / (1.0 + math.exp(-x))
-
-
-def soft_goals(score: float, tau: float) -> float:
-    return sum(sigmoid((score - threshold) / tau) for threshold in GOAL_THRESHOLDS)
-
-
-def vector_scores(sample: VectorZoneSample, params: VectorParams) -> tuple[float, float]:
-    weights = [getattr(params, feature) for feature in FEATURES]
-    k = max(1e-6, params.saturation_k)
-    total = 0.0
-    weight_sum = 0.0
-    # sample.zones_away is already mirrored at load time, so zip pairs a home
-    # zone with the opponent's defensive (mirrored) zone — a specular duel.
-    # Central width bands are weighted (1 + zone_center_weight)× vs flanks.
-    for i, (home_vec, away_vec) in enumerate(zip(sample.zones_home, sample.zones_away)):
-        margin = sum(weights[j] * (home_vec[j] - away_vec[j]) for j in range(len(FEATURES)))
-        zone_weight = 1.0 + params.zone_center_weight * sample.zone_centrality[i]
-        total += zone_weight * k * math.tanh(margin / k)  # weighted saturating outcome
-        weight_sum += zone_weight
-    total_margin = total / max(1e-9, weight_sum)
-    home = params.base + params.home_advantage + params.score_scale * total_margin
-    away = params.base - params.home_advantage - params.score_scale * total_margin
-    return home, away
-
-
-def objective(
-    samples: list[VectorZoneSample],
-    params: VectorParams,
+def _theta(params: VectorParams) -> np.ndarray:
+    return np.array([params.as_dict()[name] for name in PARAM_NAMES])
+
+
+def _clipped(thetas: np.ndarray) -> np.ndarray:
+    """``VectorParams.clipped`` for a stack of parameter vectors."""
+    return np.clip(thetas, _LOWER, _UPPER)
+
+
+def vector_scores(samples: VectorZoneSamples, thetas: np.ndarray) -> np.ndarray:
+    """(home, away) scores, candidates × matches × 2, for every parameter vector in
+    ``thetas`` at once.
+
+    Per zone the margin saturates, ``K·tanh(margin / K)``: small K -> winning a
+    zone matters more than dominating it. Central width bands are weighted
+    (1 + zone_center_weight)× vs flanks."""
+    base, scale, home_advantage, saturation_k, center = (thetas[:, i] for i in range(_HEAD))
+    k = np.maximum(1e-6, saturation_k)[:, None, None]
+    margin = np.einsum("mzf,cf->cmz", samples.margins, thetas[:, _HEAD:])
+    zone_weight = 1.0 + center[:, None] * samples.zone_centrality[None, :]     # c z
+    total = (zone_weight[:, None, :] * k * np.tanh(margin / k)).sum(axis=-1)
+    total_margin = total / np.maximum(1e-9, zone_weight.sum(axis=-1))[:, None]
+    home = (base + home_advantage)[:, None] + scale[:, None] * total_margin
+    away = (base - home_advantage)[:, None] - scale[:, None] * total_margin
+    return np.stack([home, away], axis=-1)
+
+
+def soft_goals(score: np.ndarray, tau: float) -> np.ndarray:
+    x = (score[..., None] - np.array(GOAL_THRESHOLDS)) / tau
+    sig = 1.0 / (1.0 + np.exp(-np.clip(x, -40.0, 40.0)))
+    return np.where(x >= 40, 1.0, np.where(x <= -40, 0.0, sig)).sum(axis=-1)
+
+
+def objective_batch(
+    samples: VectorZoneSamples,
+    thetas: np.ndarray,
     *,
     tau: float,
     sign_weight: float,
@@ -156,83 +174,60 @@ def objective(
     sign_tau: float,
     regularization: float,
     prior: VectorParams,
-) -> float:
-    if not samples:
+) -> np.ndarray:
+    """The training loss of every parameter vector in ``thetas``."""
+    if not len(samples):
+        return np.zeros(len(thetas))
+    scores = vector_scores(samples, thetas)
+    pred = soft_goals(scores, tau)
+    real = samples.goals
+    goal_loss = ((pred - real) ** 2).sum(axis=-1)
+    diff_loss = ((pred[..., 0] - pred[..., 1]) - (real[:, 0] - real[:, 1])) ** 2
+    real_sign = np.sign(real[:, 0] - real[:, 1])
+    score_diff = scores[..., 0] - scores[..., 1]
+    sign_loss = np.where(real_sign == 0, draw_weight * (score_diff / 6.0) ** 2,
+                         np.log1p(np.exp(-real_sign * score_diff / sign_tau)))
+    total = goal_loss + diff_weight * diff_loss + sign_weight * sign_loss
+    reg = (((thetas - _theta(prior)) / _REG_SCALE) ** 2).sum(axis=1)
+    return total.mean(axis=1) + regularization * reg
+
+
+def objective(samples: VectorZoneSamples, params: VectorParams, **kwargs) -> float:
+    if not len(samples):
         return 0.0
-    total = 0.0
-    for sample in samples:
-        home_score, away_score = vector_scores(sample, params)
-        pred_home = soft_goals(home_score, tau)
-        pred_away = soft_goals(away_score, tau)
-        goal_loss = (pred_home - sample.real_home_goals) ** 2 + (pred_away - sample.real_away_goals) ** 2
-        diff_loss = ((pred_home - pred_away) - (sample.real_home_goals - sample.real_away_goals)) ** 2
-        real_sign = sign(sample.real_home_goals, sample.real_away_goals)
-        score_diff = home_score - away_score
-        if real_sign == 0:
-            sign_loss = draw_weight * (score_diff / 6.0) ** 2
-        else:
-            sign_loss = math.log1p(math.exp(-real_sign * score_diff / sign_tau))
-        total += goal_loss + diff_weight * diff_loss + sign_weight * sign_loss
-
-    p = params.as_dict()
-    q = prior.as_dict()
-    reg = 0.0
-    for key, value in p.items():
-        scale = 6.0 if key in {"base", "score_scale"} else 1.0
-        reg += ((value - q[key]) / scale) ** 2
-    return total / len(samples) + regularization * reg
-
-
-def spsa_gradient(samples: list[VectorZoneSample], params: VectorParams, *, rng: random.Random, perturbation: float, **kwargs) -> dict[str, float]:
-    names = list(params.as_dict())
-    base = params.as_dict()
-    delta = {name: (1.0 if rng.random() >= 0.5 else -1.0) for name in names}
-    scales = {name: 1.0 for name in names}
-    scales["base"] = 4.0
-    scales["score_scale"] = 4.0
-    scales["home_advantage"] = 1.0
-    scales["zone_center_weight"] = 0.3
-
-    plus = base.copy()
-    minus = base.copy()
-    for name in names:
-        step = perturbation * scales[name] * delta[name]
-        plus[name] += step
-        minus[name] -= step
-
-    loss_plus = objective(samples, VectorParams(**plus).clipped(), **kwargs)
-    loss_minus = objective(samples, VectorParams(**minus).clipped(), **kwargs)
-    return {
-        name: (loss_plus - loss_minus) / (2.0 * perturbation * scales[name] * delta[name])
-        for name in names
-    }
+    return float(objective_batch(samples, _theta(params)[None], **kwargs)[0])
 
 
-def metrics(samples: list[VectorZoneSample], params: VectorParams, tau: float) -> dict[str, float]:
-    if not samples:
-        return {"matches": 0}
-    soft_abs = 0.0
-    soft_wdl = 0
-    soft_diff_abs = 0.0
-    soft_goal_sum = 0.0
-    real_goal_sum = 0
-    for sample in samples:
-        home_score, away_score = vector_scores(sample, params)
-        pred_home = soft_goals(home_score, tau)
-        pred_away = soft_goals(away_score, tau)
-        soft_abs += abs(pred_home - sample.real_home_goals) + abs(pred_away - sample.real_away_goals)
-        soft_diff_abs += abs((pred_home - pred_away) - (sample.real_home_goals - sample.real_away_goals))
-        soft_wdl += int(sign(pred_home, pred_away) == sign(sample.real_home_goals, sample.real_away_goals))
-        soft_goal_sum += pred_home + pred_away
-        real_goal_sum += sample.real_home_goals + sample.real_away_goals
+def spsa_gradient(samples: VectorZoneSamples, params: VectorParams, *, rng: random.Random,
+                  perturbation: float, candidates: int = 1, **kwargs) -> dict[str, float]:
+    """The SPSA gradient averaged over ``candidates`` random directions, all of
+    whose ± evaluations are scored in one batch. One direction is the classic
+    estimate, and draws from ``rng`` exactly as it always has."""
+    theta = _theta(params)
+    deltas = np.array([[1.0 if rng.random() >= 0.5 else -1.0 for _ in PARAM_NAMES]
+                       for _ in range(candidates)])
+    steps = perturbation * SPSA_SCALES * deltas
+    losses = objective_batch(samples, _clipped(np.vstack([theta + steps, theta - steps])),
+                             **kwargs)
+    grads = (losses[:candidates] - losses[candidates:])[:, None] / (2.0 * steps)
+    return dict(zip(PARAM_NAMES, grads.mean(axis=0).tolist()))
+
+
+def metrics(samples: VectorZoneSamples, params: VectorParams, tau: float) -> dict[str, float]:
     n = len(samples)
+    if not n:
+        return {"matches": 0}
+    pred = soft_goals(vector_scores(samples, _theta(params)[None])[0], tau)
+    real = samples.goals
+    same_sign = np.sign(pred[:, 0] - pred[:, 1]) == np.sign(real[:, 0] - real[:, 1])
     return {
         "matches": n,
-        "soft_goal_mae_per_team": soft_abs / (2.0 * n),
-        "soft_wdl_accuracy": soft_wdl / n,
-        "soft_goal_diff_mae": soft_diff_abs / n,
-        "soft_avg_pred_goals_per_team": soft_goal_sum / (2.0 * n),
-        "avg_real_goals_per_team": real_goal_sum / (2.0 * n),
+        "soft_goal_mae_per_team": float(np.abs(pred - real).sum()) / (2.0 * n),
+        "soft_wdl_accuracy": float(same_sign.sum()) / n,
+        "soft_goal_diff_mae": float(np.abs((pred[:, 0] - pred[:, 1])
+                                           - (real[:, 0] - real[:, 1])).sum()) / n,
+        "soft_avg_pred_goals_per_team": float(pred.sum()) / (2.0 * n),
+        "avg_real_goals_per_team": float(real.sum()) / (2.0 * n),
     }
 
 
@@ -251,14 +246,18 @@ class Command(BaseCommand):
         parser.add_argument("--regularization", type=float, default=0.03)
         parser.add_argument("--validation-mod", type=int, default=5)
         parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--candidates", type=int, default=1,
+                            help="SPSA directions per epoch, scored in one batch and "
+                                 "averaged; 1 is the classic single-direction step.")
         parser.add_argument("--output", type=str, default="calibration/vector_zone_duel_v1.json")
         parser.add_argument("--no-write", action="store_true")
 
     def handle(self, *args, **options):
         samples, feature_scales = self._load_samples()
         validation_mod = int(options["validation_mod"])
-        train = [sample for sample in samples if sample.match_id % validation_mod != 0]
-        validation = [sample for sample in samples if sample.match_id % validation_mod == 0]
+        held_out = samples.match_ids % validation_mod == 0
+        train = samples.subset(~held_out)
+        validation = samples.subset(held_out)
 
         prior = VectorParams()
         params = VectorParams()
@@ -282,6 +281,7 @@ class Command(BaseCommand):
         lr = float(options["learning_rate"])
         epochs = int(options["epochs"])
         rng = random.Random(int(options["seed"]))
+        candidates = max(1, int(options["candidates"]))
         adam_m = {name: 0.0 for name in params.as_dict()}
         adam_v = {name: 0.0 for name in params.as_dict()}
         beta1 = 0.9
@@ -294,6 +294,7 @@ class Command(BaseCommand):
                 params,
                 rng=rng,
                 perturbation=float(options["perturbation"]) / math.sqrt(epoch),
+                candidates=candidates,
                 **kwargs,
             )
             values = params.as_dict()
@@ -323,6 +324,7 @@ class Command(BaseCommand):
             "loss": {
                 **{k: v for k, v in kwargs.items() if k != "prior"},
                 "validation_mod": validation_mod,
+                "candidates": candidates,
             },
             "params": best_params.as_dict(),
             "metrics": {
@@ -341,51 +343,47 @@ class Command(BaseCommand):
             out_path.write_text(json.dumps(result, indent=2, sort_keys=True) + "\n", encoding="utf-8")
             self.stdout.write(self.style.SUCCESS(f"Wrote {out_path}"))
 
-    def _load_samples(self) -> tuple[list[VectorZoneSample], dict[str, float]]:
-        raw: dict[int, dict[str, dict[str, dict[str, float]]]] = defaultdict(
-            lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
-        )
+    def _load_samples(self) -> tuple[VectorZoneSamples, dict[str, float]]:
         match_goals: dict[int, tuple[int, int]] = {}
         for match in Match.objects.filter(home_goals__isnull=False, away_goals__isnull=False).only("id", "home_goals", "away_goals"):
             match_goals[match.id] = (int(match.home_goals or 0), int(match.away_goals or 0))
 
-        for match_id, side, zone_key, feature_key, value in TeamZoneFeature.objects.filter(
+        rows = list(TeamZoneFeature.objects.filter(
             match_id__in=match_goals,
             feature_key__in=FEATURES,
-        ).values_list("match_id", "team_side", "zone_key", "feature_key", "value"):
-            raw[int(match_id)][str(zone_key)][str(side)][str(feature_key)] += float(value or 0.0)
-
-        max_values = {feature: 1e-9 for feature in FEATURES}
-        for zones in raw.values():
-            for sides in zones.values():
-                for side in (SIDE_HOME, SIDE_AWAY):
-                    for feature in FEATURES:
-                        max_values[feature] = max(max_values[feature], sides[side][feature])
-
-        zone_keys = sorted({zone for zones in raw.values() for zone in zones})
-        centrality = tuple(zone_centrality(zone_key) for zone_key in zone_keys)
-        samples: list[VectorZoneSample] = []
-        for match_id, zones in raw.items():
-            home_vectors = []
-            away_vectors = []
-            for zone_key in zone_keys:
-                home_sides = zones[zone_key]
-                # Away contribution to this physical zone comes from its mirrored
-                # (opponent-frame) zone, so the duel is specular.
-                away_sides = zones[mirror_zone(zone_key)]
-                home_vectors.append(tuple(home_sides[SIDE_HOME][feature] / max_values[feature] for feature in FEATURES))
-                away_vectors.append(tuple(away_sides[SIDE_AWAY][feature] / max_values[feature] for feature in FEATURES))
-            home_goals, away_goals = match_goals[match_id]
-            samples.append(
-                VectorZoneSample(
-                    match_id=match_id,
-                    zones_home=tuple(home_vectors),
-                    zones_away=tuple(away_vectors),
-                    zone_centrality=centrality,
-                    real_home_goals=home_goals,
-                    real_away_goals=away_goals,
-                )
-            )
-        samples.sort(key=lambda sample: sample.match_id)
+        ).values_list("match_id", "team_side", "zone_key", "feature_key", "value"))
+        match_ids = np.array(sorted({int(r[0]) for r in rows}), dtype=int)
+        zone_keys = sorted({str(r[2]) for r in rows})
+        row_of = {mid: i for i, mid in enumerate(match_ids.tolist())}
+        zone_of = {zone: i for i, zone in enumerate(zone_keys)}
+        feature_of = {feature: i for i, feature in enumerate(FEATURES)}
+        side_of = {SIDE_HOME: 0, SIDE_AWAY: 1}
+
+        # matches × sides × zones × features, with one empty zone at the end for a
+        # mirror that falls outside the zones seen (it reads as no activity).
+        tensor = np.zeros((len(match_ids), 2, len(zone_keys) + 1, len(FEATURES)))
+        keep = [r for r in rows if str(r[1]) in side_of]
+        np.add.at(tensor, ([row_of[int(r[0])] for r in keep],
+                           [side_of[str(r[1])] for r in keep],
+                           [zone_of[str(r[2])] for r in keep],
+                           [feature_of[str(r[3])] for r in keep]),
+                  [float(r[4] or 0.0) for r in keep])
+
+        maxima = np.maximum(1e-9, tensor.max(axis=(0, 1, 2), initial=0.0))
+        max_values = dict(zip(FEATURES, maxima.tolist()))
+        tensor /= maxima
+
+        # Away contribution to a physical zone comes from its mirrored
+        # (opponent-frame) zone, so the duel is specular.
+        mirror = np.array([zone_of.get(mirror_zone(zone), len(zone_keys)) for zone in zone_keys],
+                          dtype=int)
+        margins = tensor[:, 0, :len(zone_keys)] - tensor[:, 1, mirror]
+        goals = np.array([match_goals[mid] for mid in match_ids.tolist()],
+                         dtype=float).reshape(len(match_ids), 2)
+        samples = VectorZoneSamples(
+            match_ids=match_ids,
+            margins=margins,
+            zone_centrality=np.array([zone_centrality(zone) for zone in zone_keys]),
+            goals=goals,
+        )
         return samples, max_values
-
@@ -21,6 +21,10 @@ feature weighting. Comparing that ceiling to our hand-tuned model's correlation
 
 This does NOT modify the heuristic. It only measures.
 
+The season's feature rows and baseline votes are built once and cached
+(``season_extract``): a second target, fold count or ``--per-role`` run is a
+filter over them plus one factorisation per fold, not a rescoring of the season.
+
     python manage.py classic_fit_weights --target rating
     python manage.py classic_fit_weights --target statistico
     python manage.py classic_fit_weights --target fantacalcio --per-role
@@ -39,15 +43,19 @@ import openpyxl
 from pathlib import Path
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.management.base import BaseCommand, CommandError
 
-from realdata.models import Match, Player, PlayerTeamStint
+from realdata.models import Match, Player, PlayerTeamStint, PROVIDER_SOFASCORE
 from realdata.services.identity import norm_name
+from vfoot.services import season_tensor
+from vfoot.services.classic_pagella import data_version
 from vfoot.services.classic_rating import (
     EXTRAP_FLOOR_MINUTES, MIN_MINUTES_REFERENCE, PER90_WEIGHTS, TOTAL_WEIGHTS,
     WEIGHTS, _compress, _minutes_map, _per_match_player_totals, build_reference,
-    is_rated, current_role_map, voto_puro_for_match,
+    is_rated, current_role_map, roles_digest, voto_puro_for_match,
 )
+from vfoot.services.vote_reference import scoring_fingerprint
 
 FEATURES = list(TOTAL_WEIGHTS) + list(PER90_WEIGHTS)  # stable column order
 ROLES = [Player.ROLE_DEF, Player.ROLE_MID, Player.ROLE_FWD]  # outfield only
@@ -86,34 +94,106 @@ def _club_key(name):
     return " ".join(t for t in norm_name(name).split() if t not in fillers)
 
 
+def _ridge_path(X, R, y, alphas):
+    """Ridge coefficients ``[features, intercepts]`` for EVERY alpha, from one SVD.
+
+    The intercept columns ``R`` are not penalised, so they are projected out first:
+    the feature coefficients are a plain ridge of the within-intercept residuals,
+    ``β(α) = V diag(1 / (s² + α)) Vᵀ Xᵀ y`` on the SVD of those residuals, and the
+    intercepts are the least-squares fit of what β leaves. The same numbers as
+    solving the penalised normal equations once per alpha, for the price of one
+    factorisation."""
+    Rp = np.linalg.pinv(R)
+    Xc = X - R @ (Rp @ X)
+    yc = y - R @ (Rp @ y)
+    # The SVD through the features' Gram matrix: V and s² are its eigenvectors
+    # and eigenvalues, at p×p cost instead of n×p.
+    s2, V = np.linalg.eigh(Xc.T @ Xc)
+    vy = V.T @ (Xc.T @ yc)
+    out = []
+    for alpha in alphas:
+        beta = V @ (vy / (np.maximum(s2, 0.0) + alpha))
+        out.append(np.concatenate([beta, Rp @ (y - X @ beta)]))
+    return out
+
+
 def _ridge_cv(X, y, role_oh, alphas, folds, rng):
     """K-fold ridge; intercept columns (role one-hots) are NOT penalised.
     Returns (best_alpha, pooled out-of-fold predictions, refit coefs on full data)."""
-    n, p = X.shape
+    n = X.shape[0]
     Xa = np.hstack([X, role_oh])            # features + role intercepts
-    pen = np.concatenate([np.ones(p), np.zeros(role_oh.shape[1])])
     idx = rng.permutation(n)
     fold_id = np.array_split(idx, folds)
 
-    def fit(tr, alpha):
-        Xt, yt = Xa[tr], y[tr]
-        A = Xt.T @ Xt + alpha * np.diag(pen)
-        return np.linalg.solve(A, Xt.T @ yt)
+    preds = np.empty((len(alphas), n))
+    for f in range(folds):
+        te = fold_id[f]
+        tr = np.concatenate([fold_id[g] for g in range(folds) if g != f])
+        for a, coefs in enumerate(_ridge_path(X[tr], role_oh[tr], y[tr], alphas)):
+            preds[a, te] = Xa[te] @ coefs
 
     best, best_corr, best_pred = alphas[0], -2.0, None
-    for alpha in alphas:
-        pred = np.empty(n)
-        for f in range(folds):
-            te = fold_id[f]
-            tr = np.concatenate([fold_id[g] for g in range(folds) if g != f])
-            pred[te] = Xa[te] @ fit(tr, alpha)
+    for alpha, pred in zip(alphas, preds):
         c = _pearson(pred, y)
         if c > best_corr:
             best, best_corr, best_pred = alpha, c, pred
-    coefs = fit(np.arange(n), best)
+    coefs = _ridge_path(X, role_oh, y, [best])[0]
     return best, best_pred, coefs
 
 
+def season_extract(cs_id: int, *, rebuild: bool = False) -> dict:
+    """Every player-matchday our model rates in a season, ready to be a design matrix.
+
+    ``keys`` are (matchday, player id); ``X`` the compressed feature basis, one row
+    each; ``minutes`` and ``rated`` the gates; ``our`` the current model's voto puro,
+    the baseline. Building it scores the whole season match by match — minutes of
+    work — while a fit only filters it, so it is cached under the season's data
+    version, the scoring fingerprint and the role map: any of the three moving
+    makes the extract stale, and nothing else does.
+    """
+    key = (f"vfoot:fit_extract:{cs_id}:{data_version(cs_id)}"
+           f":{scoring_fingerprint()}:{roles_digest()}")
+    if not rebuild:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    match_ids = list(Match.objects.filter(competition_season_id=cs_id)
+                     .values_list("id", flat=True))
+    md_by_match = dict(Match.objects.filter(competition_season_id=cs_id)
+                       .values_list("id", "matchday"))
+    # a current season tensor spares the grouping (see export_season_tensor)
+    totals = _per_match_player_totals(
+        match_ids, season_tensor.load(cs_id, PROVIDER_SOFASCORE))
+    minutes = _minutes_map(match_ids)
+
+    # our current model's prediction on the same sample = the baseline
+    ref = build_reference(cs_id)
+    our_pred = {}
+    for m in Match.objects.filter(competition_season_id=cs_id):
+        for row in voto_puro_for_match(m, ref):
+            if row["rated"]:
+                our_pred[(m.matchday, row["player_id"])] = row["voto_puro"]
+
+    keys, rows, mins, rated, our = [], [], [], [], []
+    for (mid, pid), feats in totals.items():
+        k = (md_by_match[mid], pid)
+        if k not in our_pred:
+            continue
+        m = minutes.get((mid, pid), 0)
+        keys.append(k)
+        rows.append(_feature_row(feats, m))
+        mins.append(m)
+        rated.append(is_rated(m, feats))
+        our.append(our_pred[k])
+    data = {"keys": keys,
+            "X": np.asarray(rows, float).reshape(len(rows), len(FEATURES)),
+            "minutes": np.asarray(mins, int), "rated": np.asarray(rated, bool),
+            "our": np.asarray(our, float)}
+    cache.set(key, data, None)
+    return data
+
+
 class Command(BaseCommand):
     help = "Fit voto-puro feature weights to an external target vote (diagnostic)."
 
@@ -131,6 +211,9 @@ class Command(BaseCommand):
         parser.add_argument("--folds", type=int, default=5)
         parser.add_argument("--min-minutes", type=int, default=MIN_MINUTES_REFERENCE)
         parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--rebuild-extract", action="store_true",
+                            help="recompute the season's feature extract even if a "
+                                 "current one is cached")
 
     # -- target loaders --------------------------------------------------
 
@@ -265,12 +348,7 @@ class Command(BaseCommand):
             raise CommandError("no target votes loaded")
 
         # Build the sample: rated outfield player-matchdays that HAVE a target vote.
-        match_ids = list(Match.objects.filter(competition_season_id=cs_id)
-                         .values_list("id", flat=True))
-        md_by_match = dict(Match.objects.filter(competition_season_id=cs_id)
-                           .values_list("id", "matchday"))
-        totals = _per_match_player_totals(match_ids)
-        minutes = _minutes_map(match_ids)
+        extract = season_extract(cs_id, rebuild=opts["rebuild_extract"])
         # Fit within the SAME disambiguated role buckets the reference uses, or the
         # within-role least squares would learn against the wrong role membership.
         roles = current_role_map(only_declared=True)
@@ -282,38 +360,27 @@ class Command(BaseCommand):
             feat_names += ["goals", "assists"]
         nfeat = len(feat_names)
 
-        # our current model's prediction on the same sample = the baseline
-        ref = build_reference(cs_id)
-        our_pred = {}
-        for m in Match.objects.filter(competition_season_id=cs_id):
-            for row in voto_puro_for_match(m, ref):
-                if row["rated"]:
-                    our_pred[(m.matchday, row["player_id"])] = row["voto_puro"]
-
         Xrows, yrows, rrows, ourrows = [], [], [], []
-        for (mid, pid), feats in totals.items():
-            role = roles.get(pid)
+        for i, key in enumerate(extract["keys"]):
+            role = roles.get(key[1])
             if role not in ROLES:
                 continue
-            mins = minutes.get((mid, pid), 0)
-            if mins < opts["min_minutes"] or not is_rated(mins, feats):
+            if extract["minutes"][i] < opts["min_minutes"] or not extract["rated"][i]:
                 continue
-            key = (md_by_match[mid], pid)
-            if key not in tgt or key not in our_pred:
+            if key not in tgt:
                 continue
-            row = _feature_row(feats, mins)
+            row = extract["X"][i]
             if opts["with_bonus"]:
-                g, a = bonus.get(key, (0.0, 0.0))
-                row = row + [g, a]
+                row = np.concatenate([row, bonus.get(key, (0.0, 0.0))])
             Xrows.append(row)
             yrows.append(tgt[key])
             rrows.append(role)
-            ourrows.append(our_pred[key])
+            ourrows.append(extract["our"][i])
 
         n = len(Xrows)
         if n < 200:
             raise CommandError(f"only {n} matched samples — too few")
-        X = np.asarray(Xrows, float)
+        X = np.vstack(Xrows)
         y = np.asarray(yrows, float)
         our = np.asarray(ourrows, float)
         role_arr = np.asarray(rrows)
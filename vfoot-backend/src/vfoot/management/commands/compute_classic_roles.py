@@ -16,6 +16,7 @@ from __future__ import annotations
 from django.core.management.base import BaseCommand, CommandError
 
 from realdata.models import CompetitionSeason, Player
+from realdata.services import fork_pool
 from vfoot.services.league_decisions import (
     RELEVANCE_MIN_VALUE_EUR, latest_market_values,
 )
@@ -37,6 +38,7 @@ class Command(BaseCommand):
         parser.add_argument("--categories", type=int, default=None)
         parser.add_argument("--runs", type=int, default=None,
                             help="Consensus runs; lower is faster and less stable.")
+        fork_pool.add_workers_argument(parser, "Processes for the consensus runs")
         parser.add_argument("--dry-run", action="store_true")
 
     def handle(self, *args, **o):
@@ -46,6 +48,7 @@ class Command(BaseCommand):
         kw = {k: v for k, v in (("min_minutes", o["min_minutes"]),
                                 ("n_categories", o["categories"]),
                                 ("runs", o["runs"])) if v is not None}
+        kw["workers"] = fork_pool.resolve_workers(o["workers"])
         rep = infer_roles(o["season"], o["data_season"], **kw)
 
         self.stdout.write("categorie individuate:")
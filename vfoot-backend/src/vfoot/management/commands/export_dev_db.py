@@ -63,12 +63,18 @@ from pathlib import Path
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
-from realdata.models import PlayerZoneFeature, TeamZoneFeature
+from realdata.models import (
+    MatchZoneArchive, PlayerMatchFeatureTotal, PlayerZoneFeature, TeamZoneFeature,
+)
 from vfoot.models import CrestImage, CrestReport, PushSubscription
 
 # Emptied unless --keep-zones. Read from the models so a table rename can't
-# silently turn this command into a no-op that ships an 865 MB "slim" file.
-ZONE_TABLES = (PlayerZoneFeature._meta.db_table, TeamZoneFeature._meta.db_table)
+# silently turn this command into a no-op that ships an 865 MB "slim" file. The
+# per-match totals go with them: they are the zone rows summed, and left behind
+# they would score the slim copy as if it were full. So do the archived seasons'
+# zone rows, which are the same rows compressed.
+ZONE_TABLES = (PlayerZoneFeature._meta.db_table, TeamZoneFeature._meta.db_table,
+               PlayerMatchFeatureTotal._meta.db_table, MatchZoneArchive._meta.db_table)
 
 # Never useful in a copy: sessions belong to the machine that created them, API
 # tokens are live credentials for the accounts they belong to, and a push
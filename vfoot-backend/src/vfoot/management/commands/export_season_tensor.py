@@ -0,0 +1,51 @@
+"""Export a season's zone features as a memory-mapped tensor for the offline tools.
+
+The calibrations (``classic_fit_weights``, ``classic_calibrate``,
+``calibrate_vote_reference``, ``calibrate_realdata_feature_weights``) and the role
+inference read it instead of grouping ``PlayerZoneFeature`` through the ORM, as
+long as the season's data version has not moved since the export; after that they
+go back to the database on their own. See ``vfoot.services.season_tensor``.
+
+    python manage.py export_season_tensor --season 2
+    python manage.py export_season_tensor --season 2 --check   # is it current?
+"""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from realdata.models import CompetitionSeason, PROVIDER_CHOICES, PROVIDER_SOFASCORE
+from vfoot.services import season_tensor
+
+
+class Command(BaseCommand):
+    help = "Write a season's appearances × features × zones tensor to disk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", type=int, required=True,
+                            help="CompetitionSeason id.")
+        parser.add_argument("--provider", type=str, default=PROVIDER_SOFASCORE,
+                            choices=[p for p, _label in PROVIDER_CHOICES])
+        parser.add_argument("--check", action="store_true",
+                            help="Only say whether the tensor on disk is current.")
+
+    def handle(self, *args, **o):
+        cs = CompetitionSeason.objects.filter(id=o["season"]).first()
+        if cs is None:
+            raise CommandError(f"No CompetitionSeason id={o['season']}")
+        where = season_tensor.tensor_dir(cs.id, o["provider"])
+
+        if o["check"]:
+            if season_tensor.load(cs.id, o["provider"]) is None:
+                raise CommandError(f"{where}: assente o non aggiornato")
+            self.stdout.write(self.style.SUCCESS(f"{where}: aggiornato"))
+            return
+
+        started = time.monotonic()
+        tensor = season_tensor.export(cs.id, o["provider"])
+        a, f, z = tensor.values.shape
+        self.stdout.write(f"'{cs}': {a} presenze × {f} feature × {z} zone, "
+                          f"versione {tensor.version}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Scritto {where} in {time.monotonic() - started:.1f}s"))
@@ -0,0 +1,64 @@
+"""Ricostruisce (o controlla) le classifiche salvate, dalle partite.
+
+Le righe di classifica si aggiornano quando una giornata si chiude o si riapre
+(``services.standings.tracking``), e ogni lettura si accorge da sola di un totale
+che non torna. Questo comando e' il controllo completo, squadra per squadra, e il
+rimedio se un giorno qualcosa scrivesse un risultato per un'altra strada.
+
+    manage.py rebuild_standings --check           # tutte le leghe, non scrive niente
+    manage.py rebuild_standings --league 53
+    manage.py rebuild_standings --competition 7
+"""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vfoot.models import FantasyCompetition, FantasyTeam
+from vfoot.services import standings
+
+
+class Command(BaseCommand):
+    help = "Ricostruisce le classifiche salvate dalle partite finite, o le confronta."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--league", type=int, default=None,
+                            help="Solo le competizioni di questa lega.")
+        parser.add_argument("--competition", type=int, default=None,
+                            help="Solo questa competizione.")
+        parser.add_argument("--check", action="store_true",
+                            help="Non scrive niente: elenca le righe che non tornano "
+                                 "ed esce con errore se ce ne sono.")
+
+    def handle(self, *args, **o):
+        comps = FantasyCompetition.objects.select_related("league").order_by("league_id", "id")
+        if o["league"]:
+            comps = comps.filter(league_id=o["league"])
+        if o["competition"]:
+            comps = comps.filter(id=o["competition"])
+
+        names = dict(FantasyTeam.objects.values_list("id", "name"))
+        sbagliate = 0
+        for comp in comps:
+            diffs = standings.verify(comp)
+            if not diffs:
+                continue
+            sbagliate += 1
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{comp.league.name} — {comp.name}"))
+            for d in diffs:
+                fase = f" (fase {d['stage_id']})" if d["stage_id"] else ""
+                salvata = d["stored"] or {}
+                self.stdout.write(
+                    f"  {names.get(d['team_id'], d['team_id'])}{fase}: "
+                    f"salvata {salvata.get('played', 0)}G "
+                    f"{salvata.get('wins', 0)}-{salvata.get('draws', 0)}-{salvata.get('losses', 0)}, "
+                    f"attesa {d['expected']['played']}G "
+                    f"{d['expected']['wins']}-{d['expected']['draws']}-{d['expected']['losses']}")
+            if not o["check"]:
+                standings.rebuild(comp)
+
+        if o["check"]:
+            if sbagliate:
+                raise CommandError(f"{sbagliate} classifiche non tornano con le partite.")
+            self.stdout.write(self.style.SUCCESS("Tutte le classifiche tornano."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"{sbagliate} classifiche ricostruite."))
@@ -6,20 +6,22 @@ import random
 import re
 from collections import Counter, defaultdict
 from dataclasses import dataclass, field
+from itertools import product
 from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
-from django.db.models import Count, Sum
 
 from realdata.models import (
     Match,
     MatchAppearance,
+    Player,
     PlayerOnPitchInterval,
     PlayerZoneFeature,
     SIDE_AWAY,
     SIDE_HOME,
     TeamZoneFeature,
 )
+from realdata.services import fork_pool
 from vfoot.services.vector_zone_scoring import score_zone_duel
 
 
@@ -51,6 +53,28 @@ def parse_zone_col(zone_key: str) -> int | None:
     return int(m.group(1)) if m else None
 DEFAULT_VECTOR_CALIBRATION = "calibration/vector_zone_duel_v1.json"
 
+# League options a ``--sweep`` may vary, with their type. The season table does
+# not depend on any of them, so every league of a sweep reads the same one.
+SWEEPABLE = {
+    "teams": int,
+    "budget": int,
+    "squad_size": int,
+    "starters": int,
+    "bench_size": int,
+    "matchdays": int,
+    "min_appearances": int,
+    "score_base": float,
+    "score_scale": float,
+    "fantasy_home_advantage": float,
+    "fantasy_margin_boost": float,
+    "gk_weight": float,
+    "seed": int,
+}
+# What a single league replay reads from the options (everything else is about
+# how many run, and where).
+LEAGUE_OPTIONS = (*SWEEPABLE, "scoring_mode", "vector_calibration",
+                  "disable_temporal_substitutions", "output")
+
 
 @dataclass(frozen=True)
 class PoolPlayer:
@@ -85,6 +109,39 @@ class SimTeam:
         return self.budget - self.spent
 
 
+@dataclass
+class SeasonTable:
+    """Everything a replay reads from the database, read once.
+
+    The real season is the same for every fantasy league played on it: who
+    appeared and for how long, what each player did where on each matchday, when
+    each was on the pitch. A replay used to query it league by league, and the
+    player pool one COUNT per player; here it is one pass over each table, and a
+    league — or a whole sweep of them — only looks things up.
+    """
+
+    matchdays: list[int]
+    # player id -> [appearances, starts, minutes]
+    appearances: dict[int, list[int]]
+    names: dict[int, str]
+    feature_totals: dict[int, dict[str, float]]
+    player_scores: dict[int, dict[int, float]]
+    # empty in event mode, which never reads it
+    zone_features: dict[int, dict[int, dict[str, dict[str, float]]]]
+    intervals: dict[str, dict]
+    footprints: dict[int, dict[str, float]]
+    roles: dict[int, str]
+    goalkeepers: set[int]
+    gk_ratings: dict[int, dict[int, float]]
+    # calibration-weighted contribution per matchday-player (vector mode only)
+    weighted: dict[int, dict[int, float]] = field(default_factory=dict)
+    calibration: dict | None = None
+
+
+def _replay(run: dict) -> dict:
+    return Command()._replay_league(fork_pool.shared["table"], run)
+
+
 def hard_goals(score: float) -> int:
     return sum(1 for threshold in GOAL_THRESHOLDS if score >= threshold)
 
@@ -135,8 +192,83 @@ class Command(BaseCommand):
         parser.add_argument("--disable-temporal-substitutions", action="store_true")
         parser.add_argument("--seed", type=int, default=42)
         parser.add_argument("--output", type=str, default="calibration/historical_vfoot_league_dry_run.json")
+        parser.add_argument(
+            "--sweep",
+            action="append",
+            default=[],
+            metavar="NAME=V1,V2,...",
+            help="Replay one league per combination of values (repeatable). NAME is one of "
+            + ", ".join(SWEEPABLE)
+            + "; each league writes its own --output, suffixed with its values.",
+        )
+        fork_pool.add_workers_argument(parser, "Processes replaying the leagues of a sweep")
 
     def handle(self, *args, **options):
+        runs = self._runs(options)
+        for run in runs:
+            self._check(run)
+        vector_calibration = (
+            self._load_vector_calibration(str(options["vector_calibration"]))
+            if options["scoring_mode"] == "vector"
+            else None
+        )
+        table = self._season_table(vector_calibration)
+        if not table.matchdays:
+            raise CommandError("No historical matchdays found.")
+        workers = fork_pool.resolve_workers(options["workers"])
+        for result in self._replay_leagues(table, runs, workers=workers):
+            self.stdout.write(self.style.SUCCESS(f"Wrote {result['output']}"))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Simulated {result['matchdays']} matchdays, {result['fixtures']} fixtures, "
+                    f"winner={result['winner']}"
+                )
+            )
+
+    def _runs(self, options) -> list[dict]:
+        """The options of each league to replay: one, or one per combination of the
+        ``--sweep`` values, each with its own output file."""
+        base = {key: options[key] for key in LEAGUE_OPTIONS}
+        axes = []
+        for spec in options["sweep"] or []:
+            name, _, values = str(spec).partition("=")
+            name = name.strip().lstrip("-").replace("-", "_")
+            if name not in SWEEPABLE or not values.strip():
+                raise CommandError(f"--sweep {spec!r}: expected NAME=V1,V2,... with NAME one of {', '.join(SWEEPABLE)}")
+            try:
+                axes.append([(name, SWEEPABLE[name](value)) for value in values.split(",")])
+            except ValueError as exc:
+                raise CommandError(f"--sweep {spec!r}: {exc}") from exc
+        runs = []
+        for combination in product(*axes):
+            run = {**base, **dict(combination)}
+            if combination:
+                out = Path(str(base["output"]))
+                tag = "_".join(f"{name}{value}" for name, value in combination)
+                run["output"] = str(out.with_name(f"{out.stem}_{tag}{out.suffix}"))
+            runs.append(run)
+        return runs
+
+    @staticmethod
+    def _check(run: dict):
+        if int(run["teams"]) < 2:
+            raise CommandError("--teams must be >= 2")
+        if int(run["squad_size"]) < int(run["starters"]):
+            raise CommandError("--squad-size must be >= --starters")
+
+    def _replay_leagues(self, table: SeasonTable, runs: list[dict], *, workers: int) -> list[dict]:
+        """Replay every league; one summary each, in the order given.
+
+        Given the table the leagues are independent, each writing its own file,
+        so they go through ``fork_pool.fork_map``.
+        """
+        # A worker never touches the database: the table is all it reads.
+        return fork_pool.fork_map(_replay, runs, workers=workers, state={"table": table})
+
+    def _replay_league(self, table: SeasonTable, options: dict) -> dict:
+        """Draft, schedule and play one league on the season table; write its report.
+
+        Returns where it was written and the line the command prints about it."""
         team_count = int(options["teams"])
         budget = int(options["budget"])
         squad_size = int(options["squad_size"])
@@ -150,16 +282,11 @@ class Command(BaseCommand):
         scoring_mode = str(options["scoring_mode"])
         fantasy_home_advantage = float(options["fantasy_home_advantage"])
         fantasy_margin_boost = float(options["fantasy_margin_boost"])
-        if team_count < 2:
-            raise CommandError("--teams must be >= 2")
-        if squad_size < starters_count:
-            raise CommandError("--squad-size must be >= --starters")
 
-        matchdays = self._matchdays(int(options["matchdays"]))
-        if not matchdays:
-            raise CommandError("No historical matchdays found.")
+        limit = int(options["matchdays"])
+        matchdays = table.matchdays[:limit] if limit > 0 else table.matchdays
 
-        pool = self._player_pool(min_appearances=int(options["min_appearances"]))
+        pool = self._player_pool(table, min_appearances=int(options["min_appearances"]))
         required_players = team_count * squad_size
         if len(pool) < required_players:
             raise CommandError(f"Player pool too small: {len(pool)} available, {required_players} required.")
@@ -167,22 +294,18 @@ class Command(BaseCommand):
         teams = [SimTeam(id=i + 1, name=f"Manager {i + 1}", budget=budget) for i in range(team_count)]
         self._assign_rosters(teams, pool, squad_size=squad_size)
 
-        matchday_player_scores = self._matchday_player_scores()
-        matchday_player_zone_features = self._matchday_player_zone_features() if scoring_mode == "vector" else {}
-        matchday_player_intervals = self._matchday_player_intervals()
-        season_footprints = self._player_season_footprints()
-        player_roles = self._player_roles(season_footprints)  # roles inferred spatially
-        goalkeepers = {pid for pid, role in player_roles.items() if role == "GK"}
+        matchday_player_scores = table.player_scores
+        matchday_player_zone_features = table.zone_features
+        matchday_player_intervals = table.intervals
+        season_footprints = table.footprints
+        player_roles = table.roles  # roles inferred spatially
+        goalkeepers = table.goalkeepers
         gk_weight = float(options["gk_weight"])
-        gk_ratings = self._matchday_gk_ratings(goalkeepers)
-        vector_calibration = self._load_vector_calibration(str(options["vector_calibration"])) if scoring_mode == "vector" else None
+        gk_ratings = table.gk_ratings
+        vector_calibration = table.calibration
         # Per matchday-player weighted contribution (calibration-weighted), used to
         # pick the substitute that most improves the team, not merely overlaps.
-        matchday_player_weighted = (
-            self._matchday_player_weighted(matchday_player_zone_features, vector_calibration)
-            if scoring_mode == "vector"
-            else {}
-        )
+        matchday_player_weighted = table.weighted
         schedule = round_robin_rounds([team.id for team in teams], seed=seed)
         team_by_id = {team.id: team for team in teams}
         fixture_reports = []
@@ -355,48 +478,81 @@ class Command(BaseCommand):
             out_path = Path.cwd().parent / out_path
         out_path.parent.mkdir(parents=True, exist_ok=True)
         out_path.write_text(json.dumps(report, separators=(",", ":"), sort_keys=True) + "\n", encoding="utf-8")
-        self.stdout.write(self.style.SUCCESS(f"Wrote {out_path}"))
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Simulated {len(matchdays)} matchdays, {len(fixture_reports)} fixtures, winner={standings[0].name}"
+        return {
+            "output": str(out_path),
+            "matchdays": len(matchdays),
+            "fixtures": len(fixture_reports),
+            "winner": standings[0].name,
+        }
+
+    def _season_table(self, vector_calibration: dict | None) -> SeasonTable:
+        """Read the season once (see ``SeasonTable``); ``vector_calibration`` is
+        None in event mode, which needs neither the zone features nor the weights."""
+        matches = list(Match.objects.values_list("id", "matchday", "home_goals", "away_goals"))
+        matchday_by_match = {match_id: matchday for match_id, matchday, _, _ in matches}
+        appearance_rows = list(
+            MatchAppearance.objects.order_by("id").values_list(
+                "match_id", "player_id", "side", "is_starter", "minutes_played"
             )
         )
-
-    def _matchdays(self, limit: int) -> list[int]:
-        values = list(
-            Match.objects.filter(matchday__isnull=False)
-            .order_by("matchday")
-            .values_list("matchday", flat=True)
-            .distinct()
+        weighted_rows, touch_rows = [], []
+        for row in PlayerZoneFeature.objects.filter(
+            feature_key__in=[*FEATURE_WEIGHTS, "touches"]
+        ).order_by("feature_key", "id").values_list("match_id", "player_id", "zone_key", "feature_key", "value"):
+            (touch_rows if row[3] == "touches" else weighted_rows).append(row)
+
+        appearances: dict[int, list[int]] = {}
+        for _, player_id, _, is_starter, minutes in appearance_rows:
+            counts = appearances.setdefault(int(player_id), [0, 0, 0])
+            counts[0] += 1
+            counts[1] += 1 if is_starter else 0
+            counts[2] += int(minutes or 0)
+        footprints = self._player_season_footprints(touch_rows)
+        roles = self._player_roles(footprints)
+        goalkeepers = {pid for pid, role in roles.items() if role == "GK"}
+        zone_features = (
+            self._matchday_player_zone_features(weighted_rows, matchday_by_match)
+            if vector_calibration is not None
+            else {}
         )
-        if limit > 0:
-            values = values[:limit]
-        return [int(v) for v in values]
-
-    def _player_pool(self, *, min_appearances: int) -> list[PoolPlayer]:
-        appearance_rows = (
-            MatchAppearance.objects.values("player_id", "player__short_name", "player__full_name")
-            .annotate(appearances=Count("id"), minutes=Sum("minutes_played"))
-            .filter(appearances__gte=min_appearances)
+        return SeasonTable(
+            matchdays=sorted({int(md) for md in matchday_by_match.values() if md is not None}),
+            appearances=appearances,
+            names={
+                pid: short or full or str(pid)
+                for pid, short, full in Player.objects.values_list("id", "short_name", "full_name")
+                if pid in appearances
+            },
+            feature_totals=self._player_feature_totals(weighted_rows),
+            player_scores=self._matchday_player_scores(weighted_rows, matchday_by_match),
+            zone_features=zone_features,
+            intervals=self._matchday_player_intervals(matchday_by_match),
+            footprints=footprints,
+            roles=roles,
+            goalkeepers=goalkeepers,
+            gk_ratings=self._matchday_gk_ratings(goalkeepers, matches, appearance_rows),
+            weighted=self._matchday_player_weighted(zone_features, vector_calibration),
+            calibration=vector_calibration,
         )
-        feature_totals = self._player_feature_totals()
+
+    def _player_pool(self, table: SeasonTable, *, min_appearances: int) -> list[PoolPlayer]:
         pool = []
-        for row in appearance_rows:
-            player_id = int(row["player_id"])
-            totals = feature_totals.get(player_id)
+        for player_id, (appearances, starts, minutes) in sorted(table.appearances.items()):
+            if appearances < min_appearances:
+                continue
+            totals = table.feature_totals.get(player_id)
             if not totals:
                 continue
-            value = self._feature_value(totals) + 0.01 * float(row["minutes"] or 0)
+            value = self._feature_value(totals) + 0.01 * float(minutes)
             if value <= 0:
                 continue
-            starts = MatchAppearance.objects.filter(player_id=player_id, is_starter=True).count()
             pool.append(
                 PoolPlayer(
                     player_id=player_id,
-                    name=row["player__short_name"] or row["player__full_name"] or str(player_id),
-                    appearances=int(row["appearances"] or 0),
+                    name=table.names.get(player_id, str(player_id)),
+                    appearances=appearances,
                     starts=starts,
-                    minutes=int(row["minutes"] or 0),
+                    minutes=minutes,
                     value=value,
                     price=max(1, int(round(math.sqrt(value)))),
                 )
@@ -430,16 +586,17 @@ class Command(BaseCommand):
     def _player_roles(self, footprints: dict[int, dict[str, float]]) -> dict[int, str]:
         return {pid: self._role_from_footprint(fp) for pid, fp in footprints.items()}
 
-    def _matchday_gk_ratings(self, goalkeepers: set[int]) -> dict[int, dict[int, float]]:
+    def _matchday_gk_ratings(
+        self, goalkeepers: set[int], matches: list[tuple], appearance_rows: list[tuple]
+    ) -> dict[int, dict[int, float]]:
         # Goalkeeper performance per real matchday = goals prevented =
         # xG faced (opponent team xG) - goals conceded (opponent real goals).
         # Positive = the opponent scored less than expected (good keeper/defence).
-        matchday_by_match = dict(Match.objects.values_list("id", "matchday"))
+        matchday_by_match = {match_id: matchday for match_id, matchday, _, _ in matches}
         goals: dict[int, tuple[int, int]] = {
-            m.id: (int(m.home_goals or 0), int(m.away_goals or 0))
-            for m in Match.objects.filter(home_goals__isnull=False, away_goals__isnull=False).only(
-                "id", "home_goals", "away_goals"
-            )
+            match_id: (int(home_goals), int(away_goals))
+            for match_id, _, home_goals, away_goals in matches
+            if home_goals is not None and away_goals is not None
         }
         team_xg: dict[int, dict[str, float]] = defaultdict(lambda: {SIDE_HOME: 0.0, SIDE_AWAY: 0.0})
         for match_id, side, value in TeamZoneFeature.objects.filter(feature_key="xg_shots").values_list(
@@ -449,9 +606,9 @@ class Command(BaseCommand):
                 team_xg[int(match_id)][str(side)] += float(value or 0.0)
 
         ratings: dict[int, dict[int, float]] = defaultdict(dict)
-        for match_id, player_id, side in MatchAppearance.objects.filter(player_id__in=goalkeepers).values_list(
-            "match_id", "player_id", "side"
-        ):
+        for match_id, player_id, side, _, _ in appearance_rows:
+            if player_id not in goalkeepers:
+                continue
             matchday = matchday_by_match.get(match_id)
             if matchday is None or match_id not in goals:
                 continue
@@ -463,13 +620,11 @@ class Command(BaseCommand):
             ratings[int(matchday)][int(player_id)] = faced - conceded
         return ratings
 
-    def _player_season_footprints(self) -> dict[int, dict[str, float]]:
+    def _player_season_footprints(self, touch_rows: list[tuple]) -> dict[int, dict[str, float]]:
         # Normalized presence over zones (sum=1) from season touches; used as the
         # player's EXPECTED spatial footprint for overcrowding-aware selection.
         raw: dict[int, dict[str, float]] = defaultdict(lambda: defaultdict(float))
-        for player_id, zone_key, value in PlayerZoneFeature.objects.filter(feature_key="touches").values_list(
-            "player_id", "zone_key", "value"
-        ):
+        for _, player_id, zone_key, _, value in touch_rows:
             raw[int(player_id)][str(zone_key)] += float(value or 0.0)
         footprints: dict[int, dict[str, float]] = {}
         for player_id, zones in raw.items():
@@ -545,39 +700,30 @@ class Command(BaseCommand):
             bench = sorted(bench[:-1] + reserve_gks[:1], key=lambda p: p.value, reverse=True)
         return starters, bench
 
-    def _player_feature_totals(self) -> dict[int, dict[str, float]]:
+    def _player_feature_totals(self, feature_rows: list[tuple]) -> dict[int, dict[str, float]]:
         totals: dict[int, dict[str, float]] = defaultdict(lambda: defaultdict(float))
-        for player_id, feature_key, value in PlayerZoneFeature.objects.filter(feature_key__in=FEATURE_WEIGHTS).values_list(
-            "player_id",
-            "feature_key",
-            "value",
-        ):
+        for _, player_id, _, feature_key, value in feature_rows:
             totals[int(player_id)][str(feature_key)] += float(value or 0.0)
         return totals
 
-    def _matchday_player_scores(self) -> dict[int, dict[int, float]]:
-        matchday_by_match = dict(Match.objects.values_list("id", "matchday"))
+    def _matchday_player_scores(
+        self, feature_rows: list[tuple], matchday_by_match: dict[int, int | None]
+    ) -> dict[int, dict[int, float]]:
         scores: dict[int, dict[int, float]] = defaultdict(lambda: defaultdict(float))
-        for match_id, player_id, feature_key, value in PlayerZoneFeature.objects.filter(feature_key__in=FEATURE_WEIGHTS).values_list(
-            "match_id",
-            "player_id",
-            "feature_key",
-            "value",
-        ):
+        for match_id, player_id, _, feature_key, value in feature_rows:
             matchday = matchday_by_match.get(match_id)
             if matchday is None:
                 continue
             scores[int(matchday)][int(player_id)] += FEATURE_WEIGHTS[str(feature_key)] * float(value or 0.0)
         return scores
 
-    def _matchday_player_zone_features(self) -> dict[int, dict[int, dict[str, dict[str, float]]]]:
-        matchday_by_match = dict(Match.objects.values_list("id", "matchday"))
+    def _matchday_player_zone_features(
+        self, feature_rows: list[tuple], matchday_by_match: dict[int, int | None]
+    ) -> dict[int, dict[int, dict[str, dict[str, float]]]]:
         data: dict[int, dict[int, dict[str, dict[str, float]]]] = defaultdict(
             lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
         )
-        for match_id, player_id, zone_key, feature_key, value in PlayerZoneFeature.objects.filter(
-            feature_key__in=FEATURE_WEIGHTS
-        ).values_list("match_id", "player_id", "zone_key", "feature_key", "value"):
+        for match_id, player_id, zone_key, feature_key, value in feature_rows:
             matchday = matchday_by_match.get(match_id)
             if matchday is None:
                 continue
@@ -608,12 +754,11 @@ class Command(BaseCommand):
             out[int(matchday)] = md_out
         return out
 
-    def _matchday_player_intervals(self) -> dict[str, dict]:
-        matchday_by_match = dict(Match.objects.values_list("id", "matchday"))
+    def _matchday_player_intervals(self, matchday_by_match: dict[int, int | None]) -> dict[str, dict]:
         players: dict[int, dict[int, list[dict]]] = defaultdict(lambda: defaultdict(list))
         final_seconds: dict[int, int] = defaultdict(lambda: 90 * 60)
         player_final_seconds: dict[int, dict[int, int]] = defaultdict(dict)
-        for row in PlayerOnPitchInterval.objects.values(
+        for row in PlayerOnPitchInterval.objects.order_by("id").values(
             "match_id",
             "player_id",
             "start_elapsed_seconds",
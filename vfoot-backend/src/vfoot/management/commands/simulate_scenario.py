@@ -36,6 +36,15 @@ the one that silently rots: matches that have un-happened have their data erased
 and league matchdays that are no longer behind the front are reopened. A scenario
 is a state, not a high-water mark.
 
+A BUILT SCENARIO IS KEPT
+------------------------
+Building costs minutes; returning to a state built ten minutes ago should not.
+After a build the whole database is saved (``vfoot/services/scenario_snapshot.py``)
+under a key made of the scenario, seed, instant, owner, cups and the code that
+builds it, and the next run with the same key restores it in seconds instead of
+building again. ``--rebuild`` builds anyway (and replaces the snapshot),
+``--no-snapshot`` neither reads nor writes one.
+
 THE CLOCK IS NOT SET BY THIS COMMAND
 ------------------------------------
 It prints the value and stops, deliberately. ``VFOOT_FAKE_NOW`` is read by
@@ -54,7 +63,7 @@ from django.db.models import Count
 
 from realdata.models import CompetitionSeason, Match
 from vfoot.models import FantasyFixture, FantasyLeague, FantasyMatchday
-from vfoot.services import honours, matchday_state
+from vfoot.services import honours, matchday_state, scenario_snapshot
 from vfoot.services.competition_prizes import competition_fixtures
 
 
@@ -216,6 +225,15 @@ class Command(BaseCommand):
                             help="Re-ingest the whole championship instead of only "
                                  "what this instant changes. Needed after the "
                                  "generator or the seed changes; slow (minutes).")
+        parser.add_argument("--rebuild", action="store_true",
+                            help="Build the scenario even when a snapshot of the same "
+                                 "build exists, and replace it.")
+        parser.add_argument("--no-snapshot", action="store_true",
+                            help="Neither restore nor save a snapshot of the built "
+                                 "database.")
+        parser.add_argument("--snapshot-dir", default=None,
+                            help="Where snapshots live (default: "
+                                 "$XDG_CACHE_HOME/vfoot-sim/snapshots, next to vfoot-sim's).")
         parser.add_argument("--check", action="store_true",
                             help="Rebuild nothing; just report the current state.")
         parser.add_argument("--owner", default=DEFAULT_OWNER,
@@ -261,6 +279,27 @@ class Command(BaseCommand):
             f"scenario {scenario.name} @ {at.isoformat()}"))
         self.stdout.write(f"  {scenario.description}")
 
+        # Only a FULL build is worth keeping: --skip-season leaves the championship
+        # as whatever the database held, which no key can describe.
+        snapshot = None
+        if not (o["no_snapshot"] or o["skip_season"]) and scenario_snapshot.supported():
+            snapshot = scenario_snapshot.snapshot_path(
+                o["snapshot_dir"] or scenario_snapshot.default_dir(), scenario.name,
+                seed=seed, at=at, owner=o["owner"], cup=o["cup"])
+            try:
+                restored = (not (o["rebuild"] or o["fresh"])
+                            and scenario_snapshot.restore(snapshot))
+            except scenario_snapshot.SnapshotError as exc:
+                self.stdout.write(self.style.WARNING(f"  {exc}; building instead"))
+                restored = False
+            if restored:
+                self.stdout.write(self.style.NOTICE(
+                    f"  restored from {snapshot} — nothing rebuilt"))
+                self._report(scenario, self._league(scenario, create=False,
+                                                    owner=o["owner"]), at)
+                self._observe(scenario, o, at)
+                return
+
         if not o["skip_season"]:
             call_command("simulate_sofascore_season", season=scenario.season_id,
                          through=scenario.through, now=at.isoformat(), seed=seed,
@@ -283,7 +322,18 @@ class Command(BaseCommand):
                      conclude_through=self._conclude_through(scenario, league, at),
                      seed=seed + 1, redo=True)
 
+        if snapshot is not None:
+            try:
+                scenario_snapshot.save(snapshot)
+                self.stdout.write(f"  snapshot saved: {snapshot}")
+            except scenario_snapshot.SnapshotError as exc:
+                # The build is good without it; only the next one will be slow.
+                self.stdout.write(self.style.WARNING(f"  {exc}"))
+
         self._report(scenario, league, at)
+        self._observe(scenario, o, at)
+
+    def _observe(self, scenario: Scenario, o, at) -> None:
         self.stdout.write(self.style.SUCCESS(
             "\nObserve it with:\n"
             f'    $env:VFOOT_FAKE_NOW = "{scenario.at if not o["at"] else at.isoformat()}"\n'
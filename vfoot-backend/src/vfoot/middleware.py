@@ -14,12 +14,17 @@ carries the answer.
 When the clock is not shifted the header is not set at all, so in production this
 middleware costs one boolean test and nothing else — and the client, not finding
 it, keeps using its own clock as it always has.
+
+``CalendarScopeMiddleware`` reads each season's calendar once per request: the
+matchday list, the lineup page and the dashboard ask it a dozen questions apiece,
+and ``matchday_state`` answers them all from one fixture list inside the scope.
 """
 from __future__ import annotations
 
 from django.utils import timezone
 
 from vfoot import simclock
+from vfoot.services import matchday_state
 
 HEADER = "X-Vfoot-Now"
 
@@ -35,3 +40,12 @@ class SimClockHeaderMiddleware:
         if self.active:
             response[HEADER] = timezone.now().isoformat()
         return response
+
+
+class CalendarScopeMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with matchday_state.calendar_scope():
+            return self.get_response(request)
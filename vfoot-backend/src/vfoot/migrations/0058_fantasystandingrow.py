@@ -0,0 +1,35 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vfoot', '0057_remove_savedlineupsnapshot_edited_after_kickoff'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FantasyStandingRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('goals_for', models.FloatField(default=0.0)),
+                ('goals_against', models.FloatField(default=0.0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('scored', models.IntegerField(default=0)),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standing_rows', to='vfoot.fantasycompetition')),
+                ('stage', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='standing_rows', to='vfoot.competitionstage')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standing_rows', to='vfoot.fantasyteam')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['competition', 'stage'], name='vfoot_fanta_competi_51511b_idx')],
+                'unique_together': {('competition', 'stage', 'team')},
+            },
+        ),
+    ]
@@ -19,6 +19,7 @@ from vfoot.models.fantasy import (
     FantasyMatchday,
     FantasyLineupSubmission,
     FantasyRosterSlot,
+    FantasyStandingRow,
     FantasyTeam,
     LeagueMembership,
     LeaguePlayerRole,
@@ -58,6 +59,7 @@ __all__ = [
     "FantasyMatchday",
     "FantasyLineupSubmission",
     "FantasyRosterSlot",
+    "FantasyStandingRow",
     "FantasyTeam",
     "Feedback",
     "CrestImage",
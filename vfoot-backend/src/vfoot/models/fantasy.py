@@ -832,6 +832,37 @@ class FantasyFixtureDetail(models.Model):
     payload = models.JSONField(default=dict)
 
 
+class FantasyStandingRow(models.Model):
+    """One team's running tally in one stage of a competition (``stage`` null for a
+    competition without stages), over its FINISHED fixtures.
+
+    A materialization, not a source: every number here is a sum over
+    ``FantasyFixture`` rows, kept up to date in the transaction that finishes or
+    reopens them (``services.standings.tracking``) so that a table is read, not
+    recomputed from every matchday played. The points are NOT stored: they are
+    W/D/L times the competition's own values, which an admin can still change.
+    """
+
+    competition = models.ForeignKey(FantasyCompetition, on_delete=models.CASCADE, related_name="standing_rows")
+    stage = models.ForeignKey(CompetitionStage, on_delete=models.CASCADE, related_name="standing_rows", null=True, blank=True)
+    team = models.ForeignKey(FantasyTeam, on_delete=models.CASCADE, related_name="standing_rows")
+
+    played = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    goals_for = models.FloatField(default=0.0)
+    goals_against = models.FloatField(default=0.0)
+    # The fantasy totals (FantasyFixtureDetail.vfoot_*) and how many fixtures had
+    # one: the average is over the fixtures with a tabellino, not over played.
+    score_sum = models.FloatField(default=0.0)
+    scored = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = [("competition", "stage", "team")]
+        indexes = [models.Index(fields=["competition", "stage"])]
+
+
 class AuctionSession(models.Model):
     STATUS_DRAFT = "draft"
     STATUS_ACTIVE = "active"
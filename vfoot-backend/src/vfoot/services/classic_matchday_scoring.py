@@ -22,7 +22,7 @@ import logging
 from django.core.cache import cache
 from django.db.models import Count, Max
 
-from realdata.models import Match, Player, PlayerTeamStint
+from realdata.models import Match, Player
 from vfoot.models import (
     FantasyFixture,
     FantasyFixtureDetail,
@@ -36,8 +36,10 @@ from vfoot.services.classic_pagella import (
     matchday_data_version,
     pagella_for_match,
 )
+from vfoot.services import single_flight, standings
 from vfoot.services.classic_scoring import Ruleset, resolve_fixture, score_team
 from vfoot.services.match_resolver import (
+    current_team_seasons,
     matchday_fixtures_by_team,
     pending_matches,
     pending_player_ids,
@@ -95,7 +97,8 @@ def _index_cache_key(competition_season_id: int, real_matchday: int, league) ->
             f":{scoring_fingerprint()}")
 
 
-def build_matchday_index(competition_season_id: int, real_matchday: int, league) -> dict:
+def build_matchday_index(competition_season_id: int, real_matchday: int, league, *,
+                         stale_ok: bool = False) -> dict:
     """player_id -> pagella line, for every player who appeared in the real matchday.
 
     A player plays in exactly one real match per matchday, so keys never collide.
@@ -113,12 +116,28 @@ def build_matchday_index(competition_season_id: int, real_matchday: int, league)
     Le righe che escono di qui non vanno modificate sul posto — ``compose_team_lines``
     ne fa una copia prima di toccarle, ed è quella copia che il tabellino marca come
     provvisoria.
+
+    Un dato che si muove muove la chiave per TUTTI i client aperti nello stesso
+    istante, quindi il conto lo fa un processo solo (``single_flight``). Con
+    ``stale_ok`` chi arriva mentre l'altro sta calcolando riceve l'indice della
+    versione precedente invece di aspettare: va bene per il calendario e il live,
+    che si rileggono fra due minuti; NON per chi congela un risultato.
     """
     key = _index_cache_key(competition_season_id, real_matchday, league)
-    hit = cache.get(key)
-    if hit is not None:
-        return hit
+    pointer = _index_pointer_key(competition_season_id, real_matchday, league.id)
+
+    def previous_index():
+        previous = cache.get(pointer)
+        return cache.get(previous) if previous and previous != key else None
 
+    return single_flight.get_or_build(
+        key, lambda: _build_index(competition_season_id, real_matchday, league, key, pointer),
+        stale=previous_index if stale_ok else None,
+        family="matchday_index", pointer=pointer)[0]
+
+
+def _build_index(competition_season_id: int, real_matchday: int, league,
+                 key: str, pointer: str) -> dict:
     matches = Match.objects.filter(
         competition_season_id=competition_season_id, matchday=real_matchday
     )
@@ -134,7 +153,6 @@ def build_matchday_index(competition_season_id: int, real_matchday: int, league)
     # UNA voce viva per (lega, giornata): la precedente è spazzatura dall'istante
     # in cui i dati si sono mossi, e lasciarla lì riempirebbe la cache di pagelle
     # che nessuno rileggerà (vedi _index_pointer_key).
-    pointer = _index_pointer_key(competition_season_id, real_matchday, league.id)
     previous = cache.get(pointer)
     if previous and previous != key:
         cache.delete(previous)
@@ -409,13 +427,7 @@ def office_votes_for(league, md, player_ids) -> dict:
         return {}
     cs_id = md.real_competition_season_id
     fixtures = matchday_fixtures_by_team(cs_id, md.real_matchday)
-    stints = dict(
-        PlayerTeamStint.objects.filter(
-            player_id__in=list(player_ids),
-            team_season__competition_season_id=cs_id,
-            end_date__isnull=True,
-        ).values_list("player_id", "team_season_id")
-    )
+    stints = current_team_seasons(cs_id, player_ids)
     out = {}
     for pid in player_ids:
         match = fixtures.get(stints.get(pid))
@@ -528,13 +540,7 @@ def _live_states(cs_id: int, real_matchday: int, player_ids) -> tuple[set, set]:
     if not player_ids:
         return set(), set()
     fixtures = matchday_fixtures_by_team(cs_id, real_matchday)
-    stints = dict(
-        PlayerTeamStint.objects.filter(
-            player_id__in=player_ids,
-            team_season__competition_season_id=cs_id,
-            end_date__isnull=True,
-        ).values_list("player_id", "team_season_id")
-    )
+    stints = current_team_seasons(cs_id, player_ids)
     not_started, unstable = set(), set()
     for pid in player_ids:
         match = fixtures.get(stints.get(pid))
@@ -602,7 +608,8 @@ def live_scorer(league, md, ruleset):
 
     Returns a callable ``score(fixture) -> payload``.
     """
-    index = build_matchday_index(md.real_competition_season_id, md.real_matchday, league)
+    index = build_matchday_index(md.real_competition_season_id, md.real_matchday, league,
+                                 stale_ok=True)
     # Rosters AND everyone actually FIELDED this round. Not the same set, and the
     # difference is not a corner case: the submitted lineup is authoritative and is
     # scored as sent, so a player sold since the lock still has a line in the
@@ -778,29 +785,32 @@ def score_and_persist_matchday(md, league, ruleset, fixtures, resolutions, force
     # Pass 2: score + persist (a still-missing team under force = forfait / empty).
     updated = 0
     stage_ids: set[int] = set()
-    for fx in fixtures:
-        home_ln = team_lines.get((fx.id, "home")) or ([], [], {})
-        away_ln = team_lines.get((fx.id, "away")) or ([], [], {})
-        payload = score_composed_fixture((home_ln[0], home_ln[1]), (away_ln[0], away_ln[1]), ruleset, {
-            "fixture_id": fx.id, "fantasy_round": fx.round_no, "real_matchday": md.real_matchday,
-            "stage": fx.stage_id, "competition_id": fx.competition_id,
-            "home_advantage": fx.home_advantage,
-            "home_team": fx.home_team.name, "away_team": fx.away_team.name,
-        })
-        fx.home_total = float(payload["home_goals"])
-        fx.away_total = float(payload["away_goals"])
-        fx.status = FantasyFixture.STATUS_FINISHED
-        FantasyFixtureDetail.objects.update_or_create(
-            fixture=fx,
-            defaults={"vfoot_home": payload["home_total"],
-                      "vfoot_away": payload["away_total"], "payload": payload},
-        )
-        updated += 1
-        if fx.stage_id:
-            stage_ids.add(fx.stage_id)
-
-    if fixtures:
-        FantasyFixture.objects.bulk_update(fixtures, ["home_total", "away_total", "status"], batch_size=500)
+    # The standings move in the same transaction as the results (a recompute
+    # takes the old result out and puts the new one in).
+    with standings.tracking(fx.id for fx in fixtures):
+        for fx in fixtures:
+            home_ln = team_lines.get((fx.id, "home")) or ([], [], {})
+            away_ln = team_lines.get((fx.id, "away")) or ([], [], {})
+            payload = score_composed_fixture((home_ln[0], home_ln[1]), (away_ln[0], away_ln[1]), ruleset, {
+                "fixture_id": fx.id, "fantasy_round": fx.round_no, "real_matchday": md.real_matchday,
+                "stage": fx.stage_id, "competition_id": fx.competition_id,
+                "home_advantage": fx.home_advantage,
+                "home_team": fx.home_team.name, "away_team": fx.away_team.name,
+            })
+            fx.home_total = float(payload["home_goals"])
+            fx.away_total = float(payload["away_goals"])
+            fx.status = FantasyFixture.STATUS_FINISHED
+            FantasyFixtureDetail.objects.update_or_create(
+                fixture=fx,
+                defaults={"vfoot_home": payload["home_total"],
+                          "vfoot_away": payload["away_total"], "payload": payload},
+            )
+            updated += 1
+            if fx.stage_id:
+                stage_ids.add(fx.stage_id)
+
+        if fixtures:
+            FantasyFixture.objects.bulk_update(fixtures, ["home_total", "away_total", "status"], batch_size=500)
     if update_snapshot:
         md.ruleset_snapshot = ruleset.to_snapshot()
         md.save(update_fields=["ruleset_snapshot"])
@@ -21,7 +21,7 @@ import hashlib
 from collections import defaultdict
 
 from django.core.cache import cache
-from django.db.models import Count, Max, Sum
+from django.db.models import Count, Max, Q, Sum
 
 from realdata.models import (
     CARD_RED,
@@ -34,6 +34,7 @@ from realdata.models import (
     Player,
 )
 from vfoot.models import LeaguePlayerRole
+from vfoot.services import single_flight
 from vfoot.services.classic_rating import (
     build_reference, defensive_exposure, current_role_map, voto_puro_for_match,
     _minutes_map, _per_match_player_totals,
@@ -57,13 +58,19 @@ def classic_goals(total: float) -> int:
 
 def data_version(competition_season_id: int) -> str:
     """Cheap fingerprint of a season's played data: it changes exactly when a
-    match is finalized, so anything derived from the season can be cached under it."""
+    match is finalized, so anything derived from the season can be cached under it.
+
+    Stamped on ``data_changed_at``, the importer's CONTENT stamp, and not on the
+    tick's cadence stamps: a confirmation pass that re-read the same payloads must
+    not throw away every cache built on the season. The promotion itself still
+    counts, through the ``data_ready`` tally."""
     agg = (Match.objects
            .filter(competition_season_id=competition_season_id,
                    status=Match.STATUS_FINISHED)
-           .aggregate(n=Count("id"), last=Max("data_checked_at")))
+           .aggregate(n=Count("id"), ready=Count("id", filter=Q(data_ready=True)),
+                      last=Max("data_changed_at")))
     last = agg["last"].isoformat() if agg["last"] else "-"
-    return f"{agg['n'] or 0}:{last}"
+    return f"{agg['n'] or 0}:{agg['ready'] or 0}:{last}"
 
 
 def matchday_data_version(competition_season_id: int, real_matchday: int) -> str:
@@ -74,10 +81,12 @@ def matchday_data_version(competition_season_id: int, real_matchday: int) -> str
     durante un turno in corso non si sposta di un millimetro — cioè esattamente
     quando i voti cambiano ogni due minuti.
 
-    Legge due cose. Della partita, i campi che il tick scrive DOPO aver importato
-    (stato, punteggio, ``data_ready`` e i due timbri): l'ordine conta, perché una
-    lettura che capitasse in mezzo salverebbe i dati nuovi sotto la chiave
-    vecchia, e il timbro che segue la manda subito in soffitta — mai il contrario.
+    Legge due cose. Della partita, stato, punteggio, ``data_ready`` e
+    ``data_changed_at``, il timbro che l'import scrive DOPO le righe: l'ordine
+    conta, perché una lettura che capitasse in mezzo salverebbe i dati nuovi sotto
+    la chiave vecchia, e il timbro che segue la manda subito in soffitta — mai il
+    contrario. Non i timbri del tick, che si muovono a ogni giro anche quando il
+    giro non ha trovato niente di nuovo.
     Delle presenze, quattro somme: nessuna riga porta una data di modifica, e un
     reimport a mano dei tabellini non tocca la partita, quindi senza queste
     passerebbe inosservato.
@@ -87,7 +96,7 @@ def matchday_data_version(competition_season_id: int, real_matchday: int) -> str
                              matchday=real_matchday)
         .order_by("id")
         .values_list("id", "status", "data_ready", "home_goals", "away_goals",
-                     "data_checked_at", "data_imported_at")
+                     "data_changed_at")
     )
     apps = MatchAppearance.objects.filter(match_id__in=[r[0] for r in rows]).aggregate(
         n=Count("id"), mins=Sum("minutes_played"),
@@ -96,6 +105,29 @@ def matchday_data_version(competition_season_id: int, real_matchday: int) -> str
     return hashlib.sha1(blob).hexdigest()[:16]
 
 
+def match_data_versions(competition_season_id: int) -> dict[int, str]:
+    """{match id: impronta} per ogni partita della stagione, in due query.
+
+    La stessa lettura di ``matchday_data_version``, partita per partita: chi tiene
+    da parte qualcosa di UNA partita (la pagella del benchmark) la butta solo
+    quando quella partita si muove, non quando si muove il resto del turno."""
+    apps = {
+        r.pop("match_id"): r for r in
+        MatchAppearance.objects.filter(match__competition_season_id=competition_season_id)
+        .values("match_id")
+        .annotate(n=Count("id"), mins=Sum("minutes_played"),
+                  goals=Sum("goals"), assists=Sum("assists"))
+        .order_by()
+    }
+    out = {}
+    for row in (Match.objects.filter(competition_season_id=competition_season_id)
+                .values_list("id", "status", "data_ready", "home_goals", "away_goals",
+                             "data_changed_at")):
+        blob = repr((row, sorted(apps.get(row[0], {}).items()))).encode()
+        out[row[0]] = hashlib.sha1(blob).hexdigest()[:16]
+    return out
+
+
 def get_reference(competition_season_id: int) -> dict:
     """The per-role (mean, std) the voto puro is z-scored against.
 
@@ -103,16 +135,29 @@ def get_reference(competition_season_id: int) -> dict:
     moved with the season in progress has no value on matchday 1 and makes a 6
     mean different things over time. Falls back to computing it from the given
     season only when no calibration file exists yet, so a fresh checkout still
-    works — with the live-drift caveat that fix exists to remove."""
+    works — with the live-drift caveat that fix exists to remove.
+
+    Built by one worker at a time (``single_flight``), and never served a
+    version behind: the matchday index and the listone are computed from it
+    and cached under the NEW key, where a stale reference would stay for hours."""
     fixed = fixed_reference()
     if fixed is not None:
         return fixed
     key = f"vfoot:voto_reference:{competition_season_id}:{data_version(competition_season_id)}"
-    hit = cache.get(key)
-    if hit is not None:
-        return hit
-    data = build_reference(competition_season_id)
+    pointer = f"vfoot:voto_reference:last:{competition_season_id}"
+    return single_flight.get_or_build(
+        key, lambda: _store(key, pointer, build_reference(competition_season_id)),
+        family="reference", pointer=pointer)[0]
+
+
+def _store(key: str, pointer: str, data: dict) -> dict:
+    """Store a season-wide entry and drop the one it replaces. The pointer is also
+    what tells an eviction (a miss on the key it still names) from a data change."""
+    previous = cache.get(pointer)
+    if previous and previous != key:
+        cache.delete(previous)
     cache.set(key, data, None)
+    cache.set(pointer, key, None)
     return data
 
 
@@ -128,12 +173,10 @@ def get_role_averages(competition_season_id: int) -> dict:
         return fixed
     key = (f"vfoot:role_term_averages:{competition_season_id}:"
            f"{data_version(competition_season_id)}")
-    hit = cache.get(key)
-    if hit is not None:
-        return hit
-    data = compute_role_averages(competition_season_id)
-    cache.set(key, data, None)
-    return data
+    pointer = f"vfoot:role_term_averages:last:{competition_season_id}"
+    return single_flight.get_or_build(
+        key, lambda: _store(key, pointer, compute_role_averages(competition_season_id)),
+        family="role_averages", pointer=pointer)[0]
 
 
 def compute_role_averages(competition_season_id: int,
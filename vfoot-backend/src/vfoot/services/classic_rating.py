@@ -34,9 +34,12 @@ computed once over a season and reused.
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import math
 from collections import defaultdict
+from itertools import chain
 
 from django.db.models import Sum
 
@@ -45,7 +48,9 @@ from realdata.models import (
     MatchAppearance, Match, MatchDisciplinaryEvent, MatchShot, Player,
     PlayerOnPitchInterval, PlayerZoneFeature, PROVIDER_SOFASCORE,
 )
-from realdata.services.sofascore_adapter import METHOD_UNPLACED
+from realdata.services import feature_totals as match_totals
+from realdata.services import zone_archive
+from realdata.services.sofascore_adapter import METHOD_UNPLACED, ZONE_UNPLACED
 
 log = logging.getLogger(__name__)
 
@@ -1014,6 +1019,14 @@ def current_role_map(*, only_declared: bool = False) -> dict:
     return roles
 
 
+def roles_digest() -> str:
+    """``current_role_map`` in a few characters, for cache keys: the baseline votes
+    are z-scored per role, and a role inference run moves them without touching the
+    played data."""
+    roles = sorted(current_role_map().items())
+    return hashlib.sha1(json.dumps(roles).encode()).hexdigest()[:12]
+
+
 def is_rated(minutes: int, totals: dict) -> bool:
     """Minutes/involvement gate for 'a voto' vs senza voto. NOT the whole story:
     a player involved in a decisive event is rated even below this — see
@@ -1297,29 +1310,33 @@ def index_for_role(role: str, totals: dict, minutes: int, exposure: float = 0.0,
     return idx
 
 
-def _per_match_player_totals(match_ids):
+def _per_match_player_totals(match_ids, tensor=None):
     """{(match_id, player_id): {feature_key: total_over_zones}} for sofascore.
 
     Fetches the union of the outfield AND goalkeeper weight keys: restricting it to
     the outfield set silently starved the GK index of every keeper feature, leaving
     it driven by inaccurate long balls alone (good sweeper-keepers ranked worst).
+
+    Read from the pre-summed ``PlayerMatchFeatureTotal`` rather than re-grouping
+    the zone rows; see ``realdata.services.feature_totals``. A season-wide caller
+    holding a current sofascore ``tensor`` (``vfoot.services.season_tensor``) reads
+    the zone sums from it instead and skips even that.
     """
-    rows = (PlayerZoneFeature.objects
-            .filter(match_id__in=match_ids, provider=PROVIDER_SOFASCORE,
-                    feature_key__in=sorted((set(WEIGHTS) | set(GK_WEIGHTS)
-                                            | DERIVED_INPUTS)
-                                           - set(DERIVED_FEATURES)
-                                           - set(MERGED_FEATURES)))
-            .values("match_id", "player_id", "feature_key")
-            .annotate(v=Sum("value")))
+    keys = ((set(WEIGHTS) | set(GK_WEIGHTS) | DERIVED_INPUTS)
+            - set(DERIVED_FEATURES) - set(MERGED_FEATURES))
+    if tensor is not None:
+        summed = tensor.match_player_totals(match_ids, feature_keys=keys)
+    else:
+        summed = match_totals.match_player_totals(
+            match_ids, provider=PROVIDER_SOFASCORE, feature_keys=keys)
     out = defaultdict(dict)
     covered = set()
-    for r in rows:
+    for (mid, pid), feats in summed.items():
         # arrotondata: v. PROVIDER_SUM_DECIMALS — due database che sommano le stesse
         # righe in un ordine diverso non danno lo stesso float, e quel rumore arriva
         # fino alle soglie del «senza voto»
-        out[(r["match_id"], r["player_id"])][r["feature_key"]] = _round_sum(r["v"])
-        covered.add(r["match_id"])
+        out[(mid, pid)] = {k: _round_sum(v) for k, v in feats.items()}
+        covered.add(mid)
 
     # A match with no zone row at all is NOT a match where nobody did anything:
     # it is a database that cannot answer the question. The distinction matters
@@ -1550,7 +1567,7 @@ def on_pitch_windows(match_ids, minutes: dict, appearances: dict) -> dict:
     return windows
 
 
-def _zone_presence(match_ids) -> dict:
+def _zone_presence(match_ids, tensor=None) -> dict:
     """{(match_id, player_id): {(col, row): share}}, shares summing to 1.
 
     The provider gives a positional heatmap per player, and the importer spreads
@@ -1567,13 +1584,27 @@ def _zone_presence(match_ids) -> dict:
     better than no exposure at all — see ``sofascore_adapter.METHOD_UNPLACED``.
     """
     zones: dict[tuple, dict] = defaultdict(dict)
-    for mid, pid, zk, v in (PlayerZoneFeature.objects
-                            .filter(match_id__in=match_ids, provider=PROVIDER_SOFASCORE,
-                                    feature_key="touches")
-                            .exclude(source_method=METHOD_UNPLACED)
-                            .values_list("match_id", "player_id", "zone_key")
-                            .annotate(v=Sum("value"))
-                            .values_list("match_id", "player_id", "zone_key", "v")):
+    rows = (_tensor_touches(tensor, match_ids) if tensor is not None else
+            PlayerZoneFeature.objects
+            .filter(match_id__in=match_ids, provider=PROVIDER_SOFASCORE,
+                    feature_key="touches")
+            .exclude(source_method=METHOD_UNPLACED)
+            .values_list("match_id", "player_id", "zone_key")
+            .annotate(v=Sum("value"))
+            .values_list("match_id", "player_id", "zone_key", "v"))
+    if tensor is None:
+        # A match with no hot row may be in a concluded season's archive (see
+        # zone_archive). Asked only then, so a pagella of the current season pays
+        # nothing for it.
+        rows = list(rows)
+        missing = set(match_ids) - {r[0] for r in rows}
+        if missing:
+            rows = chain(rows, ((mid, pid, zk, v) for (mid, pid, zk), v in zone_archive.grouped(
+                zone_archive.player_rows(missing, provider=PROVIDER_SOFASCORE,
+                                         feature_keys=["touches"],
+                                         exclude_method=METHOD_UNPLACED),
+                key=lambda r: (r.match_id, r.player_id, r.zone_key)).items()))
+    for mid, pid, zk, v in rows:
         _, col, row = zk.split("_")
         zones[(mid, pid)][(int(col), int(row))] = _round_sum(v)
     out = {}
@@ -1608,7 +1639,29 @@ def _charge_of_shot(is_goal: bool, xgot, shot_type: str) -> float:
     return EXPOSURE_LAMBDA * outcome + (1.0 - EXPOSURE_LAMBDA) * (xgot or 0.0)
 
 
-def defensive_exposure(match_ids, minutes: dict) -> dict:
+def _tensor_touches(tensor, match_ids):
+    """The (match, player, zone, touches) rows of ``_zone_presence``'s query, read
+    off a season tensor: placed zones only, summed over sides."""
+    if "touches" not in tensor.feature_index:
+        return
+    f = tensor.feature_index["touches"]
+    placed = [(i, z) for i, z in enumerate(tensor.zones) if z != ZONE_UNPLACED]
+    wanted = set(int(m) for m in match_ids)
+    sums: dict[tuple, float] = {}
+    for r in tensor.present[:, f].nonzero()[0]:
+        mid = int(tensor.match_ids[r])
+        if mid not in wanted:
+            continue
+        pid = int(tensor.player_ids[r])
+        vals = tensor.values[r, f]
+        for i, zk in placed:
+            sums[(mid, pid, zk)] = sums.get((mid, pid, zk), 0.0) + float(vals[i])
+    for (mid, pid, zk), v in sums.items():
+        if v:   # a cell of the array, not a row: zero is where they never were
+            yield mid, pid, zk, v
+
+
+def defensive_exposure(match_ids, minutes: dict, tensor=None) -> dict:
     """{(match_id, player_id): danger conceded where AND WHILE this player played}.
 
     Each conceded shot carries a charge (``_charge_of_shot``) that is split across
@@ -1655,7 +1708,7 @@ def defensive_exposure(match_ids, minutes: dict) -> dict:
     appearances = {(a["match_id"], a["player_id"]): (a["side"], a["is_starter"])
                    for a in MatchAppearance.objects.filter(match_id__in=match_ids)
                    .values("match_id", "player_id", "side", "is_starter")}
-    presence = _zone_presence(match_ids)
+    presence = _zone_presence(match_ids, tensor)
     windows = on_pitch_windows(match_ids, minutes, appearances)
     # The keeper is excluded from the split, not merely spared the charge: his
     # heatmap sits entirely in the zone the danger arrives in, so leaving him in
@@ -1788,12 +1841,15 @@ def _reference_population(competition_season_id: int):
     One definition, used by the feature scales, the role reference and the
     explanation's role averages alike: a drifting population between them would put
     the vote and its justification on different scales."""
+    from vfoot.services import season_tensor
+
     match_ids = list(Match.objects
                      .filter(competition_season_id=competition_season_id)
                      .values_list("id", flat=True))
-    totals = _per_match_player_totals(match_ids)
+    tensor = season_tensor.load(competition_season_id, PROVIDER_SOFASCORE)
+    totals = _per_match_player_totals(match_ids, tensor)
     minutes = _minutes_map(match_ids)
-    exposure = defensive_exposure(match_ids, minutes)
+    exposure = defensive_exposure(match_ids, minutes, tensor)
     roles = current_role_map(only_declared=True)
     for (mid, pid), feats in totals.items():
         role = roles.get(pid)
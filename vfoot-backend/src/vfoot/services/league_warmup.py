@@ -0,0 +1,87 @@
+"""What a league's pages re-read after a tick, rebuilt BEFORE the nudge tells them to.
+
+The nudge carries no data: every open page answers it by re-reading, in the same
+second. If the caches those pages read were left to the first request, that
+request paid the rebuild — and with several pages open, several paid it at once.
+The tick is the one process that knows the data just moved, so it pays instead:
+
+* **the matchday index** of every round in play (locked, not concluded) — the
+  half-second pagella of ten matches behind the live tabellino, the calendar's
+  provisional scores and the live standings. Those three have no cache of their
+  own: they are the index plus two cheap state reads, so a warm index is a warm
+  scoreboard;
+* **the standings** — the stored rows checked against the finished fixtures, and
+  rebuilt if something was written around them (``standings.ensure``);
+* **the listone** of the league and of its season (``listone_payload.warm``).
+
+Each step is timed, and ``warm`` returns the timings with the counts, ready for
+``JobRun.did``. A step that fails is logged and skipped: the nudge must still go
+out, and a cold cache is only the cost this module exists to avoid.
+"""
+from __future__ import annotations
+
+import logging
+import time
+
+from realdata.services import cache_stats
+from vfoot.models import FantasyCompetition, FantasyLeague, FantasyMatchday
+from vfoot.services import listone_payload, matchday_state, standings
+from vfoot.services.classic_matchday_scoring import build_matchday_index
+
+log = logging.getLogger(__name__)
+
+
+def _rounds_in_play(league: FantasyLeague) -> list[tuple[int, int]]:
+    """(real season, real matchday) of each round the calendar scores live."""
+    if not league.reference_season_id:
+        return []
+    locked = matchday_state.locked_matchdays(league.reference_season_id)
+    return sorted(set(
+        FantasyMatchday.objects
+        .filter(league=league, real_matchday__in=locked)
+        .exclude(status=FantasyMatchday.STATUS_CONCLUDED)
+        .values_list("real_competition_season_id", "real_matchday")))
+
+
+def _indexes(leagues) -> int:
+    n = 0
+    # One read of the season's calendar for every league on it, not one per league.
+    with matchday_state.calendar_scope():
+        for league in leagues:
+            for cs_id, real_md in _rounds_in_play(league):
+                build_matchday_index(cs_id, real_md, league)
+                n += 1
+    return n
+
+
+def _standings(leagues) -> int:
+    return sum(standings.ensure(comp)
+               for comp in FantasyCompetition.objects.filter(league__in=leagues))
+
+
+def warm(league_ids) -> dict[str, float]:
+    """Warm every cache the nudged pages of these leagues will read.
+
+    Returns ``{"warm_<step>_ms": ..., <count>: ...}``: how long each step took and
+    what it did — indexes prepared, standings rebuilt, listone entries built."""
+    leagues = list(FantasyLeague.objects.filter(id__in=list(league_ids)))
+    out: dict[str, float] = {}
+    for step, count, fn in (
+        ("index", "indexes_warmed", lambda: _indexes(leagues)),
+        ("standings", "standings_rebuilt", lambda: _standings(leagues)),
+        ("listone", "listone_warmed", lambda: listone_payload.warm(league_ids)),
+    ):
+        t0 = time.perf_counter()
+        try:
+            done = fn()
+        except Exception:  # noqa: BLE001 — a cold cache must not hold back the nudge
+            log.exception("Pre-riscaldamento %s fallito per le leghe %s", step,
+                          sorted(league_ids))
+            out["warm_failed"] = out.get("warm_failed", 0) + 1
+            done = 0
+        out[f"warm_{step}_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        if done:
+            out[count] = done
+    # The tick exits right after: what the warm-up counted goes in now.
+    cache_stats.flush()
+    return out
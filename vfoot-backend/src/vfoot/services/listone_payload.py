@@ -0,0 +1,358 @@
+"""The listone as the API serves it: one row per eligible player, materialized.
+
+Building it is the same work every time — the eligible pool, each player's club,
+the latest market quotes, the blended season values (which score two seasons of
+votes on a cold cache), the season roles — and nothing in it moves between two
+matchdays except when an import, a role freeze or a retuning moves it. It is
+also the page everybody keeps open during an auction. So the rows are built once
+per ``listone_cache_key`` and every request after that is a cache read plus the
+two columns that change by the minute and cost one query each: who owns the
+player, and whether that player's role is still an open question.
+
+THE KEY moves with everything the rows are computed from:
+
+* the league's FROZEN ROLES (count and last edit), as for the matchday index;
+* the played data of the season AND of the rest of the competition, because the
+  value blends last season's average in;
+* the scoring fingerprint and the ratings snapshot, because a retuning changes
+  every value without touching a row;
+* the eligible pool, the market quotes and the season roles, which the
+  Transfermarkt import and ``compute_classic_roles`` rewrite.
+
+Player names have no stamp; an edited short name shows up within
+``LISTONE_CACHE_TTL`` at the latest.
+
+Filtering and ordering (``filter_rows``) run on the cached rows, never on the
+query: a different filter is not a different entry.
+
+A moved key is rebuilt by one worker (``single_flight``); the others keep
+serving the previous entry until it is there.
+
+After a tick that changed data, ``warm`` rebuilds the entries of the leagues it
+is about to nudge, so the page that re-reads finds them ready.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+
+from realdata.models import Match, Player, PlayerMarketValue, PlayerTeamStint
+from vfoot.api.renderers import PreEncoded, compress_body, encode
+from vfoot.models import CurrentPlayerRole, FantasyLeague, FantasyRosterSlot, LeaguePlayerRole
+from vfoot.services.classic_pagella import data_version
+from vfoot.services import single_flight
+from vfoot.services.name_search import matches as name_matches
+from vfoot.services.vote_reference import scoring_fingerprint
+
+# The ceiling of an entry, not its freshness: the key moves as soon as the data do.
+LISTONE_CACHE_TTL = 6 * 3600
+
+ORDER_ESTIMATED = "estimated"   # the default: homogeneous estimate, then market
+ORDER_VALUE = "value"           # measured voto first, then market
+ORDER_MARKET = "market"
+ORDER_NAME = "name"
+ORDERS = (ORDER_ESTIMATED, ORDER_VALUE, ORDER_MARKET, ORDER_NAME)
+
+
+def club_by_player(competition_season_id, player_ids) -> dict[int, str]:
+    """Il club di ciascun giocatore NELL'EDIZIONE di campionato che si sta guardando.
+
+    UNA REGOLA SOLA, e sono due comportamenti diversi che vengono gratis.
+
+    Una lega in corso gioca la stagione corrente, e l'importazione delle rose
+    tiene fresca quella: chiude i cartellini di chi parte e riapre quelli di chi
+    arriva, quindi il trasferimento di gennaio si vede il giorno dopo. Una lega
+    conclusa resta ferma alla sua stagione, ed e' giusto: una lega finita e' un
+    documento, e deve dire le maglie di allora, non quelle di oggi.
+
+    E' la stessa regola del listone — anzi, e' la stessa funzione, chiamata da
+    ``championship_players_payload`` — e questo e' il punto: in asta si compra dal
+    listone, e i due schermi non possono dire due squadre diverse per lo stesso
+    giocatore. Legarli a due fonti che "di solito coincidono" e' esattamente il
+    modo in cui un giorno non coincidono piu'.
+    """
+    if not competition_season_id:
+        return {}
+    return dict(PlayerTeamStint.objects
+                .filter(team_season__competition_season_id=competition_season_id,
+                        end_date__isnull=True, player_id__in=player_ids)
+                .values_list("player_id", "team_season__team__name"))
+
+
+def _pointer_key(cs_id: int, league_id: int | None) -> str:
+    """Where the LAST key used for this listone is written, so that a new entry
+    drops the previous one instead of leaving it to the cull (see
+    ``classic_matchday_scoring._index_pointer_key`` for why that matters)."""
+    return f"vfoot:listone:last:{cs_id}:{league_id or '-'}"
+
+
+def listone_cache_key(cs, league=None) -> str:
+    """The key the listone of ``cs`` (inside ``league``, if given) lives under."""
+    from vfoot.services.player_ratings import snapshot_digest
+
+    parts: list = [data_version(cs.id), scoring_fingerprint(), snapshot_digest()]
+    parts.append(sorted(Match.objects
+                        .filter(competition_season__competition_id=cs.competition_id,
+                                status=Match.STATUS_FINISHED)
+                        .aggregate(n=Count("id"),
+                                   ready=Count("id", filter=Q(data_ready=True)),
+                                   last=Max("data_changed_at")).items()))
+    parts.append(sorted(PlayerTeamStint.objects
+                        .filter(team_season__competition_season_id=cs.id,
+                                end_date__isnull=True)
+                        .aggregate(n=Count("id"), ids=Sum("id")).items()))
+    parts.append(sorted(PlayerMarketValue.objects
+                        .aggregate(n=Count("id"), last=Max("id")).items()))
+    parts.append(sorted(CurrentPlayerRole.objects
+                        .aggregate(n=Count("id"), last=Max("computed_at")).items()))
+    if league is not None:
+        parts.append(sorted(LeaguePlayerRole.objects.filter(league=league)
+                            .aggregate(n=Count("id"), last=Max("updated_at")).items()))
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+    return f"vfoot:listone:{cs.id}:{league.id if league is not None else '-'}:{digest}"
+
+
+def build_listone(cs, league=None) -> dict:
+    """The cacheable part of the listone: every row, minus ownership and limbo."""
+    from vfoot.services.classic_rating import current_role_map
+    from vfoot.services.listone import eligible_player_ids
+    from vfoot.services.player_ratings import latest_market_values, player_values
+
+    pool = eligible_player_ids(cs.id)
+
+    # Il club di ciascuno in QUESTA edizione. Stessa funzione che usa la sala
+    # d'asta: si compra da questo elenco, e i due schermi devono dire lo stesso.
+    team_by_player = club_by_player(cs.id, pool)
+
+    # frozen listone role, fallback to the global classic role
+    lpr = (dict(LeaguePlayerRole.objects.filter(league=league)
+                .values_list("player_id", "role")) if league is not None else {})
+
+    # Value blends last season's average with current-season form as the
+    # championship progresses (see player_values).
+    market = latest_market_values(pool)
+    values, prev_cs, fit = player_values(cs, market)
+
+    players = (Player.objects.filter(id__in=pool)
+               .values("id", "full_name", "short_name", "classic_role_seed"))
+    # The season's measured role, second in line behind the league's frozen one
+    # (AGENTS.md, "Classic Role Resolution"), and never the raw provider seed
+    # alone. It used to be read only OUTSIDE a league, on the grounds that inside
+    # one the frozen role always answers — which is true of everyone except the
+    # players in limbo, who deliberately have no frozen row. For those the row fell
+    # through to ``classic_role_seed``, the provider map where every winger is a
+    # midfielder: the listone showed Chukwueze as a midfielder while the decision
+    # screen, for the same player, proposed attacker. Shown here, the two agree.
+    season_roles = current_role_map()
+    rows = []
+    for p in players:
+        pid = p["id"]
+        v = values.get(pid)
+        rows.append({
+            "market_value": market.get(pid),
+            "player_id": pid,
+            "name": p["short_name"] or p["full_name"] or str(pid),
+            # The list shows the short name ("L. Martinez"); searching for
+            # "Lautaro" found nothing because that string is all the client
+            # had. Sent alongside so the search can match either.
+            "full_name": p["full_name"] or "",
+            "role": (lpr.get(pid) or season_roles.get(pid)
+                     or p["classic_role_seed"] or ""),
+            "team": team_by_player.get(pid),
+            "value": v["value"] if v else None,
+            "estimated_value": v["estimated_value"] if v else None,
+            "value_basis": v["basis"] if v else None,
+            "appearances": v["n_cur"] if v else 0,
+            "prev_appearances": v["n_prev"] if v else 0,
+        })
+    # Default order = the HOMOGENEOUS estimated value, so newcomers rank among
+    # the rated players instead of forming an alphabetical tail. The frontend
+    # also offers the measured-voto-then-market order.
+    rows.sort(key=_ORDER_KEYS[ORDER_ESTIMATED])
+    return {
+        "value_season": str(prev_cs) if prev_cs else None,
+        "current_season": str(cs),
+        # How the market->voto estimate was calibrated (r = fit quality on the
+        # players having both signals), so the UI can be honest about it.
+        "value_fit": ({"intercept": round(fit[0], 3), "slope": round(fit[1], 3),
+                       "r": round(fit[2], 3), "n": fit[3]} if fit else None),
+        "players": rows,
+    }
+
+
+def _get_or_build(cs, league, *, stale_ok: bool = False) -> tuple[dict, bool]:
+    """The entry and whether this call built it. One worker builds a given key
+    (``single_flight``); with ``stale_ok`` the others serve the previous entry
+    meanwhile, which the views do and ``warm`` — the one meant to build — does not."""
+    key = listone_cache_key(cs, league)
+    pointer = _pointer_key(cs.id, league.id if league is not None else None)
+
+    def previous_entry():
+        previous = cache.get(pointer)
+        return cache.get(previous) if previous and previous != key else None
+
+    def build():
+        data = _with_encoded_rows(build_listone(cs, league), league)
+        previous = cache.get(pointer)
+        if previous and previous != key:
+            cache.delete(previous)
+        cache.set(key, data, LISTONE_CACHE_TTL)
+        cache.set(pointer, key, LISTONE_CACHE_TTL)
+        return data
+
+    return single_flight.get_or_build(key, build,
+                                      stale=previous_entry if stale_ok else None,
+                                      family="listone", pointer=pointer)
+
+
+def _with_encoded_rows(data: dict, league) -> dict:
+    """The entry as it goes in the cache: the rows, and each row already encoded.
+
+    ``rows_json`` is a row's JSON minus its closing brace, so that a response is
+    the cached bytes plus the three columns read fresh (``_row_tail``) — a cache
+    hit encodes three values per row instead of the whole row. Outside a league
+    those three are the same for everybody, and the unfiltered response is stored
+    whole, with its gzip form."""
+    data["rows_json"] = {r["player_id"]: encode(r)[:-1] for r in data["players"]}
+    if league is None:
+        body = encode(_envelope(data, [{**r, "owned": False, "owner": None,
+                                        "role_undecided": False}
+                                       for r in data["players"]]))
+        data["body"], data["body_gz"] = body, compress_body(body)
+    return data
+
+
+def cached_listone(cs, league=None, *, stale_ok: bool = True) -> dict:
+    """``build_listone`` through the cache. Callers must not modify the result.
+
+    While another worker rebuilds the entry the previous one is served: a page
+    one tick behind, rather than a second build of the same rows."""
+    return _get_or_build(cs, league, stale_ok=stale_ok)[0]
+
+
+_ORDER_KEYS = {
+    ORDER_ESTIMATED: lambda x: (x["estimated_value"] is None, -(x["estimated_value"] or 0),
+                                -(x["market_value"] or 0), x["name"]),
+    ORDER_VALUE: lambda x: (x["value"] is None, -(x["value"] or 0),
+                            -(x["market_value"] or 0), x["name"]),
+    ORDER_MARKET: lambda x: (x["market_value"] is None, -(x["market_value"] or 0),
+                             x["name"]),
+    ORDER_NAME: lambda x: (x["name"].casefold(), x["player_id"]),
+}
+
+
+def filter_rows(rows, *, role: str | None = None, team: str | None = None,
+                q: str | None = None, free: bool = False,
+                order: str | None = None) -> list[dict]:
+    """The rows a listone request asked for, in the order it asked for.
+
+    ``role`` is one classic role or several comma-separated; ``q`` matches the
+    short or the full name the way the player search does (accents, a typo);
+    ``free`` keeps the players nobody in the league owns. With no argument the
+    rows come back as they are, already in the default order."""
+    out = rows
+    if role:
+        wanted = {r.strip().upper() for r in role.split(",") if r.strip()}
+        out = [r for r in out if r["role"] in wanted]
+    if team:
+        out = [r for r in out if (r["team"] or "").casefold() == team.casefold()]
+    if free:
+        out = [r for r in out if not r.get("owned")]
+    if q:
+        out = [r for r in out if name_matches(q, r["name"], r["full_name"])]
+    if order and order != ORDER_ESTIMATED:
+        out = sorted(out, key=_ORDER_KEYS[order])
+    return list(out)
+
+
+def championship_players_payload(cs, league=None, **filters) -> dict:
+    """The 'listone': one row per currently-eligible player of a championship
+    edition (open real-club stint), with role, real club and a value signal
+    (average voto puro from the latest season with data).
+
+    With a ``league``, two columns are added that only exist inside one: who owns
+    the player, and the role that league froze. Without it the pool, the values
+    and the roles are the season's own — which is what the votes were scored
+    against anyway. ``filters`` are those of ``filter_rows``; the frontend also
+    filters and sorts on its own, over the whole list."""
+    return _overlaid(cached_listone(cs, league), league, filters)
+
+
+def _overlaid(base: dict, league, filters: dict) -> dict:
+    from vfoot.services.league_decisions import undecided_player_ids
+
+    # ownership in this league: it changes with every auction call, so it is read
+    # fresh and laid over the cached rows
+    owner_by_player = (dict(
+        FantasyRosterSlot.objects
+        .filter(team__league=league, released_at__isnull=True)
+        .values_list("player_id", "team__name")) if league is not None else {})
+    # Players whose role is still an open question: shown, but marked, so
+    # nobody plans an auction around someone they cannot actually buy. Outside a
+    # league nobody is buying, and there is no question open: the season role is
+    # simply what it is.
+    undecided = undecided_player_ids(league) if league is not None else set()
+    rows = [{**r, "owned": r["player_id"] in owner_by_player,
+             "owner": owner_by_player.get(r["player_id"]),
+             "role_undecided": r["player_id"] in undecided}
+            for r in base["players"]]
+    return _envelope(base, filter_rows(rows, **filters))
+
+
+def _envelope(base: dict, rows: list[dict]) -> dict:
+    return {
+        "value_season": base["value_season"],
+        "current_season": base["current_season"],
+        "count": len(rows),
+        "value_fit": base["value_fit"],
+        "players": rows,
+    }
+
+
+def _row_tail(row: dict) -> bytes:
+    return b"".join((
+        b',"owned":', b"true" if row["owned"] else b"false",
+        b',"owner":', b"null" if row["owner"] is None else encode(row["owner"]),
+        b',"role_undecided":', b"true" if row["role_undecided"] else b"false", b"}"))
+
+
+def championship_players_response(cs, league=None, **filters) -> PreEncoded:
+    """``championship_players_payload``, encoded, for the views: the same bytes,
+    assembled from the cached row fragments instead of encoded row by row."""
+    base = cached_listone(cs, league)
+    if league is None and not any(filters.values()) and base.get("body") is not None:
+        return PreEncoded(base["body"], base["body_gz"])
+    payload = _overlaid(base, league, filters)
+    fragments = base.get("rows_json")
+    if fragments is None:   # an entry written before the fragments existed
+        return PreEncoded.of(payload)
+    return PreEncoded(assemble(payload, fragments))
+
+
+def assemble(payload: dict, fragments: dict[int, bytes]) -> bytes:
+    """``encode(payload)``, with each row taken from its cached fragment.
+
+    The rest of the envelope is encoded on its own and ``players`` spliced in
+    after it, last, as ``_envelope`` puts it."""
+    head = encode({k: v for k, v in payload.items() if k != "players"})[:-1]  # {...
+    head += b',"players":[' if len(head) > 1 else b'"players":['
+    rows = b",".join(fragments[r["player_id"]] + _row_tail(r) for r in payload["players"])
+    return head + rows + b"]}"
+
+
+def warm(league_ids) -> int:
+    """Rebuild the listone entries of these leagues (and of their seasons, as read
+    outside a league). Returns how many entries were built rather than found."""
+    built = 0
+    seasons = {}
+    for league in (FantasyLeague.objects.filter(id__in=list(league_ids),
+                                                reference_season__isnull=False)
+                   .select_related("reference_season__competition",
+                                   "reference_season__season")):
+        seasons[league.reference_season_id] = league.reference_season
+        built += _get_or_build(league.reference_season, league)[1]
+    for cs in seasons.values():
+        built += _get_or_build(cs, None)[1]
+    return built
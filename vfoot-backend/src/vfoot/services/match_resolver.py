@@ -26,8 +26,6 @@ team); a future refinement can prefer the appearance when it exists.
 """
 from __future__ import annotations
 
-from django.db.models import Q
-
 from realdata.models import Match, PlayerTeamStint
 from vfoot.services.classic_pagella import get_reference, pagella_for_match
 
@@ -47,26 +45,33 @@ _STATUS_RANK = {
 }
 
 
+def current_team_seasons(cs_id: int, player_ids) -> dict[int, int]:
+    """{player_id: team_season_id} of each player's current club (open stint) in the
+    season, in ONE query; a player with no open stint is absent.
+
+    Two open stints in the same season are a data error (see
+    ``realdata.services.roster_integrity``); the lower stint id wins, so the answer
+    is at least the same on every call and on every database."""
+    out: dict[int, int] = {}
+    for pid, ts_id in (PlayerTeamStint.objects
+                       .filter(player_id__in=list(player_ids),
+                               team_season__competition_season_id=cs_id,
+                               end_date__isnull=True)
+                       .order_by("id")
+                       .values_list("player_id", "team_season_id")):
+        out.setdefault(pid, ts_id)
+    return out
+
+
 def player_team_season_id(player_id: int, cs_id: int) -> int | None:
     """The player's current club (open stint) in the season, or None."""
-    return (PlayerTeamStint.objects
-            .filter(player_id=player_id,
-                    team_season__competition_season_id=cs_id,
-                    end_date__isnull=True)
-            .values_list("team_season_id", flat=True)
-            .first())
+    return current_team_seasons(cs_id, [player_id]).get(player_id)
 
 
 def authoritative_match(cs_id: int, matchday: int, team_season_id: int) -> Match | None:
     """The club's match for the matchday, preferring a concluded (data_ready) row
     over a postponed/scheduled shell."""
-    matches = list(Match.objects.filter(
-        competition_season_id=cs_id, matchday=matchday
-    ).filter(Q(home_team_id=team_season_id) | Q(away_team_id=team_season_id)))
-    if not matches:
-        return None
-    return max(matches, key=lambda m: (1 if m.data_ready else 0,
-                                       _STATUS_RANK.get(m.status, 0)))
+    return matchday_fixtures_by_team(cs_id, matchday).get(team_season_id)
 
 
 def _outcome(pid, status, match, line, matchday):
@@ -78,18 +83,23 @@ def _outcome(pid, status, match, line, matchday):
 
 def resolve_matchday(cs_id: int, matchday: int, player_ids, reference=None) -> dict:
     """Resolve every player's outcome for the matchday. Returns
-    {player_id -> outcome dict}. Computes each concluded match's pagella once."""
+    {player_id -> outcome dict}. Computes each concluded match's pagella once.
+
+    Set-based: one query for the players' clubs, one for the matchday's fixtures,
+    then a pagella per concluded match involved — however many players are asked."""
     if reference is None:
         reference = get_reference(cs_id)
     player_ids = list(player_ids)
+    if not player_ids:
+        return {}
 
-    ts_by_player = {pid: player_team_season_id(pid, cs_id) for pid in player_ids}
-    match_by_ts = {ts: authoritative_match(cs_id, matchday, ts)
-                   for ts in {t for t in ts_by_player.values() if t}}
+    ts_by_player = current_team_seasons(cs_id, player_ids)
+    fixtures = matchday_fixtures_by_team(cs_id, matchday)
+    match_by_player = {pid: fixtures.get(ts) for pid, ts in ts_by_player.items()}
 
     # One pagella per distinct concluded match -> player_id -> line.
     line_by_player: dict[int, dict] = {}
-    for m in {mm.id: mm for mm in match_by_ts.values()
+    for m in {mm.id: mm for mm in match_by_player.values()
               if mm is not None and mm.data_ready}.values():
         pag = pagella_for_match(m, reference)
         for side in ("home", "away"):
@@ -99,7 +109,7 @@ def resolve_matchday(cs_id: int, matchday: int, player_ids, reference=None) -> d
 
     out = {}
     for pid in player_ids:
-        match = match_by_ts.get(ts_by_player.get(pid))
+        match = match_by_player.get(pid)
         if match is None:
             out[pid] = _outcome(pid, NO_MATCH, None, None, matchday)
         elif not match.data_ready:
@@ -116,6 +126,36 @@ def resolve_player(player_id: int, cs_id: int, matchday: int, reference=None) ->
     return resolve_matchday(cs_id, matchday, [player_id], reference)[player_id]
 
 
+def resolve_rosters(cs_id: int, matchday: int, rosters, reference=None) -> dict:
+    """``resolve_matchday`` for many rosters at once: ``rosters`` is
+    {key -> iterable of player ids} (typically fantasy team id -> owned players) and
+    the result is {key -> {player_id -> outcome}}.
+
+    The union of the rosters is resolved in one pass, so a real match shared by
+    ten fantasy teams has its pagella computed once rather than ten times. A player
+    owned twice (two leagues) gets the same outcome dict in both rosters."""
+    rosters = {key: list(pids) for key, pids in rosters.items()}
+    everyone = {pid for pids in rosters.values() for pid in pids}
+    resolved = resolve_matchday(cs_id, matchday, sorted(everyone), reference)
+    return {key: {pid: resolved[pid] for pid in pids} for key, pids in rosters.items()}
+
+
+def resolve_league_matchday(league, md, reference=None) -> dict:
+    """{fantasy_team_id -> {player_id -> outcome}} for every team of the league on
+    the fantasy matchday ``md``, rosters read in one query (active slots only)."""
+    from vfoot.models import FantasyRosterSlot
+
+    rosters: dict[int, list[int]] = {t_id: [] for t_id in
+                                     league.teams.values_list("id", flat=True)}
+    for team_id, pid in (FantasyRosterSlot.objects
+                         .filter(team__league=league, released_at__isnull=True)
+                         .order_by("team_id", "player_id")
+                         .values_list("team_id", "player_id")):
+        rosters[team_id].append(pid)
+    return resolve_rosters(md.real_competition_season_id, md.real_matchday, rosters,
+                           reference)
+
+
 def pending_player_ids(cs_id: int, matchday: int, player_ids) -> set:
     """Of these players, the ones whose club has NOT played its match of the matchday.
 
@@ -135,13 +175,7 @@ def pending_player_ids(cs_id: int, matchday: int, player_ids) -> set:
     if not player_ids:
         return set()
     fixtures = matchday_fixtures_by_team(cs_id, matchday)
-    stints = dict(
-        PlayerTeamStint.objects.filter(
-            player_id__in=player_ids,
-            team_season__competition_season_id=cs_id,
-            end_date__isnull=True,
-        ).values_list("player_id", "team_season_id")
-    )
+    stints = current_team_seasons(cs_id, player_ids)
     out = set()
     for pid in player_ids:
         match = fixtures.get(stints.get(pid))
@@ -157,13 +191,7 @@ def pending_matches(cs_id: int, matchday: int, player_ids) -> list:
     if not player_ids:
         return []
     fixtures = matchday_fixtures_by_team(cs_id, matchday)
-    stints = dict(
-        PlayerTeamStint.objects.filter(
-            player_id__in=player_ids,
-            team_season__competition_season_id=cs_id,
-            end_date__isnull=True,
-        ).values_list("player_id", "team_season_id")
-    )
+    stints = current_team_seasons(cs_id, player_ids)
     seen: dict[int, Match] = {}
     for pid in player_ids:
         match = fixtures.get(stints.get(pid))
@@ -183,14 +211,23 @@ def pending_matches(cs_id: int, matchday: int, player_ids) -> list:
 
 def matchday_fixtures_by_team(cs_id: int, matchday: int) -> dict:
     """{team_season_id: Match} for one matchday, keeping the authoritative row when a
-    club has more than one (postponed shell + replay)."""
+    club has more than one (postponed shell + replay). On a tie in rank the lower
+    match id is kept, whichever order the database returns the rows in."""
+    return fixtures_by_team(
+        Match.objects
+        .filter(competition_season_id=cs_id, matchday=matchday)
+        .select_related("home_team__team", "away_team__team")
+        .order_by("id"))
+
+
+def fixtures_by_team(matches) -> dict:
+    """``matchday_fixtures_by_team`` over matches already in hand, in id order —
+    for a caller that holds the round's rows (``matchday_state``'s calendar)."""
     def rank(m):
         return (1 if m.data_ready else 0, _STATUS_RANK.get(m.status, 0))
 
     out: dict[int, Match] = {}
-    for m in (Match.objects
-              .filter(competition_season_id=cs_id, matchday=matchday)
-              .select_related("home_team__team", "away_team__team")):
+    for m in matches:
         for ts_id in (m.home_team_id, m.away_team_id):
             cur = out.get(ts_id)
             if cur is None or rank(m) > rank(cur):
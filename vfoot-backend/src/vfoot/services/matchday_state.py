@@ -18,11 +18,23 @@ had to answer both.
 
 Everything in this module is DERIVED from the calendar and the ledger rows; the
 only stored state is ``FantasyMatchday.status``.
+
+The calendar half reads one season's fixture list, and a page asks it a dozen
+questions. Inside a ``calendar_scope`` — every request (``CalendarScopeMiddleware``)
+and the tick's warm-up — the list is read ONCE per season and every function below
+answers from it. Outside one each call asks the database only what it needs, as it
+always did: a command that asks one question per league must not pay a season read
+for each.
 """
 from __future__ import annotations
 
+import contextvars
+from contextlib import contextmanager
 from datetime import timedelta
 
+from django.db.models import Max, Min
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 from realdata.models import Match
@@ -35,6 +47,104 @@ from vfoot.models import FantasyMatchday
 # failure this module exists to avoid.
 MATCH_WINDOW = timedelta(hours=3)
 
+_OFF = (Match.STATUS_POSTPONED, Match.STATUS_CANCELLED)
+
+
+# --------------------------------------------------------------------------- #
+# The calendar, read once.                                                     #
+# --------------------------------------------------------------------------- #
+class _Calendar:
+    """One season's fixture list, and the per-round facts every question reads.
+
+    The matchday list alone asked for the first kickoffs, the last kickoffs, the
+    round being played and the round to field — four queries over the same three
+    hundred and eighty rows, and a dozen more once the lineup page added a deadline
+    per team. This is those rows read once, with the clubs joined because the ``own``
+    deadline hands its match back to be named on the page.
+    """
+
+    def __init__(self, competition_season_id: int):
+        self.matches = list(
+            Match.objects.filter(competition_season_id=competition_season_id)
+            .select_related("home_team__team", "away_team__team")
+            .order_by("id")
+        )
+        self.by_matchday: dict[int, list] = {}
+        for m in self.matches:
+            if m.matchday is not None:
+                self.by_matchday.setdefault(int(m.matchday), []).append(m)
+        # First confirmed kickoff whatever became of the match; last one among
+        # those still to be played where they were scheduled.
+        self.locks: dict[int, object] = {}
+        self.last_kickoffs: dict[int, object] = {}
+        for md, ms in self.by_matchday.items():
+            confirmed = [m for m in ms if m.kickoff is not None and not m.kickoff_provisional]
+            if confirmed:
+                self.locks[md] = min(m.kickoff for m in confirmed)
+            standing = [m.kickoff for m in confirmed if m.status not in _OFF]
+            if standing:
+                self.last_kickoffs[md] = max(standing)
+        self._fixtures: dict[int, dict] = {}
+
+    def fixtures(self, real_matchday: int) -> dict:
+        """``matchday_fixtures_by_team`` for one round, off the rows in hand."""
+        from vfoot.services.match_resolver import fixtures_by_team
+
+        if real_matchday not in self._fixtures:
+            self._fixtures[real_matchday] = fixtures_by_team(
+                self.by_matchday.get(real_matchday, ()))
+        return self._fixtures[real_matchday]
+
+
+_memo: contextvars.ContextVar[dict | None] = contextvars.ContextVar(
+    "matchday_state_calendar", default=None)
+
+
+@contextmanager
+def calendar_scope():
+    """Read each season's calendar at most once until the block ends.
+
+    Nested scopes share the outer one. A Match saved or deleted inside the block
+    drops its season (see ``_match_changed``); a bulk ``update()`` sends no signal,
+    and a caller that writes the calendar that way calls ``forget_calendar``.
+    """
+    if _memo.get() is not None:
+        yield
+        return
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def calendar(competition_season_id: int) -> _Calendar | None:
+    """The season's calendar as read by the open scope; None outside one."""
+    memo = _memo.get()
+    if memo is None:
+        return None
+    cal = memo.get(competition_season_id)
+    if cal is None:
+        cal = memo[competition_season_id] = _Calendar(competition_season_id)
+    return cal
+
+
+def forget_calendar(competition_season_id: int | None = None) -> None:
+    """Drop the scope's copy of one season's calendar — every season's with None."""
+    memo = _memo.get()
+    if memo is None:
+        return
+    if competition_season_id is None:
+        memo.clear()
+    else:
+        memo.pop(competition_season_id, None)
+        memo.pop("open", None)
+
+
+@receiver([post_save, post_delete], sender=Match, dispatch_uid="matchday_state.calendar")
+def _match_changed(sender, instance, **kwargs):
+    forget_calendar(instance.competition_season_id)
+
 
 # --------------------------------------------------------------------------- #
 # The real calendar: what is being played.                                     #
@@ -47,6 +157,9 @@ def lineup_lock_at(competition_season_id: int, real_matchday: int):
     Returns None when the round has no confirmed kickoff at all, which reads as
     "not locked".
     """
+    cal = calendar(competition_season_id)
+    if cal is not None:
+        return cal.locks.get(real_matchday)
     return (
         Match.objects.filter(
             competition_season_id=competition_season_id,
@@ -66,13 +179,10 @@ def is_locked(competition_season_id: int, real_matchday: int, now=None) -> bool:
 
 
 def matchday_locks(competition_season_id: int) -> dict[int, object]:
-    """{real_matchday: first confirmed kickoff} for a whole season, in one query.
-
-    The per-matchday lookup costs a query each, which a calendar of 38 rounds turns
-    into 38 — this is the same answer for the whole season at once.
-    """
-    from django.db.models import Min
-
+    """{real_matchday: first confirmed kickoff} for a whole season, in one query."""
+    cal = calendar(competition_season_id)
+    if cal is not None:
+        return dict(cal.locks)
     rows = (
         Match.objects.filter(
             competition_season_id=competition_season_id,
@@ -105,8 +215,9 @@ def matchday_last_kickoffs(competition_season_id: int) -> dict[int, object]:
     Under the per-player deadline this is when a round finally closes: the moment
     the last club takes the pitch there is nobody left to decide about.
     """
-    from django.db.models import Max
-
+    cal = calendar(competition_season_id)
+    if cal is not None:
+        return dict(cal.last_kickoffs)
     rows = (
         Match.objects.filter(
             competition_season_id=competition_season_id,
@@ -114,7 +225,7 @@ def matchday_last_kickoffs(competition_season_id: int) -> dict[int, object]:
             kickoff__isnull=False,
             matchday__isnull=False,
         )
-        .exclude(status__in=[Match.STATUS_POSTPONED, Match.STATUS_CANCELLED])
+        .exclude(status__in=_OFF)
         .values("matchday")
         .annotate(last=Max("kickoff"))
         .values_list("matchday", "last")
@@ -216,12 +327,12 @@ def team_first_kickoff(league, team, real_matchday: int):
     knows something about his own team, i.e. the clock of the defender-count rule.
     ``(None, None)`` without a reference season or a confirmed kickoff."""
     from vfoot.models import FantasyRosterSlot
-    from vfoot.services.match_resolver import matchday_fixtures_by_team
     from realdata.models import PlayerTeamStint
 
     csid = league.reference_season_id
     if csid is None:
         return None, None
+    cal = calendar(csid)
     slots = list(
         FantasyRosterSlot.objects.filter(team_id=getattr(team, "id", team))
         .values_list("player_id", "acquired_at", "released_at")
@@ -229,10 +340,15 @@ def team_first_kickoff(league, team, real_matchday: int):
     if not slots:
         # No contract, ever: there is nothing to compute a deadline from, and the
         # conservative answer is the league-wide one — the round's first kickoff.
-        m = (Match.objects.filter(competition_season_id=csid, matchday=real_matchday,
-                                  kickoff_provisional=False, kickoff__isnull=False)
-             .select_related("home_team__team", "away_team__team")
-             .order_by("kickoff").first())
+        if cal is not None:
+            m = min((m for m in cal.by_matchday.get(real_matchday, ())
+                     if m.kickoff is not None and not m.kickoff_provisional),
+                    key=lambda m: (m.kickoff, m.id), default=None)
+        else:
+            m = (Match.objects.filter(competition_season_id=csid, matchday=real_matchday,
+                                      kickoff_provisional=False, kickoff__isnull=False)
+                 .select_related("home_team__team", "away_team__team")
+                 .order_by("kickoff", "id").first())
         return (m.kickoff, m) if m is not None else (None, None)
     stint = dict(
         PlayerTeamStint.objects.filter(
@@ -241,13 +357,13 @@ def team_first_kickoff(league, team, real_matchday: int):
             end_date__isnull=True,
         ).values_list("player_id", "team_season_id")
     )
-    fixtures = matchday_fixtures_by_team(csid, real_matchday)
+    fixtures = _fixtures(csid, real_matchday)
     best, best_match = None, None
     for pid, acquired_at, released_at in slots:
         m = fixtures.get(stint.get(pid))
         if m is None or m.kickoff is None or m.kickoff_provisional:
             continue
-        if m.status in (Match.STATUS_POSTPONED, Match.STATUS_CANCELLED):
+        if m.status in _OFF:
             continue
         k = m.kickoff
         if released_at is not None and not (
@@ -257,6 +373,17 @@ def team_first_kickoff(league, team, real_matchday: int):
             best, best_match = k, m
     return best, best_match
 
+
+def _fixtures(competition_season_id: int, real_matchday: int) -> dict:
+    """``matchday_fixtures_by_team``, off the scope's calendar when one is open."""
+    from vfoot.services.match_resolver import matchday_fixtures_by_team
+
+    cal = calendar(competition_season_id)
+    if cal is not None:
+        return cal.fixtures(real_matchday)
+    return matchday_fixtures_by_team(competition_season_id, real_matchday)
+
+
 def player_lock_times(competition_season_id: int, real_matchday: int) -> dict[int, object]:
     """{team_season_id: confirmed kickoff of that club's match in this round}.
 
@@ -266,13 +393,11 @@ def player_lock_times(competition_season_id: int, real_matchday: int) -> dict[in
     replay row, so the club's deadline moves to the recovery, which is the right
     answer for a manager who has to decide about a player nobody is going to play.
     """
-    from vfoot.services.match_resolver import matchday_fixtures_by_team
-
     out: dict[int, object] = {}
-    for ts_id, m in matchday_fixtures_by_team(competition_season_id, real_matchday).items():
+    for ts_id, m in _fixtures(competition_season_id, real_matchday).items():
         if m.kickoff is None or m.kickoff_provisional:
             continue
-        if m.status in (Match.STATUS_POSTPONED, Match.STATUS_CANCELLED):
+        if m.status in _OFF:
             continue
         out[ts_id] = m.kickoff
     return out
@@ -383,19 +508,27 @@ def playing_matchday(league, now=None) -> int | None:
     cs = league.reference_season
     if cs is None:
         return None
-    rows = list(
-        Match.objects.filter(
-            competition_season_id=cs.id,
-            matchday__isnull=False,
-            kickoff__isnull=False,
-            kickoff_provisional=False,
-            kickoff__gt=now - ROUND_SPAN - MATCH_WINDOW,
-            kickoff__lte=now + ROUND_SPAN,
-        )
-        .exclude(status__in=[Match.STATUS_POSTPONED, Match.STATUS_CANCELLED])
-        .values_list("matchday", "kickoff", "data_ready")
-    )
     by_md: dict[int, list] = {}
+    cal = calendar(cs.id)
+    if cal is not None:
+        rows = ((md, m.kickoff, m.data_ready)
+                for md, ms in cal.by_matchday.items() for m in ms
+                if m.kickoff is not None and not m.kickoff_provisional
+                and m.status not in _OFF
+                and now - ROUND_SPAN - MATCH_WINDOW < m.kickoff <= now + ROUND_SPAN)
+    else:
+        rows = (
+            Match.objects.filter(
+                competition_season_id=cs.id,
+                matchday__isnull=False,
+                kickoff__isnull=False,
+                kickoff_provisional=False,
+                kickoff__gt=now - ROUND_SPAN - MATCH_WINDOW,
+                kickoff__lte=now + ROUND_SPAN,
+            )
+            .exclude(status__in=_OFF)
+            .values_list("matchday", "kickoff", "data_ready")
+        )
     for md, k, ready in rows:
         by_md.setdefault(int(md), []).append((k, ready))
     playing = []
@@ -449,14 +582,19 @@ def open_season_ids() -> set[int]:
     """
     from realdata.models import CompetitionSeason
 
-    with_calendar = set(Match.objects.values_list("competition_season_id", flat=True).distinct())
-    still_to_play = set(
-        Match.objects.filter(status__in=(Match.STATUS_SCHEDULED, Match.STATUS_LIVE))
-        .values_list("competition_season_id", flat=True)
-        .distinct()
-    )
+    memo = _memo.get()
+    if memo is not None and "open" in memo:
+        return set(memo["open"])
+    with_calendar, still_to_play = set(), set()
+    for csid, st in Match.objects.values_list("competition_season_id", "status").distinct():
+        with_calendar.add(csid)
+        if st in (Match.STATUS_SCHEDULED, Match.STATUS_LIVE):
+            still_to_play.add(csid)
     all_ids = set(CompetitionSeason.objects.values_list("id", flat=True))
-    return still_to_play | (all_ids - with_calendar)
+    out = still_to_play | (all_ids - with_calendar)
+    if memo is not None:
+        memo["open"] = out
+    return set(out)
 
 
 def season_is_open(competition_season_id: int) -> bool:
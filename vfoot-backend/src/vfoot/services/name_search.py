@@ -15,6 +15,7 @@ a broken search.
 from __future__ import annotations
 
 import unicodedata
+from collections import Counter
 
 _PUNCT = "’'`´-."
 
@@ -82,3 +83,168 @@ def matches(needle: str, *fields: str | None) -> bool:
                 if _edit_distance_within(head, q, slack) <= slack:
                     return True
     return False
+
+
+# --------------------------------------------------------------------------- #
+# The same rules, over many names at once                                      #
+# --------------------------------------------------------------------------- #
+def _distance(a: str, b: str) -> int:
+    """Exact Levenshtein distance, bit-parallel (Myers/Hyyrö): one pass over the
+    longer string with the shorter held as bit masks, instead of
+    ``_edit_distance_within``'s table — the check every index candidate gets."""
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if not m:
+        return len(a)
+    peq: dict[str, int] = {}
+    for i, ch in enumerate(b):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    full = (1 << m) - 1
+    top = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for ch in a:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & top:
+            score += 1
+        elif mh & top:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def _gram_keys(text: str) -> list[tuple[str, int]]:
+    """The padded bigrams of ``text`` as a multiset: the second "an" of "banana"
+    is ("an", 2), so two key sets intersect exactly as the multisets do."""
+    padded = f"^{text}$"
+    seen: dict[str, int] = {}
+    out = []
+    for i in range(len(padded) - 1):
+        g = padded[i:i + 2]
+        seen[g] = seen.get(g, 0) + 1
+        out.append((g, seen[g]))
+    return out
+
+
+class _NearTable:
+    """The strings within ``k`` edits of a needle, without measuring them all.
+
+    Candidates come from the q-gram lemma: ``k`` edits destroy at most ``2k`` of
+    a string's padded bigrams, so a string within ``k`` of ``q`` shares at least
+    ``len(q) + 1 - 2k`` of them with it. Counting the shared ones is a walk over
+    a few postings; only the strings that reach the bar are measured. Every
+    needle that has slack at all (``allowed_errors``) keeps the bar above zero,
+    which is what makes the filter complete — see ``within``."""
+
+    __slots__ = ("strings", "_postings")
+
+    def __init__(self, strings):
+        self.strings: list[str] = list(strings)
+        postings: dict[tuple[str, int], list[int]] = {}
+        for i, text in enumerate(self.strings):
+            for key in _gram_keys(text):
+                postings.setdefault(key, []).append(i)
+        self._postings = {key: tuple(ids) for key, ids in postings.items()}
+
+    def within(self, needle: str, k: int) -> list[str]:
+        bar = len(needle) + 1 - 2 * k
+        if bar <= 0:
+            # Not reachable from ``NameIndex`` (slack 1 needs 4 letters, slack 2
+            # seven); kept exact rather than fast for any other caller.
+            return [t for t in self.strings if _distance(t, needle) <= k]
+        shared: Counter = Counter()
+        for key in _gram_keys(needle):
+            ids = self._postings.get(key)
+            if ids:
+                shared.update(ids)
+        m = len(needle)
+        out = []
+        for i, n in shared.items():
+            if n >= bar:
+                text = self.strings[i]
+                if abs(len(text) - m) <= k and _distance(text, needle) <= k:
+                    out.append(text)
+        return out
+
+
+class NameIndex:
+    """``matches`` over a fixed list of entries, without looking at each one.
+
+    Built once from ``[(key, [name, name, ...]), ...]`` and then asked
+    ``search(needle)``, which returns the keys ``matches(needle, *names)`` would
+    accept, in the order they were given — the same answer, by construction, as
+    the loop it replaces (``tests_name_search`` holds it to that):
+
+    * a needle contained in a folded name is found through the n-gram postings
+      (trigrams; bigrams for a two-letter needle) and confirmed with ``in``;
+    * a word within the allowed errors of the needle, through a ``_NearTable``
+      of every distinct word;
+    * the typo-in-a-prefix rule, through a ``_NearTable`` of the openings of
+      exactly the length that rule compares (the needle's plus its slack), built
+      the first time a needle of that length asks for it.
+    """
+
+    def __init__(self, entries):
+        self.keys: list = []
+        self._names: list[tuple[str, ...]] = []
+        self._grams: dict[str, set[int]] = {}
+        self._words: dict[str, set[int]] = {}
+        for key, names in entries:
+            idx = len(self.keys)
+            folded = tuple(dict.fromkeys(f for f in (fold(n) for n in names) if f))
+            self.keys.append(key)
+            self._names.append(folded)
+            for name in folded:
+                for n in (2, 3):
+                    for i in range(len(name) - n + 1):
+                        self._grams.setdefault(name[i:i + n], set()).add(idx)
+                for word in name.split():
+                    self._words.setdefault(word, set()).add(idx)
+        self._word_table = _NearTable(self._words)
+        self._head_tables: dict[int, tuple[_NearTable, dict[str, set[int]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _heads(self, length: int) -> tuple[_NearTable, dict[str, set[int]]]:
+        hit = self._head_tables.get(length)
+        if hit is None:
+            owners: dict[str, set[int]] = {}
+            for word, idxs in self._words.items():
+                if len(word) > length:
+                    owners.setdefault(word[:length], set()).update(idxs)
+            hit = self._head_tables[length] = (_NearTable(owners), owners)
+        return hit
+
+    def _containing(self, q: str) -> set[int]:
+        n = min(len(q), 3)
+        if n < 2:
+            return {i for i, names in enumerate(self._names)
+                    if any(q in name for name in names)}
+        postings = sorted((self._grams.get(q[i:i + n], set())
+                           for i in range(len(q) - n + 1)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {i for i in candidates if any(q in name for name in self._names[i])}
+
+    def search(self, needle: str, limit: int | None = None) -> list:
+        q = fold(needle)
+        if not q:
+            return self.keys[:limit]
+        hits = self._containing(q)
+        slack = allowed_errors(q)
+        if slack:
+            for word in self._word_table.within(q, slack):
+                hits |= self._words[word]
+            # Words longer than the needle are also compared on their opening
+            # ``len(q) + slack`` letters; shorter openings are whole words, above.
+            table, owners = self._heads(len(q) + slack)
+            for head in table.within(q, slack):
+                hits |= owners[head]
+        return [self.keys[i] for i in sorted(hits)][:limit]
@@ -11,12 +11,16 @@ from __future__ import annotations
 
 import hashlib
 import re
+import time
 from collections import defaultdict
 
 from django.core.cache import cache
-from django.db.models import Case, F, FloatField, Max, Sum, Value, When
+from django.db.models import FloatField, Max, Sum
 
 from realdata.models import Match, MatchAppearance, PlayerZoneFeature
+from realdata.services import cache_stats
+from realdata.services import feature_totals as match_totals
+from realdata.services import zone_archive
 from realdata.services.sofascore_adapter import METHOD_UNPLACED
 
 _ZONE_RE = re.compile(r"^Z_(\d+)_\d+$")
@@ -103,7 +107,10 @@ def player_footprints(player_ids: list[int], as_of_matchday: int | None = None,
     key = _footprint_cache_key(ids, as_of_matchday, competition_season_id)
     hit = cache.get(key)
     if hit is not None:
+        cache_stats.hit("footprints")
         return {int(p): z for p, z in hit.items()}
+    cache_stats.miss("footprints")
+    t0 = time.perf_counter()
 
     # A footprint is a claim about position, so the unplaced rows a live match's
     # light round writes are not part of it (see sofascore_adapter.METHOD_UNPLACED).
@@ -119,6 +126,15 @@ def player_footprints(player_ids: list[int], as_of_matchday: int | None = None,
                                        .annotate(total=Sum("value", output_field=FloatField()))
                                        .values_list("player_id", "zone_key", "total")):
         raw[int(player_id)][str(zone_key)] = float(total or 0.0)
+    # a concluded season may have left the hot table (see zone_archive)
+    for (player_id, zone_key), total in zone_archive.grouped(
+            zone_archive.player_rows(competition_season_id=competition_season_id,
+                                     before_matchday=as_of_matchday, player_ids=ids,
+                                     feature_keys=["touches"],
+                                     exclude_method=METHOD_UNPLACED),
+            key=lambda r: (r.player_id, r.zone_key)).items():
+        zones = raw[int(player_id)]
+        zones[zone_key] = zones.get(zone_key, 0.0) + total
 
     footprints: dict[int, dict[str, float]] = {}
     for player_id, zones in raw.items():
@@ -126,6 +142,7 @@ def player_footprints(player_ids: list[int], as_of_matchday: int | None = None,
         if total > 0:
             footprints[player_id] = {z: round(v / total, 5) for z, v in zones.items()}
     cache.set(key, footprints, None)
+    cache_stats.built("footprints", time.perf_counter() - t0)
     return footprints
 
 
@@ -285,11 +302,13 @@ def player_form(
     the previous one when the current has not started); `player_minutes` has always
     honoured that decision, and this simply stops being the one that ignores it.
 
-    Summed BY THE DATABASE, not in Python. The old shape pulled every zone-feature
-    row of every player — 34k rows to produce two dozen numbers — and that cost is
-    paid per request: alone it is 60ms, but five concurrent requests took 2.8s,
-    forty times worse per request rather than five, because the row conversion
-    holds the GIL while SQLite pages thrash. Aggregating leaves 196 rows.
+    Read from the per-match totals, not the zone rows. The first shape pulled
+    every zone-feature row of every player — 34k rows to produce two dozen numbers
+    — and that cost is paid per request: alone it is 60ms, but five concurrent
+    requests took 2.8s, forty times worse per request rather than five, because
+    the row conversion holds the GIL while SQLite pages thrash. Grouping them in
+    the database fixed the transfer and not the scan; ``PlayerMatchFeatureTotal``
+    already holds one row per player and match.
     """
     ids = [int(p) for p in player_ids]
     if not ids:
@@ -299,9 +318,12 @@ def player_form(
                           competition_season_id)
     hit = cache.get(key)
     if hit is not None:
+        cache_stats.hit("player_form")
         # Le chiavi tornano dal JSON come stringhe: rimesse a int, altrimenti il
         # chiamante trova un dizionario che a lui sembra vuoto.
         return {int(k): v for k, v in hit.items()}
+    cache_stats.miss("player_form")
+    t0 = time.perf_counter()
 
     # Solo le feature che hanno UN PESO E UNA SCALA: sono 14 su 46, e le altre 32
     # venivano lette, trasferite e buttate via dall'`if w and s`.
@@ -309,33 +331,27 @@ def player_form(
     if not usable:
         return {}
 
-    qs = PlayerZoneFeature.objects.filter(player_id__in=ids, feature_key__in=usable)
+    matches = Match.objects.all()
     if competition_season_id is not None:
-        qs = qs.filter(match__competition_season_id=competition_season_id)
+        matches = matches.filter(competition_season_id=competition_season_id)
     if as_of_matchday is not None:
-        qs = qs.filter(match__matchday__lt=as_of_matchday,
-                       match__matchday__gte=as_of_matchday - window)
-
-    # Due CASE, e non un peso gia' diviso: cosi' l'aritmetica resta w * (value / s),
-    # nello stesso ordine di prima. Precalcolare w/s sposterebbe l'ultima cifra, e
-    # su un numero che alimenta i voti non e' una liberta' da prendersi in silenzio.
-    w_case = Case(*[When(feature_key=k, then=Value(float(params[k]))) for k in usable],
-                  output_field=FloatField())
-    s_case = Case(*[When(feature_key=k, then=Value(float(scales[k]))) for k in usable],
-                  output_field=FloatField())
-    rows = (qs.annotate(_w=w_case, _s=s_case)
-              .values("player_id", "match_id")
-              .annotate(total=Sum(F("_w") * (F("value") / F("_s")),
-                                  output_field=FloatField()))
-              .values_list("player_id", "match_id", "total"))
-
+        matches = matches.filter(matchday__lt=as_of_matchday,
+                                 matchday__gte=as_of_matchday - window)
+    summed = match_totals.match_player_totals(
+        matches.values_list("id", flat=True), player_ids=ids, feature_keys=usable)
+
+    # w * (value / s), e non un peso gia' diviso: precalcolare w/s sposterebbe
+    # l'ultima cifra, e su un numero che alimenta i voti non e' una liberta' da
+    # prendersi in silenzio.
     by_player: dict[int, list[float]] = defaultdict(list)
-    for pid, _mid, total in rows:
-        by_player[int(pid)].append(float(total or 0.0))
+    for (_mid, pid), feats in summed.items():
+        by_player[int(pid)].append(sum(float(params[k]) * (v / float(scales[k]))
+                                       for k, v in feats.items()))
     out = {pid: round(sum(cs) / len(cs), 3) for pid, cs in by_player.items() if cs}
     # Senza scadenza, come le altre cache di questo progetto: a farla decadere e'
     # la chiave, non l'orologio.
     cache.set(key, out, None)
+    cache_stats.built("player_form", time.perf_counter() - t0)
     return out
 
 
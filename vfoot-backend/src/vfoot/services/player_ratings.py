@@ -27,6 +27,7 @@ import hashlib
 import json
 import logging
 import math
+import time
 from collections import defaultdict
 from pathlib import Path
 
@@ -34,6 +35,7 @@ from django.conf import settings
 from django.core.cache import cache
 
 from realdata.models import CompetitionSeason, Match, Player, PlayerZoneFeature
+from realdata.services import cache_stats, zone_archive
 from vfoot.services.classic_pagella import data_version, get_reference
 from vfoot.services.vote_reference import scoring_fingerprint
 from vfoot.services.classic_rating import PROVIDER_SOFASCORE, voto_puro_for_match
@@ -107,9 +109,10 @@ def _compute_season_player_ratings(cs_id: int) -> dict:
     # Cheap probe before 380 scoring passes that would each find nothing: a slim
     # database (see export_dev_db) has no zone features, and the snapshot fallback
     # in season_player_ratings is what answers for it.
-    if not PlayerZoneFeature.objects.filter(
-            match_id__in=[m.id for m in matches],
-            provider=PROVIDER_SOFASCORE).exists():
+    if not (PlayerZoneFeature.objects.filter(
+                match_id__in=[m.id for m in matches],
+                provider=PROVIDER_SOFASCORE).exists()
+            or zone_archive.archived_match_ids(competition_season_id=cs_id)):
         return {}
 
     ref = get_reference(cs_id)
@@ -303,7 +306,10 @@ def season_player_ratings(cs_id: int) -> dict:
            f":{scoring_fingerprint()}:{snapshot_digest()}")
     hit = cache.get(key)
     if hit is not None:
+        cache_stats.hit("season_ratings")
         return hit
+    cache_stats.miss("season_ratings")
+    t0 = time.perf_counter()
     data = _compute_season_player_ratings(cs_id)
     if not data:
         # Nothing computable: either a season this model cannot score at all, or a
@@ -315,6 +321,7 @@ def season_player_ratings(cs_id: int) -> dict:
             log.info("season %s scored from the versioned snapshot (%d players): "
                      "no zone features in this database.", cs_id, len(data))
     cache.set(key, data, None)
+    cache_stats.built("season_ratings", time.perf_counter() - t0)
     return data
 
 
@@ -0,0 +1,84 @@
+"""The player search's forgiving pass, over an in-process index of every name.
+
+``PlayerSearchView`` asks the database first (``icontains`` on either name) and,
+when that finds nothing — an accent, a typo, a first name typed as the short
+name hides it — falls back to ``name_search.matches``. That fallback used to fold
+and compare every row of the player table in Python, once per keystroke. Here
+the table is folded ONCE into a ``name_search.NameIndex`` of the short and full
+names kept for the life of the process, and a keystroke is a few n-gram
+postings and an edit-distance check of the words they leave. ``PlayerAlias`` is
+left out: its rows are provider ids (SofaScore, Transfermarkt), not names.
+
+FRESHNESS. The index is stamped with the player table's size and highest id,
+which every import moves; one aggregate per search tells whether it still
+describes the table. A name corrected IN PLACE (the admin fixing a short
+name) moves neither, so an index is also rebuilt once it is older than
+``VFOOT_PLAYER_SEARCH_MAX_AGE`` seconds.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from realdata.models import Player
+from vfoot.services.name_search import NameIndex
+
+_lock = threading.Lock()
+_current: tuple[tuple, float, NameIndex] | None = None
+
+
+def _stamp() -> tuple:
+    players = Player.objects.aggregate(n=Count("id"), last=Max("id"))
+    return (players["n"], players["last"])
+
+
+def build_index() -> NameIndex:
+    """Every player, in the order the database search lists them, under their
+    short and full name."""
+    return NameIndex(
+        (pid, [short, full])
+        for pid, short, full in (Player.objects.order_by("short_name", "full_name", "id")
+                                 .values_list("id", "short_name", "full_name")))
+
+
+def player_index() -> NameIndex:
+    """The process's index, rebuilt first if the player tables moved under it."""
+    global _current
+    stamp = _stamp()
+    max_age = getattr(settings, "VFOOT_PLAYER_SEARCH_MAX_AGE", 600)
+    current = _current
+    if (current is not None and current[0] == stamp
+            and time.monotonic() - current[1] < max_age):
+        return current[2]
+    with _lock:
+        # Another request may have rebuilt it while this one waited.
+        current = _current
+        if (current is not None and current[0] == stamp
+                and time.monotonic() - current[1] < max_age):
+            return current[2]
+        index = build_index()
+        _current = (stamp, time.monotonic(), index)
+        return index
+
+
+def fuzzy_player_ids(query: str, *, exclude=(), limit: int = 20) -> list[int]:
+    """Ids of the players ``query`` matches under the forgiving rules, in the
+    database search's order, without the excluded ones."""
+    excluded = set(exclude)
+    out = []
+    for pid in player_index().search(query):
+        if pid not in excluded:
+            out.append(pid)
+            if len(out) >= limit:
+                break
+    return out
+
+
+def reset() -> None:
+    """Forget the index (tests, and after editing names in bulk)."""
+    global _current
+    with _lock:
+        _current = None
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Iterable
 
+import numpy as np
 from django.db.models import QuerySet
 
-from realdata.models import Match, PlayerZoneFeature
+from realdata.models import Match, Player, PlayerZoneFeature
+from realdata.services import zone_archive
 from realdata.services.sofascore_adapter import METHOD_UNPLACED
 from vfoot.services.duel_engine import DUEL_BONUS_RATE
 from vfoot.services.zone_engine import make_zone_grid
@@ -56,6 +58,9 @@ class PlayerRealZoneProfile:
     total_presence_volume: float
     pure_vote: float
     fantavote: float
+    # ``presence`` and ``zone_rating`` as arrays in zone-grid order, for the duel.
+    presence_vector: np.ndarray = field(default=None, compare=False, repr=False)
+    rating_vector: np.ndarray = field(default=None, compare=False, repr=False)
 
 
 def statsbomb_zone_to_contract(zone_key: str) -> str:
@@ -76,26 +81,111 @@ def contract_zone_to_statsbomb(zone_id: str) -> str:
     return f"Z_{col}_{row}"
 
 
-def _clamp(value: float, lo: float, hi: float) -> float:
-    return max(lo, min(hi, value))
+def _profile_rows(match: Match, player_ids: list[int]) -> list[tuple]:
+    """(player_id, team_side, zone_key, feature_key, value) of these players, in
+    row order: ONE query for the whole match, the archive only for players the
+    table has nothing for.
 
-
-def _empty_zone_values(zone_ids: Iterable[str]) -> dict[str, float]:
-    return {zone_id: 0.0 for zone_id in zone_ids}
-
-
-def _normalise(values: dict[str, float]) -> dict[str, float]:
-    total = sum(max(0.0, v) for v in values.values())
-    if total <= 0:
-        return values
-    return {k: max(0.0, v) / total for k, v in values.items()}
-
-
-def _overcrowding_renormalize(values: list[float]) -> list[float]:
-    total = sum(values)
-    if total <= 1.0 or total <= 0.0:
-        return values
-    return [v / total for v in values]
+    The zone duel is a question about WHERE, so it reads only rows that answer it.
+    A live match's light round writes a player's totals without a heatmap behind
+    them (see sofascore_adapter.METHOD_UNPLACED); read as positions they would pile
+    a whole squad into one cell and decide the duel there. Better no profile at
+    all — the heavy pass restores the player a few minutes later.
+    """
+    rows = list(
+        PlayerZoneFeature.objects.filter(match=match, player_id__in=player_ids)
+        .exclude(source_method=METHOD_UNPLACED)
+        .order_by("id")
+        .values_list("player_id", "team_side", "zone_key", "feature_key", "value")
+    )
+    missing = set(player_ids) - {r[0] for r in rows}
+    if missing and match.data_ready:  # only a concluded match can be archived
+        rows.extend((r.player_id, r.team_side, r.zone_key, r.feature_key, r.value)
+                    for r in zone_archive.player_rows([match.id], player_ids=missing,
+                                                      exclude_method=METHOD_UNPLACED))
+    return rows
+
+
+def _zone_columns(zone_ids: list[str]) -> dict[str, int]:
+    """Stored zone key -> column of ``zone_ids``, for both spellings of a key."""
+    columns = {}
+    for i, zone_id in enumerate(zone_ids):
+        columns[zone_id] = i
+        columns[contract_zone_to_statsbomb(zone_id)] = i
+    return columns
+
+
+def _match_profiles(match: Match, player_ids: list[int],
+                    zone_ids: list[str]) -> dict[int, PlayerRealZoneProfile]:
+    """Every profile these players have in ``match``, by player id.
+
+    The rows are scattered once into two players × zones matrices — weighted
+    presence and quality — so normalising, rating and the pure vote are whole-row
+    operations rather than a dictionary per player and a loop per zone.
+    """
+    rows = _profile_rows(match, player_ids)
+    if not rows:
+        return {}
+    columns = _zone_columns(zone_ids)
+    for key in {str(r[2]) for r in rows} - columns.keys():
+        # A key in neither spelling of the grid: mapped the slow way, once.
+        col = columns.get(statsbomb_zone_to_contract(key))
+        columns[key] = -1 if col is None else col
+
+    order: dict[int, int] = {}
+    sides: dict[int, str] = {}
+    r_idx, c_idx, presence_w, quality_w = [], [], [], []
+    for player_id, side, zone_key, feature_key, value in rows:
+        i = order.setdefault(player_id, len(order))
+        sides.setdefault(player_id, side)
+        col = columns[str(zone_key)]
+        if col < 0:
+            continue
+        value = float(value or 0.0)
+        r_idx.append(i)
+        c_idx.append(col)
+        presence_w.append(value * PRESENCE_FEATURE_WEIGHTS.get(str(feature_key), 0.0))
+        quality_w.append(value * QUALITY_FEATURE_WEIGHTS.get(str(feature_key), 0.0))
+
+    volume = np.zeros((len(order), len(zone_ids)))
+    quality = np.zeros((len(order), len(zone_ids)))
+    np.add.at(volume, (r_idx, c_idx), presence_w)
+    np.add.at(quality, (r_idx, c_idx), quality_w)
+
+    # Sums along a row are taken zone by zone, as the dictionaries did: numpy's
+    # pairwise row sum would move the vote in its last bit.
+    clipped = np.maximum(volume, 0.0)
+    totals = np.array([sum(row) for row in clipped.tolist()])
+    placed = totals > 0
+    presence = np.divide(clipped, totals[:, None], out=np.zeros_like(clipped),
+                         where=placed[:, None])
+    rating = np.clip(BASE_ZONE_RATING + quality, MIN_ZONE_RATING, MAX_ZONE_RATING)
+    pure_votes = [sum(row) for row in (presence * rating).tolist()]
+
+    names = {pid: short or full or str(pid) for pid, short, full in
+             Player.objects.filter(id__in=list(order))
+             .values_list("id", "short_name", "full_name")}
+    out: dict[int, PlayerRealZoneProfile] = {}
+    for player_id, i in order.items():
+        if not placed[i]:
+            continue
+        pure_vote = pure_votes[i]
+        out[player_id] = PlayerRealZoneProfile(
+            player_id=player_id,
+            name=names.get(player_id, str(player_id)),
+            side=sides[player_id],
+            presence=dict(zip(zone_ids, presence[i].tolist())),
+            zone_rating=dict(zip(zone_ids, rating[i].tolist())),
+            total_presence_volume=sum(volume[i].tolist()),
+            pure_vote=pure_vote,
+            # First playable baseline: fantavote equals provider-derived pure vote.
+            # Goal/card fantasy modifiers can be layered later when a calibrated
+            # vote model exists.
+            fantavote=pure_vote,
+            presence_vector=presence[i],
+            rating_vector=rating[i],
+        )
+    return out
 
 
 def build_player_real_zone_profile(
@@ -104,101 +194,42 @@ def build_player_real_zone_profile(
     player_id: int,
     zone_ids: list[str] | None = None,
 ) -> PlayerRealZoneProfile | None:
-    grid = make_zone_grid()
-    zone_ids = zone_ids or list(grid["zone_ids"])
-    contract_zone_ids = set(zone_ids)
-
-    # The zone duel is a question about WHERE, so it reads only rows that answer it.
-    # A live match's light round writes a player's totals without a heatmap behind
-    # them (see sofascore_adapter.METHOD_UNPLACED); read as positions they would pile
-    # a whole squad into one cell and decide the duel there. Better no profile at
-    # all — the heavy pass restores him a few minutes later.
-    rows = list(
-        PlayerZoneFeature.objects.filter(match=match, player_id=player_id)
-        .exclude(source_method=METHOD_UNPLACED)
-        .select_related("player")
-        .values("player_id", "player__short_name", "player__full_name", "team_side", "zone_key", "feature_key", "value")
-    )
-    if not rows:
-        return None
-
-    name = rows[0]["player__short_name"] or rows[0]["player__full_name"] or str(player_id)
-    side = rows[0]["team_side"]
-    presence_volume = _empty_zone_values(zone_ids)
-    quality_raw = _empty_zone_values(zone_ids)
-
-    for row in rows:
-        zone_id = statsbomb_zone_to_contract(str(row["zone_key"]))
-        if zone_id not in contract_zone_ids:
-            continue
-        feature_key = str(row["feature_key"])
-        value = float(row["value"] or 0.0)
-        presence_volume[zone_id] += value * PRESENCE_FEATURE_WEIGHTS.get(feature_key, 0.0)
-        quality_raw[zone_id] += value * QUALITY_FEATURE_WEIGHTS.get(feature_key, 0.0)
-
-    presence = _normalise(presence_volume)
-    if sum(presence.values()) <= 0:
-        return None
-
-    zone_rating = {
-        zone_id: _clamp(BASE_ZONE_RATING + quality_raw[zone_id], MIN_ZONE_RATING, MAX_ZONE_RATING)
-        for zone_id in zone_ids
-    }
-    pure_vote = sum(presence[z] * zone_rating[z] for z in zone_ids)
-
-    # First playable baseline: fantavote equals provider-derived pure vote.
-    # Goal/card fantasy modifiers can be layered later when a calibrated vote model exists.
-    fantavote = pure_vote
-
-    return PlayerRealZoneProfile(
-        player_id=player_id,
-        name=name,
-        side=side,
-        presence=presence,
-        zone_rating=zone_rating,
-        total_presence_volume=sum(presence_volume.values()),
-        pure_vote=pure_vote,
-        fantavote=fantavote,
-    )
+    zone_ids = zone_ids or list(make_zone_grid()["zone_ids"])
+    return _match_profiles(match, [int(player_id)], zone_ids).get(int(player_id))
 
 
 def build_real_match_profiles(match: Match, player_ids: Iterable[int]) -> list[PlayerRealZoneProfile]:
     zone_ids = list(make_zone_grid()["zone_ids"])
-    profiles: list[PlayerRealZoneProfile] = []
-    for player_id in player_ids:
-        profile = build_player_real_zone_profile(match=match, player_id=int(player_id), zone_ids=zone_ids)
-        if profile is not None:
-            profiles.append(profile)
-    return profiles
+    player_ids = [int(p) for p in player_ids]
+    profiles = _match_profiles(match, player_ids, zone_ids)
+    return [profiles[p] for p in player_ids if p in profiles]
 
 
 def _team_zone_scores(
     profiles: list[PlayerRealZoneProfile],
     zone_ids: list[str],
 ) -> tuple[list[float], list[float], dict[str, list[dict[str, float | int | str]]]]:
-    pure_scores = [0.0] * len(zone_ids)
-    base_scores = [0.0] * len(zone_ids)
-    contributors: dict[str, list[dict[str, float | int | str]]] = {zone_id: [] for zone_id in zone_ids}
-
+    """Per zone: the side's presence-weighted rating, its presence-weighted vote,
+    and who contributed. A zone holding more than one player's worth of presence
+    is scaled back to one (overcrowding)."""
+    if not profiles:
+        zeros = [0.0] * len(zone_ids)
+        return zeros, list(zeros), {zone_id: [] for zone_id in zone_ids}
+    presence = np.vstack([p.presence_vector for p in profiles])
+    rating = np.vstack([p.rating_vector for p in profiles])
+    totals = presence.sum(axis=0)
+    presence = presence / np.where(totals > 1.0, totals, 1.0)
+    base = presence * np.array([p.fantavote for p in profiles])[:, None]
+
+    contributors: dict[str, list[dict[str, float | int | str]]] = {}
     for zi, zone_id in enumerate(zone_ids):
-        zone_presences = [p.presence.get(zone_id, 0.0) for p in profiles]
-        norm_presences = _overcrowding_renormalize(zone_presences)
-        for idx, profile in enumerate(profiles):
-            presence = norm_presences[idx]
-            rating = profile.zone_rating.get(zone_id, BASE_ZONE_RATING)
-            pure = presence * rating
-            base = presence * profile.fantavote
-            pure_scores[zi] += pure
-            base_scores[zi] += base
-            if base > 0:
-                contributors[zone_id].append(
-                    {
-                        "player_id": profile.player_id,
-                        "name": profile.name,
-                        "contrib": round(base, 3),
-                    }
-                )
-    return pure_scores, base_scores, contributors
+        contributors[zone_id] = [
+            {"player_id": profiles[idx].player_id, "name": profiles[idx].name,
+             "contrib": round(float(base[idx, zi]), 3)}
+            for idx in np.flatnonzero(base[:, zi] > 0)
+        ]
+    return ((presence * rating).sum(axis=0).tolist(), base.sum(axis=0).tolist(),
+            contributors)
 
 
 def compute_real_match_zone_duels(
@@ -211,55 +242,44 @@ def compute_real_match_zone_duels(
 ) -> dict:
     grid = make_zone_grid()
     zone_ids = list(grid["zone_ids"])
-    home_profiles = build_real_match_profiles(match, home_player_ids)
-    away_profiles = build_real_match_profiles(match, away_player_ids)
+    home_player_ids = [int(p) for p in home_player_ids]
+    away_player_ids = [int(p) for p in away_player_ids]
+    profiles = _match_profiles(match, home_player_ids + away_player_ids, zone_ids)
+    home_profiles = [profiles[p] for p in home_player_ids if p in profiles]
+    away_profiles = [profiles[p] for p in away_player_ids if p in profiles]
 
     home_pure, home_base, home_contrib = _team_zone_scores(home_profiles, zone_ids)
     away_pure, away_base, away_contrib = _team_zone_scores(away_profiles, zone_ids)
 
-    zone_results = []
-    winner_map = []
-    points_map = []
-    margin_map = []
-    key_factor_map = []
+    hp, ap = np.array(home_pure), np.array(away_pure)
+    hb, ab = np.array(home_base), np.array(away_base)
+    edge = np.where(np.abs(hp - ap) < 1e-9, 0, np.sign(hp - ap))
+    home_points = hb * (1.0 + edge * DUEL_BONUS_RATE)
+    away_points = ab * (1.0 - edge * DUEL_BONUS_RATE)
+    winners = np.array(["away", "draw", "home"])[edge.astype(int) + 1].tolist()
+    key_factor = "statsbomb_event_quality"
 
+    zone_results = []
     for zi, zone_id in enumerate(zone_ids):
-        hp = home_pure[zi]
-        ap = away_pure[zi]
-        if abs(hp - ap) < 1e-9:
-            winner = "draw"
-        else:
-            winner = "home" if hp > ap else "away"
-
-        hb = home_base[zi]
-        ab = away_base[zi]
-        if winner == "home":
-            home_points = hb * (1.0 + DUEL_BONUS_RATE)
-            away_points = ab * (1.0 - DUEL_BONUS_RATE)
-        elif winner == "away":
-            home_points = hb * (1.0 - DUEL_BONUS_RATE)
-            away_points = ab * (1.0 + DUEL_BONUS_RATE)
-        else:
-            home_points = hb
-            away_points = ab
-
-        swing = home_points - away_points
-        margin = abs(hp - ap)
-        key_factor = "statsbomb_event_quality"
-
+        h_pure, a_pure = float(hp[zi]), float(ap[zi])
+        h_base, a_base = float(hb[zi]), float(ab[zi])
+        h_points, a_points = float(home_points[zi]), float(away_points[zi])
+        swing = h_points - a_points
         zone_results.append(
             {
                 "zone_id": zone_id,
-                "winner": winner,
+                "winner": winners[zi],
                 "points": {
-                    "home": round(home_points, 3),
-                    "away": round(away_points, 3),
+                    "home": round(h_points, 3),
+                    "away": round(a_points, 3),
                     "swing": round(swing, 3),
                 },
-                "margin": round(margin, 3),
+                "margin": round(abs(h_pure - a_pure), 3),
                 "macro_scores": {
-                    "presence_quality": {"home": round(hp, 3), "away": round(ap, 3), "swing": round(hp - ap, 3)},
-                    "base_vote": {"home": round(hb, 3), "away": round(ab, 3), "swing": round(hb - ab, 3)},
+                    "presence_quality": {"home": round(h_pure, 3), "away": round(a_pure, 3),
+                                         "swing": round(h_pure - a_pure, 3)},
+                    "base_vote": {"home": round(h_base, 3), "away": round(a_base, 3),
+                                  "swing": round(h_base - a_base, 3)},
                 },
                 "key_factor": key_factor,
                 "top_contributors": {
@@ -268,10 +288,10 @@ def compute_real_match_zone_duels(
                 },
             }
         )
-        winner_map.append(winner)
-        points_map.append(round(abs(swing), 3))
-        margin_map.append(round(margin, 3))
-        key_factor_map.append(key_factor)
+    winner_map = winners
+    points_map = [round(abs(float(h - a)), 3) for h, a in zip(home_points, away_points)]
+    margin_map = [z["margin"] for z in zone_results]
+    key_factor_map = [key_factor] * len(zone_ids)
 
     home_total = round(sum(z["points"]["home"] for z in zone_results), 3)
     away_total = round(sum(z["points"]["away"] for z in zone_results), 3)
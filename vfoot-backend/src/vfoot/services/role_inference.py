@@ -45,13 +45,16 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 
 import numpy as np
+from django.conf import settings
 from django.db import transaction
 from django.db.models import Sum
 
 from realdata.models import (
     MatchAppearance, Player, PlayerTeamStint, PlayerZoneFeature, PROVIDER_SOFASCORE,
 )
-from realdata.services.sofascore_adapter import METHOD_UNPLACED
+from realdata.services import fork_pool, zone_archive
+from realdata.services.sofascore_adapter import METHOD_UNPLACED, ZONE_UNPLACED
+from vfoot.services import season_tensor
 from vfoot.services.classic_rating import _round_sum
 
 PROVIDER_TM = "transfermarkt"
@@ -98,6 +101,11 @@ MIN_MINUTES = 600
 N_CATEGORIES = 8          # where category quality stops improving
 CONSENSUS_RUNS = 60       # k-means runs whose agreement defines the categories
 LOW_CONFIDENCE = 0.55     # below this, ask a human rather than guess
+# Rows of the co-association matrix computed per product; bounds the float32
+# scratch to a strip instead of a second N×N matrix.
+_CO_ASSOCIATION_BLOCK = 256
+# Integers a float32 product still counts exactly: the most runs the blocks hold.
+_EXACT_FLOAT32 = 2 ** 24
 
 FEATURE_NAMES = ([f"heat_col{i}" for i in range(5)] +
                  ["width", "box_share", "shots", "xg", "key_passes", "xa",
@@ -248,21 +256,30 @@ def tm_positions(competition_season_id: int) -> dict[int, str]:
         .values_list("player_id", "tm_position"))}
 
 
-def player_profiles(competition_season_id: int, min_minutes: int = MIN_MINUTES):
-    """(player_ids, feature matrix) for outfielders with enough football played."""
+def _season_sums(competition_season_id: int):
+    """(totals, grid, minutes): per player, the season's counters, the touches
+    per zone and the minutes — grouped by the database."""
     totals: dict[int, dict[str, float]] = {}
     grid: dict[int, np.ndarray] = {}
     # The unplaced rows of a match still being played carry no position, and the
     # split below would raise on their key rather than misread it — which is the
     # point of that key. Either way they have no business in a spatial cluster.
-    for pid, zk, fk, v in (PlayerZoneFeature.objects
-                           .filter(provider=PROVIDER_SOFASCORE,
-                                   feature_key__in=_COUNTERS,
-                                   match__competition_season_id=competition_season_id)
-                           .exclude(source_method=METHOD_UNPLACED)
-                           .values_list("player_id", "zone_key", "feature_key")
-                           .annotate(v=Sum("value"))
-                           .values_list("player_id", "zone_key", "feature_key", "v")):
+    sums = {(pid, zk, fk): v for pid, zk, fk, v in (
+        PlayerZoneFeature.objects
+        .filter(provider=PROVIDER_SOFASCORE, feature_key__in=_COUNTERS,
+                match__competition_season_id=competition_season_id)
+        .exclude(source_method=METHOD_UNPLACED)
+        .values_list("player_id", "zone_key", "feature_key")
+        .annotate(v=Sum("value"))
+        .values_list("player_id", "zone_key", "feature_key", "v"))}
+    # the previous season — the one this usually reads — may be archived
+    for key, v in zone_archive.grouped(
+            zone_archive.player_rows(competition_season_id=competition_season_id,
+                                     provider=PROVIDER_SOFASCORE, feature_keys=_COUNTERS,
+                                     exclude_method=METHOD_UNPLACED),
+            key=lambda r: (r.player_id, r.zone_key, r.feature_key)).items():
+        sums[key] = (sums.get(key) or 0.0) + v
+    for (pid, zk, fk), v in sums.items():
         # arrotondata come nel canale del voto (v. classic_rating.PROVIDER_SUM_DECIMALS):
         # la somma in virgola mobile dipende dall'ordine degli addendi, e su questa
         # matrice il rumore sposta di reparto i giocatori di confine
@@ -278,7 +295,52 @@ def player_profiles(competition_season_id: int, min_minutes: int = MIN_MINUTES):
                    .filter(match__competition_season_id=competition_season_id)
                    .values_list("player_id", "minutes_played")):
         minutes[pid] = minutes.get(pid, 0.0) + (m or 0)
+    return totals, grid, minutes
+
+
+def _season_sums_from_tensor(tensor):
+    """(totals, grid, minutes) of ``player_profiles`` read off a season tensor —
+    the same sums, rounded at the same point, without grouping the zone rows."""
+    totals: dict[int, dict[str, float]] = {}
+    grid: dict[int, np.ndarray] = {}
+    feats = [f for f in _COUNTERS if f in tensor.feature_index]
+    zones = [z for z in tensor.zones if z != ZONE_UNPLACED]
+    if feats and zones and len(tensor.player_ids):
+        fi = [tensor.feature_index[f] for f in feats]
+        zi = [tensor.zone_index[z] for z in zones]
+        players, inverse = np.unique(tensor.player_ids, return_inverse=True)
+        # per (player, feature, zone) over the season, rounded, then over zones:
+        # the order the grouped query has, so both paths give the same numbers
+        per_zone = np.zeros((len(players), len(fi), len(zi)))
+        np.add.at(per_zone, inverse, tensor.values[:, fi, :][:, :, zi])
+        has = np.zeros((len(players), len(fi)), dtype=bool)
+        np.logical_or.at(has, inverse, tensor.present[:, fi])
+        for p, pid in enumerate(players.tolist()):
+            for j in np.flatnonzero(has[p]):
+                fk = feats[j]
+                for k, zk in enumerate(zones):
+                    v = _round_sum(float(per_zone[p, j, k]))
+                    totals.setdefault(pid, {}).setdefault(fk, 0.0)
+                    totals[pid][fk] += v
+                    if fk == "touches":
+                        _, col, row = zk.split("_")
+                        grid.setdefault(pid, np.zeros((5, 4)))[int(col)][int(row)] += v
+    minutes: dict[int, float] = {}
+    for pid, m in zip(tensor.player_ids.tolist(), tensor.minutes.tolist()):
+        minutes[pid] = minutes.get(pid, 0.0) + m
+    return totals, grid, minutes
 
+
+def player_profiles(competition_season_id: int, min_minutes: int = MIN_MINUTES):
+    """(player_ids, feature matrix) for outfielders with enough football played.
+
+    Reads the season tensor when ``export_season_tensor`` left a current one, the
+    zone rows otherwise (see ``vfoot.services.season_tensor``)."""
+    tensor = season_tensor.load(competition_season_id, PROVIDER_SOFASCORE)
+    if tensor is not None:
+        totals, grid, minutes = _season_sums_from_tensor(tensor)
+    else:
+        totals, grid, minutes = _season_sums(competition_season_id)
     # CHI È UN PORTIERE, e perché non basta il tag. ``Player.is_goalkeeper`` viene
     # dal cartellino Transfermarkt, quindi esiste solo per chi sta in una rosa che
     # abbiamo importato: su un'installazione che ha le rose della stagione NUOVA ma
@@ -341,6 +403,15 @@ def player_profiles(competition_season_id: int, min_minutes: int = MIN_MINUTES):
 # consensus clustering
 # --------------------------------------------------------------------------
 
+def consensus_workers() -> int:
+    """Processes for the consensus runs: ``VFOOT_ROLE_WORKERS`` when set, else one.
+    Read at call time, like the tick's knobs. A pool is opted into — by the setting
+    or by ``compute_classic_roles --workers`` — never forked from under a caller
+    that did not ask for one."""
+    configured = getattr(settings, "VFOOT_ROLE_WORKERS", None)
+    return max(1, int(configured) if configured else 1)
+
+
 def _kmeans(Z: np.ndarray, k: int, seed: int, iters: int = 200):
     r = np.random.default_rng(seed)
     C = Z[r.integers(len(Z))][None, :]
@@ -359,22 +430,56 @@ def _kmeans(Z: np.ndarray, k: int, seed: int, iters: int = 200):
     return lab, C
 
 
+def _kmeans_labels(seed: int) -> np.ndarray:
+    return _kmeans(fork_pool.shared["Z"], fork_pool.shared["k"], seed)[0]
+
+
+def _consensus_labels(Z: np.ndarray, k: int, seeds: list[int],
+                      workers: int) -> list[np.ndarray]:
+    """One label vector per seed, in seed order, through ``fork_pool.fork_map``."""
+    return fork_pool.fork_map(_kmeans_labels, seeds, workers=workers,
+                              state={"Z": Z, "k": k})
+
+
+def _co_association(label_runs: list[np.ndarray], k: int) -> np.ndarray:
+    """The share of runs that put each pair together, as a float64 N×N matrix.
+
+    Built from the label vectors as a product of one-hot memberships rather than
+    one N×N comparison per run: each block of rows is an exact small-integer
+    float32 product, written straight into the one full-size matrix, which is then
+    divided in place. The counts are exact, so the shares are the float64
+    accumulator's to the bit, and nothing else of size N×N is ever alive."""
+    n, runs = len(label_runs[0]), len(label_runs)
+    H = np.zeros((n, runs * k), dtype=np.float32)
+    for r, lab in enumerate(label_runs):
+        H[np.arange(n), r * k + lab] = 1.0
+    M = np.empty((n, n), dtype=np.float64)
+    for i in range(0, n, _CO_ASSOCIATION_BLOCK):
+        M[i:i + _CO_ASSOCIATION_BLOCK] = H[i:i + _CO_ASSOCIATION_BLOCK] @ H.T
+    M /= runs
+    return M
+
+
 def consensus_categories(Z: np.ndarray, k: int = N_CATEGORIES,
-                         runs: int = CONSENSUS_RUNS):
+                         runs: int = CONSENSUS_RUNS, workers: int | None = None):
     """Seed-independent categories, plus each player's confidence in his own.
 
     A single k-means run moves the boundary of the wide-attacker group between 24
     and 49 players depending on the seed. Averaging membership over many runs (the
     co-association matrix) and clustering THAT is stable to ~96%, and the average
     co-association with one's own group is a natural, honest confidence.
+
+    ``workers`` spreads the runs over processes (default: ``consensus_workers``).
+    The seeds are fixed per run and the counts are integers, so the result is
+    bit-identical to the serial loop whatever the number of workers.
     """
     if len(Z) < k:
         return np.zeros(len(Z), dtype=int), np.ones(len(Z)), np.zeros((len(Z), len(Z)))
-    M = np.zeros((len(Z), len(Z)))
-    for s in range(runs):
-        lab, _ = _kmeans(Z, k, 1000 + s)
-        M += (lab[:, None] == lab[None, :])
-    M /= runs
+    if runs > _EXACT_FLOAT32:
+        raise ValueError(f"runs={runs} is beyond the exact float32 co-association counts")
+    workers = consensus_workers() if workers is None else workers
+    label_runs = _consensus_labels(Z, k, [1000 + s for s in range(runs)], workers)
+    M = _co_association(label_runs, k)
     labels, _ = _kmeans(M, k, 7)          # cluster the co-association profiles
     conf = np.array([M[i][labels == labels[i]].mean() for i in range(len(Z))])
     return labels, conf, M
@@ -522,7 +627,8 @@ def role_boundaries(Z: np.ndarray, labels: np.ndarray, by_label: dict) -> np.nda
 def infer_roles(roster_season_id: int, data_season_id: int, *,
                 min_minutes: int = MIN_MINUTES,
                 n_categories: int = N_CATEGORIES,
-                runs: int = CONSENSUS_RUNS) -> InferenceReport:
+                runs: int = CONSENSUS_RUNS,
+                workers: int | None = None) -> InferenceReport:
     """Roles for the squads of ``roster_season_id``, measured on the football
     actually played in ``data_season_id`` (normally the season before)."""
     tm_pos = tm_positions(roster_season_id)
@@ -533,7 +639,7 @@ def infer_roles(roster_season_id: int, data_season_id: int, *,
     if len(ids):
         mu, sd = Z.mean(0), np.where(Z.std(0) == 0, 1, Z.std(0))
         Zs = (Z - mu) / sd
-        labels, conf, M = consensus_categories(Zs, n_categories, runs)
+        labels, conf, M = consensus_categories(Zs, n_categories, runs, workers)
         cats = describe_categories(Zs, labels)
         by_label = {v["label"]: k for k, v in cats.items()}
         for name, meta in cats.items():
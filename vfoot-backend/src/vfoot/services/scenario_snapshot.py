@@ -0,0 +1,165 @@
+"""Built scenarios kept on disk, so that going back to one costs seconds.
+
+``simulate_scenario`` builds its state the long way: the championship imported
+match by match, the league seeded, every matchday concluded. That is the right
+price for building a state and an absurd one for returning to it — a scenario is
+reproducible by definition, so the database it left behind ten minutes ago is the
+database it would build again. This module keeps that database, and hands it back
+when nothing that decides it has changed.
+
+WHAT DECIDES IT is the key: the scenario, the seed, the instant, the owner and the
+cups asked for — the inputs — and the CODE that turns them into rows: the source of
+the commands that build the state, the scoring fingerprint the tabellini are
+computed with, and the migrations the schema is at. A snapshot taken under a
+different key is never restored. The file name keeps the two halves apart, so a
+save replaces only the files of the same inputs under older code — the ones that
+can never be restored again — and leaves the other seeds, owners and cups of the
+same evening where they are. What the key does not see (an edit to a service the
+builders call, a new Sofascore cache) is what ``simulate_scenario --rebuild`` is
+for.
+
+HOW. SQLite through its online backup API, in both directions: it copies a
+consistent database while the connection is open, and writes it back into the open
+connection, so neither side has to close anything. PostgreSQL through ``pg_dump``'s
+custom format and ``pg_restore --clean``. Any other engine has no snapshot, and the
+scenario is built as before.
+
+The whole database is saved, not only the scenario's rows: that is what the
+``vfoot-sim`` snapshots have always been, and a partial one would restore a league
+whose users were the ones of another evening.
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+from pathlib import Path
+
+from django.db import connection
+
+# What builds a scenario's rows. Their source is part of the key: a change to the
+# generator or to the way a matchday is concluded builds a different state.
+_BUILDERS = (
+    "realdata/services/season_simulator.py",
+    "realdata/management/commands/simulate_sofascore_season.py",
+    "vfoot/management/commands/seed_classic_demo_league.py",
+    "vfoot/management/commands/advance_fantasy_league.py",
+    "vfoot/management/commands/simulate_scenario.py",
+)
+_SRC = Path(__file__).resolve().parents[2]
+
+
+class SnapshotError(RuntimeError):
+    """The snapshot could not be saved or restored; the database is as it was."""
+
+
+def default_dir() -> Path:
+    """Next to the ``vfoot-sim`` ones: big files that must survive a reboot."""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "vfoot-sim" / "snapshots"
+
+
+def supported() -> bool:
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+def code_fingerprint() -> str:
+    """The builders' source, the scoring fingerprint and the migration leaves."""
+    from django.db.migrations.loader import MigrationLoader
+
+    from vfoot.services.vote_reference import scoring_fingerprint
+
+    h = hashlib.sha1()
+    for rel in _BUILDERS:
+        h.update(rel.encode())
+        h.update((_SRC / rel).read_bytes())
+    h.update(scoring_fingerprint().encode())
+    leaves = sorted(MigrationLoader(None, ignore_no_migrations=True).graph.leaf_nodes())
+    h.update(json.dumps(leaves).encode())
+    return h.hexdigest()
+
+
+def snapshot_path(directory, scenario: str, *, seed: int, at, owner: str,
+                  cup: bool | None) -> Path:
+    """Where the snapshot of this build lives.
+
+    Readable up front — scenario and instant, with the characters Windows refuses
+    in a file name replaced, as ``vfoot-sim`` does — then the inputs as a digest
+    and the code fingerprint as another, so that two keys can never share a file
+    and ``save`` can tell a stale build of these inputs from another build.
+    """
+    inputs = json.dumps({"scenario": scenario, "seed": seed, "at": at.isoformat(),
+                         "owner": owner, "cup": cup}, sort_keys=True)
+    stamp = at.isoformat()
+    for ch in ":+.":
+        stamp = stamp.replace(ch, "-")
+    suffix = "sqlite3" if connection.vendor == "sqlite" else "dump"
+    digest = hashlib.sha1(inputs.encode()).hexdigest()[:16]
+    return (Path(directory)
+            / f"{scenario}@{stamp}.{digest}.{code_fingerprint()[:12]}.{suffix}")
+
+
+def save(path: Path) -> Path:
+    """Write the current database to ``path``, replacing the snapshots of the same
+    inputs taken under other code: they can never be restored."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        if connection.vendor == "sqlite":
+            connection.ensure_connection()
+            dst = sqlite3.connect(tmp)
+            try:
+                connection.connection.backup(dst)
+            finally:
+                dst.close()
+        else:
+            _pg("pg_dump", "--format=custom", "--no-owner", f"--file={tmp}")
+        # On a temporary and then renamed: a copy cut short must not leave a
+        # truncated file where a good snapshot is looked for.
+        os.replace(tmp, path)
+    except (OSError, sqlite3.Error, subprocess.CalledProcessError) as exc:
+        tmp.unlink(missing_ok=True)
+        raise SnapshotError(f"snapshot not saved: {exc}") from exc
+    inputs = path.name.rsplit(".", 2)[0]
+    for old in path.parent.glob(f"{glob.escape(inputs)}.*{path.suffix}"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def restore(path: Path) -> bool:
+    """Put the database back as ``path`` holds it. False when there is none."""
+    if not path.exists():
+        return False
+    try:
+        if connection.vendor == "sqlite":
+            connection.ensure_connection()
+            src = sqlite3.connect(path.resolve().as_uri() + "?mode=ro", uri=True)
+            try:
+                src.backup(connection.connection)
+            finally:
+                src.close()
+        else:
+            # pg_restore needs the tables free of this process's own locks.
+            connection.close()
+            _pg("pg_restore", "--clean", "--if-exists", "--no-owner",
+                "--single-transaction", str(path))
+    except (OSError, sqlite3.Error, subprocess.CalledProcessError) as exc:
+        raise SnapshotError(f"snapshot not restored: {exc}") from exc
+    return True
+
+
+def _pg(tool: str, *args: str) -> None:
+    db = connection.settings_dict
+    cmd = [tool, f"--dbname={db['NAME']}"]
+    if db.get("HOST"):
+        cmd.append(f"--host={db['HOST']}")
+    if db.get("PORT"):
+        cmd.append(f"--port={db['PORT']}")
+    if db.get("USER"):
+        cmd.append(f"--username={db['USER']}")
+    env = {**os.environ, "PGPASSWORD": db.get("PASSWORD") or ""}
+    subprocess.run([*cmd, *args], check=True, env=env, capture_output=True)
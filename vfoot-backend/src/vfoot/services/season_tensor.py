@@ -0,0 +1,257 @@
+"""A season's zone features as one on-disk array: appearances × features × zones.
+
+The calibration commands and the role inference all start the same way: group the
+season's ``PlayerZoneFeature`` rows through the ORM — a few million of them — and
+rebuild Python dicts from the result, every run. Between two runs nothing has
+usually changed. ``export`` writes that season once as NumPy files the next run
+maps in milliseconds:
+
+    values.npy    float64 [A, F, Z]  the summed value of each feature in each zone
+    present.npy   bool    [A, F]     whether the feature had any row at all
+    match.npy / player.npy / side.npy / minutes.npy   int [A]  one per appearance
+
+An appearance is a (match, player, side) with zone rows OR a ``MatchAppearance``;
+the rows are sorted by match, then player, then side, so a match is a contiguous
+slice. ``present`` keeps apart "no row" and "rows summing to zero", which the dict
+readers it replaces did too. ``header.json`` names the axes and carries the
+season's data version at export time.
+
+A tensor is a CACHE: ``load`` returns None whenever it does not describe what the
+database holds now — missing, another format, another database, or a data version
+that moved — and every reader falls back to the query it always ran. Nothing ever
+NEEDS one. The version is the one the pagella cache trusts (``data_version``) plus
+the latest content stamp of any match, finished or not; zone rows edited by hand
+move neither, and after that kind of surgery the tensor is to be exported again.
+"""
+from __future__ import annotations
+
+import json
+import shutil
+from itertools import chain
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Max
+
+from realdata.models import (
+    Match, MatchAppearance, PlayerZoneFeature, PROVIDER_SOFASCORE, SIDE_AWAY, SIDE_HOME,
+)
+from realdata.services import zone_archive
+from vfoot.services.classic_pagella import data_version
+
+FORMAT = 1
+SIDES = (SIDE_HOME, SIDE_AWAY)
+# Zone rows accumulated per np.add.at call: enough to amortise the call, small
+# enough that the index arrays stay a few MB.
+_CHUNK = 200_000
+_ARRAYS = ("match", "player", "side", "minutes", "present")
+
+
+@dataclass(frozen=True)
+class SeasonTensor:
+    competition_season_id: int
+    provider: str
+    version: str
+    features: tuple[str, ...]
+    zones: tuple[str, ...]
+    values: np.ndarray            # [A, F, Z], memory-mapped read-only
+    present: np.ndarray           # [A, F]
+    match_ids: np.ndarray         # [A]
+    player_ids: np.ndarray        # [A]
+    sides: np.ndarray             # [A], index into SIDES
+    minutes: np.ndarray           # [A]
+    feature_index: dict[str, int] = field(init=False, repr=False, compare=False)
+    zone_index: dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "feature_index",
+                           {f: i for i, f in enumerate(self.features)})
+        object.__setattr__(self, "zone_index", {z: i for i, z in enumerate(self.zones)})
+
+    def match_rows(self, match_id: int) -> slice:
+        """The appearances of one match, as a slice of every array."""
+        lo, hi = np.searchsorted(self.match_ids, [match_id, match_id + 1])
+        return slice(int(lo), int(hi))
+
+    def has_match(self, match_id: int) -> bool:
+        s = self.match_rows(match_id)
+        return s.stop > s.start
+
+    def match_player_totals(self, match_ids=None, feature_keys=None
+                            ) -> dict[tuple[int, int], dict[str, float]]:
+        """``{(match_id, player_id): {feature: total_over_zones}}``, summed over
+        sides — the shape of ``feature_totals.match_player_totals``, including its
+        rule that a feature with no row is absent and a pair with none is too."""
+        feats = [f for f in (self.features if feature_keys is None else
+                             sorted(feature_keys)) if f in self.feature_index]
+        if not feats:
+            return {}
+        cols = [self.feature_index[f] for f in feats]
+        rows = (np.arange(len(self.match_ids)) if match_ids is None else
+                np.flatnonzero(np.isin(self.match_ids, np.fromiter(
+                    (int(m) for m in match_ids), dtype=np.int64))))
+        sums = self.values[rows][:, cols, :].sum(axis=2)
+        present = self.present[rows][:, cols]
+        out: dict[tuple[int, int], dict[str, float]] = {}
+        for i, r in enumerate(rows):
+            hit = np.flatnonzero(present[i])
+            if not len(hit):
+                continue
+            row = out.setdefault((int(self.match_ids[r]), int(self.player_ids[r])), {})
+            for j in hit:
+                row[feats[j]] = row.get(feats[j], 0.0) + float(sums[i, j])
+        return out
+
+
+def root_dir() -> Path:
+    return Path(getattr(settings, "VFOOT_SEASON_TENSOR_DIR",
+                        Path(settings.VFOOT_DATA_DIR) / "season-tensors"))
+
+
+def tensor_dir(competition_season_id: int, provider: str = PROVIDER_SOFASCORE,
+               root: Path | None = None) -> Path:
+    return Path(root or root_dir()) / f"cs{competition_season_id}-{provider}"
+
+
+def season_version(competition_season_id: int) -> str:
+    """What a tensor of the season must have been exported at to still be true."""
+    agg = (Match.objects.filter(competition_season_id=competition_season_id)
+           .aggregate(n=Count("id"), last=Max("data_changed_at")))
+    last = agg["last"].isoformat() if agg["last"] else "-"
+    return f"{data_version(competition_season_id)}|{agg['n'] or 0}:{last}"
+
+
+def _database() -> str:
+    return str(connection.settings_dict.get("NAME") or "")
+
+
+def export(competition_season_id: int, provider: str = PROVIDER_SOFASCORE,
+           root: Path | None = None) -> SeasonTensor:
+    """Write the season's tensor (replacing any previous one) and return it loaded.
+
+    The version is read BEFORE the rows: an import landing in between leaves a
+    tensor stamped older than its content, which the next ``load`` rejects — never
+    one stamped newer than what it holds."""
+    version = season_version(competition_season_id)
+    zone_qs = PlayerZoneFeature.objects.filter(
+        match__competition_season_id=competition_season_id, provider=provider)
+    # an archived season is exported from its archive (see zone_archive): read
+    # once here, it is what spares every later reader the decompression
+    archived = [(r.match_id, r.player_id, r.team_side, r.zone_key, r.feature_key, r.value)
+                for r in zone_archive.player_rows(
+                    competition_season_id=competition_season_id, provider=provider)]
+    features = tuple(sorted(set(zone_qs.values_list("feature_key", flat=True).distinct())
+                            | {r[4] for r in archived}))
+    zones = tuple(sorted(set(zone_qs.values_list("zone_key", flat=True).distinct())
+                         | {r[3] for r in archived}))
+    side_code = {s: i for i, s in enumerate(SIDES)}
+
+    keys = set(zone_qs.values_list("match_id", "player_id", "team_side").distinct())
+    keys |= {r[:3] for r in archived}
+    minutes_by_key = {}
+    for mid, pid, side, mins in (MatchAppearance.objects
+                                 .filter(match__competition_season_id=competition_season_id)
+                                 .values_list("match_id", "player_id", "side",
+                                              "minutes_played")):
+        keys.add((mid, pid, side))
+        minutes_by_key[(mid, pid, side)] = mins or 0
+    keys = sorted(keys, key=lambda k: (k[0], k[1], side_code.get(k[2], len(SIDES))))
+    keys = [k for k in keys if k[2] in side_code]
+    row_of = {k: i for i, k in enumerate(keys)}
+
+    target = tensor_dir(competition_season_id, provider, root)
+    work = target.with_name(target.name + ".tmp")
+    shutil.rmtree(work, ignore_errors=True)
+    work.mkdir(parents=True)
+
+    shape = (len(keys), len(features), len(zones))
+    # An empty season is still a tensor; an empty array is just not mappable.
+    values = (np.lib.format.open_memmap(work / "values.npy", mode="w+",
+                                        dtype=np.float64, shape=shape)
+              if all(shape) else np.zeros(shape))
+    present = np.zeros(shape[:2], dtype=bool)
+    f_of = {f: i for i, f in enumerate(features)}
+    z_of = {z: i for i, z in enumerate(zones)}
+
+    def flush(r, f, z, v):
+        if r:
+            np.add.at(values, (np.array(r), np.array(f), np.array(z)), np.array(v))
+            present[np.array(r), np.array(f)] = True
+
+    r, f, z, v = [], [], [], []
+    for mid, pid, side, zk, fk, val in chain(
+            zone_qs.values_list("match_id", "player_id", "team_side", "zone_key",
+                                "feature_key", "value").iterator(chunk_size=20_000),
+            archived):
+        row = row_of.get((mid, pid, side))
+        if row is None:
+            continue
+        r.append(row)
+        f.append(f_of[fk])
+        z.append(z_of[zk])
+        v.append(float(val or 0.0))
+        if len(r) >= _CHUNK:
+            flush(r, f, z, v)
+            r, f, z, v = [], [], [], []
+    flush(r, f, z, v)
+    if isinstance(values, np.memmap):
+        values.flush()
+    else:
+        np.save(work / "values.npy", values)
+    del values
+
+    np.save(work / "match.npy", np.array([k[0] for k in keys], dtype=np.int64))
+    np.save(work / "player.npy", np.array([k[1] for k in keys], dtype=np.int64))
+    np.save(work / "side.npy", np.array([side_code[k[2]] for k in keys], dtype=np.int8))
+    np.save(work / "minutes.npy",
+            np.array([minutes_by_key.get(k, 0) for k in keys], dtype=np.int32))
+    np.save(work / "present.npy", present)
+    # The header last: a directory without one is an interrupted export.
+    (work / "header.json").write_text(json.dumps({
+        "format": FORMAT, "competition_season_id": competition_season_id,
+        "provider": provider, "version": version, "database": _database(),
+        "features": list(features), "zones": list(zones), "shape": list(shape),
+    }, indent=1), encoding="utf-8")
+
+    old = target.with_name(target.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if target.exists():
+        target.rename(old)
+    work.rename(target)
+    shutil.rmtree(old, ignore_errors=True)
+    return load(competition_season_id, provider, root, check_version=False)
+
+
+def load(competition_season_id: int, provider: str = PROVIDER_SOFASCORE,
+         root: Path | None = None, *, check_version: bool = True) -> SeasonTensor | None:
+    """The season's tensor if there is one AND it is still the database's truth,
+    else None. Costs one small aggregate query when a file exists, none otherwise."""
+    d = tensor_dir(competition_season_id, provider, root)
+    try:
+        header = json.loads((d / "header.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if (header.get("format") != FORMAT
+            or header.get("competition_season_id") != competition_season_id
+            or header.get("provider") != provider
+            or header.get("database") != _database()):
+        return None
+    if check_version and header.get("version") != season_version(competition_season_id):
+        return None
+    try:
+        shape = header.get("shape") or []
+        values = np.load(d / "values.npy", mmap_mode="r" if all(shape) else None)
+        arrays = {name: np.load(d / f"{name}.npy") for name in _ARRAYS}
+    except (OSError, ValueError):
+        return None
+    if list(values.shape) != shape:
+        return None
+    return SeasonTensor(
+        competition_season_id=competition_season_id, provider=provider,
+        version=header["version"], features=tuple(header["features"]),
+        zones=tuple(header["zones"]), values=values, present=arrays["present"],
+        match_ids=arrays["match"], player_ids=arrays["player"], sides=arrays["side"],
+        minutes=arrays["minutes"])
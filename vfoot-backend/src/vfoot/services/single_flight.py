@@ -0,0 +1,147 @@
+"""One worker rebuilds an expensive cache entry; the others do not.
+
+The matchday index, the voto reference and the listone are keyed on the data
+they are computed from, so a tick that moves the data moves every key at once —
+and every client with the page open refetches in the same second. Without a
+guard each request process finds the new key missing and starts the same
+multi-second build: one import becomes N identical computations fighting for
+one CPU, and the requests time out behind them.
+
+``get_or_build`` puts a LEASE next to the key (``cache.add``, with a timeout, so
+a worker that dies mid-build does not hold it forever):
+
+* the worker that takes the lease builds, stores, releases;
+* a worker that finds it taken serves the PREVIOUS version when the caller can
+  name one (``stale``) — stale-while-revalidate: a page read a couple of
+  seconds behind the data is what it would have shown before the tick anyway;
+* without a previous version it waits for the entry to appear, and after
+  ``VFOOT_SINGLE_FLIGHT_WAIT`` seconds it builds it itself: a slow leader must
+  never turn into a failed request.
+
+The lease is as atomic as the backend's ``add``: exact on redis, memcached and
+the in-memory cache, a check-then-write on the file cache. There a second
+worker can slip through the window between the two — rare, and harmless: the
+two build the same entry, which is what every worker did before. The read-back
+after ``add`` narrows that window to the two writes themselves.
+"""
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import Callable
+from contextlib import nullcontext
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+from realdata.services import cache_stats
+
+# First pause between two looks at a missing entry, and the ceiling the pause
+# doubles up to: quick for the index (half a second), not a busy loop for the
+# listone (several).
+_POLL_FIRST = 0.05
+_POLL_MAX = 0.5
+
+
+def _lease_seconds() -> int:
+    return int(getattr(settings, "VFOOT_SINGLE_FLIGHT_LEASE", 120))
+
+
+def _wait_seconds() -> float:
+    return float(getattr(settings, "VFOOT_SINGLE_FLIGHT_WAIT", 15))
+
+
+def _lease_key(key: str) -> str:
+    return f"{key}:lease"
+
+
+def _sleep(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def _acquire(key: str) -> str | None:
+    """A token if this worker now holds the lease on ``key``, else None."""
+    token = uuid.uuid4().hex
+    if not cache.add(_lease_key(key), token, _lease_seconds()):
+        return None
+    # On a backend whose add is not atomic two workers may both get True: the
+    # one whose token was written last wins. None is a backend that keeps
+    # nothing (the dummy cache) — there is nobody to lose to.
+    if cache.get(_lease_key(key)) not in (token, None):
+        return None
+    return token
+
+
+def _release(key: str, token: str) -> None:
+    if cache.get(_lease_key(key)) == token:
+        cache.delete(_lease_key(key))
+
+
+def is_building(key: str) -> bool:
+    """Whether some worker holds the lease on ``key`` right now."""
+    return cache.get(_lease_key(key)) is not None
+
+
+def _timed(family: str | None):
+    return cache_stats.timed(family) if family else nullcontext()
+
+
+def get_or_build(key: str, build: Callable[[], Any], *,
+                 stale: Callable[[], Any] | None = None,
+                 family: str | None = None,
+                 pointer: str | None = None) -> tuple[Any, bool]:
+    """The entry under ``key``, built by one worker at a time.
+
+    ``build()`` must compute the value AND store it under ``key`` — the callers
+    swap their previous-version pointer there, and that write belongs to the
+    worker that built. ``stale()`` returns the previous version, or None; pass
+    it only where a value one data version behind is acceptable to whoever
+    reads it (a page, not a persisted result, and not the input of another
+    cache that would keep it under a new key).
+
+    Returns ``(value, built)``; ``built`` is True only for the worker that
+    ran ``build``.
+
+    With ``family`` the read is counted in ``cache_stats``: a hit, a miss — an
+    eviction when ``pointer``, the key of the family's last written entry, still
+    names this one — a stale answer, and the build's duration.
+    """
+    hit = cache.get(key)
+    if family:
+        if hit is not None:
+            cache_stats.hit(family)
+        else:
+            cache_stats.miss(family, evicted=bool(pointer) and cache.get(pointer) == key)
+    if hit is not None:
+        return hit, False
+    deadline = time.monotonic() + _wait_seconds()
+    pause = _POLL_FIRST
+    served_stale = False
+    while True:
+        token = _acquire(key)
+        if token is not None:
+            try:
+                # The leader may have finished between our miss and our add.
+                hit = cache.get(key)
+                if hit is not None:
+                    return hit, False
+                with _timed(family):
+                    return build(), True
+            finally:
+                _release(key, token)
+        if stale is not None and not served_stale:
+            previous = stale()
+            if previous is not None:
+                if family:
+                    cache_stats.stale(family)
+                return previous, False
+            served_stale = True    # nothing to serve: do not ask again
+        if time.monotonic() >= deadline:
+            with _timed(family):
+                return build(), True
+        _sleep(pause)
+        pause = min(pause * 2, _POLL_MAX)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit, False
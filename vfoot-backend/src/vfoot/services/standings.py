@@ -0,0 +1,292 @@
+"""La classifica: salvata, e aggiornata quando un risultato cambia.
+
+Fino a qui una classifica si ricalcolava a ogni lettura, rileggendo TUTTE le
+partite della competizione con il loro tabellino: un costo che cresceva con le
+giornate giocate, pagato da chiunque aprisse la classifica, il cruscotto o una
+struttura di coppa — cioè da tutti, e soprattutto la domenica. Come per l'albo
+d'oro (``honours``), il conto si fa QUANDO un risultato cambia, non a ogni
+apertura di pagina.
+
+COME
+----
+Una ``FantasyStandingRow`` per squadra e per fase (fase nulla = competizione
+senza fasi): giocate, V/N/P, gol fatti e subiti, la somma dei punteggi fantasy.
+Chi chiude o riapre delle partite lo fa dentro ``tracking(...)``, che legge lo
+stato di quelle partite prima e dopo e applica alle righe SOLO la differenza:
+una rettifica toglie il vecchio risultato e aggiunge il nuovo, una riapertura
+toglie e basta. Tutto nella stessa transazione delle partite: o cambiano
+entrambe, o nessuna.
+
+I punti non si salvano. Sono V/N/P moltiplicati per i valori della competizione,
+che un amministratore può ancora cambiare; salvarli avrebbe voluto dire doverli
+rifare tutti quel giorno.
+
+LE PARTITE IN CORSO non stanno qui: sono provvisorie per definizione, e si
+sovrappongono in lettura (``table``) alle righe salvate, come prima.
+
+IL RISCHIO di un dato salvato è che qualcuno scriva un risultato senza passare
+di qui — un seed, una simulazione materializzata, un test. Per questo ogni
+lettura confronta le righe con un riassunto delle partite finite (quante, quanti
+gol, quanti tabellini): una query, e se non tornano la competizione si
+ricostruisce da capo. ``manage.py rebuild_standings --check`` fa il confronto
+completo, squadra per squadra.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from vfoot.models import FantasyCompetition, FantasyFixture, FantasyStandingRow, FantasyTeam
+
+_EPS = 1e-6
+
+
+@dataclass
+class Tally:
+    played: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    goals_for: float = 0.0
+    goals_against: float = 0.0
+    score_sum: float = 0.0
+    scored: int = 0
+
+    def add(self, gf: float, ga: float, score: float | None = None, sign: int = 1) -> None:
+        self.played += sign
+        self.goals_for += sign * gf
+        self.goals_against += sign * ga
+        if gf > ga:
+            self.wins += sign
+        elif gf < ga:
+            self.losses += sign
+        else:
+            self.draws += sign
+        if score is not None:
+            self.score_sum += sign * score
+            self.scored += sign
+
+    def merge(self, other) -> None:
+        for f in _TALLY_FIELDS:
+            setattr(self, f, getattr(self, f) + getattr(other, f))
+
+    def same_as(self, other) -> bool:
+        return all(abs(getattr(self, f) - getattr(other, f)) < _EPS for f in _TALLY_FIELDS)
+
+
+_TALLY_FIELDS = tuple(f.name for f in fields(Tally))
+_STATE_COLUMNS = ("id", "competition_id", "stage_id", "home_team_id", "away_team_id",
+                  "home_total", "away_total", "detail__vfoot_home", "detail__vfoot_away")
+
+
+def _states(fixtures) -> dict[int, tuple]:
+    """{fixture_id: ciò che la partita porta in classifica}, per le sole finite."""
+    return {row[0]: row[1:] for row in
+            fixtures.filter(status=FantasyFixture.STATUS_FINISHED).values_list(*_STATE_COLUMNS)}
+
+
+def _fold(state: tuple, sign: int, into: dict) -> None:
+    comp_id, stage_id, home_id, away_id, hs, as_, vh, va = state
+    into.setdefault((comp_id, stage_id, home_id), Tally()).add(hs, as_, vh, sign)
+    into.setdefault((comp_id, stage_id, away_id), Tally()).add(as_, hs, va, sign)
+
+
+def _reference(competition: FantasyCompetition) -> dict[tuple, Tally]:
+    """Le righe come dovrebbero essere, rifatte dalle partite."""
+    out: dict[tuple, Tally] = {}
+    for state in _states(FantasyFixture.objects.filter(competition=competition)).values():
+        _fold(state, 1, out)
+    return out
+
+
+def _row(key: tuple, tally: Tally) -> FantasyStandingRow:
+    comp_id, stage_id, team_id = key
+    return FantasyStandingRow(competition_id=comp_id, stage_id=stage_id, team_id=team_id,
+                              **{f: getattr(tally, f) for f in _TALLY_FIELDS})
+
+
+def _apply(before: dict[int, tuple], after: dict[int, tuple]) -> None:
+    delta: dict[tuple, Tally] = {}
+    for fid, state in before.items():
+        if after.get(fid) != state:
+            _fold(state, -1, delta)
+    for fid, state in after.items():
+        if before.get(fid) != state:
+            _fold(state, 1, delta)
+    if not delta:
+        return
+    existing = {
+        (r.competition_id, r.stage_id, r.team_id): r
+        for r in FantasyStandingRow.objects.select_for_update()
+        .filter(competition_id__in={key[0] for key in delta})
+    }
+    changed, created = [], []
+    for key, d in delta.items():
+        row = existing.get(key)
+        if row is None:
+            created.append(_row(key, d))
+            continue
+        for f in _TALLY_FIELDS:
+            setattr(row, f, getattr(row, f) + getattr(d, f))
+        changed.append(row)
+    if changed:
+        FantasyStandingRow.objects.bulk_update(changed, list(_TALLY_FIELDS), batch_size=500)
+    if created:
+        FantasyStandingRow.objects.bulk_create(created, batch_size=500)
+
+
+@contextmanager
+def tracking(fixture_ids):
+    """Le righe seguono ciò che il blocco fa a queste partite.
+
+    Lo stato delle partite si legge prima e dopo il blocco, e alle righe va la
+    sola differenza: chiude, rettifica o riapre, è sempre la stessa operazione.
+    Dentro una transazione, così che partite e righe non possano separarsi.
+    """
+    ids = list(fixture_ids)
+    with transaction.atomic():
+        scope = FantasyFixture.objects.filter(id__in=ids)
+        before = _states(scope)
+        yield
+        _apply(before, _states(scope))
+
+
+def rebuild(competition: FantasyCompetition) -> dict[tuple, Tally]:
+    """Riscrive da capo le righe della competizione, dalle sue partite."""
+    reference = _reference(competition)
+    with transaction.atomic():
+        FantasyStandingRow.objects.filter(competition=competition).delete()
+        FantasyStandingRow.objects.bulk_create(
+            [_row(key, tally) for key, tally in reference.items()], batch_size=500)
+    return reference
+
+
+def verify(competition: FantasyCompetition) -> list[dict]:
+    """Le righe che non sono ciò che le partite dicono: [{"stage_id", "team_id",
+    "stored", "expected"}]. Vuota se la classifica salvata è giusta."""
+    reference = _reference(competition)
+    stored = {(r.competition_id, r.stage_id, r.team_id): r
+              for r in FantasyStandingRow.objects.filter(competition=competition)}
+    out = []
+    for key in sorted(set(reference) | set(stored), key=lambda k: (k[1] or 0, k[2])):
+        expected = reference.get(key, Tally())
+        row = stored.get(key)
+        if row is not None and expected.same_as(row):
+            continue
+        if row is None and expected.same_as(Tally()):
+            continue
+        out.append({"stage_id": key[1], "team_id": key[2],
+                    "stored": None if row is None else {f: getattr(row, f) for f in _TALLY_FIELDS},
+                    "expected": {f: getattr(expected, f) for f in _TALLY_FIELDS}})
+    return out
+
+
+def _in_step(competition: FantasyCompetition) -> bool:
+    """Le righe riassumono ancora le partite finite? Un confronto di totali: non
+    dimostra che siano giuste squadra per squadra (quello è ``verify``), ma si
+    accorge di qualunque risultato scritto senza passare da ``tracking``."""
+    fx = (FantasyFixture.objects
+          .filter(competition=competition, status=FantasyFixture.STATUS_FINISHED)
+          .aggregate(n=Count("id"), scored=Count("detail"),
+                     goals=Sum(F("home_total") + F("away_total"))))
+    rows = (FantasyStandingRow.objects.filter(competition=competition)
+            .aggregate(played=Sum("played"), scored=Sum("scored"),
+                       goals=Sum("goals_for")))
+    return (2 * fx["n"] == (rows["played"] or 0)
+            and 2 * fx["scored"] == (rows["scored"] or 0)
+            and abs((fx["goals"] or 0.0) - (rows["goals"] or 0.0)) < _EPS)
+
+
+def ensure(competition: FantasyCompetition) -> bool:
+    """Rimette in passo le righe se non lo sono; True se ha dovuto ricostruirle.
+    È il controllo che fa ogni lettura, fatto prima: dal tick, perché la prima
+    pagina dopo l'avviso trovi le righe pronte."""
+    if _in_step(competition):
+        return False
+    try:
+        rebuild(competition)
+    except IntegrityError:
+        return False       # la stava ricostruendo qualcun altro
+    return True
+
+
+def _stored(competition: FantasyCompetition, stage) -> dict[int, Tally]:
+    if not _in_step(competition):
+        try:
+            reference = rebuild(competition)
+        except IntegrityError:
+            # Un'altra richiesta la stava ricostruendo nello stesso momento: la sua
+            # versione vale quanto questa, e qui basta il conto fatto in memoria.
+            reference = _reference(competition)
+        keys = reference.items()
+    else:
+        rows = FantasyStandingRow.objects.filter(competition=competition, played__gt=0)
+        keys = (((r.competition_id, r.stage_id, r.team_id), r) for r in rows)
+    out: dict[int, Tally] = {}
+    for (_comp_id, stage_id, team_id), tally in keys:
+        if stage is not None and stage_id != stage.id:
+            continue
+        if tally.played <= 0:
+            continue
+        out.setdefault(team_id, Tally()).merge(tally)
+    return out
+
+
+def table(competition: FantasyCompetition, pw: int, pd: int, pl: int, *, stage=None,
+          pending=(), live_totals: dict | None = None) -> list[dict]:
+    """La classifica ordinata: di una fase, o (``stage`` None) di tutta la
+    competizione.
+
+    LE PARTITE IN CORSO CONTANO, quando ``live_totals`` le porta. Una classifica
+    che si fermava all'ultima giornata conclusa dava, per tutta la domenica, la
+    risposta sbagliata alla sola domanda che le si fa in quel momento — "come sta
+    andando" — e la dava accanto a un calendario che i punteggi provvisori li
+    mostrava già. Le righe toccate escono con ``provisional`` acceso, perché
+    "sesto a 41" e "sesto a 41 con una partita da finire" non sono la stessa frase.
+    ``pending`` sono le partite non ancora finite dello stesso ambito (con le
+    squadre caricate): solo quelle si leggono, le finite sono già nelle righe.
+
+    Senza ``live_totals`` il conto è quello sulle sole partite chiuse: è ciò che
+    serve a chi la classifica la vuole definitiva (un premio, un verdetto).
+    """
+    tallies = _stored(competition, stage)
+    live: set[int] = set()
+    for fx in pending:
+        scores = (live_totals or {}).get(fx.id)
+        if fx.status == FantasyFixture.STATUS_FINISHED or scores is None:
+            continue
+        hs, as_ = scores["home_total"], scores["away_total"]
+        # Nessun tabellino per una partita in corso: non entra nella media.
+        tallies.setdefault(fx.home_team_id, Tally()).add(hs, as_)
+        tallies.setdefault(fx.away_team_id, Tally()).add(as_, hs)
+        live |= {fx.home_team_id, fx.away_team_id}
+
+    teams = FantasyTeam.objects.in_bulk(list(tallies))
+
+    def points(r: Tally) -> int:
+        return r.wins * pw + r.draws * pd + r.losses * pl
+
+    ranked = sorted(tallies.items(),
+                    key=lambda kv: (points(kv[1]), kv[1].goals_for - kv[1].goals_against,
+                                    kv[1].goals_for),
+                    reverse=True)
+    return [
+        {
+            "rank": i + 1, "team_id": tid,
+            "team": teams[tid].name if tid in teams else str(tid),
+            "crest": teams[tid].crest if tid in teams else "",
+            "played": r.played, "wins": r.wins, "draws": r.draws, "losses": r.losses,
+            "goals_for": int(r.goals_for), "goals_against": int(r.goals_against),
+            "goal_diff": int(r.goals_for - r.goals_against), "points": points(r),
+            # La media sulle partite che un tabellino ce l'hanno: una in corso non
+            # ne ha ancora uno, e dividerla per le giocate abbassava la media di
+            # tutti appena cominciava la giornata.
+            "avg_score_for": round(r.score_sum / r.scored, 3) if r.scored else 0.0,
+            # Questa riga contiene una partita ancora da finire.
+            "provisional": tid in live,
+        }
+        for i, (tid, r) in enumerate(ranked)
+    ]
@@ -0,0 +1,39 @@
+"""The ridge path of ``classic_fit_weights``: one factorisation per fold must give
+the coefficients one penalised solve per alpha gives."""
+from __future__ import annotations
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from vfoot.management.commands.classic_fit_weights import _ridge_cv, _ridge_path
+
+
+def _solve(X, R, y, alpha):
+    """The penalised normal equations, intercepts unpenalised — the old way."""
+    Xa = np.hstack([X, R])
+    pen = np.concatenate([np.ones(X.shape[1]), np.zeros(R.shape[1])])
+    return np.linalg.solve(Xa.T @ Xa + alpha * np.diag(pen), Xa.T @ y)
+
+
+class RidgePathTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.X = rng.normal(size=(400, 12))
+        self.X[:, 5] = self.X[:, 4] + rng.normal(size=400) * 0.01   # near-collinear
+        roles = rng.integers(0, 3, 400)
+        self.R = np.column_stack([(roles == k).astype(float) for k in range(3)])
+        self.y = self.X @ rng.normal(size=12) * 0.1 + roles * 0.3 + rng.normal(size=400)
+
+    def test_every_alpha_matches_its_own_solve(self):
+        alphas = [0.3, 3.0, 100.0]
+        for alpha, coefs in zip(alphas, _ridge_path(self.X, self.R, self.y, alphas)):
+            np.testing.assert_allclose(coefs, _solve(self.X, self.R, self.y, alpha),
+                                       rtol=1e-9, atol=1e-11)
+
+    def test_a_single_intercept_is_a_column_of_ones(self):
+        ones = np.ones((400, 1))
+        alpha, pred, coefs = _ridge_cv(self.X, self.y, ones, [1.0, 10.0], 5,
+                                       np.random.default_rng(0))
+        np.testing.assert_allclose(coefs, _solve(self.X, ones, self.y, alpha),
+                                   rtol=1e-9, atol=1e-11)
+        self.assertEqual(pred.shape, self.y.shape)
@@ -0,0 +1,74 @@
+"""The feature-weight calibration on packed arrays.
+
+The objective is evaluated for a whole stack of parameter vectors at once; these
+check that stacking, padding and the restart pool change how fast it runs and
+nothing else. Synthetic samples, no database.
+"""
+from __future__ import annotations
+
+import random
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from realdata.services import fork_pool
+from vfoot.management.commands import calibrate_realdata_feature_weights as cfw
+
+ZONES = 20
+LOSS = {"tau": 1.25, "diff_weight": 0.35, "sign_weight": 1.0, "draw_weight": 0.5,
+        "sign_tau": 4.0, "regularization": 0.08, "prior": cfw.FeatureParams()}
+
+
+def _player(rng: random.Random, pid: int) -> cfw.PlayerSample:
+    presence = [rng.random() ** 3 for _ in range(ZONES)]
+    total = sum(presence)
+    return cfw.PlayerSample(
+        player_id=pid, side="home", presence=[p / total for p in presence],
+        grouped_quality={g: [rng.uniform(-0.5, 1.5) * rng.random() for _ in range(ZONES)]
+                         for g in cfw.FEATURE_GROUPS})
+
+
+def _samples(n: int, seed: int = 1) -> list[cfw.MatchSample]:
+    rng = random.Random(seed)
+    return [cfw.MatchSample(
+        match_id=m,
+        home_players=tuple(_player(rng, i) for i in range(rng.randint(8, 11))),
+        away_players=tuple(_player(rng, i) for i in range(rng.randint(8, 11))),
+        real_home_goals=rng.randint(0, 4), real_away_goals=rng.randint(0, 3))
+        for m in range(n)]
+
+
+class FeatureWeightCalibrationTests(SimpleTestCase):
+    def setUp(self):
+        self.samples = _samples(24)
+        self.packed = cfw.pack_samples(self.samples, ZONES)
+
+    def test_a_batch_scores_each_vector_as_it_would_alone(self):
+        thetas = np.vstack([cfw._theta(cfw.FeatureParams()),
+                            cfw._theta(cfw.FeatureParams(passing=1.4, errors=0.3, offset=6.0))])
+        batch = cfw.objective_batch(self.packed, thetas, **LOSS)
+        alone = [cfw.objective(self.packed, cfw.FeatureParams(**dict(zip(cfw.PARAM_NAMES, t))),
+                               **LOSS) for t in thetas.tolist()]
+        np.testing.assert_allclose(batch, alone, rtol=1e-12)
+
+    def test_padding_a_side_changes_no_score(self):
+        """A match packed next to a wider line-up is scored as if packed alone."""
+        short = min(self.samples, key=lambda s: len(s.home_players))
+        theta = cfw._theta(cfw.FeatureParams())[None]
+        alone = cfw.raw_scores(cfw.pack_samples([short], ZONES), theta)[0, 0]
+        packed = cfw.raw_scores(self.packed, theta)[0, self.samples.index(short)]
+        np.testing.assert_allclose(packed, alone, rtol=1e-12)
+
+    def test_restarts_in_a_pool_are_the_restarts_run_here(self):
+        train = cfw.pack_samples(self.samples[:18], ZONES)
+        validation = cfw.pack_samples(self.samples[18:], ZONES)
+        settings = {"epochs": 6, "learning_rate": 0.03, "optimizer": "spsa",
+                    "perturbation": 0.08, "loss": LOSS}
+        state = {"train": train, "validation": validation, "prior": LOSS["prior"],
+                 "seed": 42, "settings": settings}
+        here = [run[:2] for run in fork_pool.fork_map(
+            cfw._descend_restart, range(2), workers=1, state=state)]
+        there = [run[:2] for run in fork_pool.fork_map(
+            cfw._descend_restart, range(2), workers=2, state=state)]
+        self.assertEqual(there, here)
+        self.assertNotEqual(here[0], here[1])
@@ -0,0 +1,118 @@
+"""The historical league replay on a season table read once.
+
+A small synthetic season: the table is read in a fixed number of queries however
+many players and matchdays it holds, and a sweep replayed in a process pool writes
+the files the same leagues write one after the other.
+"""
+from __future__ import annotations
+
+import random
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from realdata.models import (
+    INTERVAL_FINAL_WHISTLE,
+    INTERVAL_SUBSTITUTION_OFF,
+    Competition,
+    CompetitionSeason,
+    Match,
+    MatchAppearance,
+    Player,
+    PlayerOnPitchInterval,
+    PlayerZoneFeature,
+    SIDE_AWAY,
+    SIDE_HOME,
+    Season,
+    Team,
+    TeamSeason,
+    TeamZoneFeature,
+)
+from vfoot.management.commands import simulate_historical_vfoot_league as shl
+
+FEATURES = ("xg_shots", "shots", "key_passes", "interceptions", "progressive_carries")
+
+
+def _season(matchdays: int, seed: int = 3):
+    rng = random.Random(seed)
+    comp = Competition.objects.create(external_id=str(seed), name="Serie A")
+    cs = CompetitionSeason.objects.create(
+        competition=comp, season=Season.objects.create(code=f"20{seed:02d}"), name="Serie A")
+    clubs = []
+    for c in range(4):
+        ts = TeamSeason.objects.create(competition_season=cs, team=Team.objects.create(name=f"Club {c}"))
+        # a keeper at the back, then defenders to forwards up the pitch
+        squad = [(Player.objects.create(full_name=f"Club {c} player {i}"), min(i // 2, 4))
+                 for i in range(9)]
+        clubs.append((ts, squad))
+    apps, feats, intervals, team_xg = [], [], [], []
+    for md in range(1, matchdays + 1):
+        for home, away in ((0, 1), (2, 3)) if md % 2 else ((0, 2), (1, 3)):
+            match = Match.objects.create(competition_season=cs, matchday=md,
+                                         home_team=clubs[home][0], away_team=clubs[away][0],
+                                         home_goals=rng.randint(0, 3), away_goals=rng.randint(0, 3))
+            for side, club in ((SIDE_HOME, home), (SIDE_AWAY, away)):
+                ts, squad = clubs[club]
+                team_xg.append(TeamZoneFeature(match=match, team_side=side, zone_key="Z_5_2",
+                                               feature_key="xg_shots", value=rng.random() * 2))
+                for i, (player, col) in enumerate(squad):
+                    starter = i < 7
+                    end = 90 * 60 if rng.random() < 0.8 else rng.randint(40, 80) * 60
+                    start = 0 if starter else 60 * 60
+                    apps.append(MatchAppearance(match=match, player=player, team_season=ts, side=side,
+                                                is_starter=starter, minutes_played=(end - start) // 60))
+                    intervals.append(PlayerOnPitchInterval(
+                        match=match, player=player, team_season=ts, team_side=side,
+                        start_elapsed_seconds=start, end_elapsed_seconds=max(end, start + 60),
+                        end_reason=INTERVAL_SUBSTITUTION_OFF if end < 90 * 60 else INTERVAL_FINAL_WHISTLE))
+                    for zone in (f"Z_{col}_{rng.randint(0, 3)}", f"Z_{min(col + 1, 5)}_1"):
+                        feats.append(PlayerZoneFeature(match=match, player=player, team_side=side,
+                                                       zone_key=zone, feature_key="touches",
+                                                       value=rng.randint(1, 20)))
+                        for feature in FEATURES:
+                            feats.append(PlayerZoneFeature(match=match, player=player, team_side=side,
+                                                           zone_key=zone, feature_key=feature,
+                                                           value=rng.random() * 3))
+    MatchAppearance.objects.bulk_create(apps)
+    PlayerZoneFeature.objects.bulk_create(feats)
+    PlayerOnPitchInterval.objects.bulk_create(intervals)
+    TeamZoneFeature.objects.bulk_create(team_xg)
+
+
+class HistoricalReplayTests(TestCase):
+    LEAGUE = ["--teams", "2", "--squad-size", "8", "--starters", "6", "--min-appearances", "1"]
+
+    @classmethod
+    def setUpTestData(cls):
+        _season(matchdays=6)
+
+    def setUp(self):
+        self.out = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.out)
+
+    def _run(self, *args):
+        call_command("simulate_historical_vfoot_league", *self.LEAGUE, *args, stdout=StringIO())
+
+    def test_the_season_is_read_once_whatever_its_size(self):
+        with self.assertNumQueries(6):
+            table = shl.Command()._season_table(None)
+        self.assertEqual(table.matchdays, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(table.appearances[Player.objects.order_by("id").first().id][:2], [6, 6])
+        _season(matchdays=3, seed=4)    # twice the players, half again the matches
+        with self.assertNumQueries(6):
+            shl.Command()._season_table(None)
+
+    def test_a_sweep_in_a_pool_writes_what_the_leagues_write_alone(self):
+        alone = {}
+        for seed in (1, 2):
+            path = self.out / f"alone_{seed}.json"
+            self._run("--seed", str(seed), "--output", str(path))
+            alone[seed] = path.read_bytes()
+        self._run("--sweep", "seed=1,2", "--workers", "2", "--output", str(self.out / "sweep.json"))
+        self.assertEqual((self.out / "sweep_seed1.json").read_bytes(), alone[1])
+        self.assertEqual((self.out / "sweep_seed2.json").read_bytes(), alone[2])
+        self.assertNotEqual(alone[1], alone[2])
@@ -0,0 +1,144 @@
+"""The API's JSON goes through orjson, and the cached listone goes out pre-encoded.
+
+What is tested is that nobody can tell: the bytes are those DRF's renderer
+writes, for the types the API actually sends, and a response assembled from
+cached fragments is the same document as one encoded whole.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.functional import lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from realdata.models import (
+    Competition, CompetitionSeason, Player, PlayerTeamStint, Season, Team, TeamSeason,
+)
+from vfoot.api import renderers
+from vfoot.models import FantasyLeague, FantasyRosterSlot, FantasyTeam, LeagueMembership
+from vfoot.services import listone_payload
+
+
+class EncodeTests(SimpleTestCase):
+    def test_the_bytes_are_drfs(self):
+        lazy_name = lazy(lambda: "Giornata", str)()
+        payload = {
+            "name": "Lautaro Martínez", "ok": True, "none": None, "n": 3, "x": 66.5,
+            "when": datetime(2026, 10, 19, 14, 30, 5, 123456, tzinfo=timezone.utc),
+            "naive": datetime(2026, 10, 19, 14, 30), "day": date(2026, 10, 19),
+            "price": Decimal("12.5"), "label": lazy_name, "ids": (1, 2), 7: "int key",
+            "js": "riga\u2028nuova\u2029", "nested": [{"a": []}, {}],
+        }
+        self.assertEqual(renderers.encode(payload), JSONRenderer().render(payload))
+
+    def test_what_orjson_refuses_still_encodes(self):
+        big = {"n": 2 ** 70}
+        self.assertEqual(renderers.encode(big), JSONRenderer().render(big))
+        with self.assertRaises(TypeError):
+            renderers.encode({"x": object()})
+
+    def test_the_renderer_sends_a_pre_encoded_body_as_it_is(self):
+        body = b'{"a":1}'
+        r = renderers.FastJSONRenderer()
+        self.assertIs(r.render(renderers.PreEncoded(body)), body)
+        self.assertEqual(r.render(renderers.PreEncoded(body), "application/json; indent=2"),
+                         b'{\n  "a": 1\n}')
+
+    def test_extend_encoded_is_a_merge_without_decoding(self):
+        extra = {"home_manager": {"username": "mario"}}
+        for raw in ('{"mode": "classic", "n": [1, 2]}', "{}", ' {"a": "\u2028"} '):
+            out = renderers.extend_encoded(raw, extra)
+            self.assertEqual(json.loads(out), {**json.loads(raw), **extra})
+            self.assertNotIn(b"\xe2\x80\xa8", out)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                        "LOCATION": "json-render-tests"}},
+)
+class PreEncodedListoneTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        self.cs = CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2026-2027"),
+            name="Serie A 2026-2027")
+        self.user = User.objects.create_user("mario", "m@x.it", "pw")
+        self.league = FantasyLeague.objects.create(
+            name="Lega", owner=self.user, mode=FantasyLeague.MODE_CLASSIC,
+            reference_season=self.cs)
+        membership = LeagueMembership.objects.create(
+            league=self.league, user=self.user, role=LeagueMembership.ROLE_ADMIN)
+        self.team = FantasyTeam.objects.create(league=self.league, manager=membership,
+                                               name="Mario \u2028FC")
+        napoli = TeamSeason.objects.create(competition_season=self.cs,
+                                           team=Team.objects.create(name="Napoli"))
+        self.players = []
+        for i in range(40):   # abbastanza da superare la soglia del gzip
+            p = Player.objects.create(full_name=f"Giocatore Numero{i}", short_name=f"G. N{i}",
+                                      classic_role_seed=("POR", "DIF", "CEN", "ATT")[i % 4])
+            PlayerTeamStint.objects.create(player=p, team_season=napoli)
+            self.players.append(p)
+        FantasyRosterSlot.objects.create(team=self.team, player=self.players[3],
+                                         purchase_price=7)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_the_assembled_listone_is_the_encoded_payload(self):
+        for filters in ({}, {"role": "ATT"}, {"order": "name"}, {"free": True}, {"q": "n3"}):
+            body = listone_payload.championship_players_response(
+                self.cs, league=self.league, **filters).body
+            payload = listone_payload.championship_players_payload(
+                self.cs, league=self.league, **filters)
+            self.assertEqual(body, renderers.encode(payload), filters)
+        owned = next(r for r in json.loads(body)["players"]
+                     if r["player_id"] == self.players[3].id)
+        self.assertEqual(owned["owner"], "Mario \u2028FC")
+
+    def test_a_hit_encodes_no_row(self):
+        listone_payload.championship_players_response(self.cs, league=self.league)
+        calls = []
+        real = listone_payload.encode
+        with patch.object(listone_payload, "encode",
+                          side_effect=lambda d: calls.append(d) or real(d)):
+            listone_payload.championship_players_response(self.cs, league=self.league)
+        # L'involucro e il nome di chi possiede: nessuna riga intera.
+        self.assertTrue(all("player_id" not in c for c in calls if isinstance(c, dict)))
+        self.assertTrue(all(not c.get("players") for c in calls if isinstance(c, dict)))
+
+    def test_the_season_listone_is_stored_whole_and_gzipped(self):
+        url = f"/api/v1/real-seasons/{self.cs.id}/players"
+        plain = self.client.get(url)
+        self.assertEqual(plain.status_code, 200)
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(plain.content, renderers.encode(
+            listone_payload.championship_players_payload(self.cs)))
+        zipped = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(zipped["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", zipped["Vary"])
+        self.assertEqual(gzip.decompress(zipped.content), plain.content)
+        # Un filtro non è la risposta intera: si assembla, e non si comprime.
+        filtered = self.client.get(url, {"role": "POR"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", filtered)
+        self.assertEqual(len(filtered.json()["players"]), 10)
+
+    def test_the_league_view_serves_the_same_document(self):
+        res = self.client.get(f"/api/v1/leagues/{self.league.id}/championship-players")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), json.loads(json.dumps(
+            listone_payload.championship_players_payload(self.cs, league=self.league))))
+
+    def test_the_benchmark_runs(self):
+        out = open("/dev/null", "w")
+        self.addCleanup(out.close)
+        call_command("bench_json_render", "--league", self.league.id, "--repeat", 1,
+                     stdout=out)
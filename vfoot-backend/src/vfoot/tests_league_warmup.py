@@ -0,0 +1,106 @@
+"""Dopo un tick, le pagine che l'avviso fa rileggere trovano la cache già pronta.
+
+Il tick è l'unico processo che sa che i dati si sono appena mossi: il conto lo
+paga lui, prima dell'avviso, e non la prima pagina che risponde — né le dieci
+che rispondono insieme.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from realdata.models import (
+    Competition, CompetitionSeason, Match, MatchAppearance, Player, Season, Team,
+    TeamSeason,
+)
+from vfoot.models import (
+    FantasyCompetition, FantasyFixture, FantasyLeague, FantasyMatchday,
+    FantasyStandingRow, FantasyTeam, LeagueMembership,
+)
+from vfoot.services import classic_matchday_scoring as cms
+from vfoot.services import league_warmup, listone_payload
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                        "LOCATION": "league-warmup-tests"}},
+)
+class LeagueWarmupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        self.cs = CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2026-2027"),
+            name="Serie A 2026-2027")
+        self.user = User.objects.create_user("mario", "m@x.it", "pw")
+        self.league = FantasyLeague.objects.create(
+            name="Lega", owner=self.user, mode=FantasyLeague.MODE_CLASSIC,
+            reference_season=self.cs)
+        membership = LeagueMembership.objects.create(
+            league=self.league, user=self.user, role=LeagueMembership.ROLE_ADMIN)
+        self.team = FantasyTeam.objects.create(league=self.league, manager=membership,
+                                               name="Mario FC")
+        home, away = (TeamSeason.objects.create(competition_season=self.cs,
+                                                team=Team.objects.create(name=n))
+                      for n in ("Napoli", "Inter"))
+        kickoff = timezone.now() - timedelta(hours=1)
+        for md in (21, 22):     # la 21 è conclusa, la 22 si sta giocando
+            match = Match.objects.create(
+                competition_season=self.cs, matchday=md, home_team=home, away_team=away,
+                kickoff=kickoff - timedelta(days=7 * (22 - md)), status=Match.STATUS_LIVE)
+            p = Player.objects.create(full_name=f"Tizio {md}", short_name=f"Tizio {md}",
+                                      classic_role_seed="CEN")
+            MatchAppearance.objects.create(match=match, player=p, team_season=home,
+                                           side="home", minutes_played=70, is_starter=True)
+        FantasyMatchday.objects.create(league=self.league, real_competition_season=self.cs,
+                                       real_matchday=21,
+                                       status=FantasyMatchday.STATUS_CONCLUDED)
+        FantasyMatchday.objects.create(league=self.league, real_competition_season=self.cs,
+                                       real_matchday=22)
+
+    def test_the_round_in_play_is_indexed_before_anyone_asks(self):
+        timings = league_warmup.warm([self.league.id])
+        self.assertEqual(timings["indexes_warmed"], 1)
+        self.assertIsNotNone(cache.get(cms._index_cache_key(self.cs.id, 22, self.league)))
+        self.assertIsNone(cache.get(cms._index_cache_key(self.cs.id, 21, self.league)),
+                          "una giornata conclusa non la rilegge nessuno")
+        with patch.object(cms, "pagella_for_match") as never:
+            cms.build_matchday_index(self.cs.id, 22, self.league, stale_ok=True)
+        never.assert_not_called()
+
+    def test_every_step_is_timed_and_the_listone_is_built(self):
+        timings = league_warmup.warm([self.league.id])
+        self.assertEqual({k for k in timings if k.endswith("_ms")},
+                         {"warm_index_ms", "warm_standings_ms", "warm_listone_ms"})
+        self.assertEqual(timings["listone_warmed"], 2)        # lega + stagione
+        self.assertEqual(listone_payload.warm([self.league.id]), 0)
+
+    def test_standings_written_around_the_rows_are_rebuilt(self):
+        other = FantasyTeam.objects.create(
+            league=self.league, name="Luigi FC",
+            manager=LeagueMembership.objects.create(
+                league=self.league, user=User.objects.create_user("luigi", password="x"),
+                role=LeagueMembership.ROLE_MANAGER))
+        comp = FantasyCompetition.objects.create(
+            league=self.league, name="Campionato",
+            competition_type=FantasyCompetition.TYPE_ROUND_ROBIN)
+        FantasyFixture.objects.create(competition=comp, home_team=self.team,
+                                      away_team=other, round_no=1, leg_no=1,
+                                      status=FantasyFixture.STATUS_FINISHED,
+                                      home_total=2, away_total=1)
+        self.assertEqual(league_warmup.warm([self.league.id])["standings_rebuilt"], 1)
+        self.assertEqual(FantasyStandingRow.objects.filter(competition=comp).count(), 2)
+        self.assertNotIn("standings_rebuilt", league_warmup.warm([self.league.id]))
+
+    def test_a_failing_step_does_not_stop_the_others(self):
+        with patch.object(league_warmup, "build_matchday_index",
+                          side_effect=RuntimeError("pagella rotta")), \
+             self.assertLogs("vfoot.services.league_warmup", "ERROR"):
+            timings = league_warmup.warm([self.league.id])
+        self.assertEqual(timings["warm_failed"], 1)
+        self.assertEqual(timings["listone_warmed"], 2)
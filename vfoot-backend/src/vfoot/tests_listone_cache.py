@@ -0,0 +1,160 @@
+"""Il listone sta in cache, e la chiave si muove con ciò da cui è calcolato.
+
+È la pagina che tutti tengono aperta durante un'asta, e rifarla a ogni richiesta
+voleva dire rileggere il pool, i club, le quotazioni, i ruoli e due stagioni di
+voti. Come per l'indice di giornata, quello che conta qui non è la velocità ma la
+chiave: stesse righe, e una chiave diversa appena si muove qualcosa che le cambia.
+Le due colonne che cambiano a ogni chiamata d'asta — chi possiede il giocatore, e
+se il suo ruolo è ancora in discussione — NON stanno in cache: si leggono fresche.
+"""
+from __future__ import annotations
+
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from realdata.models import (
+    Competition, CompetitionSeason, Player, PlayerMarketValue, PlayerTeamStint, Season,
+    Team, TeamSeason,
+)
+from vfoot.models import (
+    FantasyLeague, FantasyRosterSlot, FantasyTeam, LeagueMembership, LeaguePlayerRole,
+)
+from vfoot.services import listone_payload
+
+
+# La cache è l'oggetto in esame: ce ne vuole una vera (vedi tests_matchday_index_cache).
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                        "LOCATION": "listone-tests"}},
+)
+class ListoneCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        self.cs = CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2026-2027"),
+            name="Serie A 2026-2027")
+        self.user = User.objects.create_user("mario", "m@x.it", "pw")
+        self.league = FantasyLeague.objects.create(
+            name="Lega", owner=self.user, mode=FantasyLeague.MODE_CLASSIC,
+            reference_season=self.cs)
+        self.membership = LeagueMembership.objects.create(
+            league=self.league, user=self.user, role=LeagueMembership.ROLE_ADMIN)
+        self.napoli = TeamSeason.objects.create(
+            competition_season=self.cs, team=Team.objects.create(name="Napoli"))
+        self.tizio = self._signed("Tizio", "CEN")
+        self.caio = self._signed("Caio", "ATT")
+
+    def _signed(self, name: str, role: str) -> Player:
+        p = Player.objects.create(full_name=f"{name} Rossi", short_name=name,
+                                  classic_role_seed=role)
+        PlayerTeamStint.objects.create(player=p, team_season=self.napoli)
+        return p
+
+    def _payload(self, **filters):
+        return listone_payload.championship_players_payload(self.cs, league=self.league,
+                                                            **filters)
+
+    def _rows(self, **filters):
+        return {r["player_id"]: r for r in self._payload(**filters)["players"]}
+
+    # -- la cache serve la stessa cosa -------------------------------------
+    def test_the_second_read_does_not_rebuild(self):
+        first = self._payload()
+        with patch.object(listone_payload, "build_listone",
+                          side_effect=AssertionError("ricostruito")):
+            self.assertEqual(self._payload(), first)
+        self.assertEqual(first["count"], 2)
+
+    def test_ownership_is_read_fresh_over_the_cached_rows(self):
+        self.assertFalse(self._rows()[self.tizio.id]["owned"])
+        team = FantasyTeam.objects.create(league=self.league, manager=self.membership,
+                                          name="MarioFC")
+        FantasyRosterSlot.objects.create(team=team, player=self.tizio, purchase_price=3)
+        with patch.object(listone_payload, "build_listone",
+                          side_effect=AssertionError("ricostruito")):
+            row = self._rows()[self.tizio.id]
+        self.assertTrue(row["owned"])
+        self.assertEqual(row["owner"], "MarioFC")
+
+    # -- la chiave si muove ------------------------------------------------
+    def _moves(self, change) -> None:
+        before = listone_payload.listone_cache_key(self.cs, self.league)
+        change()
+        self.assertNotEqual(listone_payload.listone_cache_key(self.cs, self.league), before)
+
+    def test_a_signing_moves_the_key(self):
+        self._moves(lambda: self._signed("Sempronio", "DIF"))
+        self.assertEqual(self._payload()["count"], 3)
+
+    def test_a_departure_moves_the_key(self):
+        self._moves(lambda: PlayerTeamStint.objects.filter(player=self.caio)
+                    .update(end_date=date(2027, 1, 31)))
+
+    def test_a_new_quote_moves_the_key(self):
+        self._moves(lambda: PlayerMarketValue.objects.create(
+            player=self.tizio, provider="transfermarkt", value_eur=5_000_000,
+            as_of=date(2026, 9, 1)))
+
+    def test_a_frozen_role_moves_the_key(self):
+        self._moves(lambda: LeaguePlayerRole.objects.create(
+            league=self.league, player=self.tizio, role="ATT",
+            source=LeaguePlayerRole.SOURCE_ADMIN))
+        self.assertEqual(self._rows()[self.tizio.id]["role"], "ATT")
+
+    def test_a_retuned_model_moves_the_key(self):
+        before = listone_payload.listone_cache_key(self.cs, self.league)
+        with patch.object(listone_payload, "scoring_fingerprint", return_value="ritarato"):
+            self.assertNotEqual(listone_payload.listone_cache_key(self.cs, self.league),
+                                before)
+
+    def test_the_league_and_the_season_are_two_entries(self):
+        self.assertNotEqual(listone_payload.listone_cache_key(self.cs, self.league),
+                            listone_payload.listone_cache_key(self.cs))
+
+    # -- filtri e ordine sulle righe in cache -------------------------------
+    def test_filters_run_on_the_cached_rows(self):
+        self.assertEqual(set(self._rows(role="ATT")), {self.caio.id})
+        self.assertEqual(set(self._rows(role="cen,att")), {self.tizio.id, self.caio.id})
+        self.assertEqual(set(self._rows(q="tzio")), {self.tizio.id})      # un refuso
+        self.assertEqual(set(self._rows(q="Rossi")), {self.tizio.id, self.caio.id})
+        self.assertEqual([r["name"] for r in self._payload(order="name")["players"]],
+                         ["Caio", "Tizio"])
+        team = FantasyTeam.objects.create(league=self.league, manager=self.membership,
+                                          name="MarioFC")
+        FantasyRosterSlot.objects.create(team=team, player=self.caio, purchase_price=3)
+        self.assertEqual(set(self._rows(free=True)), {self.tizio.id})
+
+    def test_the_view_filters_and_refuses_an_unknown_order(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = f"/api/v1/leagues/{self.league.id}/championship-players"
+        resp = client.get(url, {"role": "ATT"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r["player_id"] for r in resp.json()["players"]], [self.caio.id])
+        self.assertEqual(client.get(url, {"order": "a caso"}).status_code, 400)
+
+    # -- il tick la prepara prima di avvisare ------------------------------
+    def test_warm_builds_once_and_drops_the_previous_entry(self):
+        self.assertEqual(listone_payload.warm([self.league.id]), 2)   # lega + stagione
+        self.assertEqual(listone_payload.warm([self.league.id]), 0)
+        old = listone_payload.listone_cache_key(self.cs, self.league)
+        self._signed("Sempronio", "DIF")
+        self.assertEqual(listone_payload.warm([self.league.id]), 2)
+        self.assertIsNone(cache.get(old))
+
+    def test_while_another_worker_rebuilds_the_page_reads_the_previous_entry(self):
+        self.assertEqual(len(self._rows()), 2)
+        self._signed("Sempronio", "DIF")
+        key = listone_payload.listone_cache_key(self.cs, self.league)
+        cache.set(f"{key}:lease", "un-altro-processo", 60)
+        with patch.object(listone_payload, "build_listone") as never:
+            self.assertEqual(len(self._rows()), 2)
+        never.assert_not_called()
+        cache.delete(f"{key}:lease")
+        self.assertEqual(len(self._rows()), 3)
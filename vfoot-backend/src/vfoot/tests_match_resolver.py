@@ -1,7 +1,11 @@
 """Tests for the status-aware real-match resolver (player+matchday -> outcome)."""
 from __future__ import annotations
 
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from realdata.models import (
     Competition,
@@ -14,12 +18,24 @@ from realdata.models import (
     Team,
     TeamSeason,
 )
+from vfoot.models import (
+    FantasyLeague,
+    FantasyMatchday,
+    FantasyRosterSlot,
+    FantasyTeam,
+    LeagueMembership,
+)
 from vfoot.services.match_resolver import (
     NO_MATCH,
     PENDING,
     SENZA_VOTO,
     VOTO,
+    current_team_seasons,
+    pending_player_ids,
+    resolve_league_matchday,
+    resolve_matchday,
     resolve_player,
+    resolve_rosters,
 )
 
 
@@ -106,3 +122,98 @@ class MatchResolverTests(TestCase):
         self._match(1, Match.STATUS_FINISHED, True, "m1")
         self.assertEqual(resolve_player(other.id, self.cs.id, 1, self.ref)["status"],
                          NO_MATCH)
+
+
+class SetBasedResolutionTests(TestCase):
+    """The whole matchday is resolved in a fixed number of queries, and resolving
+    rosters together answers exactly what resolving them one player at a time did."""
+
+    def setUp(self):
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        self.cs = CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2026-2027"))
+        self.ts = [TeamSeason.objects.create(competition_season=self.cs,
+                                             team=Team.objects.create(name=f"T{i}"))
+                   for i in range(4)]
+        # matchday 1: T0-T1 postponed shell + concluded replay, T2-T3 still to play.
+        self._match(self.ts[0], self.ts[1], Match.STATUS_POSTPONED, False, "shell")
+        self.replay = self._match(self.ts[0], self.ts[1], Match.STATUS_FINISHED, True,
+                                  "replay")
+        self.later = self._match(self.ts[2], self.ts[3], Match.STATUS_SCHEDULED, False,
+                                 "later")
+        self.players = []
+        for i in range(12):
+            p = Player.objects.create(full_name=f"P{i}", classic_role_seed="CEN")
+            PlayerTeamStint.objects.create(player=p, team_season=self.ts[i % 4])
+            self.players.append(p.id)
+        self.clubless = Player.objects.create(full_name="Svincolato").id
+        self.ref = {}
+
+    def _match(self, home, away, status, ready, ext):
+        return Match.objects.create(competition_season=self.cs, matchday=1,
+                                    home_team=home, away_team=away, status=status,
+                                    data_ready=ready, external_source="sofascore",
+                                    external_id=ext)
+
+    def test_the_query_count_does_not_grow_with_the_roster(self):
+        # Both touch the one concluded match, so both compute one pagella.
+        with CaptureQueriesContext(connection) as one:
+            resolve_matchday(self.cs.id, 1, self.players[:1], self.ref)
+        with self.assertNumQueries(len(one.captured_queries)):
+            resolve_matchday(self.cs.id, 1, self.players + [self.clubless], self.ref)
+        with self.assertNumQueries(2):             # clubs + fixtures, no pagella
+            resolve_matchday(self.cs.id, 1, self.players[2:4], self.ref)
+
+    def test_same_outcomes_as_one_player_at_a_time(self):
+        together = resolve_matchday(self.cs.id, 1, self.players + [self.clubless],
+                                    self.ref)
+        for pid in self.players + [self.clubless]:
+            self.assertEqual(together[pid], resolve_player(pid, self.cs.id, 1, self.ref))
+        by_status = {pid: o["status"] for pid, o in together.items()}
+        self.assertEqual(by_status[self.players[0]], SENZA_VOTO)
+        self.assertEqual(together[self.players[0]]["match_id"], self.replay.id)
+        self.assertEqual(by_status[self.players[2]], PENDING)
+        self.assertEqual(by_status[self.clubless], NO_MATCH)
+
+    def test_rosters_resolve_as_their_union(self):
+        rosters = {"a": self.players[:6], "b": self.players[4:] + [self.clubless]}
+        got = resolve_rosters(self.cs.id, 1, rosters, self.ref)
+        alone = {k: resolve_matchday(self.cs.id, 1, v, self.ref)
+                 for k, v in rosters.items()}
+        self.assertEqual(got, alone)
+
+    def test_two_open_stints_resolve_the_same_way_everywhere(self):
+        """A data error, but a deterministic one: the older stint wins for the
+        outcome and for the pending check alike."""
+        pid = self.players[0]                      # stint with T0 (concluded)
+        PlayerTeamStint.objects.create(player_id=pid, team_season=self.ts[2])
+        self.assertEqual(current_team_seasons(self.cs.id, [pid]), {pid: self.ts[0].id})
+        self.assertEqual(resolve_player(pid, self.cs.id, 1, self.ref)["match_id"],
+                         self.replay.id)
+        self.assertEqual(pending_player_ids(self.cs.id, 1, [pid]), set())
+
+    def test_the_league_entry_point_reads_every_active_roster(self):
+        owner = User.objects.create_user("owner", "o@x.it", "pw")
+        league = FantasyLeague.objects.create(
+            name="Lega", owner=owner, mode=FantasyLeague.MODE_CLASSIC,
+            reference_season=self.cs)
+        md = FantasyMatchday.objects.create(league=league, real_competition_season=self.cs,
+                                            real_matchday=1)
+        teams = []
+        for i, pids in enumerate((self.players[:3], self.players[3:5], [])):
+            user = owner if i == 0 else User.objects.create_user(f"m{i}", f"m{i}@x.it", "pw")
+            member = LeagueMembership.objects.create(league=league, user=user)
+            team = FantasyTeam.objects.create(league=league, manager=member, name=f"F{i}")
+            for pid in pids:
+                FantasyRosterSlot.objects.create(team=team, player_id=pid)
+            teams.append(team)
+        FantasyRosterSlot.objects.filter(team=teams[1], player_id=self.players[4]).update(
+            released_at=timezone.now())
+
+        got = resolve_league_matchday(league, md, self.ref)
+
+        self.assertEqual(set(got), {t.id for t in teams})
+        self.assertEqual(set(got[teams[0].id]), set(self.players[:3]))
+        self.assertEqual(set(got[teams[1].id]), {self.players[3]})
+        self.assertEqual(got[teams[2].id], {})
+        self.assertEqual(got[teams[1].id][self.players[3]]["status"], PENDING)
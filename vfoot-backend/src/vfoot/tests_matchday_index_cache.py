@@ -110,12 +110,21 @@ class MatchdayIndexCacheTests(TestCase):
         self.assertNotEqual(before, self._key())
 
     def test_a_live_round_moves_the_key(self):
-        """Il timbro che il tick scrive dopo ogni importazione live."""
+        """Il timbro che l'import scrive quando un giro live cambia i dati."""
         before = self._key()
-        self.match.data_checked_at = self.match.created_at
-        self.match.save(update_fields=["data_checked_at"])
+        self.match.data_changed_at = self.match.created_at
+        self.match.save(update_fields=["data_changed_at"])
         self.assertNotEqual(before, self._key())
 
+    def test_a_round_that_found_nothing_new_keeps_the_key(self):
+        """Il tick timbra la cadenza a ogni giro; se l'import ha trovato gli
+        stessi dati, la pagella in cache e' ancora quella giusta."""
+        before = self._key()
+        self.match.data_checked_at = self.match.created_at
+        self.match.data_imported_at = self.match.created_at
+        self.match.save(update_fields=["data_checked_at", "data_imported_at"])
+        self.assertEqual(before, self._key())
+
     def test_the_final_confirmation_moves_the_key(self):
         before = self._key()
         self.match.data_ready = True
@@ -165,6 +174,23 @@ class MatchdayIndexCacheTests(TestCase):
         self.assertIsNone(cache.get(old), "la voce del giro precedente e' andata")
         self.assertIsNotNone(cache.get(self._key()))
 
+    def test_while_another_worker_rebuilds_the_live_page_reads_the_previous_index(self):
+        """Un gol muove la chiave per tutti i client insieme: chi arriva mentre un
+        altro processo sta calcolando riceve l'indice di prima, non un secondo conto.
+        Chi congela un risultato invece non si accontenta."""
+        before = self._index()
+        self.match.home_goals = 2
+        self.match.save(update_fields=["home_goals"])
+        cache.set(f"{self._key()}:lease", "un-altro-processo", 60)
+        with patch.object(cms, "pagella_for_match") as never:
+            stale = cms.build_matchday_index(self.cs.id, 22, self.league, stale_ok=True)
+        never.assert_not_called()
+        self.assertEqual(stale, before)
+        with self.settings(VFOOT_SINGLE_FLIGHT_WAIT=0):
+            fresh = self._index()
+        self.assertIsNotNone(cache.get(self._key()))
+        self.assertIn(self.player.id, fresh)
+
     def test_another_league_gets_its_own_entry(self):
         """I ruoli congelati sono per lega, quindi lo e' anche la pagella."""
         other_user = User.objects.create_user("luigi", "l@x.it", "pw")
@@ -9,7 +9,9 @@ from __future__ import annotations
 from datetime import datetime, timedelta, timezone as dttz
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from realdata.models import (
     Competition,
@@ -114,6 +116,59 @@ class TwoClocksTests(TestCase):
         during_shell = DEC20 + timedelta(days=1, hours=1)
         self.assertIsNone(matchday_state.playing_matchday(self.league, during_shell))
 
+    # -- the calendar, read once -------------------------------------------- #
+    def test_a_scope_answers_every_calendar_question_from_one_read(self):
+        self.league.enforce_lineup_deadline = True
+        self.league.lineup_lock_mode = FantasyLeague.LOCK_PLAYER
+        after = DEC20 + timedelta(hours=1)
+
+        def ask():
+            return (matchday_state.lineup_lock_at(self.cs.id, 16),
+                    matchday_state.is_locked(self.cs.id, 17, after),
+                    matchday_state.matchday_locks(self.cs.id),
+                    matchday_state.locked_matchdays(self.cs.id, after),
+                    matchday_state.matchday_last_kickoffs(self.cs.id),
+                    matchday_state.closed_matchdays(self.league, after),
+                    matchday_state.player_lock_times(self.cs.id, 16),
+                    matchday_state.playing_matchday(self.league, after))
+
+        alone = ask()
+        with matchday_state.calendar_scope(), self.assertNumQueries(1):
+            self.assertEqual(ask(), alone)
+        self.assertEqual(alone[0], DEC20)
+        self.assertEqual(alone[6], {self.tsc.id: DEC20, self.tsd.id: DEC20})
+
+    def test_outside_a_scope_a_question_reads_only_its_answer(self):
+        # The commands ask one deadline per league: no season read behind each.
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(matchday_state.lineup_lock_at(self.cs.id, 16), DEC20)
+            self.assertTrue(matchday_state.is_locked(self.cs.id, 16, DEC20))
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all("JOIN" not in q["sql"] for q in queries.captured_queries))
+
+    def test_a_saved_match_drops_the_scopes_copy(self):
+        with matchday_state.calendar_scope():
+            self.assertEqual(matchday_state.lineup_lock_at(self.cs.id, 17), DEC27)
+            earlier = DEC27 - timedelta(days=1)
+            Match.objects.filter(external_id="a17").update(kickoff=earlier)
+            self.assertEqual(matchday_state.lineup_lock_at(self.cs.id, 17), DEC27,
+                             "un update() non manda segnali: resta la copia letta")
+            Match.objects.get(external_id="a17").save()
+            self.assertEqual(matchday_state.lineup_lock_at(self.cs.id, 17), earlier)
+
+    def test_each_request_reads_the_calendar_afresh(self):
+        from vfoot.middleware import CalendarScopeMiddleware
+
+        def view(request):
+            return [matchday_state.lineup_lock_at(self.cs.id, md) for md in (16, 17, 18)]
+
+        middleware = CalendarScopeMiddleware(view)
+        with self.assertNumQueries(1):
+            self.assertEqual(middleware(None), [DEC20, DEC27, None])
+        Match.objects.filter(external_id="a16").update(kickoff=DEC20 - timedelta(hours=2))
+        with self.assertNumQueries(1):
+            self.assertEqual(middleware(None)[0], DEC20 - timedelta(hours=2))
+
     # -- the ledger clock --------------------------------------------------- #
     def test_ledger_pointer_is_the_first_unscored_matchday(self):
         self.assertEqual(matchday_state.ledger_matchday(self.league).id, self.md16.id)
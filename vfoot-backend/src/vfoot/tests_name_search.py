@@ -7,9 +7,16 @@ answers differently depending on the page is worse than a strict one.
 """
 from __future__ import annotations
 
+import random
+from unittest.mock import patch
+
 from django.test import TestCase
 
-from vfoot.services.name_search import fold, matches
+from realdata.models import Player, PlayerAlias
+from vfoot.services import player_search
+from vfoot.services.name_search import (
+    NameIndex, _distance, _edit_distance_within, fold, matches,
+)
 
 
 class FoldTests(TestCase):
@@ -59,3 +66,80 @@ class MatchTests(TestCase):
 
     def test_missing_fields_are_not_a_match(self):
         self.assertFalse(matches("leao", None, None))
+
+
+class NameIndexTests(TestCase):
+    """The index must answer exactly what ``matches`` answers over the same
+    names, one by one — it is a faster way to ask, not a different question."""
+
+    NAMES = [("R. Leão", "Rafael Leão"), ("H. Çalhanoğlu", "Hakan Çalhanoğlu"),
+             ("L. Martínez", "Lautaro Martínez"), ("H. Mkhitaryan", "Henrikh Mkhitaryan"),
+             ("G. Donnarumma", "Gianluigi Donnarumma"), ("M. Kean", "Moise Kean"),
+             ("D'Ambrosio", "Danilo D''Ambrosio"), ("", None), ("P. Dybala", "Paulo Dybala")]
+
+    def _brute(self, needle, entries):
+        return [key for key, names in entries if matches(needle, *names)]
+
+    def test_the_pinned_cases_answer_as_matches_does(self):
+        entries = list(enumerate(self.NAMES))
+        index = NameIndex(entries)
+        for needle in ("leao", "calhanoglu", "lautaro", "mkitarian", "donarumma",
+                       "martines", "gianluigy", "leo", "kea", "mkhitaryan", "dybala",
+                       "dambrosio", "", "   ", "l.", "an", "x"):
+            self.assertEqual(index.search(needle), self._brute(needle, entries), needle)
+
+    def test_random_names_and_typos_answer_as_matches_does(self):
+        rnd = random.Random(7)
+        syllables = ["ma", "ri", "no", "lu", "ca", "tti", "ssi", "ro", "ga", "ne",
+                     "zzo", "be", "di", "lla", "to", "ve", "rdi", "ke", "an"]
+
+        def word():
+            return "".join(rnd.choice(syllables) for _ in range(rnd.randint(1, 4)))
+
+        entries = [(i, [f"{word()[0].upper()}. {word()}", f"{word()} {word()}"])
+                   for i in range(400)]
+        index = NameIndex(entries)
+        for _ in range(150):
+            target = rnd.choice(rnd.choice(entries)[1]).lower()
+            chars = list(target)
+            for _ in range(rnd.randint(0, 2)):
+                chars[rnd.randrange(len(chars))] = rnd.choice("aeioubz")
+            start = rnd.randrange(len(chars))
+            needle = "".join(chars[start:start + rnd.randint(2, 12)])
+            self.assertEqual(index.search(needle), self._brute(needle, entries), needle)
+
+    def test_the_distance_is_levenshtein(self):
+        rnd = random.Random(3)
+        for _ in range(500):
+            a = "".join(rnd.choice("abc") for _ in range(rnd.randint(0, 9)))
+            b = "".join(rnd.choice("abc") for _ in range(rnd.randint(0, 9)))
+            self.assertEqual(_distance(a, b), _edit_distance_within(a, b, 99), (a, b))
+
+
+class PlayerSearchIndexTests(TestCase):
+    def setUp(self):
+        player_search.reset()
+        self.addCleanup(player_search.reset)
+        self.leao = Player.objects.create(full_name="Rafael Leão", short_name="R. Leão")
+        PlayerAlias.objects.create(player=self.leao, source="transfermarkt", alias="357119")
+        self.kean = Player.objects.create(full_name="Moise Kean", short_name="M. Kean")
+
+    def test_a_typo_finds_the_player(self):
+        self.assertEqual(player_search.fuzzy_player_ids("Leaoo"), [self.leao.id])
+
+    def test_a_provider_id_is_not_a_name(self):
+        self.assertEqual(player_search.fuzzy_player_ids("357119"), [])
+
+    def test_the_excluded_are_left_out(self):
+        self.assertEqual(player_search.fuzzy_player_ids("leao", exclude=[self.leao.id]), [])
+
+    def test_an_import_is_seen_by_the_next_search(self):
+        self.assertEqual(player_search.fuzzy_player_ids("dybbala"), [])
+        dybala = Player.objects.create(full_name="Paulo Dybala", short_name="P. Dybala")
+        self.assertEqual(player_search.fuzzy_player_ids("dybbala"), [dybala.id])
+
+    def test_the_index_is_built_once(self):
+        player_search.fuzzy_player_ids("leao")
+        with patch.object(player_search, "build_index",
+                          side_effect=AssertionError("ricostruito")):
+            self.assertEqual(player_search.fuzzy_player_ids("keam"), [self.kean.id])
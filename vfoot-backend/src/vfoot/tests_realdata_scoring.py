@@ -57,3 +57,43 @@ class RealDataScoringTests(TestCase):
         self.assertGreater(payload["score"]["away_total"], 0)
         self.assertEqual(payload["provenance"]["formula_version"], "realdata_scoring_v1")
 
+
+
+class MatchProfilesTests(TestCase):
+    """The profiles of a match come from one query, whatever the number of players."""
+
+    def setUp(self):
+        from realdata.models import Competition, CompetitionSeason, Player, Season, Team, TeamSeason
+
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        cs = CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2025-2026"), name="Serie A")
+        home, away = (TeamSeason.objects.create(competition_season=cs, team=Team.objects.create(name=n))
+                      for n in ("Napoli", "Inter"))
+        self.match = Match.objects.create(competition_season=cs, matchday=1,
+                                          home_team=home, away_team=away)
+        self.ids = {SIDE_HOME: [], SIDE_AWAY: []}
+        for side in (SIDE_HOME, SIDE_AWAY):
+            for i in range(4):
+                player = Player.objects.create(full_name=f"{side} {i}", short_name=f"{side[0]}{i}")
+                self.ids[side].append(player.id)
+                for col, feature, value in ((i, "touches", 10.0), (i + 1, "touches", 5.0),
+                                            (i, "key_passes", 2.0)):
+                    PlayerZoneFeature.objects.create(match=self.match, player=player, team_side=side,
+                                                     zone_key=f"Z_{col}_1", feature_key=feature,
+                                                     value=value, provider="sofascore")
+
+    def test_one_query_for_the_rows_and_one_for_the_names(self):
+        with self.assertNumQueries(2):
+            payload = compute_real_match_zone_duels(match=self.match,
+                                                    home_player_ids=self.ids[SIDE_HOME],
+                                                    away_player_ids=self.ids[SIDE_AWAY])
+        self.assertEqual(payload["provenance"]["home_profiles"], 4)
+        self.assertEqual(payload["provenance"]["away_profiles"], 4)
+
+    def test_the_vectors_follow_the_zone_grid(self):
+        profile = build_player_real_zone_profile(match=self.match, player_id=self.ids[SIDE_HOME][0])
+        self.assertEqual(list(profile.presence.values()), profile.presence_vector.tolist())
+        self.assertAlmostEqual(profile.presence["z0100"], 10 / 15)
+        self.assertAlmostEqual(profile.zone_rating["z0100"], 5.5 + 2 * 0.12)
+        self.assertIsNone(build_player_real_zone_profile(match=self.match, player_id=0))
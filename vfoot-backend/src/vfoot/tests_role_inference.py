@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import numpy as np
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
 from realdata.models import (
     Competition, CompetitionSeason, Match, MatchAppearance, Player,
@@ -11,8 +11,9 @@ from realdata.models import (
 )
 from vfoot.models import CurrentPlayerRole, FantasyLeague, LeaguePlayerRole
 from vfoot.services.role_inference import (
-    ROLE_MARGIN_REVIEW, TM_AMBIGUOUS, TM_DEFAULT, TM_DETERMINISTIC, infer_roles,
-    player_profiles, refresh_current_roles, role_margins, tm_positions,
+    ROLE_MARGIN_REVIEW, TM_AMBIGUOUS, TM_DEFAULT, TM_DETERMINISTIC, _kmeans,
+    consensus_categories, consensus_workers, infer_roles, player_profiles,
+    refresh_current_roles, role_margins, tm_positions,
 )
 
 
@@ -165,6 +166,45 @@ class RoleInferenceTests(TestCase):
         self.assertEqual(set(TM_DEFAULT), TM_AMBIGUOUS)
 
 
+class ConsensusRunsTests(SimpleTestCase):
+    """The runs went from a loop to a pool, and the accumulator from one N×N
+    comparison per run to a product of memberships. Neither may move a single bit
+    of the result: a role that depended on the core count would be as arbitrary
+    as one that depended on the seed."""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.Z = np.vstack([rng.normal(c, 0.6, size=(25, 4)) for c in (-2, 0, 2)])
+
+    def _serial_loop(self, k, runs):
+        """The accumulation as it was written before."""
+        M = np.zeros((len(self.Z), len(self.Z)))
+        for s in range(runs):
+            lab, _ = _kmeans(self.Z, k, 1000 + s)
+            M += (lab[:, None] == lab[None, :])
+        M /= runs
+        labels, _ = _kmeans(M, k, 7)
+        return labels, M
+
+    def test_the_counts_reproduce_the_float_accumulator(self):
+        labels, _conf, M = consensus_categories(self.Z, 3, runs=8, workers=1)
+        want_labels, want_M = self._serial_loop(3, 8)
+        self.assertTrue(np.array_equal(M, want_M))
+        self.assertTrue(np.array_equal(labels, want_labels))
+
+    def test_a_pool_gives_the_serial_answer(self):
+        serial = consensus_categories(self.Z, 3, runs=8, workers=1)
+        pooled = consensus_categories(self.Z, 3, runs=8, workers=2)
+        for a, b in zip(serial, pooled):
+            self.assertTrue(np.array_equal(a, b))
+
+    def test_the_runs_stay_in_process_unless_a_pool_is_asked_for(self):
+        with override_settings(VFOOT_ROLE_WORKERS=None):
+            self.assertEqual(consensus_workers(), 1)
+        with override_settings(VFOOT_ROLE_WORKERS=4):
+            self.assertEqual(consensus_workers(), 4)
+
+
 class RoleMarginTests(TestCase):
     """The margin is read against the role we ASSIGN, not between the top two.
 
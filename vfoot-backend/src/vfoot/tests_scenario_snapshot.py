@@ -0,0 +1,76 @@
+"""A built scenario saved and put back, and the key that decides when it may be.
+
+The backup API writes into the open connection, so these run outside the
+per-test transaction: a TransactionTestCase, with the test database itself as
+the scenario.
+"""
+from __future__ import annotations
+
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dttz
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import TransactionTestCase
+
+from realdata.models import Competition, CompetitionSeason, Season
+from vfoot.services import scenario_snapshot
+
+AT = datetime(2027, 1, 31, 17, 35, tzinfo=dttz.utc)
+
+
+class ScenarioSnapshotTests(TransactionTestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def _path(self, scenario="g22-live", **key):
+        return scenario_snapshot.snapshot_path(
+            self.dir, scenario, **{"seed": 2627, "at": AT, "owner": "andrea",
+                                   "cup": None, **key})
+
+    def test_a_restored_build_is_the_database_that_was_saved(self):
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2026-2027"), name="Serie A")
+        path = self._path()
+        self.assertFalse(scenario_snapshot.restore(path), "nothing saved yet")
+        scenario_snapshot.save(path)
+
+        # The evening goes on: rows written, rows thrown away.
+        Season.objects.create(code="2027-2028")
+        CompetitionSeason.objects.all().delete()
+        self.assertTrue(scenario_snapshot.restore(path))
+        self.assertEqual(list(Season.objects.values_list("code", flat=True)), ["2026-2027"])
+        self.assertEqual(CompetitionSeason.objects.get().competition.name, "Serie A")
+
+    def test_the_key_moves_with_whatever_builds_the_state(self):
+        path = self._path()
+        self.assertEqual(self._path(), path)
+        self.assertTrue(path.name.startswith("g22-live@2027-01-31T17-35-00-00-00."))
+        for other in ({"seed": 1}, {"at": AT + timedelta(minutes=10)},
+                      {"owner": "mario"}, {"cup": True}):
+            self.assertNotEqual(self._path(**other), path, other)
+        with patch.object(scenario_snapshot, "code_fingerprint", return_value="altro"):
+            moved = self._path()
+        self.assertNotEqual(moved, path)
+
+        # A save under new code replaces the old build of the same inputs, which
+        # can never be restored; the builds of other inputs stay.
+        other_seed = self._path(seed=1)
+        scenario_snapshot.save(path)
+        scenario_snapshot.save(other_seed)
+        scenario_snapshot.save(moved)
+        self.assertEqual(sorted(p.name for p in self.dir.iterdir()),
+                         sorted([moved.name, other_seed.name]))
+
+    def test_a_folder_name_is_not_read_as_part_of_the_uri(self):
+        self.dir = self.dir / "serata #2 ?100%"
+        self.dir.mkdir()
+        Season.objects.create(code="2026-2027")
+        path = self._path()
+        scenario_snapshot.save(path)
+        Season.objects.all().delete()
+        self.assertTrue(scenario_snapshot.restore(path))
+        self.assertEqual(list(Season.objects.values_list("code", flat=True)), ["2026-2027"])
@@ -0,0 +1,138 @@
+"""The season tensor: an on-disk copy of the zone rows that the offline readers
+trust only while the season's data version says it is still true.
+
+The readers that use it must not be able to tell it from the database: the same
+role matrix, the same per-match totals, the same zone presence. The rest is about
+when it must NOT be used.
+"""
+from __future__ import annotations
+
+import shutil
+import tempfile
+from datetime import timedelta
+
+import numpy as np
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from realdata.models import Match, PlayerZoneFeature
+from realdata.services import zone_archive
+from realdata.services.sofascore_adapter import METHOD_UNPLACED, ZONE_UNPLACED
+from vfoot import tests_role_inference
+from vfoot.management.commands.calibrate_realdata_feature_weights import (
+    Command as FeatureWeightsCommand,
+)
+from vfoot.services import season_tensor
+from vfoot.services.classic_rating import _per_match_player_totals, _zone_presence
+from vfoot.services.role_inference import player_profiles
+from vfoot.services.zone_engine import make_zone_grid
+
+
+class SeasonTensorTests(TestCase):
+    # the role inference's synthetic league, without re-running its tests here
+    setUp_population = tests_role_inference.RoleInferenceTests.setUp
+    _player = tests_role_inference.RoleInferenceTests._player
+    _population = tests_role_inference.RoleInferenceTests._population
+
+    def setUp(self):
+        self.setUp_population()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = override_settings(VFOOT_SEASON_TENSOR_DIR=tmp.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self._population()
+        # a light round's row: totals with no position, which no positional
+        # reader may stand anywhere on the pitch
+        p = self._player("Live", "central midfield", col=1)
+        PlayerZoneFeature.objects.create(
+            match=self.match, player=p, provider="sofascore", feature_key="touches",
+            zone_key=ZONE_UNPLACED, value=7.0, team_side="home",
+            source_method=METHOD_UNPLACED)
+
+    def test_the_export_holds_every_row(self):
+        tensor = season_tensor.export(self.prev.id)
+        self.assertEqual(len(tensor.match_ids),
+                         PlayerZoneFeature.objects.values("player_id").distinct().count())
+        self.assertIn(ZONE_UNPLACED, tensor.zones)
+        self.assertAlmostEqual(float(np.asarray(tensor.values).sum()),
+                               sum(PlayerZoneFeature.objects.values_list("value",
+                                                                         flat=True)))
+        self.assertEqual(set(tensor.minutes.tolist()), {900})
+        self.assertEqual(tensor.match_rows(self.match.id), slice(0, len(tensor.match_ids)))
+
+    def test_the_role_matrix_is_the_databases(self):
+        ids, db = player_profiles(self.prev.id, min_minutes=1)
+        self.assertIsNotNone(season_tensor.export(self.prev.id))
+        # the version and the keeper and ordering lookups: no zone row is read
+        with self.assertNumQueries(6):
+            t_ids, from_tensor = player_profiles(self.prev.id, min_minutes=1)
+        self.assertEqual(t_ids, ids)
+        np.testing.assert_array_equal(from_tensor, db)
+
+    def test_the_vote_readers_are_the_databases(self):
+        ids = [self.match.id]
+        db_totals, db_presence = _per_match_player_totals(ids), _zone_presence(ids)
+        tensor = season_tensor.export(self.prev.id)
+        self.assertEqual(_per_match_player_totals(ids, tensor), db_totals)
+        self.assertEqual(_zone_presence(ids, tensor), db_presence)
+
+    def test_the_zone_duel_samples_are_the_databases(self):
+        zone_index = {z: i for i, z in enumerate(make_zone_grid()["zone_ids"])}
+        pids = set(PlayerZoneFeature.objects.values_list("player_id", flat=True))
+        cmd = FeatureWeightsCommand()
+        db = cmd._load_players(self.match, pids, zone_index, len(zone_index))
+        tensor = season_tensor.export(self.prev.id)
+        got = cmd._tensor_players(tensor, self.match, pids, zone_index, len(zone_index))
+        self.assertEqual(len(got), len(db))
+        by_id = {p.player_id: p for p in db}
+        for p in got:
+            want = by_id[p.player_id]
+            self.assertEqual(p.side, want.side)
+            np.testing.assert_allclose(p.presence, want.presence)
+            for group, zones in want.grouped_quality.items():
+                np.testing.assert_allclose(p.grouped_quality[group], zones)
+
+    def test_an_archived_season_reads_the_same(self):
+        ids, profiles = player_profiles(self.prev.id, min_minutes=1)
+        presence = _zone_presence([self.match.id])
+        values = np.asarray(season_tensor.export(self.prev.id).values).copy()
+        # no tensor to answer for it: the readers have to find the archive
+        shutil.rmtree(season_tensor.tensor_dir(self.prev.id))
+        zone_archive.archive_season(self.prev.id, force=True)
+        self.assertFalse(PlayerZoneFeature.objects.exists())
+        a_ids, archived = player_profiles(self.prev.id, min_minutes=1)
+        self.assertEqual(a_ids, ids)
+        np.testing.assert_allclose(archived, profiles)
+        self.assertEqual(_zone_presence([self.match.id]), presence)
+        np.testing.assert_array_equal(
+            np.asarray(season_tensor.export(self.prev.id).values), values)
+
+    def test_a_new_import_retires_the_tensor(self):
+        season_tensor.export(self.prev.id)
+        self.assertIsNotNone(season_tensor.load(self.prev.id))
+        Match.objects.filter(id=self.match.id).update(
+            data_changed_at=timezone.now() + timedelta(minutes=1))
+        self.assertIsNone(season_tensor.load(self.prev.id))
+
+    def test_another_season_or_provider_is_not_this_one(self):
+        season_tensor.export(self.prev.id)
+        self.assertIsNone(season_tensor.load(self.cur.id))
+        self.assertIsNone(season_tensor.load(self.prev.id, "statsbomb"))
+
+    def test_an_empty_season_exports(self):
+        tensor = season_tensor.export(self.cur.id)
+        self.assertEqual(tensor.values.shape[0], 0)
+        self.assertIsNotNone(season_tensor.load(self.cur.id))
+
+    def test_the_command_checks_and_writes(self):
+        out = open("/dev/null", "w")
+        self.addCleanup(out.close)
+        with self.assertRaises(CommandError):
+            call_command("export_season_tensor", "--season", self.prev.id, "--check",
+                         stdout=out)
+        call_command("export_season_tensor", "--season", self.prev.id, stdout=out)
+        call_command("export_season_tensor", "--season", self.prev.id, "--check",
+                     stdout=out)
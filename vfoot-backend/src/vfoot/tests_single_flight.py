@@ -0,0 +1,113 @@
+"""Una chiave che si muove la ricostruisce UN processo; gli altri aspettano o
+servono la versione di prima.
+
+Gli altri processi qui sono una riga di cache: il lease è una voce come le altre,
+e chi lo trova occupato non sa, né deve sapere, chi lo tiene.
+"""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from realdata.services import cache_stats
+from vfoot.services import single_flight
+
+KEY = "vfoot:test:entry"
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                        "LOCATION": "single-flight-tests"}},
+    VFOOT_SINGLE_FLIGHT_WAIT=5,
+)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def _build(self, value="nuovo"):
+        def build():
+            self.builds += 1
+            cache.set(KEY, value)
+            return value
+        return build
+
+    def _held_elsewhere(self):
+        cache.set(f"{KEY}:lease", "un-altro-processo", 60)
+
+    def test_the_first_builds_and_the_second_reads(self):
+        self.assertEqual(single_flight.get_or_build(KEY, self._build()), ("nuovo", True))
+        self.assertEqual(single_flight.get_or_build(KEY, self._build()), ("nuovo", False))
+        self.assertEqual(self.builds, 1)
+        self.assertFalse(single_flight.is_building(KEY))
+
+    def test_a_held_lease_serves_the_previous_version(self):
+        self._held_elsewhere()
+        value, built = single_flight.get_or_build(KEY, self._build(),
+                                                  stale=lambda: "vecchio")
+        self.assertEqual((value, built, self.builds), ("vecchio", False, 0))
+
+    def test_without_a_previous_version_it_waits_for_the_leader(self):
+        self._held_elsewhere()
+
+        def leader_finishes(_seconds):
+            cache.set(KEY, "del leader")
+            cache.delete(f"{KEY}:lease")
+
+        with patch.object(single_flight, "_sleep", side_effect=leader_finishes) as slept:
+            value = single_flight.get_or_build(KEY, self._build(), stale=lambda: None)
+        self.assertEqual(value, ("del leader", False))
+        self.assertEqual((slept.call_count, self.builds), (1, 0))
+
+    def test_a_leader_that_died_takes_the_lease_with_it(self):
+        """Il lease scade; chi aspetta lo prende e costruisce."""
+        self._held_elsewhere()
+        with patch.object(single_flight, "_sleep",
+                          side_effect=lambda _s: cache.delete(f"{KEY}:lease")):
+            self.assertEqual(single_flight.get_or_build(KEY, self._build()),
+                             ("nuovo", True))
+
+    @override_settings(VFOOT_SINGLE_FLIGHT_WAIT=0)
+    def test_a_slow_leader_never_fails_the_request(self):
+        self._held_elsewhere()
+        self.assertEqual(single_flight.get_or_build(KEY, self._build()), ("nuovo", True))
+        self.assertTrue(single_flight.is_building(KEY), "il lease resta di chi lo tiene")
+
+    def test_a_failed_build_releases_the_lease(self):
+        def broken():
+            raise RuntimeError("import a metà")
+
+        with self.assertRaises(RuntimeError):
+            single_flight.get_or_build(KEY, broken)
+        self.assertFalse(single_flight.is_building(KEY))
+        self.assertEqual(single_flight.get_or_build(KEY, self._build())[1], True)
+
+    def test_a_racing_add_is_lost_to_the_last_writer(self):
+        """Sul file cache ``add`` è un controllo e una scrittura: se due processi
+        passano entrambi, vince chi ha scritto per ultimo."""
+        with patch.object(cache, "add", return_value=True):
+            self._held_elsewhere()
+            self.assertIsNone(single_flight._acquire(KEY))
+
+    def test_the_reads_are_counted_and_a_culled_entry_is_an_eviction(self):
+        """Il puntatore all'ultima chiave scritta la nomina ancora: la voce non è
+        stata sostituita, è sparita — il culling della cache su file."""
+        cache_stats._pending.clear()
+        self.addCleanup(cache_stats._pending.clear)
+        patcher = patch.object(cache_stats, "FLUSH_SECONDS", float("inf"))   # niente DB qui
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.set("vfoot:test:last", KEY)
+        for _ in range(2):
+            single_flight.get_or_build(KEY, self._build(), family="test",
+                                       pointer="vfoot:test:last")
+        self._held_elsewhere()
+        cache.delete(KEY)
+        single_flight.get_or_build(KEY, self._build(), stale=lambda: "vecchio",
+                                   family="test")
+        counts = {k: v for (f, k), v in cache_stats._pending.items() if f == "test"}
+        self.assertEqual({k: counts.get(k) for k in ("hits", "misses", "evictions",
+                                                     "stale", "builds")},
+                         {"hits": 1, "misses": 2, "evictions": 1, "stale": 1, "builds": 1})
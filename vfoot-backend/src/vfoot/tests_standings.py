@@ -0,0 +1,173 @@
+"""La classifica salvata: si muove con i risultati, e dice le stesse cose di prima.
+
+Quello che conta non è che sia veloce, è che non si possa distinguere da una
+classifica rifatta dalle partite: dopo una chiusura, una rettifica, una
+riapertura, e anche quando qualcuno scrive un risultato senza passare dal
+percorso che la aggiorna.
+"""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from vfoot.models import (
+    CompetitionStage, FantasyCompetition, FantasyFixture, FantasyFixtureDetail,
+    FantasyLeague, FantasyStandingRow, FantasyTeam, LeagueMembership,
+)
+from vfoot.services import standings
+
+
+class StandingsTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("boss", password="x")
+        self.league = FantasyLeague.objects.create(name="L", owner=self.owner)
+        self.teams = []
+        for i, name in enumerate(("A", "B", "C")):
+            user = self.owner if i == 0 else User.objects.create_user(f"u{i}", password="x")
+            membership = LeagueMembership.objects.create(
+                league=self.league, user=user,
+                role=LeagueMembership.ROLE_ADMIN if i == 0 else LeagueMembership.ROLE_MANAGER)
+            self.teams.append(FantasyTeam.objects.create(
+                league=self.league, manager=membership, name=name))
+        self.a, self.b, self.c = self.teams
+        self.comp = FantasyCompetition.objects.create(
+            league=self.league, name="Campionato",
+            competition_type=FantasyCompetition.TYPE_ROUND_ROBIN)
+        self.rounds = [
+            self._fixture(1, self.a, self.b),
+            self._fixture(2, self.b, self.c),
+            self._fixture(3, self.c, self.a),
+        ]
+
+    def _fixture(self, round_no, home, away, stage=None):
+        return FantasyFixture.objects.create(
+            competition=self.comp, stage=stage, home_team=home, away_team=away,
+            round_no=round_no, leg_no=1)
+
+    def _finish(self, fx, hs, as_, vh=None, va=None):
+        """Chiude una partita come fa la conclusione: dentro ``tracking``."""
+        with standings.tracking([fx.id]):
+            self._write(fx, hs, as_, vh, va)
+
+    @staticmethod
+    def _write(fx, hs, as_, vh=None, va=None):
+        FantasyFixture.objects.filter(id=fx.id).update(
+            status=FantasyFixture.STATUS_FINISHED, home_total=hs, away_total=as_)
+        if vh is not None:
+            FantasyFixtureDetail.objects.update_or_create(
+                fixture=fx, defaults={"vfoot_home": vh, "vfoot_away": va})
+
+    def _table(self, **kw):
+        return {r["team"]: r for r in standings.table(self.comp, 3, 1, 0, **kw)}
+
+    def _rebuilt(self):
+        return patch.object(standings, "rebuild", side_effect=AssertionError("ricostruita"))
+
+    # -- il percorso normale non ricostruisce ------------------------------
+    def test_a_conclusion_moves_the_rows_and_the_read_trusts_them(self):
+        self._finish(self.rounds[0], 2, 1, 70.5, 64.0)
+        self._finish(self.rounds[1], 1, 1, 66.0, 66.5)
+        with self._rebuilt():
+            table = self._table()
+        self.assertEqual([table[t]["points"] for t in "ABC"], [3, 1, 1])
+        self.assertEqual(table["A"]["rank"], 1)
+        self.assertEqual((table["B"]["wins"], table["B"]["draws"], table["B"]["losses"]),
+                         (0, 1, 1))
+        self.assertEqual(table["B"]["avg_score_for"], round((64.0 + 66.0) / 2, 3))
+        self.assertEqual(standings.verify(self.comp), [])
+
+    def test_a_rectified_result_replaces_the_old_one(self):
+        self._finish(self.rounds[0], 2, 1, 70.5, 64.0)
+        self._finish(self.rounds[0], 0, 3, 60.0, 78.0)
+        with self._rebuilt():
+            table = self._table()
+        self.assertEqual((table["A"]["played"], table["A"]["losses"]), (1, 1))
+        self.assertEqual((table["B"]["points"], table["B"]["goals_for"]), (3, 3))
+        self.assertEqual(standings.verify(self.comp), [])
+
+    def test_a_reopened_matchday_leaves_the_table(self):
+        self._finish(self.rounds[0], 2, 1, 70.5, 64.0)
+        self._finish(self.rounds[1], 3, 0)
+        with standings.tracking([self.rounds[0].id]):
+            FantasyFixtureDetail.objects.filter(fixture=self.rounds[0]).delete()
+            FantasyFixture.objects.filter(id=self.rounds[0].id).update(
+                status=FantasyFixture.STATUS_SCHEDULED, home_total=0.0, away_total=0.0)
+        with self._rebuilt():
+            table = self._table()
+        self.assertNotIn("A", table)
+        self.assertEqual(table["B"]["played"], 1)
+        self.assertEqual(standings.verify(self.comp), [])
+
+    def test_nothing_moves_when_the_block_fails(self):
+        with self.assertRaises(RuntimeError):
+            with standings.tracking([self.rounds[0].id]):
+                self._write(self.rounds[0], 2, 1)
+                raise RuntimeError("conclusione fallita")
+        self.assertFalse(FantasyStandingRow.objects.exists())
+        self.assertEqual(FantasyFixture.objects.get(id=self.rounds[0].id).status,
+                         FantasyFixture.STATUS_SCHEDULED)
+
+    # -- un risultato scritto per un'altra strada --------------------------
+    def test_a_result_written_around_it_is_caught_on_read(self):
+        self._finish(self.rounds[0], 2, 1)
+        self._write(self.rounds[1], 0, 2)          # un seed, una simulazione
+        table = self._table()
+        self.assertEqual((table["C"]["points"], table["C"]["played"]), (3, 1))
+        self.assertEqual(standings.verify(self.comp), [])
+
+    # -- le partite in corso ------------------------------------------------
+    def test_live_fixtures_are_laid_over_the_stored_rows(self):
+        self._finish(self.rounds[0], 2, 1)
+        live = {self.rounds[1].id: {"home_total": 0, "away_total": 1}}
+        table = self._table(pending=[self.rounds[1], self.rounds[2]], live_totals=live)
+        self.assertTrue(table["B"]["provisional"] and table["C"]["provisional"])
+        self.assertFalse(table["A"]["provisional"])
+        self.assertEqual((table["C"]["points"], table["B"]["played"]), (3, 2))
+        # Nessun tabellino per una partita in corso: la media resta quella di prima.
+        self.assertEqual(table["C"]["avg_score_for"], 0.0)
+        self.assertFalse(FantasyStandingRow.objects.filter(team=self.c).exists())
+
+    # -- fasi e punti --------------------------------------------------------
+    def test_a_stage_reads_its_own_rows_and_the_competition_all_of_them(self):
+        group = CompetitionStage.objects.create(competition=self.comp, name="Girone",
+                                                order_index=1)
+        playoff = CompetitionStage.objects.create(competition=self.comp, name="Playoff",
+                                                  order_index=2)
+        self._finish(self._fixture(10, self.a, self.b, stage=group), 1, 0)
+        self._finish(self._fixture(11, self.a, self.c, stage=playoff), 2, 0)
+        self.assertEqual(self._table(stage=group)["A"]["played"], 1)
+        self.assertNotIn("C", self._table(stage=group))
+        self.assertEqual(self._table()["A"]["points"], 6)
+
+    def test_points_follow_the_competition_values(self):
+        self._finish(self.rounds[0], 1, 1)
+        table = {r["team"]: r for r in standings.table(self.comp, 2, 1, 0)}
+        self.assertEqual(table["A"]["points"], 1)
+        table = {r["team"]: r for r in standings.table(self.comp, 3, 2, 0)}
+        self.assertEqual(table["A"]["points"], 2)
+
+    # -- la vista e il comando ----------------------------------------------
+    def test_the_view_serves_the_stored_table(self):
+        self._finish(self.rounds[0], 2, 1)
+        client = APIClient()
+        client.force_authenticate(user=self.owner)
+        with self._rebuilt():
+            res = client.get(f"/api/v1/leagues/{self.league.id}/standings")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([r["team"] for r in res.json()["standings"]], ["A", "B"])
+
+    def test_the_command_checks_and_rebuilds(self):
+        out = open("/dev/null", "w")
+        self.addCleanup(out.close)
+        self._finish(self.rounds[0], 2, 1)
+        call_command("rebuild_standings", "--check", stdout=out)
+        FantasyStandingRow.objects.filter(team=self.a).update(wins=0, losses=1)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_standings", "--check", stdout=out)
+        call_command("rebuild_standings", "--league", self.league.id, stdout=out)
+        self.assertEqual(standings.verify(self.comp), [])
@@ -150,8 +150,8 @@ class MyTeamIdentityTests(TestCase):
         self.assertEqual(row["team_crest"], '{"shape":"circle"}')
 
     def test_standings_carry_the_crest(self):
-        """The standings rows are built by a block that DUPLICATES
-        _compute_standings(). The crest was added to one and not the other, and
+        """The standings rows used to be built by a block that DUPLICATED the
+        standings computation. The crest was added to one and not the other, and
         nothing failed — the column simply came back empty. This is the test that
         would have caught it."""
         comp = FantasyCompetition.objects.create(league=self.league, name="Campionato")
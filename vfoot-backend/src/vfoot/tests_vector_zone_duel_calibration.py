@@ -0,0 +1,57 @@
+"""The vector zone-duel calibration on a match × zone × feature tensor.
+
+A candidate is scored by one contraction and a batch of candidates by one more
+axis on it: these check that the batch, the mirror permutation and the averaged
+SPSA step agree with what each piece means on its own.
+"""
+from __future__ import annotations
+
+import random
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from vfoot.management.commands import calibrate_vector_zone_duel as cvz
+
+LOSS = {"tau": 1.25, "sign_weight": 6.0, "diff_weight": 1.0, "draw_weight": 0.5,
+        "sign_tau": 4.0, "regularization": 0.03, "prior": cvz.VectorParams()}
+
+
+def _samples(n: int = 30, zones: int = 12) -> cvz.VectorZoneSamples:
+    rng = np.random.default_rng(3)
+    return cvz.VectorZoneSamples(
+        match_ids=np.arange(1, n + 1),
+        margins=rng.normal(scale=0.2, size=(n, zones, len(cvz.FEATURES))),
+        zone_centrality=np.isin(np.arange(zones) % 4, (1, 2)).astype(float),
+        goals=rng.integers(0, 4, size=(n, 2)).astype(float))
+
+
+class VectorZoneDuelCalibrationTests(SimpleTestCase):
+    def test_a_batch_scores_each_candidate_as_it_would_alone(self):
+        samples = _samples()
+        thetas = np.vstack([cvz._theta(cvz.VectorParams()),
+                            cvz._theta(cvz.VectorParams(saturation_k=2.0, xg_shots=1.6,
+                                                        home_advantage=-0.4))])
+        batch = cvz.objective_batch(samples, thetas, **LOSS)
+        alone = [cvz.objective(samples, cvz.VectorParams(**dict(zip(cvz.PARAM_NAMES, t))),
+                               **LOSS) for t in thetas.tolist()]
+        np.testing.assert_allclose(batch, alone, rtol=1e-12)
+
+    def test_one_candidate_is_the_classic_step(self):
+        samples = _samples()
+        params = cvz.VectorParams()
+        one = cvz.spsa_gradient(samples, params, rng=random.Random(7), perturbation=0.08,
+                                **LOSS)
+        rng = random.Random(7)
+        delta = np.array([1.0 if rng.random() >= 0.5 else -1.0 for _ in cvz.PARAM_NAMES])
+        step = 0.08 * cvz.SPSA_SCALES * delta
+        theta = cvz._theta(params)
+        plus, minus = (cvz.objective(samples, cvz.VectorParams(
+            **dict(zip(cvz.PARAM_NAMES, cvz._clipped(t[None])[0].tolist()))), **LOSS)
+            for t in (theta + step, theta - step))
+        np.testing.assert_allclose(list(one.values()), (plus - minus) / (2.0 * step),
+                                   rtol=1e-9)
+        many = cvz.spsa_gradient(samples, params, rng=random.Random(7), perturbation=0.08,
+                                 candidates=8, **LOSS)
+        self.assertEqual(set(many), set(one))
+        self.assertNotEqual(many, one)
@@ -0,0 +1,123 @@
+"""Il benchmark del voto rifatto costa quanto e' cambiato.
+
+Una stagione finta di quattro partite e i suoi fogli fantacalcio: la seconda
+costruzione legge tutte le pagelle da disco e non riscrive nessuna pagina, una
+partita reimportata e' l'unica ricalcolata, e il pool di processi scrive le
+pagine che scrive il calcolo in serie.
+"""
+from __future__ import annotations
+
+import random
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import openpyxl
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from realdata.models import (
+    Competition, CompetitionSeason, Match, MatchAppearance, Player, PlayerTeamStint,
+    PlayerZoneFeature, Season, Team, TeamSeason,
+)
+
+CLUBS = ("Inter", "Milan", "Roma", "Lazio")
+ROLES = ("POR", "DIF", "DIF", "CEN", "CEN", "ATT")
+SURNAMES = ("Alfa", "Bravo", "Conti", "Delta", "Esposito", "Ferri")
+FEATURES = ("touches", "passes_completed", "shots", "xg_shots", "tackles_won",
+            "interceptions", "key_passes")
+
+
+class VotoBenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(7)
+        comp = Competition.objects.create(external_id="23", name="Serie A")
+        cls.cs = CompetitionSeason.objects.create(
+            competition=comp, season=Season.objects.create(code="2025-2026"), name="Serie A")
+        cls.squads = {}
+        for club in CLUBS:
+            ts = TeamSeason.objects.create(competition_season=cls.cs,
+                                           team=Team.objects.create(name=club))
+            squad = []
+            for i, role in enumerate(ROLES):
+                p = Player.objects.create(full_name=f"Nome {SURNAMES[i]}",
+                                          short_name=SURNAMES[i], classic_role_seed=role)
+                PlayerTeamStint.objects.create(player=p, team_season=ts)
+                squad.append(p)
+            cls.squads[club] = (ts, squad)
+        cls.matches = []
+        for md, pairs in ((1, (("Inter", "Milan"), ("Roma", "Lazio"))),
+                          (2, (("Milan", "Roma"), ("Lazio", "Inter")))):
+            for home, away in pairs:
+                m = Match.objects.create(
+                    competition_season=cls.cs, matchday=md, status=Match.STATUS_FINISHED,
+                    home_team=cls.squads[home][0], away_team=cls.squads[away][0],
+                    home_goals=rng.randint(0, 3), away_goals=rng.randint(0, 3))
+                cls.matches.append(m)
+                for side, club in (("home", home), ("away", away)):
+                    ts, squad = cls.squads[club]
+                    for p in squad:
+                        minutes = rng.choice((90, 90, 60, 20))
+                        MatchAppearance.objects.create(
+                            match=m, player=p, team_season=ts, side=side,
+                            minutes_played=minutes, is_starter=minutes > 20)
+                        for f in FEATURES:
+                            PlayerZoneFeature.objects.create(
+                                match=m, player=p, provider="sofascore", feature_key=f,
+                                zone_key=f"Z_{rng.randint(0, 5)}_{rng.randint(0, 3)}",
+                                value=rng.random() * minutes / 10, team_side=side)
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.sheets = self.tmp / "fogli"
+        self.sheets.mkdir()
+        rng = random.Random(11)
+        for md in (1, 2):
+            wb = openpyxl.Workbook()
+            for title in ("Fantacalcio", "Statistico"):
+                ws = wb.create_sheet(title)
+                for club in CLUBS:
+                    ws.append([club.upper()])
+                    for i, role in enumerate(ROLES):
+                        ws.append([100 * CLUBS.index(club) + i, role[0], SURNAMES[i],
+                                   rng.choice((5.5, 6, 6.5, 7, "6*")), 0, 0, 0, 0, 0, 0, 0, 0, 0])
+            wb.remove(wb["Sheet"])
+            wb.save(self.sheets / f"Voti_Giornata_{md}.xlsx")
+
+    def _build(self, out, *args):
+        buf = StringIO()
+        call_command("build_voto_benchmark", "--season", str(self.cs.id),
+                     "--dir", str(self.sheets), "--out", str(self.tmp / out),
+                     "--workers", "1", *args, stdout=buf)
+        return buf.getvalue()
+
+    def _pages(self, out):
+        return {p.name: p.read_bytes() for p in (self.tmp / out).glob("*.html")}
+
+    def test_a_second_build_reads_everything_back(self):
+        first = self._build("out")
+        self.assertIn("0 pagelle dalla cache, 4 da calcolare", first)
+        pages = self._pages("out")
+        self.assertIn("giornata-02.html", pages)
+        again = self._build("out")
+        self.assertIn("4 pagelle dalla cache, 0 da calcolare", again)
+        self.assertIn("0 pagine riscritte", again)
+        self.assertEqual(self._pages("out"), pages)
+
+    def test_a_reimported_match_is_the_only_one_rescored(self):
+        self._build("out")
+        pages = self._pages("out")
+        Match.objects.filter(id=self.matches[2].id).update(data_changed_at=timezone.now())
+        out = self._build("out")
+        self.assertIn("3 pagelle dalla cache, 1 da calcolare", out)
+        self.assertEqual(len(list((self.tmp / "out" / ".cache").glob("pagella-*"))), 4)
+        self.assertEqual(self._pages("out"), pages, "stessi voti, stesse pagine")
+
+    def test_the_pool_builds_the_pages_the_serial_run_builds(self):
+        self._build("serie")
+        self._build("pool", "--workers", "3")
+        self.assertEqual(self._pages("pool"), self._pages("serie"))